@@ -32,6 +32,17 @@ class Settings(BaseSettings):
     LLM_MODEL: str = os.environ.get("LLM_MODEL", "deepseek-chat")
     LLM_TEMPERATURE: float = float(os.environ.get("LLM_TEMPERATURE", "0.7"))
     LLM_MAX_TOKENS: int = int(os.environ.get("LLM_MAX_TOKENS", "2000"))
+    # 异步 LLM 客户端（流式对话）：单次调用超时、并发上限与 keep-alive 连接池大小
+    LLM_TIMEOUT: float = float(os.environ.get("LLM_TIMEOUT", "60"))
+    LLM_MAX_CONCURRENCY: int = int(os.environ.get("LLM_MAX_CONCURRENCY", "16"))
+    LLM_POOL_MAX_CONNECTIONS: int = int(os.environ.get("LLM_POOL_MAX_CONNECTIONS", "32"))
+    LLM_POOL_MAX_KEEPALIVE: int = int(os.environ.get("LLM_POOL_MAX_KEEPALIVE", "16"))
+    # LLM 响应缓存：相同提示词直接复用结果；语义模式仅用于 temperature=0 的调用
+    LLM_CACHE_ENABLED: bool = os.environ.get("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_MAX_ENTRIES: int = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "512"))
+    LLM_CACHE_TTL_SECONDS: int = int(os.environ.get("LLM_CACHE_TTL_SECONDS", "600"))
+    LLM_CACHE_SEMANTIC: bool = os.environ.get("LLM_CACHE_SEMANTIC", "false").lower() == "true"
+    LLM_CACHE_SIMILARITY: float = float(os.environ.get("LLM_CACHE_SIMILARITY", "0.97"))
 
     # LLM 功能开关
     ENABLE_LLM: bool = os.environ.get("ENABLE_LLM", "true").lower() == "true"
@@ -47,8 +58,43 @@ class Settings(BaseSettings):
         "nomic-embed-text"
     )
     EMBEDDING_CACHE_SIZE: int = int(os.environ.get("EMBEDDING_CACHE_SIZE", "1000"))
+    # 持久化 embedding 缓存（跨进程共享，空字符串表示禁用）
+    EMBEDDING_CACHE_PATH: str = os.environ.get("EMBEDDING_CACHE_PATH", "data/embedding_cache.db")
+    EMBEDDING_CACHE_MAX_MB: int = int(os.environ.get("EMBEDDING_CACHE_MAX_MB", "256"))
+    # 批量 embedding：单次请求条数上限与并发请求数
+    EMBEDDING_BATCH_SIZE: int = int(os.environ.get("EMBEDDING_BATCH_SIZE", "64"))
+    EMBEDDING_MAX_CONCURRENCY: int = int(os.environ.get("EMBEDDING_MAX_CONCURRENCY", "4"))
     EMBEDDING_ENABLED: bool = os.environ.get("EMBEDDING_ENABLED", "true").lower() == "true"
 
+    # 房态可售库存索引（房型×日期），由事件总线增量维护；超过存活时间全量重建
+    AVAILABILITY_INDEX_ENABLED: bool = os.environ.get("AVAILABILITY_INDEX_ENABLED", "true").lower() == "true"
+    AVAILABILITY_INDEX_MAX_AGE_SECONDS: int = int(os.environ.get("AVAILABILITY_INDEX_MAX_AGE_SECONDS", "3600"))
+
+    # 日经营指标汇总（daily_kpi），由事件增量维护；今天的行超过存活时间按明细重算
+    KPI_ROLLUP_ENABLED: bool = os.environ.get("KPI_ROLLUP_ENABLED", "true").lower() == "true"
+    KPI_ROLLUP_MAX_AGE_SECONDS: int = int(os.environ.get("KPI_ROLLUP_MAX_AGE_SECONDS", "300"))
+    # 夜间对账任务重算的天数（含今天）
+    KPI_RECONCILE_DAYS: int = int(os.environ.get("KPI_RECONCILE_DAYS", "2"))
+
+    # 事件发件箱：启用后退房等事件与业务变更同事务写入 event_outbox，由中继线程批量发布
+    OUTBOX_ENABLED: bool = os.environ.get("OUTBOX_ENABLED", "false").lower() == "true"
+    OUTBOX_BATCH_SIZE: int = int(os.environ.get("OUTBOX_BATCH_SIZE", "100"))
+    OUTBOX_POLL_INTERVAL: float = float(os.environ.get("OUTBOX_POLL_INTERVAL", "1.0"))
+    OUTBOX_MAX_ATTEMPTS: int = int(os.environ.get("OUTBOX_MAX_ATTEMPTS", "10"))
+
+    # 内存审计日志（core AuditEngine）批量转存到 system_logs
+    AUDIT_SPILL_ENABLED: bool = os.environ.get("AUDIT_SPILL_ENABLED", "false").lower() == "true"
+
+    # 认证主体缓存：(员工 ID, 令牌版本) -> 身份与权限快照，命中时认证不访问数据库
+    AUTH_PRINCIPAL_CACHE_ENABLED: bool = os.environ.get("AUTH_PRINCIPAL_CACHE_ENABLED", "true").lower() == "true"
+    AUTH_PRINCIPAL_CACHE_SIZE: int = int(os.environ.get("AUTH_PRINCIPAL_CACHE_SIZE", "1024"))
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: int = int(os.environ.get("AUTH_PRINCIPAL_CACHE_TTL_SECONDS", "300"))
+
+    # 定时任务调度器（APScheduler），启动时只加载系统内置任务（如 daily_kpi_reconcile）；
+    # 多个 worker 通过锁文件保证只有一个进程运行调度器
+    SCHEDULER_ENABLED: bool = os.environ.get("SCHEDULER_ENABLED", "true").lower() == "true"
+    SCHEDULER_LOCK_PATH: str = os.environ.get("SCHEDULER_LOCK_PATH", "data/scheduler.lock")
+
     model_config = ConfigDict(env_file=".env", case_sensitive=True)
 
 
@@ -31,6 +31,8 @@ def init_db():
     from app.models import ontology  # noqa
     from app.models import snapshots  # noqa - 操作快照和配置历史表
     from app.models import security_events  # noqa - 安全事件表
+    from app.models import kpi  # noqa - 经营指标日汇总表
+    from app.models import outbox  # noqa - 事件发件箱
     from app.system import models as system_models  # noqa - 系统管理表
     Base.metadata.create_all(bind=engine)
 
@@ -50,7 +50,8 @@ def register_guest_rules(engine: RuleEngine) -> None:
             "等级升级检查"
         ),
         action=_upgrade_guest_tier,
-        priority=80
+        priority=80,
+        entity_type="guest"
     ))
 
     # 黑名单检查规则
@@ -63,7 +64,8 @@ def register_guest_rules(engine: RuleEngine) -> None:
             "黑名单检查"
         ),
         action=_block_blacklisted_guest,
-        priority=100
+        priority=100,
+        entity_type="guest"
     ))
 
     # VIP 特殊服务规则
@@ -76,7 +78,8 @@ def register_guest_rules(engine: RuleEngine) -> None:
             "VIP客人检查"
         ),
         action=_provide_vip_service,
-        priority=60
+        priority=60,
+        entity_type="guest"
     ))
 
     # 首次客人识别规则
@@ -89,7 +92,8 @@ def register_guest_rules(engine: RuleEngine) -> None:
             "首次客人检查"
         ),
         action=_welcome_first_time_guest,
-        priority=40
+        priority=40,
+        entity_type="guest"
     ))
 
     logger.info("Guest rules registered")
@@ -10,9 +10,12 @@ core/domain/rules/pricing_rules.py
 - 住宿天数折扣规则
 """
 from datetime import date, timedelta
-from typing import Any, Optional
+from functools import lru_cache
+from typing import Any, Optional, Sequence
 from decimal import Decimal
 
+import numpy as np
+
 from core.engine.rule_engine import (
     Rule,
     RuleContext,
@@ -23,6 +26,13 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# 会员折扣率（规则动作、calculate_room_price 与批量报价共用）
+_MEMBER_DISCOUNT_RATES = {
+    "vip": Decimal("0.15"),      # VIP 15% 折扣
+    "gold": Decimal("0.10"),     # 金卡 10% 折扣
+    "silver": Decimal("0.05"),   # 银卡 5% 折扣
+}
+
 
 def register_pricing_rules(engine: RuleEngine) -> None:
     """
@@ -41,7 +51,8 @@ def register_pricing_rules(engine: RuleEngine) -> None:
             "周末预订检查"
         ),
         action=_apply_weekend_surcharge,
-        priority=50
+        priority=50,
+        entity_type="pricing"
     ))
 
     # 节假日价格上调规则
@@ -54,7 +65,8 @@ def register_pricing_rules(engine: RuleEngine) -> None:
             "节假日预订检查"
         ),
         action=_apply_holiday_surcharge,
-        priority=60
+        priority=60,
+        entity_type="pricing"
     ))
 
     # 会员折扣规则
@@ -67,7 +79,8 @@ def register_pricing_rules(engine: RuleEngine) -> None:
             "会员预订检查"
         ),
         action=_apply_member_discount,
-        priority=70
+        priority=70,
+        entity_type="pricing"
     ))
 
     # 长住折扣规则
@@ -80,7 +93,8 @@ def register_pricing_rules(engine: RuleEngine) -> None:
             "长住检查"
         ),
         action=_apply_long_stay_discount,
-        priority=40
+        priority=40,
+        entity_type="pricing"
     ))
 
     logger.info("Pricing rules registered")
@@ -88,35 +102,52 @@ def register_pricing_rules(engine: RuleEngine) -> None:
 
 # ==================== 规则条件函数 ====================
 
+def _parse_date(value: Any) -> Optional[date]:
+    """ISO 字符串或 date 转为 date，其余返回 None"""
+    if not value:
+        return None
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    return value if isinstance(value, date) else None
+
+
+def _check_in_date(context: RuleContext) -> Optional[date]:
+    """入住日期（同一上下文只解析一次，周末/节假日/长住规则共用）"""
+    return context.fact(
+        "check_in_date", lambda ctx: _parse_date(ctx.parameters.get("check_in_date"))
+    )
+
+
+def _stay_nights(context: RuleContext) -> Optional[int]:
+    """住宿晚数（同一上下文只计算一次）"""
+    def compute(ctx: RuleContext) -> Optional[int]:
+        check_in = _check_in_date(ctx)
+        check_out = _parse_date(ctx.parameters.get("check_out_date"))
+        if not check_in or not check_out:
+            return None
+        return (check_out - check_in).days
+
+    return context.fact("stay_nights", compute)
+
+
 def _is_weekend_booking(context: RuleContext) -> bool:
     """检查是否是周末预订（周五、周六）"""
-    check_in = context.parameters.get("check_in_date")
+    check_in = _check_in_date(context)
     if not check_in:
         return False
 
-    if isinstance(check_in, str):
-        check_in = date.fromisoformat(check_in)
-    elif not isinstance(check_in, date):
-        return False
-
     # 周五 (4) 或周六 (5)
     return check_in.weekday() in (4, 5)
 
 
 def _is_holiday_booking(context: RuleContext) -> bool:
     """检查是否是节假日预订"""
-    check_in = context.parameters.get("check_in_date")
+    check_in = _check_in_date(context)
     if not check_in:
         return False
 
-    if isinstance(check_in, str):
-        check_in = date.fromisoformat(check_in)
-    elif not isinstance(check_in, date):
-        return False
-
     # 中国法定节假日列表（简化版）
-    holidays = _get_chinese_holidays(check_in.year)
-    return check_in in holidays
+    return check_in in _holiday_set(check_in.year)
 
 
 def _is_member_booking(context: RuleContext) -> bool:
@@ -136,19 +167,8 @@ def _is_member_booking(context: RuleContext) -> bool:
 
 def _is_long_stay(context: RuleContext) -> bool:
     """检查是否是长住（7天及以上）"""
-    check_in = context.parameters.get("check_in_date")
-    check_out = context.parameters.get("check_out_date")
-
-    if not check_in or not check_out:
-        return False
-
-    if isinstance(check_in, str):
-        check_in = date.fromisoformat(check_in)
-    if isinstance(check_out, str):
-        check_out = date.fromisoformat(check_out)
-
-    nights = (check_out - check_in).days
-    return nights >= 7
+    nights = _stay_nights(context)
+    return nights is not None and nights >= 7
 
 
 # ==================== 规则动作函数 ====================
@@ -193,40 +213,25 @@ def _apply_member_discount(context: RuleContext) -> None:
     else:
         return
 
-    # 折扣率
-    discount_rates = {
-        "vip": 0.15,      # VIP 15% 折扣
-        "gold": 0.10,     # 金卡 10% 折扣
-        "silver": 0.05,   # 银卡 5% 折扣
-    }
-
-    discount_rate = discount_rates.get(tier, 0)
-    if discount_rate > 0:
-        discount = Decimal(str(base_price)) * Decimal(str(discount_rate))
+    discount_rate = _MEMBER_DISCOUNT_RATES.get(tier)
+    if discount_rate:
+        discount = Decimal(str(base_price)) * discount_rate
         adjusted_price = Decimal(str(base_price)) - discount
 
         context.metadata["member_discount"] = float(discount)
         context.metadata["adjusted_price"] = float(adjusted_price)
-        context.metadata["discount_rate"] = discount_rate
+        context.metadata["discount_rate"] = float(discount_rate)
         logger.info(f"Member discount applied ({tier}): -{discount}")
 
 
 def _apply_long_stay_discount(context: RuleContext) -> None:
     """应用长住折扣"""
-    check_in = context.parameters.get("check_in_date")
-    check_out = context.parameters.get("check_out_date")
     base_price = context.parameters.get("base_price")
+    nights = _stay_nights(context)
 
-    if not all([check_in, check_out, base_price]):
+    if nights is None or not base_price:
         return
 
-    if isinstance(check_in, str):
-        check_in = date.fromisoformat(check_in)
-    if isinstance(check_out, str):
-        check_out = date.fromisoformat(check_out)
-
-    nights = (check_out - check_in).days
-
     # 折扣率
     if nights >= 14:
         discount_rate = 0.15
@@ -289,6 +294,19 @@ def _get_chinese_holidays(year: int) -> list[date]:
     return holidays
 
 
+@lru_cache(maxsize=32)
+def _holiday_set(year: int) -> frozenset:
+    """按年缓存的节假日集合，供逐晚/批量判断使用"""
+    return frozenset(_get_chinese_holidays(year))
+
+
+def _holiday_mask(dates: Sequence[date]) -> np.ndarray:
+    """批量判断节假日，每个年份只取一次节假日集合"""
+    return np.fromiter(
+        (d in _holiday_set(d.year) for d in dates), dtype=bool, count=len(dates)
+    )
+
+
 # ==================== 便捷函数 ====================
 
 def calculate_room_price(
@@ -319,20 +337,14 @@ def calculate_room_price(
         adjustments.append({"name": "周末上调", "amount": float(surcharge)})
 
     # 节假日上调
-    holidays = _get_chinese_holidays(check_in.year)
-    if check_in in holidays:
+    if check_in in _holiday_set(check_in.year):
         surcharge = price * Decimal("0.30")
         price += surcharge
         adjustments.append({"name": "节假日上调", "amount": float(surcharge)})
 
     # 会员折扣
-    discount_rates = {
-        "vip": 0.15,
-        "gold": 0.10,
-        "silver": 0.05,
-    }
-    if guest_tier in discount_rates:
-        discount = Decimal(str(base_price)) * Decimal(str(discount_rates[guest_tier]))
+    if guest_tier in _MEMBER_DISCOUNT_RATES:
+        discount = Decimal(str(base_price)) * _MEMBER_DISCOUNT_RATES[guest_tier]
         price -= discount
         adjustments.append({"name": f"{guest_tier.upper()}会员折扣", "amount": -float(discount)})
 
@@ -350,6 +362,60 @@ def calculate_room_price(
     return float(price), {"adjustments": adjustments, "nights": nights}
 
 
+def calculate_room_prices(
+    base_prices: Sequence[float],
+    check_ins: Sequence[date],
+    check_outs: Sequence[date],
+    guest_tiers: Sequence[str] = None
+) -> list[float]:
+    """
+    批量计算房间价格，结果与逐条调用 calculate_room_price 相同
+
+    周末、节假日、会员、长住四条规则以掩码数组一次性作用于全部报价，
+    金额仍用 Decimal 计算，不引入浮点误差
+
+    Args:
+        base_prices: 基础价格
+        check_ins: 入住日期
+        check_outs: 退房日期
+        guest_tiers: 客人等级，缺省均为 basic
+
+    Returns:
+        最终价格列表
+    """
+    count = len(base_prices)
+    if not (len(check_ins) == len(check_outs) == count):
+        raise ValueError("base_prices、check_ins、check_outs 长度不一致")
+    if guest_tiers is None:
+        guest_tiers = ["basic"] * count
+    elif len(guest_tiers) != count:
+        raise ValueError("guest_tiers 长度不一致")
+    if count == 0:
+        return []
+
+    base = np.array([Decimal(str(p)) for p in base_prices], dtype=object)
+    ordinals = np.fromiter((d.toordinal() for d in check_ins), dtype=np.int64, count=count)
+    nights = np.fromiter((d.toordinal() for d in check_outs), dtype=np.int64, count=count) - ordinals
+    zero = Decimal("0")
+
+    price = base.copy()
+    # 周末上调（toordinal 第 1 天为周一）
+    weekend = np.isin((ordinals - 1) % 7, (4, 5))
+    price = price + np.where(weekend, price * Decimal("0.20"), zero)
+    # 节假日上调
+    price = price + np.where(_holiday_mask(check_ins), price * Decimal("0.30"), zero)
+    # 会员折扣
+    member_rates = np.array([_MEMBER_DISCOUNT_RATES.get(t, zero) for t in guest_tiers], dtype=object)
+    price = price - base * member_rates
+    # 长住折扣
+    long_stay_rates = np.where(
+        nights >= 14, Decimal("0.15"), np.where(nights >= 7, Decimal("0.10"), zero)
+    )
+    price = price - base * long_stay_rates
+
+    return [float(p) for p in price]
+
+
 def is_weekend(date_to_check: date) -> bool:
     """检查是否是周末（周五或周六）"""
     return date_to_check.weekday() in (4, 5)
@@ -357,13 +423,13 @@ def is_weekend(date_to_check: date) -> bool:
 
 def is_holiday(date_to_check: date) -> bool:
     """检查是否是节假日"""
-    holidays = _get_chinese_holidays(date_to_check.year)
-    return date_to_check in holidays
+    return date_to_check in _holiday_set(date_to_check.year)
 
 
 __all__ = [
     "register_pricing_rules",
     "calculate_room_price",
+    "calculate_room_prices",
     "is_weekend",
     "is_holiday",
 ]
@@ -40,7 +40,9 @@ def register_room_rules(engine: RuleEngine) -> None:
             "退房动作检查"
         ),
         action=_set_room_dirty,
-        priority=100
+        priority=100,
+        entity_type="room",
+        events=("checkout",)
     ))
 
     # 入住时房间变为 OCCUPIED
@@ -53,7 +55,9 @@ def register_room_rules(engine: RuleEngine) -> None:
             "入住动作检查"
         ),
         action=_set_room_occupied,
-        priority=100
+        priority=100,
+        entity_type="room",
+        events=("checkin", "walkin_checkin")
     ))
 
     # 清洁完成房间变为 VACANT_CLEAN
@@ -66,7 +70,9 @@ def register_room_rules(engine: RuleEngine) -> None:
             "清洁完成动作检查"
         ),
         action=_set_room_vacant_clean,
-        priority=100
+        priority=100,
+        entity_type="room",
+        events=("complete_task",)
     ))
 
     logger.info("Room rules registered")
@@ -7,6 +7,7 @@ from typing import Callable, List
 import logging
 
 from app.services.event_bus import event_bus, Event
+from app.services.outbox_service import claim_event, outbox_enabled
 from app.models.events import EventType
 from app.database import SessionLocal
 
@@ -72,6 +73,11 @@ class EventHandlers:
                 logger.warning(f"Invalid checkout event: missing room_id")
                 return
 
+            # 发件箱至少一次投递：同一退房事件只创建一次清洁任务
+            if outbox_enabled() and not claim_event(db, "checkout_cleaning_task", event.event_id):
+                logger.info(f"Checkout event {event.event_id} already handled, skipping")
+                return
+
             # 创建清洁任务
             cleaning_task = Task(
                 room_id=room_id,
@@ -115,13 +121,18 @@ class EventHandlers:
                 logger.warning(f"Invalid task completed event: missing room_id")
                 return
 
+            # 发件箱至少一次投递：重放的完成事件不能把之后再次变脏的房间置为干净
+            if outbox_enabled() and not claim_event(db, "task_completed_room_clean", event.event_id):
+                logger.info(f"Task completed event {event.event_id} already handled, skipping")
+                return
+
             room = db.query(Room).filter(Room.id == room_id).first()
             if room and room.status == RoomStatus.VACANT_DIRTY:
                 room.status = RoomStatus.VACANT_CLEAN
-                db.commit()
                 logger.info(
                     f"Room {data.get('room_number')} status updated to vacant_clean"
                 )
+            db.commit()
         except Exception as e:
             db.rollback()
             logger.error(f"Failed to update room status: {e}", exc_info=True)
@@ -147,6 +158,11 @@ class EventHandlers:
             if not old_room_id:
                 return
 
+            # 发件箱至少一次投递：同一换房事件只创建一次清洁任务
+            if outbox_enabled() and not claim_event(db, "room_change_cleaning_task", event.event_id):
+                logger.info(f"Room changed event {event.event_id} already handled, skipping")
+                return
+
             # 创建清洁任务
             cleaning_task = Task(
                 room_id=old_room_id,
@@ -25,10 +25,27 @@ async def lifespan(app: FastAPI):
     from app.services.event_handlers import register_event_handlers
     register_event_handlers()
 
+    # 注册房态可售库存索引（订阅预订/入住/退房/房态事件）
+    from app.services.availability_index import register_availability_index
+    register_availability_index()
+
+    # 注册日经营指标汇总（订阅入住/退房/收款/房态事件，增量更新 daily_kpi）
+    from app.services.kpi_rollup_service import register_kpi_rollup
+    register_kpi_rollup()
+
     # 注册告警处理器
     from app.services.alert_service import register_alert_handlers
     register_alert_handlers()
 
+    # 启动事件发件箱中继（OUTBOX_ENABLED 时，发布上次运行遗留和新写入的事件；
+    # 在所有事件处理器注册之后启动）
+    from app.services.outbox_service import start_outbox_relay
+    start_outbox_relay()
+
+    # 启动审计日志转存（AUDIT_SPILL_ENABLED 时，core 审计条目批量写入 system_logs）
+    from app.services.audit_service import start_audit_spill
+    start_audit_spill()
+
     # ========== SPEC-64: 初始化本体注册中心 ==========
     try:
         # 导入本体注册中心
@@ -71,6 +88,10 @@ async def lifespan(app: FastAPI):
             model=settings.EMBEDDING_MODEL,
             cache_size=settings.EMBEDDING_CACHE_SIZE,
             enabled=settings.ENABLE_LLM and settings.EMBEDDING_ENABLED and bool(embed_api_key),
+            cache_path=settings.EMBEDDING_CACHE_PATH or None,
+            cache_max_bytes=settings.EMBEDDING_CACHE_MAX_MB * 1024 * 1024,
+            batch_size=settings.EMBEDDING_BATCH_SIZE,
+            max_concurrency=settings.EMBEDDING_MAX_CONCURRENCY,
         )
 
         # ========== Configure admin roles for SecurityContext ==========
@@ -136,7 +157,12 @@ async def lifespan(app: FastAPI):
         from core.security.permission import permission_provider_registry
         from app.system.services.permission_provider import RBACPermissionProvider
         from app.database import SessionLocal
-        provider = RBACPermissionProvider(SessionLocal)
+        from app.config import settings as app_settings
+        provider = RBACPermissionProvider(
+            SessionLocal,
+            max_entries=app_settings.AUTH_PRINCIPAL_CACHE_SIZE,
+            ttl_seconds=app_settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS,
+        )
         permission_provider_registry.set_provider(provider)
         print("✓ RBAC PermissionProvider 已注册")
 
@@ -161,6 +187,37 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"本体注册中心初始化警告: {e}")
 
+    # ========== 定时任务调度器 ==========
+    # 补齐系统内置任务（如 daily_kpi_reconcile），启动调度器并只加载内置任务；
+    # 多 worker 时由锁文件选出一个进程运行调度器，避免任务重复执行
+    scheduler_backend = None
+    scheduler_lock = None
+    from app.config import settings as app_settings
+    if app_settings.SCHEDULER_ENABLED:
+        try:
+            from core.scheduler import SchedulerRegistry
+            from app.system.services.scheduler_backend import APSchedulerBackend, acquire_scheduler_lock
+            from app.system.services.scheduler_service import SchedulerService
+            from app.database import SessionLocal
+            scheduler_lock = acquire_scheduler_lock(app_settings.SCHEDULER_LOCK_PATH)
+            if scheduler_lock is None:
+                print("定时任务调度器已由其他 worker 运行，本进程跳过")
+            elif SchedulerRegistry().get_backend() is None:
+                scheduler_backend = APSchedulerBackend()
+                SchedulerRegistry().set_backend(scheduler_backend)
+                scheduler_backend.start()
+            if scheduler_lock is not None:
+                job_db = SessionLocal()
+                try:
+                    job_service = SchedulerService(job_db)
+                    job_service.seed_builtin_jobs()
+                    if scheduler_backend is not None:
+                        job_service.load_builtin_jobs()
+                finally:
+                    job_db.close()
+        except Exception as e:
+            print(f"定时任务调度器初始化警告: {e}")
+
     # ========== 可选：初始化语义搜索索引 ==========
     # 通过环境变量 AUTO_BUILD_SCHEMA_INDEX 控制是否自动构建
     if os.getenv("AUTO_BUILD_SCHEMA_INDEX", "false").lower() == "true":
@@ -179,8 +236,34 @@ async def lifespan(app: FastAPI):
 
     yield
 
-    # 关闭时执行（如果需要清理资源）
-    pass
+    # 关闭时执行：停止本进程启动的调度器
+    if scheduler_backend is not None:
+        from core.scheduler import SchedulerRegistry
+        scheduler_backend.shutdown()
+        if SchedulerRegistry().get_backend() is scheduler_backend:
+            SchedulerRegistry().clear()
+    if scheduler_lock is not None:
+        scheduler_lock.close()
+
+    # 关闭时执行：释放异步 LLM 客户端的连接池
+    from app.routers.ai import close_async_llm_client
+    await close_async_llm_client()
+
+    # 关闭时执行：发布发件箱中剩余的事件并停止中继
+    from app.services.outbox_service import stop_outbox_relay
+    stop_outbox_relay()
+
+    # 关闭时执行：转存剩余审计日志并停止转存线程
+    from app.services.audit_service import stop_audit_spill
+    stop_audit_spill()
+
+    # 关闭时执行：处理完框架事件总线中排队的异步事件
+    from core.engine.event_bus import event_bus as core_event_bus
+    core_event_bus.shutdown(timeout=5.0)
+
+    # 关闭时执行：提交调试日志写队列中尚未落库的记录
+    from core.ai.debug_logger import flush_debug_loggers
+    flush_debug_loggers()
 
 
 # 创建应用
@@ -25,6 +25,8 @@ class EventType(str, Enum):
     RESERVATION_CREATED = "reservation.created"
     RESERVATION_CANCELLED = "reservation.cancelled"
     RESERVATION_CONFIRMED = "reservation.confirmed"
+    RESERVATION_UPDATED = "reservation.updated"
+    RESERVATION_NO_SHOW = "reservation.no_show"
 
     # 任务相关
     TASK_CREATED = "task.created"
@@ -72,6 +74,22 @@ class RoomStatusChangedData(BaseEventData):
     reason: str = ""
 
 
+@dataclass
+class RoomCreatedData(BaseEventData):
+    """房间创建事件数据"""
+    room_id: int = 0
+    room_number: str = ""
+    room_type_id: int = 0
+    floor: int = 0
+    status: str = ""
+    is_active: bool = True
+
+
+@dataclass
+class RoomUpdatedData(RoomCreatedData):
+    """房间更新事件数据（删除房间时 is_active=False）"""
+
+
 @dataclass
 class GuestCheckedInData(BaseEventData):
     """客人入住事件数据"""
@@ -142,11 +160,17 @@ class ReservationCreatedData(BaseEventData):
     room_type_name: str = ""
     check_in_date: str = ""  # date as string
     check_out_date: str = ""  # date as string
+    room_count: int = 1
     total_amount: float = 0.0
     operator_id: int = 0
     operator_name: str = ""
 
 
+@dataclass
+class ReservationUpdatedData(ReservationCreatedData):
+    """预订修改事件数据（修改后的完整预订信息）"""
+
+
 @dataclass
 class ReservationCancelledData(BaseEventData):
     """预订取消事件数据"""
@@ -228,6 +252,7 @@ class PaymentReceivedData(BaseEventData):
     stay_record_id: int = 0
     amount: float = 0.0
     method: str = ""
+    payment_time: Optional[datetime] = None
     received_by: int = 0
     received_by_name: str = ""
 
@@ -269,12 +294,16 @@ class OperationUndoneData(BaseEventData):
 # 事件数据类型映射
 EVENT_DATA_CLASSES = {
     EventType.ROOM_STATUS_CHANGED: RoomStatusChangedData,
+    EventType.ROOM_CREATED: RoomCreatedData,
+    EventType.ROOM_UPDATED: RoomUpdatedData,
     EventType.GUEST_CHECKED_IN: GuestCheckedInData,
     EventType.GUEST_CHECKED_OUT: GuestCheckedOutData,
     EventType.STAY_EXTENDED: StayExtendedData,
     EventType.ROOM_CHANGED: RoomChangedData,
     EventType.RESERVATION_CREATED: ReservationCreatedData,
     EventType.RESERVATION_CANCELLED: ReservationCancelledData,
+    EventType.RESERVATION_UPDATED: ReservationUpdatedData,
+    EventType.RESERVATION_NO_SHOW: ReservationCancelledData,
     EventType.TASK_CREATED: TaskCreatedData,
     EventType.TASK_ASSIGNED: TaskAssignedData,
     EventType.TASK_STARTED: TaskStartedData,
@@ -0,0 +1,56 @@
+"""
+经营指标日汇总表
+每个营业日一行，由事件处理器增量维护、夜间任务对账重算，
+仪表盘与报表直接读取，不再扫描业务明细表
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, Date, DateTime, Float, Numeric, Text
+from app.database import Base
+
+
+class DailyKPI(Base):
+    """
+    日经营指标汇总
+
+    - 房态计数（total_rooms ~ out_of_order）为该日作为"今天"时最后一次刷新的快照
+    - occupied_rooms 口径与入住率报表一致：在住且预计离店晚于当天，或当天退房
+    - revenue 为当天收款合计（含退款负数），ADR = revenue / occupied_rooms，
+      RevPAR = revenue / sellable_rooms
+    - revenue_by_method: {"cash": "100.00", ...}
+    - room_type_breakdown: {"<room_type_id>": {room_type_name, total_rooms,
+      occupied_rooms, arrivals, departures, revenue}}
+    """
+    __tablename__ = "daily_kpi"
+
+    id = Column(Integer, primary_key=True, index=True)
+    business_date = Column(Date, unique=True, nullable=False, index=True)
+
+    # 房态快照
+    total_rooms = Column(Integer, default=0)
+    sellable_rooms = Column(Integer, default=0)
+    vacant_clean = Column(Integer, default=0)
+    vacant_dirty = Column(Integer, default=0)
+    occupied = Column(Integer, default=0)
+    out_of_order = Column(Integer, default=0)
+
+    # 入住率
+    occupied_rooms = Column(Integer, default=0)
+    occupancy_rate = Column(Float, default=0.0)
+
+    # 到离店
+    arrivals = Column(Integer, default=0)
+    departures = Column(Integer, default=0)
+
+    # 营收
+    revenue = Column(Numeric(12, 2), default=0)
+    payment_count = Column(Integer, default=0)
+    adr = Column(Numeric(12, 2), default=0)
+    revpar = Column(Numeric(12, 2), default=0)
+    revenue_by_method = Column(Text)        # JSON
+    room_type_breakdown = Column(Text)      # JSON
+
+    reconciled_at = Column(DateTime)        # 最近一次全量重算时间
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+
+__all__ = ["DailyKPI"]
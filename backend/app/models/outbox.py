@@ -0,0 +1,48 @@
+"""
+事件发件箱（transactional outbox）
+领域事件与业务变更在同一事务中写入 event_outbox，由中继进程读取后发布到事件总线；
+processed_events 记录消费者已处理的事件 ID，用于至少一次投递下的幂等
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index, UniqueConstraint
+from app.database import Base
+
+
+class OutboxEvent(Base):
+    """
+    待发布的领域事件
+
+    - event_id 即幂等键，中继重发时保持不变
+    - payload 为 Event.data 的 JSON
+    - published_at 为空表示尚未发布；attempts 为发布失败次数
+    """
+    __tablename__ = "event_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    event_id = Column(String(64), unique=True, nullable=False)
+    event_type = Column(String(64), nullable=False)
+    source = Column(String(64), default="")
+    payload = Column(Text, nullable=False)
+    occurred_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=datetime.now, nullable=False)
+    published_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text)
+
+    __table_args__ = (
+        Index("ix_event_outbox_pending", "published_at", "id"),
+    )
+
+
+class ProcessedEvent(Base):
+    """消费者已处理的事件（consumer + event_id 唯一）"""
+    __tablename__ = "processed_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    consumer = Column(String(64), nullable=False)
+    event_id = Column(String(64), nullable=False)
+    processed_at = Column(DateTime, default=datetime.now, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("consumer", "event_id", name="uq_processed_events_consumer_event"),
+    )
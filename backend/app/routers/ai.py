@@ -2,11 +2,17 @@
 AI 对话路由
 实现自然语言交互和 OODA 循环
 """
+import asyncio
+import json
+import logging
 import uuid
 from typing import Optional, List
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
+from app.config import settings
 from app.database import get_db
 from app.models.ontology import Employee
 from app.models.schemas import AIAction, ActionConfirmation
@@ -14,7 +20,10 @@ from app.services.ai_service import AIService
 from app.services.conversation_service import ConversationService
 from app.security.auth import get_current_user, require_permission
 from app.security.permissions import AI_CHAT
+from core.ai.llm_client import AsyncOpenAICompatibleClient
+from core.ai.llm_stream import ChatStreamBridge, set_stream_handler
 
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/ai", tags=["AI对话"])
 
@@ -30,6 +39,36 @@ def get_conversation_service() -> ConversationService:
     return _conversation_service
 
 
+# 全局异步 LLM 客户端（流式对话共享同一个 keep-alive 连接池）
+_async_llm_client: Optional[AsyncOpenAICompatibleClient] = None
+
+
+def get_async_llm_client() -> Optional[AsyncOpenAICompatibleClient]:
+    """获取异步 LLM 客户端实例，LLM 未启用时返回 None"""
+    global _async_llm_client
+    if not (settings.ENABLE_LLM and settings.OPENAI_API_KEY):
+        return None
+    if _async_llm_client is None:
+        _async_llm_client = AsyncOpenAICompatibleClient(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL,
+            model=settings.LLM_MODEL,
+            timeout=settings.LLM_TIMEOUT,
+            max_concurrency=settings.LLM_MAX_CONCURRENCY,
+            max_connections=settings.LLM_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_POOL_MAX_KEEPALIVE,
+        )
+    return _async_llm_client
+
+
+async def close_async_llm_client() -> None:
+    """关闭异步 LLM 客户端的连接池（应用关闭时调用）"""
+    global _async_llm_client
+    if _async_llm_client is not None:
+        await _async_llm_client.aclose()
+        _async_llm_client = None
+
+
 # ============== 请求/响应模型 ==============
 
 class AIMessageWithContext(BaseModel):
@@ -69,6 +108,77 @@ def chat(
     - **content**: 用户消息内容
     - **topic_id**: 可选，当前话题 ID（用于上下文追踪）
     """
+    return _run_chat(message, db, current_user, conv_service)
+
+
+@router.post("/chat/stream")
+async def chat_stream(
+    message: AIMessageWithContext,
+    db: Session = Depends(get_db),
+    current_user: Employee = Depends(get_current_user),
+    conv_service: ConversationService = Depends(get_conversation_service),
+    llm_client: Optional[AsyncOpenAICompatibleClient] = Depends(get_async_llm_client)
+):
+    """
+    流式 AI 对话接口（Server-Sent Events）
+    与 /ai/chat 处理流程相同，但 LLM 生成回复时逐 token 推送
+
+    事件类型：
+    - **token**: `{"delta": "...", "stream": 0}`，回复文本增量；stream 递增表示新一轮生成，覆盖之前的文本
+    - **done**: 完整响应，结构同 /ai/chat
+    - **error**: `{"detail": "..."}`，处理失败
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    bridge = None
+    if llm_client is not None and llm_client.is_enabled():
+        bridge = ChatStreamBridge(llm_client, loop, queue, timeout=settings.LLM_TIMEOUT)
+
+    def run() -> AIResponseWithHistory:
+        # OODA 编排使用同步数据库会话，放在工作线程中执行；LLM 调用回到事件循环
+        set_stream_handler(bridge)
+        try:
+            return _run_chat(message, db, current_user, conv_service)
+        finally:
+            set_stream_handler(None)
+
+    async def event_stream():
+        task = asyncio.ensure_future(run_in_threadpool(run))
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            yield _sse_event(*item)
+
+        try:
+            response = task.result()
+        except Exception as e:
+            logger.exception("Streaming chat failed")
+            yield _sse_event("error", {"detail": str(e)})
+            return
+        yield _sse_event("done", response.model_dump(mode="json"))
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _sse_event(event: str, data: dict) -> str:
+    """格式化一条 SSE 事件"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+def _run_chat(
+    message: AIMessageWithContext,
+    db: Session,
+    current_user: Employee,
+    conv_service: ConversationService
+) -> AIResponseWithHistory:
+    """执行一轮对话：加载上下文、运行 OODA 循环、保存消息对"""
     # 获取历史上下文消息
     conversation_history = []
     follow_up_context = None
@@ -176,8 +176,16 @@ def get_statistics(
 
     Requires sysadmin role.
     """
+    from app.services.llm_service import get_response_cache
+
     debug_logger = get_debug_logger()
-    return debug_logger.get_statistics()
+    stats = debug_logger.get_statistics()
+
+    # Live counters of the in-process LLM response cache
+    response_cache = get_response_cache()
+    if response_cache is not None:
+        stats["llm_response_cache"] = response_cache.get_stats()
+    return stats
 
 
 # ==================== Analytics Endpoints ====================
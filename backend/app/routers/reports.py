@@ -8,6 +8,7 @@ from app.database import get_db
 from app.models.ontology import Employee
 from app.models.schemas import DashboardStats
 from app.services.report_service import ReportService
+from app.services.kpi_rollup_service import KPIRollupService
 from app.security.auth import get_current_user, require_manager, require_permission
 from app.security.permissions import REPORT_READ
 
@@ -19,8 +20,8 @@ def get_dashboard(
     db: Session = Depends(get_db),
     current_user: Employee = Depends(get_current_user)
 ):
-    """获取仪表盘数据"""
-    service = ReportService(db)
+    """获取仪表盘数据（读取 daily_kpi 日汇总）"""
+    service = KPIRollupService(db)
     return DashboardStats(**service.get_dashboard_stats())
 
 
@@ -31,8 +32,8 @@ def get_occupancy_report(
     db: Session = Depends(get_db),
     current_user: Employee = Depends(require_permission(REPORT_READ))
 ):
-    """获取入住率报表"""
-    service = ReportService(db)
+    """获取入住率报表（读取 daily_kpi 日汇总）"""
+    service = KPIRollupService(db)
     return service.get_occupancy_report(start_date, end_date)
 
 
@@ -43,8 +44,8 @@ def get_revenue_report(
     db: Session = Depends(get_db),
     current_user: Employee = Depends(require_permission(REPORT_READ))
 ):
-    """获取营收报表"""
-    service = ReportService(db)
+    """获取营收报表（读取 daily_kpi 日汇总）"""
+    service = KPIRollupService(db)
     return service.get_revenue_report(start_date, end_date)
 
 
@@ -158,12 +158,13 @@ def get_available_rooms(
     check_in_date: date,
     check_out_date: date,
     room_type_id: Optional[int] = None,
+    reservation_id: Optional[int] = None,
     db: Session = Depends(get_db),
     current_user: Employee = Depends(get_current_user)
 ):
-    """获取可用房间"""
+    """获取可用房间（传 reservation_id 时不计入该预订自身的占用，用于入住/改单选房）"""
     service = get_room_service(db)
-    rooms = service.get_available_rooms(check_in_date, check_out_date, room_type_id)
+    rooms = service.get_available_rooms(check_in_date, check_out_date, room_type_id, reservation_id)
     return [service.get_room_with_guest(r.id) for r in rooms]
 
 
@@ -171,12 +172,13 @@ def get_available_rooms(
 def get_room_availability(
     check_in_date: date,
     check_out_date: date,
+    reservation_id: Optional[int] = None,
     db: Session = Depends(get_db),
     current_user: Employee = Depends(get_current_user)
 ):
-    """按房型统计可用房间数"""
+    """按房型统计可用房间数（传 reservation_id 时不计入该预订自身的占用）"""
     service = get_room_service(db)
-    return service.get_availability_by_room_type(check_in_date, check_out_date)
+    return service.get_availability_by_room_type(check_in_date, check_out_date, reservation_id)
 
 
 @router.get("/{room_id}", response_model=RoomResponse)
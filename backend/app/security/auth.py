@@ -41,10 +41,12 @@ def create_access_token(employee_id: int, role: EmployeeRole,
                         branch_id: Optional[int] = None,
                         data_scope: Optional[str] = None) -> str:
     """创建 JWT token — 新格式包含 role_codes、branch_id、data_scope"""
-    expire = datetime.now(UTC) + timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
+    issued_at = datetime.now(UTC)
+    expire = issued_at + timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
     to_encode = {
         "sub": str(employee_id),
         "role": role.value if isinstance(role, EmployeeRole) else str(role),
+        "iat": issued_at,
         "exp": expire
     }
     if role_codes is not None:
@@ -108,11 +110,25 @@ async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
 ) -> Employee:
-    """获取当前登录用户"""
+    """获取当前登录用户
+
+    命中主体缓存时由身份快照重建 Employee，不访问数据库；
+    未命中时查询数据库并缓存（仅缓存启用中的账号）。
+    """
+    from app.security.principal_cache import build_principal, get_principal_cache
+
     token = credentials.credentials
     payload = decode_token(token)
 
     employee_id = int(payload.get("sub"))
+    # 令牌签发时间作为令牌版本（旧令牌无 iat 时为 0）
+    token_version = int(payload.get("iat") or 0)
+    cache = get_principal_cache()
+    if cache is not None:
+        principal = cache.get(employee_id, token_version)
+        if principal is not None:
+            return principal.to_employee(db)
+
     employee = db.query(Employee).filter(Employee.id == employee_id).first()
 
     if not employee:
@@ -127,6 +143,10 @@ async def get_current_user(
             detail="账号已停用"
         )
 
+    if cache is not None:
+        principal = build_principal(employee, token_version)
+        employee._principal = principal
+        cache.put(principal)
     return employee
 
 
@@ -190,8 +210,12 @@ def require_permission(*permission_codes: str):
         if current_user.role == EmployeeRole.SYSADMIN:
             return current_user
 
-        # 尝试通过 RBAC provider 检查
-        if permission_provider_registry.has_provider():
+        # 优先使用认证时缓存的权限快照，否则通过 RBAC provider 检查
+        principal = getattr(current_user, '_principal', None)
+        if principal is not None and principal.permissions:
+            if any(code in principal.permissions for code in permission_codes):
+                return current_user
+        elif permission_provider_registry.has_provider():
             for code in permission_codes:
                 if permission_provider_registry.has_permission(current_user.id, code):
                     return current_user
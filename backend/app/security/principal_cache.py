@@ -0,0 +1,288 @@
+"""
+认证主体缓存 - JWT 认证快速路径
+
+get_current_user 每个请求按 id 查询 Employee（含 user_roles 的 selectin 查询）。
+主体缓存以 (employee_id, 令牌版本) 为键保存身份快照：Employee 列值、角色编码、
+权限集合、分店与数据范围，命中时不访问数据库即可重建当前用户。
+
+- 令牌版本取 JWT 的 iat（签发时间）：重新登录签发的令牌使用新的缓存条目
+- 有界 LRU + TTL：超过 max_entries 淘汰最久未使用的条目，超过 ttl_seconds 过期
+- 事件驱动失效：rbac_service 修改角色/权限、Employee 更新或删除时失效相关条目
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, Hashable, Optional, Tuple
+
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.models.ontology import Employee
+
+logger = logging.getLogger(__name__)
+
+
+class BoundedTTLCache:
+    """
+    线程安全的 LRU + TTL 字典
+
+    Example:
+        >>> cache = BoundedTTLCache(max_entries=2, ttl_seconds=60)
+        >>> cache[1] = {"room:read"}
+        >>> cache.get(1)
+        {'room:read'}
+        >>> 2 in cache
+        False
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()  # key -> (value, expires_at)
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """读取未过期的条目，并标记为最近使用"""
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                self._misses += 1
+                return default
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            item = self._entries.get(key)
+            return item is not None and item[1] > time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """删除条目"""
+        with self._lock:
+            item = self._entries.pop(key, None)
+            if item is None:
+                return default
+            self._invalidations += 1
+            return item[0]
+
+    def discard_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """删除键满足条件的条目，返回删除条数"""
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                del self._entries[key]
+            self._invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._invalidations += len(self._entries)
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """命中率与淘汰统计"""
+        lookups = self._hits + self._misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self._hits,
+            'misses': self._misses,
+            'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+            'evictions': self._evictions,
+            'expirations': self._expirations,
+            'invalidations': self._invalidations,
+        }
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    已认证用户的身份快照
+
+    - columns 为 Employee 全部列值，用于无查询地重建 ORM 实例
+    - permissions 为 RBAC 权限码快照（未注册 PermissionProvider 时为空）
+    """
+    employee_id: int
+    token_version: int
+    columns: Dict[str, Any]
+    role_codes: Tuple[str, ...]
+    permissions: FrozenSet[str]
+    branch_id: Optional[int]
+    data_scope: str
+    cached_at: float = field(default_factory=time.monotonic)
+
+    def to_employee(self, db: Session) -> Employee:
+        """
+        在请求会话中重建 Employee（不发出 SQL）
+
+        快照列值被视为已提交状态，merge(load=False) 直接放入会话的身份映射；
+        关系属性（branch、user_roles 等）仍在首次访问时按需加载。
+        """
+        employee = Employee(**self.columns)
+        make_transient_to_detached(employee)
+        employee = db.merge(employee, load=False)
+        employee._principal = self
+        return employee
+
+
+def build_principal(employee: Employee, token_version: int) -> Principal:
+    """从已加载的 Employee 构建身份快照"""
+    from app.security.auth import _get_branch_id, _get_max_data_scope, _get_role_codes
+    from core.security.permission import permission_provider_registry
+
+    columns = {attr.key: getattr(employee, attr.key) for attr in sa_inspect(Employee).column_attrs}
+    permissions: FrozenSet[str] = frozenset()
+    if permission_provider_registry.has_provider():
+        permissions = frozenset(permission_provider_registry.get_user_permissions(employee.id))
+    return Principal(
+        employee_id=employee.id,
+        token_version=token_version,
+        columns=columns,
+        role_codes=tuple(_get_role_codes(employee)),
+        permissions=permissions,
+        branch_id=_get_branch_id(employee),
+        data_scope=_get_max_data_scope(employee),
+    )
+
+
+class PrincipalCache:
+    """
+    (employee_id, token_version) -> Principal
+
+    Example:
+        >>> cache = PrincipalCache(max_entries=1024, ttl_seconds=300)
+        >>> cache.put(build_principal(employee, token_version=1760000000))
+        >>> cache.get(employee.id, 1760000000).role_codes
+        ('receptionist',)
+        >>> cache.invalidate_user(employee.id)
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300.0):
+        self._cache = BoundedTTLCache(max_entries, ttl_seconds)
+
+    def get(self, employee_id: int, token_version: int) -> Optional[Principal]:
+        return self._cache.get((employee_id, token_version))
+
+    def put(self, principal: Principal) -> None:
+        self._cache[(principal.employee_id, principal.token_version)] = principal
+
+    def invalidate_user(self, employee_id: int) -> int:
+        """失效该用户所有令牌版本的快照"""
+        return self._cache.discard_where(lambda key: key[0] == employee_id)
+
+    def invalidate_all(self) -> None:
+        self._cache.clear()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self._cache.get_stats()
+
+
+# 全局实例（进程内共享；其他进程依赖 TTL 收敛）
+_principal_cache: Optional[PrincipalCache] = None
+_principal_cache_lock = threading.Lock()
+
+
+def get_principal_cache() -> Optional[PrincipalCache]:
+    """获取共享的主体缓存，AUTH_PRINCIPAL_CACHE_ENABLED=false 时返回 None"""
+    global _principal_cache
+    from app.config import settings
+    if not settings.AUTH_PRINCIPAL_CACHE_ENABLED:
+        return None
+    with _principal_cache_lock:
+        if _principal_cache is None:
+            _principal_cache = PrincipalCache(
+                max_entries=settings.AUTH_PRINCIPAL_CACHE_SIZE,
+                ttl_seconds=settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS,
+            )
+        return _principal_cache
+
+
+def reset_principal_cache() -> None:
+    """丢弃共享的主体缓存（测试隔离用）"""
+    global _principal_cache
+    with _principal_cache_lock:
+        _principal_cache = None
+
+
+def invalidate_principals(user_id: Optional[int] = None) -> None:
+    """
+    失效主体快照与 PermissionProvider 的权限缓存
+
+    Args:
+        user_id: 指定用户；None 表示全部（角色或权限定义变化）
+    """
+    from core.security.permission import permission_provider_registry
+
+    cache = _principal_cache
+    provider = permission_provider_registry.get_provider()
+    if user_id is None:
+        if cache is not None:
+            cache.invalidate_all()
+        if provider is not None and hasattr(provider, 'invalidate_all'):
+            provider.invalidate_all()
+    else:
+        if cache is not None:
+            cache.invalidate_user(user_id)
+        if provider is not None and hasattr(provider, 'invalidate_user'):
+            provider.invalidate_user(user_id)
+
+
+def invalidate_principals_on_commit(db: Session, user_id: Optional[int] = None) -> None:
+    """
+    立即失效，并在会话提交后再次失效
+
+    变更在 flush 后、提交前对其他会话不可见，期间的并发请求可能重新缓存旧状态；
+    提交后的第二次失效保证缓存不会保留旧快照。
+    """
+    invalidate_principals(user_id)
+    event.listen(db, "after_commit", lambda session: invalidate_principals(user_id), once=True)
+
+
+@event.listens_for(Employee, "after_update")
+@event.listens_for(Employee, "after_delete")
+def _invalidate_employee(mapper, connection, target) -> None:
+    """员工资料、角色、启用状态变化时失效其快照"""
+    invalidate_principals(target.id)
+
+
+__all__ = [
+    "BoundedTTLCache",
+    "Principal",
+    "PrincipalCache",
+    "build_principal",
+    "get_principal_cache",
+    "invalidate_principals",
+    "invalidate_principals_on_commit",
+    "reset_principal_cache",
+]
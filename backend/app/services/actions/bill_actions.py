@@ -255,9 +255,17 @@ def register_bill_actions(
                 bill.paid_amount = Decimal('0')
             bill.is_settled = False
 
+            from app.services.billing_service import build_payment_event
+            from app.services.outbox_service import TransactionalEventPublisher
+            db.flush()
+            events = TransactionalEventPublisher(db)
+            event = events.stage(build_payment_event(refund, bill, user.id, "refund_payment"))
+
             db.commit()
             db.refresh(refund)
 
+            events.publish(event)
+
             return {
                 "success": True,
                 "message": f"已退款 ¥{refund_amount}，原因：{params.reason}",
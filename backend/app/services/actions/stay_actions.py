@@ -3,6 +3,7 @@ app/services/actions/stay_actions.py
 
 StayRecord-related action handlers using ActionRegistry.
 """
+from datetime import date
 from typing import Dict, Any, TYPE_CHECKING, Optional
 from sqlalchemy.orm import Session
 from pydantic import ValidationError
@@ -190,13 +191,20 @@ def register_stay_actions(
                         "error": "not_found"
                     }
             else:
-                # Find first available room of the right type
+                # Find first available room of the right type; the reservation's
+                # own hold must not count against it
                 from app.models.ontology import RoomStatus
-                room = db.query(Room).filter(
-                    Room.room_type_id == reservation.room_type_id,
-                    Room.status.in_([RoomStatus.VACANT_CLEAN, RoomStatus.VACANT_DIRTY]),
-                    Room.is_active == True
-                ).first()
+                from app.services.room_service import RoomService
+                available = RoomService(db).get_available_rooms(
+                    max(reservation.check_in_date, date.today()),
+                    reservation.check_out_date,
+                    reservation.room_type_id,
+                    exclude_reservation_id=reservation.id
+                )
+                room = next((
+                    r for r in available
+                    if r.status in (RoomStatus.VACANT_CLEAN, RoomStatus.VACANT_DIRTY)
+                ), None)
                 if not room:
                     return {
                         "success": False,
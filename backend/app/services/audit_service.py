@@ -2,11 +2,15 @@
 审计日志服务 - 本体操作层
 管理 SystemLog 对象和审计记录
 """
-from typing import List, Optional
+import logging
+from typing import Callable, List, Optional
 from datetime import datetime, date, timedelta
 from sqlalchemy.orm import Session
+from app.database import SessionLocal
 from app.models.ontology import SystemLog
 
+logger = logging.getLogger(__name__)
+
 
 class AuditService:
     """审计日志服务"""
@@ -22,9 +26,17 @@ class AuditService:
         entity_id: Optional[int] = None,
         old_value: Optional[str] = None,
         new_value: Optional[str] = None,
-        ip_address: Optional[str] = None
+        ip_address: Optional[str] = None,
+        created_at: Optional[datetime] = None,
+        commit: bool = True,
     ) -> SystemLog:
-        """创建审计日志"""
+        """
+        创建审计日志
+
+        Args:
+            created_at: 记录时间（默认当前时间；批量转存内存审计日志时使用原时间）
+            commit: False 时只加入会话，由调用方批量提交
+        """
         log = SystemLog(
             operator_id=operator_id,
             action=action,
@@ -32,11 +44,13 @@ class AuditService:
             entity_id=entity_id,
             old_value=old_value,
             new_value=new_value,
-            ip_address=ip_address
+            ip_address=ip_address,
+            created_at=created_at,
         )
         self.db.add(log)
-        self.db.commit()
-        self.db.refresh(log)
+        if commit:
+            self.db.commit()
+            self.db.refresh(log)
         return log
 
     def get_logs(
@@ -137,3 +151,60 @@ class AuditService:
             }
             for r in results
         ]
+
+
+# ==================== 内存审计日志转存 ====================
+
+def make_system_log_spill(db_session_factory: Callable = None) -> Callable[[list], None]:
+    """
+    构造 core AuditEngine 的转存函数：一批审计条目写入 system_logs，一次提交
+
+    严重级别、user_agent、extra 在 SystemLog 中没有对应列，不转存。
+    """
+    session_factory = db_session_factory or SessionLocal
+
+    def spill(entries: list) -> None:
+        db = session_factory()
+        try:
+            service = AuditService(db)
+            for entry in entries:
+                service.create_log(
+                    operator_id=entry.operator_id,
+                    action=entry.action,
+                    entity_type=entry.entity_type,
+                    entity_id=entry.entity_id,
+                    old_value=entry.old_value,
+                    new_value=entry.new_value,
+                    ip_address=entry.ip_address,
+                    created_at=entry.timestamp,
+                    commit=False,
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    return spill
+
+
+def start_audit_spill(engine=None, db_session_factory: Callable = None):
+    """启动审计日志转存（应用启动时调用；AUDIT_SPILL_ENABLED 关闭时不启动）"""
+    from app.config import settings
+    from core.engine.audit import audit_engine
+    if not settings.AUDIT_SPILL_ENABLED:
+        return None
+    engine = engine or audit_engine
+    engine.set_spill(make_system_log_spill(db_session_factory))
+    engine.start_spill()
+    return engine
+
+
+def stop_audit_spill(engine=None) -> None:
+    """转存剩余条目并停止转存线程（应用关闭、测试）"""
+    from core.engine.audit import audit_engine
+    engine = engine or audit_engine
+    engine.stop_spill()
+    engine.flush_spill()
+    engine.set_spill(None)
@@ -0,0 +1,558 @@
+"""
+房态可售库存索引 - 按房型×日期维护占用量
+由事件总线上的预订/入住/退房/房态事件增量更新，日期区间可售查询只需一次数组切片
+
+- 占用（booked）：已确认预订的房间数 + 在住记录（按房间所属房型计）
+- 停用（blocked）：维修中（OUT_OF_ORDER）的房间数
+- 可售（available）：可售房间数 - 区间内每晚占用量的最大值
+
+索引首次查询时从数据库全量构建；事件处理器只替换或移除某条预订/住宿的
+占用区间（幂等），无法增量处理的事件（房间增删改、撤销操作）将索引标记为
+过期，下次查询时重建。跨天或超过 max_age_seconds 也会重建，以修正绕过服务层
+直接修改数据库的情况。发件箱重复投递的事件按事件 ID 跳过（内存中记忆最近的
+APPLIED_EVENT_IDS_LIMIT 个）；进程重启后索引从数据库重建，不依赖这份记忆。
+"""
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from collections import OrderedDict
+import logging
+import threading
+import time
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models.ontology import (
+    Room, RoomStatus, Reservation, ReservationStatus, StayRecord, StayRecordStatus
+)
+from app.models.events import EventType
+from app.services.event_bus import event_bus, Event
+
+logger = logging.getLogger(__name__)
+
+# 占用数组初始长度（天），超出时按需扩展
+DEFAULT_HORIZON_DAYS = 400
+
+# 记忆已应用事件 ID 的数量上限
+APPLIED_EVENT_IDS_LIMIT = 10000
+
+
+def _parse_date(value) -> Optional[date]:
+    """事件中的日期为字符串，兼容 date/datetime"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+class RoomAvailabilityIndex:
+    """
+    房型×日期可售库存索引
+
+    Example:
+        >>> index = RoomAvailabilityIndex()
+        >>> index.get_availability(db, date(2026, 10, 1), date(2026, 10, 3))
+        {1: {'room_type_id': 1, 'total': 14, 'blocked': 0, 'booked': 9, 'available': 5,
+             'nights': [{'date': '2026-10-01', 'booked': 9, 'available': 5}, ...]}, ...}
+    """
+
+    def __init__(self, max_age_seconds: float = 3600.0, horizon_days: int = DEFAULT_HORIZON_DAYS):
+        """
+        Args:
+            max_age_seconds: 全量重建间隔（秒），0 表示只在过期或跨天时重建
+            horizon_days: 占用数组初始长度（天）
+        """
+        self.max_age_seconds = max_age_seconds
+        self.horizon_days = horizon_days
+
+        self._lock = threading.RLock()
+        self._registered = False
+        self._bus = None
+
+        self._origin: Optional[date] = None      # 数组第 0 位对应的日期
+        self._built_at: Optional[float] = None
+        self._bind_key: Optional[int] = None     # 构建所用数据库连接（engine）
+        self._dirty = True
+
+        # room_id -> (room_type_id, status, is_active)
+        self._rooms: Dict[int, Tuple[int, RoomStatus, bool]] = {}
+        self._sellable: Dict[int, int] = {}      # room_type_id -> 可售房间数
+        self._blocked: Dict[int, int] = {}       # room_type_id -> 维修房间数
+        self._booked: Dict[int, np.ndarray] = {}  # room_type_id -> 每晚占用量
+        # ("reservation"|"stay", id) -> (room_type_id, start, end, count)，区间为 [start, end)
+        self._contrib: Dict[Tuple[str, int], Tuple[int, int, int, int]] = {}
+        # stay_id -> room_id; room_id -> {stay_id: (start, end)}
+        self._stay_rooms: Dict[int, int] = {}
+        self._room_stays: Dict[int, Dict[int, Tuple[int, int]]] = {}
+
+        # 最近应用的事件 ID（发件箱重复投递时跳过）
+        self._applied_events: "OrderedDict[str, None]" = OrderedDict()
+        self._rebuilds = 0
+        self._events_applied = 0
+
+    # ============== 构建 ==============
+
+    @property
+    def registered(self) -> bool:
+        """是否已订阅事件总线（未订阅的索引不会随业务操作更新）"""
+        return self._registered
+
+    def invalidate(self) -> None:
+        """标记过期，下次查询时全量重建"""
+        with self._lock:
+            self._dirty = True
+
+    def ensure_fresh(self, db: Session) -> None:
+        """按需重建：过期、跨天、超过最大存活时间或数据库连接变化"""
+        with self._lock:
+            if self._needs_rebuild(db):
+                self.rebuild(db)
+
+    def _needs_rebuild(self, db: Session) -> bool:
+        if self._dirty or self._origin != date.today():
+            return True
+        if self._bind_key != id(db.get_bind()):
+            return True
+        if self.max_age_seconds and time.monotonic() - self._built_at > self.max_age_seconds:
+            return True
+        return False
+
+    def rebuild(self, db: Session, start: Optional[date] = None, end: Optional[date] = None) -> None:
+        """
+        从数据库全量构建索引
+
+        Args:
+            db: 数据库会话
+            start: 索引起始日期（默认今天）
+            end: 只加载该日期之前开始的预订（默认不限，用于单次查询的临时索引）
+        """
+        with self._lock:
+            origin = start or date.today()
+            self._origin = origin
+            self._rooms = {}
+            self._sellable = {}
+            self._blocked = {}
+            self._booked = {}
+            self._contrib = {}
+            self._stay_rooms = {}
+            self._room_stays = {}
+
+            for room_id, room_type_id, status, is_active in db.query(
+                Room.id, Room.room_type_id, Room.status, Room.is_active
+            ):
+                self._set_room(room_id, room_type_id, status, bool(is_active))
+
+            reservations = db.query(
+                Reservation.id, Reservation.room_type_id, Reservation.check_in_date,
+                Reservation.check_out_date, Reservation.room_count
+            ).filter(
+                Reservation.status == ReservationStatus.CONFIRMED,
+                Reservation.check_out_date > origin
+            )
+            if end is not None:
+                reservations = reservations.filter(Reservation.check_in_date < end)
+            for res_id, room_type_id, check_in, check_out, room_count in reservations:
+                self._set_reservation(res_id, room_type_id, check_in, check_out, room_count or 1)
+
+            stays = db.query(
+                StayRecord.id, StayRecord.room_id, StayRecord.check_in_time,
+                StayRecord.expected_check_out
+            ).filter(StayRecord.status == StayRecordStatus.ACTIVE)
+            for stay_id, room_id, check_in_time, expected_check_out in stays:
+                self._set_stay(stay_id, room_id, check_in_time, expected_check_out)
+
+            self._bind_key = id(db.get_bind())
+            self._built_at = time.monotonic()
+            self._dirty = False
+            self._rebuilds += 1
+
+    # ============== 内部维护 ==============
+
+    def _ord(self, d: date) -> int:
+        return (d - self._origin).days
+
+    def _array(self, room_type_id: int, length: int) -> np.ndarray:
+        """房型的占用数组，长度不足时扩展"""
+        arr = self._booked.get(room_type_id)
+        if arr is None:
+            arr = np.zeros(max(length, self.horizon_days), dtype=np.int32)
+            self._booked[room_type_id] = arr
+        elif len(arr) < length:
+            arr = np.concatenate([arr, np.zeros(max(length - len(arr), self.horizon_days), dtype=np.int32)])
+            self._booked[room_type_id] = arr
+        return arr
+
+    def _add_interval(self, room_type_id: int, start: int, end: int, count: int) -> None:
+        start = max(start, 0)
+        if end <= start or count == 0:
+            return
+        arr = self._array(room_type_id, end)
+        arr[start:end] += count
+
+    def _set_contrib(self, key: Tuple[str, int], value: Optional[Tuple[int, int, int, int]]) -> None:
+        """替换（或移除）一条占用区间"""
+        old = self._contrib.pop(key, None)
+        if old is not None:
+            self._add_interval(old[0], old[1], old[2], -old[3])
+        if value is not None:
+            self._contrib[key] = value
+            self._add_interval(*value)
+
+    def _set_room(self, room_id: int, room_type_id: int, status: RoomStatus, is_active: bool) -> None:
+        old = self._rooms.get(room_id)
+        if old is not None:
+            self._count_room(old, -1)
+        new = (room_type_id, status, is_active)
+        self._rooms[room_id] = new
+        self._count_room(new, 1)
+
+    def _count_room(self, room: Tuple[int, RoomStatus, bool], delta: int) -> None:
+        room_type_id, status, is_active = room
+        if not is_active:
+            return
+        if status == RoomStatus.OUT_OF_ORDER:
+            self._blocked[room_type_id] = self._blocked.get(room_type_id, 0) + delta
+        else:
+            self._sellable[room_type_id] = self._sellable.get(room_type_id, 0) + delta
+
+    def _set_reservation(self, reservation_id: int, room_type_id: int,
+                         check_in: date, check_out: date, room_count: int) -> None:
+        self._set_contrib(
+            ("reservation", reservation_id),
+            (room_type_id, self._ord(check_in), self._ord(check_out), room_count)
+        )
+
+    def _set_stay(self, stay_id: int, room_id: int, check_in_time, expected_check_out) -> bool:
+        """登记在住记录；房间未知时返回 False"""
+        room = self._rooms.get(room_id)
+        check_in = _parse_date(check_in_time) or date.today()
+        check_out = _parse_date(expected_check_out)
+        if room is None or check_out is None:
+            return False
+
+        start = self._ord(check_in)
+        # 超期未退房的客人今晚仍占用房间
+        end = max(self._ord(check_out), self._ord(date.today()) + 1)
+        self._remove_stay(stay_id)
+        self._set_contrib(("stay", stay_id), (room[0], start, end, 1))
+        self._stay_rooms[stay_id] = room_id
+        self._room_stays.setdefault(room_id, {})[stay_id] = (start, end)
+        return True
+
+    def _remove_stay(self, stay_id: int) -> None:
+        self._set_contrib(("stay", stay_id), None)
+        room_id = self._stay_rooms.pop(stay_id, None)
+        if room_id is not None:
+            stays = self._room_stays.get(room_id, {})
+            stays.pop(stay_id, None)
+            if not stays:
+                self._room_stays.pop(room_id, None)
+
+    # ============== 查询 ==============
+
+    def _window(self, check_in_date: date, check_out_date: date) -> Tuple[int, int]:
+        start = max(self._ord(check_in_date), 0)
+        end = max(self._ord(check_out_date), start + 1)
+        return start, end
+
+    def get_availability(self, db: Session, check_in_date: date, check_out_date: date,
+                         room_type_id: Optional[int] = None,
+                         exclude_reservation_id: Optional[int] = None) -> Dict[int, dict]:
+        """
+        区间内各房型可售数量
+
+        Args:
+            db: 数据库会话（用于按需重建）
+            check_in_date: 入住日期
+            check_out_date: 离店日期（不含当晚）
+            room_type_id: 只统计该房型
+            exclude_reservation_id: 不计入该预订的占用（为该预订办理入住时使用）
+
+        Returns:
+            room_type_id -> {room_type_id, total, blocked, booked, available, nights}
+        """
+        with self._lock:
+            if self.registered:
+                self.ensure_fresh(db)
+            start, end = self._window(check_in_date, check_out_date)
+            excluded = self._contrib.get(("reservation", exclude_reservation_id))
+
+            type_ids = set(self._sellable) | set(self._blocked)
+            if room_type_id is not None:
+                type_ids &= {room_type_id}
+
+            result = {}
+            for rt_id in sorted(type_ids):
+                nights = self._array(rt_id, end)[start:end].copy()
+                if excluded is not None and excluded[0] == rt_id:
+                    lo, hi = max(excluded[1], start), min(excluded[2], end)
+                    if lo < hi:
+                        nights[lo - start:hi - start] -= excluded[3]
+                total = self._sellable.get(rt_id, 0)
+                booked = int(nights.max())
+                result[rt_id] = {
+                    'room_type_id': rt_id,
+                    'total': total,
+                    'blocked': self._blocked.get(rt_id, 0),
+                    'booked': booked,
+                    'available': max(total - booked, 0),
+                    'nights': [
+                        {
+                            'date': str(self._origin + timedelta(days=start + i)),
+                            'booked': int(n),
+                            'available': max(total - int(n), 0)
+                        }
+                        for i, n in enumerate(nights)
+                    ]
+                }
+            return result
+
+    def get_free_room_ids(self, db: Session, check_in_date: date, check_out_date: date,
+                          room_type_id: Optional[int] = None) -> Dict[int, List[int]]:
+        """
+        区间内没有在住记录、且未停用的房间（按房型分组）
+
+        入住日期不晚于今天时，当前为入住状态的房间也视为不可用。
+        """
+        with self._lock:
+            if self.registered:
+                self.ensure_fresh(db)
+            start, end = self._window(check_in_date, check_out_date)
+            includes_today = check_in_date <= date.today()
+
+            result: Dict[int, List[int]] = {}
+            for room_id, (rt_id, status, is_active) in self._rooms.items():
+                if not is_active or status == RoomStatus.OUT_OF_ORDER:
+                    continue
+                if room_type_id is not None and rt_id != room_type_id:
+                    continue
+                if includes_today and status == RoomStatus.OCCUPIED:
+                    continue
+                stays = self._room_stays.get(room_id)
+                if stays and any(s < end and e > start for s, e in stays.values()):
+                    continue
+                result.setdefault(rt_id, []).append(room_id)
+            return result
+
+    # ============== 事件处理 ==============
+
+    def _claim(self, event: Event) -> bool:
+        """登记事件 ID（调用方持有锁）；已应用过的重复投递返回 False"""
+        if event.event_id in self._applied_events:
+            return False
+        self._applied_events[event.event_id] = None
+        if len(self._applied_events) > APPLIED_EVENT_IDS_LIMIT:
+            self._applied_events.popitem(last=False)
+        return True
+
+    def handle_reservation_changed(self, event: Event) -> None:
+        """预订创建/修改：登记（替换）该预订的占用区间"""
+        data = event.data
+        check_in = _parse_date(data.get('check_in_date'))
+        check_out = _parse_date(data.get('check_out_date'))
+        with self._lock:
+            if self._origin is None or not self._claim(event):
+                return
+            if not data.get('reservation_id') or not data.get('room_type_id') or not check_in or not check_out:
+                self._dirty = True
+                return
+            self._set_reservation(
+                data['reservation_id'], data['room_type_id'],
+                check_in, check_out, data.get('room_count') or 1
+            )
+            self._events_applied += 1
+
+    def handle_reservation_released(self, event: Event) -> None:
+        """预订取消/未到：释放占用"""
+        with self._lock:
+            if self._origin is None or not self._claim(event):
+                return
+            self._set_contrib(("reservation", event.data.get('reservation_id')), None)
+            self._events_applied += 1
+
+    def handle_guest_checked_in(self, event: Event) -> None:
+        """入住：预订占用转为在住记录占用"""
+        data = event.data
+        with self._lock:
+            if self._origin is None or not self._claim(event):
+                return
+            if data.get('reservation_id'):
+                self._set_contrib(("reservation", data['reservation_id']), None)
+            if not self._set_stay(data.get('stay_record_id'), data.get('room_id'),
+                                  data.get('check_in_time'), data.get('expected_check_out')):
+                self._dirty = True
+            room = self._rooms.get(data.get('room_id'))
+            if room is not None:
+                self._set_room(data['room_id'], room[0], RoomStatus.OCCUPIED, room[2])
+            self._events_applied += 1
+
+    def handle_stay_extended(self, event: Event) -> None:
+        """续住：延长在住记录的占用区间"""
+        data = event.data
+        stay_id = data.get('stay_record_id')
+        with self._lock:
+            if self._origin is None or not self._claim(event):
+                return
+            key = ("stay", stay_id)
+            old = self._contrib.get(key)
+            room_id = self._stay_rooms.get(stay_id)
+            new_check_out = _parse_date(data.get('new_check_out'))
+            if old is None or room_id is None or new_check_out is None:
+                self._dirty = True
+                return
+            check_in = self._origin + timedelta(days=old[1])
+            self._set_stay(stay_id, room_id, check_in, new_check_out)
+            self._events_applied += 1
+
+    def handle_room_changed(self, event: Event) -> None:
+        """换房：在住记录移到新房间（可能跨房型）"""
+        data = event.data
+        stay_id = data.get('stay_record_id')
+        with self._lock:
+            if self._origin is None or not self._claim(event):
+                return
+            old = self._contrib.get(("stay", stay_id))
+            new_room = self._rooms.get(data.get('new_room_id'))
+            if old is None or new_room is None:
+                self._dirty = True
+                return
+            check_in = self._origin + timedelta(days=old[1])
+            check_out = self._origin + timedelta(days=old[2])
+            self._set_stay(stay_id, data['new_room_id'], check_in, check_out)
+            self._set_room(data['new_room_id'], new_room[0], RoomStatus.OCCUPIED, new_room[2])
+            self._events_applied += 1
+
+    def handle_guest_checked_out(self, event: Event) -> None:
+        """退房：释放在住记录占用，房间转为脏房"""
+        data = event.data
+        with self._lock:
+            if self._origin is None or not self._claim(event):
+                return
+            self._remove_stay(data.get('stay_record_id'))
+            room = self._rooms.get(data.get('room_id'))
+            if room is not None and room[1] == RoomStatus.OCCUPIED:
+                self._set_room(data['room_id'], room[0], RoomStatus.VACANT_DIRTY, room[2])
+            self._events_applied += 1
+
+    def handle_room_status_changed(self, event: Event) -> None:
+        """房态变更：维护可售/维修房间数"""
+        data = event.data
+        with self._lock:
+            if self._origin is None or not self._claim(event):
+                return
+            room = self._rooms.get(data.get('room_id'))
+            try:
+                status = RoomStatus(data.get('new_status'))
+            except ValueError:
+                status = None
+            if room is None or status is None:
+                self._dirty = True
+                return
+            self._set_room(data['room_id'], room[0], status, room[2])
+            self._events_applied += 1
+
+    def handle_inventory_changed(self, event: Event) -> None:
+        """房间增删改、撤销操作：无法增量处理，标记过期"""
+        self.invalidate()
+
+    def _handlers(self) -> Iterable[Tuple[EventType, callable]]:
+        return [
+            (EventType.RESERVATION_CREATED, self.handle_reservation_changed),
+            (EventType.RESERVATION_UPDATED, self.handle_reservation_changed),
+            (EventType.RESERVATION_CANCELLED, self.handle_reservation_released),
+            (EventType.RESERVATION_NO_SHOW, self.handle_reservation_released),
+            (EventType.GUEST_CHECKED_IN, self.handle_guest_checked_in),
+            (EventType.STAY_EXTENDED, self.handle_stay_extended),
+            (EventType.ROOM_CHANGED, self.handle_room_changed),
+            (EventType.GUEST_CHECKED_OUT, self.handle_guest_checked_out),
+            (EventType.ROOM_STATUS_CHANGED, self.handle_room_status_changed),
+            (EventType.ROOM_CREATED, self.handle_inventory_changed),
+            (EventType.ROOM_UPDATED, self.handle_inventory_changed),
+            (EventType.OPERATION_UNDONE, self.handle_inventory_changed),
+        ]
+
+    def register(self, event_bus_instance=None) -> None:
+        """订阅事件总线"""
+        if self._registered:
+            return
+        bus = event_bus_instance or event_bus
+        for event_type, handler in self._handlers():
+            bus.subscribe(event_type, handler)
+        self._bus = bus
+        self._registered = True
+        self.invalidate()
+        logger.info("Room availability index registered")
+
+    def unregister(self) -> None:
+        """取消订阅（用于测试）"""
+        if not self._registered:
+            return
+        for event_type, handler in self._handlers():
+            self._bus.unsubscribe(event_type, handler)
+        self._bus = None
+        self._registered = False
+
+    def get_stats(self) -> dict:
+        """索引统计信息"""
+        with self._lock:
+            return {
+                'registered': self._registered,
+                'origin': str(self._origin) if self._origin else None,
+                'room_types': len(set(self._sellable) | set(self._blocked)),
+                'rooms': len(self._rooms),
+                'intervals': len(self._contrib),
+                'rebuilds': self._rebuilds,
+                'events_applied': self._events_applied,
+                'dirty': self._dirty,
+            }
+
+
+# 全局索引实例（应用启动时注册到事件总线）
+_availability_index: Optional[RoomAvailabilityIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_availability_index() -> RoomAvailabilityIndex:
+    """获取全局房态可售库存索引"""
+    global _availability_index
+    if _availability_index is None:
+        with _index_lock:
+            if _availability_index is None:
+                from app.config import settings
+                _availability_index = RoomAvailabilityIndex(
+                    max_age_seconds=settings.AVAILABILITY_INDEX_MAX_AGE_SECONDS
+                )
+    return _availability_index
+
+
+def register_availability_index(event_bus_instance=None) -> Optional[RoomAvailabilityIndex]:
+    """注册全局索引到事件总线（应用启动时调用）"""
+    from app.config import settings
+    if not settings.AVAILABILITY_INDEX_ENABLED:
+        return None
+    index = get_availability_index()
+    index.register(event_bus_instance)
+    return index
+
+
+def reset_availability_index() -> None:
+    """重置全局索引（用于测试）"""
+    global _availability_index
+    with _index_lock:
+        if _availability_index is not None:
+            _availability_index.unregister()
+        _availability_index = None
+
+
+__all__ = [
+    "RoomAvailabilityIndex",
+    "get_availability_index",
+    "register_availability_index",
+    "reset_availability_index",
+]
@@ -3,20 +3,43 @@
 管理 Bill 和 Payment 对象
 支持操作撤销：关键操作创建快照
 """
-from typing import List, Optional
+from typing import Callable, List, Optional
 from datetime import datetime
 from decimal import Decimal
 from sqlalchemy.orm import Session
 from app.models.ontology import Bill, Payment, StayRecord, PaymentMethod
 from app.models.schemas import PaymentCreate, BillAdjustment
 from app.models.snapshots import OperationType
+from app.services.event_bus import Event
+from app.services.outbox_service import TransactionalEventPublisher
+from app.models.events import EventType, PaymentReceivedData
+
+
+def build_payment_event(payment: Payment, bill: Bill, operator_id: int, source: str) -> Event:
+    """收款事件（退款为负数金额）"""
+    return Event(
+        event_type=EventType.PAYMENT_RECEIVED,
+        timestamp=datetime.now(),
+        data=PaymentReceivedData(
+            payment_id=payment.id,
+            bill_id=bill.id,
+            stay_record_id=bill.stay_record_id,
+            amount=float(payment.amount),
+            method=payment.method.value if hasattr(payment.method, 'value') else str(payment.method),
+            payment_time=payment.payment_time,
+            received_by=operator_id or 0
+        ).to_dict(),
+        source=source
+    )
 
 
 class BillingService:
     """账单服务"""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, event_publisher: Callable[[Event], None] = None):
         self.db = db
+        # 支持依赖注入事件发布器，便于测试；未注入且启用发件箱时，事件随业务事务写入发件箱
+        self._events = TransactionalEventPublisher(db, event_publisher)
 
     def get_bill(self, bill_id: int) -> Optional[Bill]:
         """获取账单"""
@@ -78,8 +101,12 @@ class BillingService:
             operator_id=operator_id
         )
 
+        # 收款事件（日经营指标汇总增量更新）
+        event = self._events.stage(build_payment_event(payment, bill, operator_id, "billing_service"))
         self.db.commit()
         self.db.refresh(payment)
+
+        self._events.publish(event)
         return payment
 
     def adjust_bill(self, data: BillAdjustment, operator_id: int) -> Bill:
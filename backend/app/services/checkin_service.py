@@ -18,7 +18,8 @@ from app.models.ontology import (
 from app.models.schemas import CheckInFromReservation, WalkInCheckIn, ExtendStay, ChangeRoom
 from app.services.price_service import PriceService
 from app.services.param_parser_service import ParamParserService
-from app.services.event_bus import event_bus, Event
+from app.services.event_bus import Event
+from app.services.outbox_service import TransactionalEventPublisher
 from app.models.events import (
     EventType, GuestCheckedInData, StayExtendedData, RoomChangedData,
     RoomStatusChangedData, BillCreatedData
@@ -50,8 +51,8 @@ class CheckInService:
         self.db = db
         self.price_service = PriceService(db)
         self.param_parser = ParamParserService(db)
-        # 支持依赖注入事件发布器，便于测试
-        self._publish_event = event_publisher or event_bus.publish
+        # 支持依赖注入事件发布器，便于测试；未注入且启用发件箱时，事件随业务事务写入发件箱
+        self._events = TransactionalEventPublisher(db, event_publisher)
 
     def get_active_stays(self) -> List[StayRecord]:
         """获取所有在住记录"""
@@ -177,11 +178,8 @@ class CheckInService:
             operator_id=operator_id
         )
 
-        self.db.commit()
-        self.db.refresh(stay_record)
-
-        # 发布入住事件
-        self._publish_event(Event(
+        # 入住事件
+        event = self._events.stage(Event(
             event_type=EventType.GUEST_CHECKED_IN,
             timestamp=datetime.now(),
             data=GuestCheckedInData(
@@ -199,6 +197,11 @@ class CheckInService:
             source="checkin_service"
         ))
 
+        self.db.commit()
+        self.db.refresh(stay_record)
+
+        self._events.publish(event)
+
         return stay_record
 
     def walk_in_check_in(self, data: WalkInCheckIn, operator_id: int) -> StayRecord:
@@ -303,11 +306,8 @@ class CheckInService:
             operator_id=operator_id
         )
 
-        self.db.commit()
-        self.db.refresh(stay_record)
-
-        # 发布入住事件
-        self._publish_event(Event(
+        # 入住事件
+        event = self._events.stage(Event(
             event_type=EventType.GUEST_CHECKED_IN,
             timestamp=datetime.now(),
             data=GuestCheckedInData(
@@ -325,6 +325,11 @@ class CheckInService:
             source="checkin_service"
         ))
 
+        self.db.commit()
+        self.db.refresh(stay_record)
+
+        self._events.publish(event)
+
         return stay_record
 
     def extend_stay(self, stay_record_id: int, data: ExtendStay, operator_id: int = None) -> StayRecord:
@@ -383,11 +388,8 @@ class CheckInService:
             operator_id=operator_id or 0
         )
 
-        self.db.commit()
-        self.db.refresh(stay_record)
-
-        # 发布续住事件
-        self._publish_event(Event(
+        # 续住事件
+        event = self._events.stage(Event(
             event_type=EventType.STAY_EXTENDED,
             timestamp=datetime.now(),
             data=StayExtendedData(
@@ -403,6 +405,11 @@ class CheckInService:
             source="checkin_service"
         ))
 
+        self.db.commit()
+        self.db.refresh(stay_record)
+
+        self._events.publish(event)
+
         return stay_record
 
     def change_room(self, stay_record_id: int, data: ChangeRoom,
@@ -494,11 +501,8 @@ class CheckInService:
             operator_id=operator_id
         )
 
-        self.db.commit()
-        self.db.refresh(stay_record)
-
-        # 发布换房事件
-        self._publish_event(Event(
+        # 换房事件
+        room_changed_event = self._events.stage(Event(
             event_type=EventType.ROOM_CHANGED,
             timestamp=datetime.now(),
             data=RoomChangedData(
@@ -514,8 +518,8 @@ class CheckInService:
             source="checkin_service"
         ))
 
-        # 发布原房间状态变更事件（用于触发清洁任务）
-        self._publish_event(Event(
+        # 原房间状态变更事件（用于触发清洁任务）
+        room_status_event = self._events.stage(Event(
             event_type=EventType.ROOM_STATUS_CHANGED,
             timestamp=datetime.now(),
             data=RoomStatusChangedData(
@@ -529,6 +533,12 @@ class CheckInService:
             source="checkin_service"
         ))
 
+        self.db.commit()
+        self.db.refresh(stay_record)
+
+        self._events.publish(room_changed_event)
+        self._events.publish(room_status_event)
+
         return stay_record
 
     def get_stay_detail(self, stay_record_id: int) -> dict:
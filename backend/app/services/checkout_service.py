@@ -1,6 +1,7 @@
 """
 退房服务 - 本体操作层
 遵循事件驱动架构：退房发布事件，由事件处理器自动创建清洁任务
+启用事件发件箱（OUTBOX_ENABLED）时，退房事件与退房变更同事务写入发件箱，由中继发布
 支持操作撤销：关键操作创建快照
 SPEC-R13: State machine validation before status changes
 """
@@ -14,7 +15,8 @@ from app.models.ontology import (
     Reservation, ReservationStatus, Task, TaskType, TaskStatus
 )
 from app.models.schemas import CheckOutRequest
-from app.services.event_bus import event_bus, Event
+from app.services.event_bus import Event
+from app.services.outbox_service import TransactionalEventPublisher
 from app.models.events import EventType, GuestCheckedOutData, RoomStatusChangedData
 from app.models.snapshots import OperationType
 
@@ -41,8 +43,8 @@ class CheckOutService:
 
     def __init__(self, db: Session, event_publisher: Callable[[Event], None] = None):
         self.db = db
-        # 支持依赖注入事件发布器，便于测试
-        self._publish_event = event_publisher or event_bus.publish
+        # 支持依赖注入事件发布器，便于测试；未注入且启用发件箱时，事件随业务事务写入发件箱
+        self._events = TransactionalEventPublisher(db, event_publisher)
 
     def check_out(self, data: CheckOutRequest, operator_id: int) -> StayRecord:
         """
@@ -130,11 +132,8 @@ class CheckOutService:
             operator_id=operator_id
         )
 
-        self.db.commit()
-        self.db.refresh(stay_record)
-
-        # 发布退房事件（事件处理器会自动创建清洁任务）
-        self._publish_event(Event(
+        # 退房事件（事件处理器会自动创建清洁任务）
+        event = Event(
             event_type=EventType.GUEST_CHECKED_OUT,
             timestamp=datetime.now(),
             data=GuestCheckedOutData(
@@ -149,7 +148,13 @@ class CheckOutService:
                 operator_id=operator_id
             ).to_dict(),
             source="checkout_service"
-        ))
+        )
+        self._events.stage(event)
+
+        self.db.commit()
+        self.db.refresh(stay_record)
+
+        self._events.publish(event)
 
         return stay_record
 
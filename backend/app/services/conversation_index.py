@@ -0,0 +1,439 @@
+"""
+会话索引 - JSONL 会话日志的 SQLite 索引
+
+JSONL 文件（{base_dir}/{user_id}/{YYYY-MM-DD}.jsonl）仍是只追加的主存储，
+索引库只是可随时删除重建的二级索引：
+- files: 每个日志文件已索引到的字节偏移、文件大小和 mtime，同步时只读取新追加的行
+- messages: 每条消息一行，(user_id, date, offset) 唯一，按 (user, topic, 时间) 建索引，
+  保存原始 JSON 行，读取最近 k 条只需读 k 行索引
+- messages_fts: FTS5 trigram 全文索引（子串匹配、大小写不敏感）；
+  SQLite 未编译 FTS5 时退化为按用户、日期范围扫描 content 列
+
+同步策略：用户目录 mtime 未变时只 stat 已知的日志文件（任一天的追加都会同步），
+新建/删除文件才重新列目录
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# from_dict 必需的字段，缺失的行与 _read_file 一样跳过
+_REQUIRED_KEYS = ('id', 'timestamp', 'role', 'content')
+
+# trigram 分词器至少需要 3 个字符
+_FTS_MIN_CHARS = 3
+
+
+def timestamp_key(timestamp: str) -> float:
+    """ISO 时间戳转为可比较的秒数（兼容 'Z' 后缀）"""
+    return datetime.fromisoformat(timestamp.replace('Z', '+00:00')).timestamp()
+
+
+def _log_date(file_name: str) -> Optional[str]:
+    """日志文件名中的日期，非 YYYY-MM-DD.jsonl 返回 None"""
+    if not file_name.endswith('.jsonl'):
+        return None
+    stem = file_name[:-len('.jsonl')]
+    try:
+        date.fromisoformat(stem)
+    except ValueError:
+        return None
+    return stem
+
+
+class ConversationIndex:
+    """
+    会话日志索引
+
+    Example:
+        >>> index = ConversationIndex(Path("data/conversations"))
+        >>> index.sync_user(1)
+        >>> index.recent(1, limit=6)          # 最新在前的原始 JSON 行
+        >>> index.search(1, "退房", limit=20)
+    """
+
+    def __init__(self, base_dir: Path, db_path: Optional[str] = None):
+        """
+        Args:
+            base_dir: 会话日志根目录
+            db_path: 索引库路径，默认为 {base_dir}/index.db
+        """
+        self.base_dir = Path(base_dir)
+        self.db_path = str(db_path or self.base_dir / 'index.db')
+        if self.db_path != ':memory:':
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.RLock()
+        # user_id -> (目录 mtime_ns, {日志日期: (size, mtime_ns)})
+        self._dir_state: Dict[int, Tuple[int, Dict[str, Tuple[int, int]]]] = {}
+
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30.0)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                user_id INTEGER NOT NULL,
+                date TEXT NOT NULL,
+                indexed_offset INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                PRIMARY KEY (user_id, date)
+            );
+            CREATE TABLE IF NOT EXISTS messages (
+                seq INTEGER PRIMARY KEY,
+                user_id INTEGER NOT NULL,
+                date TEXT NOT NULL,
+                offset INTEGER NOT NULL,
+                message_id TEXT NOT NULL,
+                ts REAL NOT NULL,
+                role TEXT NOT NULL,
+                topic_id TEXT,
+                content TEXT NOT NULL,
+                action_types TEXT,
+                raw TEXT NOT NULL,
+                UNIQUE (user_id, date, offset)
+            );
+            CREATE INDEX IF NOT EXISTS idx_messages_topic
+                ON messages(user_id, topic_id, date, offset);
+            CREATE INDEX IF NOT EXISTS idx_messages_ts
+                ON messages(user_id, ts);
+        """)
+        try:
+            self.conn.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+                    content, content='messages', content_rowid='seq', tokenize='trigram'
+                );
+                CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+                    INSERT INTO messages_fts(rowid, content) VALUES (new.seq, new.content);
+                END;
+                CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+                    INSERT INTO messages_fts(messages_fts, rowid, content)
+                    VALUES ('delete', old.seq, old.content);
+                END;
+            """)
+            self.fts_enabled = True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"FTS5 trigram unavailable, conversation search scans content: {e}")
+            self.fts_enabled = False
+        self.conn.commit()
+
+    # ========== 同步 ==========
+
+    def sync_user(self, user_id: int) -> None:
+        """把用户目录下新增/追加/删除的日志同步到索引"""
+        user_dir = self.base_dir / str(user_id)
+        with self._lock:
+            try:
+                dir_mtime = os.stat(user_dir).st_mtime_ns
+            except FileNotFoundError:
+                self._dir_state.pop(user_id, None)
+                self._purge_user(user_id)
+                return
+
+            state = self._dir_state.get(user_id)
+            if state and state[0] == dir_mtime and self._sync_known_files(user_id, user_dir, state[1]):
+                return
+
+            self._scan_user(user_id, user_dir, dir_mtime)
+
+    def sync_file(self, user_id: int, date_str: str) -> None:
+        """同步单个日志文件（写入后调用，只读取新追加的字节）"""
+        path = self.base_dir / str(user_id) / f"{date_str}.jsonl"
+        with self._lock:
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                return
+            self._sync_file(user_id, date_str, st)
+            state = self._dir_state.get(user_id)
+            if state and date_str in state[1]:
+                state[1][date_str] = (st.st_size, st.st_mtime_ns)
+
+    def sync_all(self) -> List[int]:
+        """
+        同步全部用户目录，并清除已删除用户的索引
+
+        Returns:
+            有日志文件的用户 ID 列表（升序）
+        """
+        with self._lock:
+            user_ids = []
+            if self.base_dir.exists():
+                for entry in os.scandir(self.base_dir):
+                    if entry.is_dir() and entry.name.isdigit():
+                        user_ids.append(int(entry.name))
+            for user_id in user_ids:
+                self.sync_user(user_id)
+
+            indexed = [row[0] for row in self.conn.execute("SELECT DISTINCT user_id FROM files")]
+            for user_id in set(indexed) - set(user_ids):
+                self._dir_state.pop(user_id, None)
+                self._purge_user(user_id)
+
+            return [row[0] for row in self.conn.execute(
+                "SELECT DISTINCT user_id FROM files ORDER BY user_id"
+            )]
+
+    def rebuild(self) -> Dict[str, int]:
+        """清空索引并从全部日志重建"""
+        with self._lock:
+            self.conn.execute("DELETE FROM messages")
+            self.conn.execute("DELETE FROM files")
+            self.conn.commit()
+            self._dir_state.clear()
+            self.sync_all()
+            return self.counts()
+
+    def counts(self) -> Dict[str, int]:
+        """索引规模"""
+        with self._lock:
+            users, files = self.conn.execute(
+                "SELECT COUNT(DISTINCT user_id), COUNT(*) FROM files"
+            ).fetchone()
+            messages = self.conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+        return {'users': users, 'files': files, 'messages': messages}
+
+    def _scan_user(self, user_id: int, user_dir: Path, dir_mtime: int) -> None:
+        logs = {}
+        for entry in os.scandir(user_dir):
+            date_str = _log_date(entry.name)
+            if date_str and entry.is_file():
+                logs[date_str] = entry.stat()
+
+        for date_str, st in logs.items():
+            self._sync_file(user_id, date_str, st)
+
+        stale = [
+            row[0] for row in self.conn.execute("SELECT date FROM files WHERE user_id = ?", (user_id,))
+            if row[0] not in logs
+        ]
+        for date_str in stale:
+            self.conn.execute("DELETE FROM messages WHERE user_id = ? AND date = ?", (user_id, date_str))
+            self.conn.execute("DELETE FROM files WHERE user_id = ? AND date = ?", (user_id, date_str))
+        if stale:
+            self.conn.commit()
+
+        self._dir_state[user_id] = (
+            dir_mtime, {date_str: (st.st_size, st.st_mtime_ns) for date_str, st in logs.items()}
+        )
+
+    def _sync_known_files(self, user_id: int, user_dir: Path, files: Dict[str, Tuple[int, int]]) -> bool:
+        """目录未变时逐个 stat 已知日志，同步有变化的；有文件消失返回 False（需重新列目录）"""
+        for date_str, known in files.items():
+            try:
+                st = os.stat(user_dir / f"{date_str}.jsonl")
+            except FileNotFoundError:
+                return False
+            if (st.st_size, st.st_mtime_ns) != known:
+                self._sync_file(user_id, date_str, st)
+                files[date_str] = (st.st_size, st.st_mtime_ns)
+        return True
+
+    def _sync_file(self, user_id: int, date_str: str, st: os.stat_result) -> None:
+        row = self.conn.execute(
+            "SELECT indexed_offset, size, mtime_ns FROM files WHERE user_id = ? AND date = ?",
+            (user_id, date_str)
+        ).fetchone()
+        if row and (row[1], row[2]) == (st.st_size, st.st_mtime_ns):
+            return
+
+        if row and st.st_size > row[1]:
+            start = row[0]
+        else:
+            # 首次索引，或文件被截断/改写：整文件重建
+            start = 0
+            if row:
+                self.conn.execute("DELETE FROM messages WHERE user_id = ? AND date = ?", (user_id, date_str))
+
+        path = self.base_dir / str(user_id) / f"{date_str}.jsonl"
+        with open(path, 'rb') as f:
+            f.seek(start)
+            chunk = f.read()
+
+        records = []
+        consumed = 0
+        for line in chunk.split(b'\n'):
+            line_offset = start + consumed
+            complete = consumed + len(line) < len(chunk)
+            consumed += len(line) + (1 if complete else 0)
+            record = self._parse_line(line)
+            if record is None:
+                if not complete and line.strip():
+                    # 末尾未写完的行留待下次同步
+                    consumed -= len(line)
+                continue
+            records.append((user_id, date_str, line_offset) + record)
+
+        self.conn.executemany("""
+            INSERT OR IGNORE INTO messages
+                (user_id, date, offset, message_id, ts, role, topic_id, content, action_types, raw)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, records)
+        self.conn.execute("""
+            INSERT OR REPLACE INTO files (user_id, date, indexed_offset, size, mtime_ns)
+            VALUES (?, ?, ?, ?, ?)
+        """, (user_id, date_str, start + consumed, st.st_size, st.st_mtime_ns))
+        self.conn.commit()
+
+    @staticmethod
+    def _parse_line(line: bytes) -> Optional[tuple]:
+        """解析一行日志为索引字段；无效行返回 None"""
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            data = json.loads(line)
+            if not isinstance(data, dict) or any(key not in data for key in _REQUIRED_KEYS):
+                return None
+            ts = timestamp_key(data['timestamp'])
+        except (ValueError, TypeError, AttributeError):
+            return None
+
+        context = data.get('context') or {}
+        topic_id = context.get('topic_id') if isinstance(context, dict) else None
+        action_types = None
+        if data.get('actions'):
+            action_types = json.dumps([
+                act.get('action_type', 'unknown') for act in data['actions'] if isinstance(act, dict)
+            ], ensure_ascii=False)
+        return (
+            str(data['id']), ts, str(data['role']), topic_id, str(data['content']),
+            action_types, line.decode('utf-8'),
+        )
+
+    def _purge_user(self, user_id: int) -> None:
+        self.conn.execute("DELETE FROM messages WHERE user_id = ?", (user_id,))
+        self.conn.execute("DELETE FROM files WHERE user_id = ?", (user_id,))
+        self.conn.commit()
+
+    # ========== 查询 ==========
+
+    def recent(
+        self,
+        user_id: int,
+        limit: int,
+        before_ts: Optional[float] = None,
+        topic_id: Optional[str] = None
+    ) -> List[str]:
+        """最近的 limit 条消息（原始 JSON 行，最新在前，按日志顺序）"""
+        sql = "SELECT raw FROM messages WHERE user_id = ?"
+        params: list = [user_id]
+        if topic_id is not None:
+            sql += " AND topic_id = ?"
+            params.append(topic_id)
+        if before_ts is not None:
+            sql += " AND ts < ?"
+            params.append(before_ts)
+        sql += " ORDER BY date DESC, offset DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            return [row[0] for row in self.conn.execute(sql, params)]
+
+    def messages(
+        self,
+        user_id: int,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> List[str]:
+        """日期范围内的全部消息（原始 JSON 行，按日志顺序）"""
+        sql = "SELECT raw FROM messages WHERE user_id = ?"
+        params: list = [user_id]
+        sql, params = self._date_range(sql, params, start_date, end_date)
+        sql += " ORDER BY date, offset"
+        with self._lock:
+            return [row[0] for row in self.conn.execute(sql, params)]
+
+    def dates(self, user_id: int) -> List[str]:
+        """有日志的日期（倒序）"""
+        with self._lock:
+            return [row[0] for row in self.conn.execute(
+                "SELECT date FROM files WHERE user_id = ? ORDER BY date DESC", (user_id,)
+            )]
+
+    def search(
+        self,
+        user_id: int,
+        keyword: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        limit: int = 50
+    ) -> List[str]:
+        """
+        内容包含 keyword（不区分大小写）的消息，按时间倒序
+
+        FTS 只用于缩小候选集，最终仍以 Python 的 lower() 子串匹配判定，
+        与逐行扫描的结果一致
+        """
+        if self.fts_enabled and len(keyword) >= _FTS_MIN_CHARS:
+            # 先由 FTS 取候选 rowid 再按主键回表；"+user_id" 阻止优化器改走用户索引逐行探测 FTS
+            sql = ("SELECT raw, content FROM messages"
+                   " WHERE seq IN (SELECT rowid FROM messages_fts WHERE messages_fts MATCH ?)"
+                   " AND +user_id = ?")
+            params: list = ['"' + keyword.replace('"', '""') + '"', user_id]
+        else:
+            sql = "SELECT raw, content FROM messages WHERE user_id = ?"
+            params = [user_id]
+        sql, params = self._date_range(sql, params, start_date, end_date)
+        sql += " ORDER BY ts DESC, seq DESC"
+
+        keyword_lower = keyword.lower()
+        results = []
+        with self._lock:
+            for raw, content in self.conn.execute(sql, params):
+                if keyword_lower in content.lower():
+                    results.append(raw)
+                    if len(results) >= limit:
+                        break
+        return results
+
+    def statistics(self, today: str, top_actions: int = 10) -> Dict:
+        """全部用户的消息数、当天消息数、用户数与操作类型分布"""
+        with self._lock:
+            total, today_count = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(date = ?), 0) FROM messages", (today,)
+            ).fetchone()
+            user_count = self.conn.execute("SELECT COUNT(DISTINCT user_id) FROM files").fetchone()[0]
+            actions = self.conn.execute("""
+                SELECT a.value, COUNT(*) AS cnt
+                FROM messages, json_each(messages.action_types) AS a
+                WHERE messages.action_types IS NOT NULL
+                GROUP BY a.value
+                ORDER BY cnt DESC, a.value
+                LIMIT ?
+            """, (top_actions,)).fetchall()
+        return {
+            "total_messages": total,
+            "today_messages": today_count,
+            "user_count": user_count,
+            "action_distribution": [{"action_type": k, "count": v} for k, v in actions],
+        }
+
+    @staticmethod
+    def _date_range(sql: str, params: list, start_date: Optional[str],
+                    end_date: Optional[str]) -> Tuple[str, list]:
+        if start_date:
+            sql += " AND date >= ?"
+            params.append(start_date)
+        if end_date:
+            sql += " AND date <= ?"
+            params.append(end_date)
+        return sql, params
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+
+__all__ = [
+    "ConversationIndex",
+    "timestamp_key",
+]
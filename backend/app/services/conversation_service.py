@@ -6,6 +6,9 @@
 - 消息分页查询（支持跨天）
 - 上下文消息获取（按 topic_id 或最近 N 轮）
 - 关键词搜索（支持日期范围）
+
+JSONL 文件是只追加的主存储，查询走 ConversationIndex（SQLite + FTS5），
+只增量索引新追加的行，不再每次请求扫描、解析全部历史文件
 """
 import json
 import os
@@ -15,6 +18,8 @@ from pathlib import Path
 from typing import Optional, List, Dict, Any
 from dataclasses import dataclass, asdict
 
+from app.services.conversation_index import ConversationIndex, timestamp_key
+
 
 class DateTimeEncoder(json.JSONEncoder):
     """Custom JSON encoder that handles date and datetime objects"""
@@ -86,12 +91,13 @@ class ConversationMessage:
 class ConversationService:
     """会话服务"""
 
-    def __init__(self, base_dir: str = None):
+    def __init__(self, base_dir: str = None, index_path: str = None):
         """
         初始化会话服务
 
         Args:
             base_dir: 数据存储根目录，默认为 backend/data/conversations
+            index_path: 索引库路径，默认为 {base_dir}/index.db
         """
         if base_dir is None:
             # 获取 backend 目录
@@ -100,6 +106,7 @@ class ConversationService:
             base_dir = backend_dir / 'data' / 'conversations'
         self.base_dir = Path(base_dir)
         self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.index = ConversationIndex(self.base_dir, index_path)
 
     def _get_user_dir(self, user_id: int) -> Path:
         """获取用户目录"""
@@ -141,6 +148,7 @@ class ConversationService:
 
         with open(file_path, 'a', encoding='utf-8') as f:
             f.write(json.dumps(message.to_dict(), ensure_ascii=False, cls=DateTimeEncoder) + '\n')
+        self.index.sync_file(user_id, date_str)
 
         return message
 
@@ -223,36 +231,10 @@ class ConversationService:
         Returns:
             (消息列表, 是否还有更多) 元组
         """
-        user_dir = self._get_user_dir(user_id)
-
-        # 获取所有日期文件，按日期倒序
-        files = sorted(user_dir.glob('*.jsonl'), reverse=True)
-
-        if not files:
-            return [], False
-
-        messages = []
-        before_dt = None
-        if before:
-            before_dt = datetime.fromisoformat(before.replace('Z', '+00:00'))
-
-        # 遍历文件收集消息
-        for file_path in files:
-            file_messages = self._read_file(file_path)
-
-            for msg in reversed(file_messages):  # 从新到旧
-                msg_dt = datetime.fromisoformat(msg.timestamp.replace('Z', '+00:00'))
-
-                if before_dt and msg_dt >= before_dt:
-                    continue
+        before_ts = timestamp_key(before) if before else None
 
-                messages.append(msg)
-
-                if len(messages) >= limit + 1:  # 多取一条判断是否还有更多
-                    break
-
-            if len(messages) >= limit + 1:
-                break
+        self.index.sync_user(user_id)
+        messages = self._parse(self.index.recent(user_id, limit + 1, before_ts=before_ts))  # 多取一条判断是否还有更多
 
         has_more = len(messages) > limit
         if has_more:
@@ -274,10 +256,8 @@ class ConversationService:
         Returns:
             消息列表
         """
-        file_path = self._get_file_path(user_id, date_str)
-        if not file_path.exists():
-            return []
-        return self._read_file(file_path)
+        self.index.sync_user(user_id)
+        return self._parse(self.index.messages(user_id, date_str, date_str))
 
     def get_context_messages(
         self,
@@ -296,22 +276,19 @@ class ConversationService:
         Returns:
             上下文消息列表
         """
-        messages, _ = self.get_messages(user_id, limit=max_rounds * 2 + 10)
-
-        if not messages:
+        limit = max_rounds * 2
+        if limit <= 0:
             return []
+        self.index.sync_user(user_id)
 
         if topic_id:
-            # 按 topic_id 过滤
-            topic_messages = [
-                msg for msg in messages
-                if msg.context and msg.context.topic_id == topic_id
-            ]
+            # 直接按 topic_id 取该话题最近的 N 轮
+            topic_messages = self.index.recent(user_id, limit, topic_id=topic_id)
             if topic_messages:
-                return topic_messages[-max_rounds * 2:]
+                return self._parse(reversed(topic_messages))
 
         # 返回最近的 N 轮对话
-        return messages[-max_rounds * 2:]
+        return self._parse(reversed(self.index.recent(user_id, limit)))
 
     def search_messages(
         self,
@@ -334,48 +311,8 @@ class ConversationService:
         Returns:
             匹配的消息列表
         """
-        user_dir = self._get_user_dir(user_id)
-        files = sorted(user_dir.glob('*.jsonl'), reverse=True)
-
-        if not files:
-            return []
-
-        # 解析日期范围
-        start_d = date.fromisoformat(start_date) if start_date else None
-        end_d = date.fromisoformat(end_date) if end_date else None
-
-        results = []
-        keyword_lower = keyword.lower()
-
-        for file_path in files:
-            # 从文件名获取日期
-            file_date_str = file_path.stem
-            try:
-                file_date = date.fromisoformat(file_date_str)
-            except ValueError:
-                continue
-
-            # 日期范围过滤
-            if start_d and file_date < start_d:
-                continue
-            if end_d and file_date > end_d:
-                continue
-
-            # 搜索文件内容
-            file_messages = self._read_file(file_path)
-            for msg in file_messages:
-                if keyword_lower in msg.content.lower():
-                    results.append(msg)
-                    if len(results) >= limit:
-                        break
-
-            if len(results) >= limit:
-                break
-
-        # 按时间倒序
-        results.sort(key=lambda m: m.timestamp, reverse=True)
-
-        return results[:limit]
+        self.index.sync_user(user_id)
+        return self._parse(self.index.search(user_id, keyword, start_date, end_date, limit))
 
     def get_available_dates(self, user_id: int) -> List[str]:
         """
@@ -387,19 +324,8 @@ class ConversationService:
         Returns:
             日期字符串列表 (YYYY-MM-DD)，按日期倒序
         """
-        user_dir = self._get_user_dir(user_id)
-        files = sorted(user_dir.glob('*.jsonl'), reverse=True)
-
-        dates = []
-        for file_path in files:
-            date_str = file_path.stem
-            try:
-                date.fromisoformat(date_str)  # 验证日期格式
-                dates.append(date_str)
-            except ValueError:
-                continue
-
-        return dates
+        self.index.sync_user(user_id)
+        return self.index.dates(user_id)
 
     def _read_file(self, file_path: Path) -> List[ConversationMessage]:
         """读取 JSONL 文件"""
@@ -421,6 +347,15 @@ class ConversationService:
 
         return messages
 
+    @staticmethod
+    def _parse(lines) -> List[ConversationMessage]:
+        """把索引中的原始 JSON 行解析为消息"""
+        return [ConversationMessage.from_dict(json.loads(line)) for line in lines]
+
+    def rebuild_index(self) -> Dict[str, int]:
+        """清空索引并从 JSONL 日志重建（用于迁移已有历史）"""
+        return self.index.rebuild()
+
     def get_last_active_conversation(self, user_id: int) -> tuple[List[ConversationMessage], Optional[str]]:
         """
         获取用户最后一次活跃对话的所有消息
@@ -458,19 +393,9 @@ class ConversationService:
         Returns:
             用户 ID 列表（按 ID 排序）
         """
-        user_ids = []
         if not self.base_dir.exists():
-            return user_ids
-        for entry in self.base_dir.iterdir():
-            if entry.is_dir():
-                try:
-                    user_id = int(entry.name)
-                    # 确认目录下有 .jsonl 文件
-                    if list(entry.glob('*.jsonl')):
-                        user_ids.append(user_id)
-                except ValueError:
-                    continue
-        return sorted(user_ids)
+            return []
+        return self.index.sync_all()
 
     def generate_topic_id(self) -> str:
         """生成新的话题 ID"""
@@ -484,12 +409,6 @@ class ConversationService:
             Dict with total_conversations, today_count, per_user stats,
             action distribution, etc.
         """
-        today_str = date.today().isoformat()
-        total_messages = 0
-        today_messages = 0
-        user_count = 0
-        action_counts: Dict[str, int] = {}
-
         if not self.base_dir.exists():
             return {
                 "total_messages": 0,
@@ -498,46 +417,8 @@ class ConversationService:
                 "action_distribution": [],
             }
 
-        for user_dir in self.base_dir.iterdir():
-            if not user_dir.is_dir():
-                continue
-            try:
-                int(user_dir.name)
-            except ValueError:
-                continue
-
-            files = list(user_dir.glob("*.jsonl"))
-            if not files:
-                continue
-            user_count += 1
-
-            for file_path in files:
-                msgs = self._read_file(file_path)
-                total_messages += len(msgs)
-
-                if file_path.stem == today_str:
-                    today_messages += len(msgs)
-
-                # Count actions
-                for msg in msgs:
-                    if msg.actions:
-                        for act in msg.actions:
-                            atype = act.get("action_type", "unknown")
-                            action_counts[atype] = action_counts.get(atype, 0) + 1
-
-        # Sort actions by count desc
-        action_distribution = sorted(
-            [{"action_type": k, "count": v} for k, v in action_counts.items()],
-            key=lambda x: x["count"],
-            reverse=True,
-        )
-
-        return {
-            "total_messages": total_messages,
-            "today_messages": today_messages,
-            "user_count": user_count,
-            "action_distribution": action_distribution[:10],
-        }
+        self.index.sync_all()
+        return self.index.statistics(date.today().isoformat())
 
     def export_messages(
         self,
@@ -551,27 +432,5 @@ class ConversationService:
         Returns:
             List of message dicts ready for JSON/CSV serialization.
         """
-        user_dir = self._get_user_dir(user_id)
-        files = sorted(user_dir.glob("*.jsonl"))
-
-        start_d = date.fromisoformat(start_date) if start_date else None
-        end_d = date.fromisoformat(end_date) if end_date else None
-
-        results = []
-        for file_path in files:
-            file_date_str = file_path.stem
-            try:
-                file_date = date.fromisoformat(file_date_str)
-            except ValueError:
-                continue
-
-            if start_d and file_date < start_d:
-                continue
-            if end_d and file_date > end_d:
-                continue
-
-            msgs = self._read_file(file_path)
-            for msg in msgs:
-                results.append(msg.to_dict())
-
-        return results
+        self.index.sync_user(user_id)
+        return [msg.to_dict() for msg in self._parse(self.index.messages(user_id, start_date, end_date))]
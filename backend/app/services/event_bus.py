@@ -8,6 +8,7 @@ from datetime import datetime
 from collections import deque
 import logging
 import threading
+import uuid
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +20,7 @@ class Event:
     timestamp: datetime
     data: Dict[str, Any]
     source: str  # 触发来源（服务名）
-    event_id: str = field(default_factory=lambda: datetime.now().strftime("%Y%m%d%H%M%S%f"))
+    event_id: str = field(default_factory=lambda: f"{datetime.now():%Y%m%d%H%M%S%f}_{uuid.uuid4().hex[:8]}")
 
 
 class EventBus:
@@ -0,0 +1,687 @@
+"""
+经营指标日汇总服务 - daily_kpi 表的计算、对账与读取
+仪表盘和入住率/营收报表读取预计算的日汇总行，不再逐次扫描业务明细表
+
+- 计算：日期序列与住宿、支付、房间做分组聚合，任意区间只需几次查询
+- 增量：DailyKPIRollup 订阅入住/退房/收款/房态等事件，按事件内容修改当天的行；
+  启用发件箱时按事件 ID 登记（claim_event），重复投递的事件不再累加
+- 对账：reconcile() 按明细表重算指定区间（默认昨天和今天），由夜间定时任务
+  daily_kpi_reconcile 调用，修正绕过服务层的修改和增量误差
+- 读取：过去和今天的行按需补齐后落库；未来日期（预计在住）实时计算，不落库；
+  今天的行在事件维护不可用（未注册或数据库不同）时每次读取重算，否则超过
+  KPI_ROLLUP_MAX_AGE_SECONDS 后重算
+"""
+import json
+import logging
+import threading
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.events import EventType
+from app.models.kpi import DailyKPI
+from app.models.ontology import (
+    Bill, Payment, Room, RoomStatus, RoomType, StayRecord, StayRecordStatus
+)
+from app.services.event_bus import event_bus, Event
+from app.services.outbox_service import claim_event, outbox_enabled
+from app.services.report_service import date_series, stay_occupies
+
+logger = logging.getLogger(__name__)
+
+CENT = Decimal('0.01')
+
+# 房态快照字段（历史日期对账时保留当时的快照）
+ROOM_SNAPSHOT_FIELDS = (
+    'total_rooms', 'sellable_rooms', 'vacant_clean', 'vacant_dirty', 'occupied', 'out_of_order'
+)
+
+_STATUS_FIELDS = {
+    RoomStatus.VACANT_CLEAN: 'vacant_clean',
+    RoomStatus.VACANT_DIRTY: 'vacant_dirty',
+    RoomStatus.OCCUPIED: 'occupied',
+    RoomStatus.OUT_OF_ORDER: 'out_of_order',
+}
+
+
+def _event_date(value) -> Optional[date]:
+    """事件中的时间为 ISO 字符串，兼容 date/datetime"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def _as_date(value) -> date:
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+def _day_bounds(start_date: date, end_date: date):
+    return (datetime.combine(start_date, datetime.min.time()),
+            datetime.combine(end_date + timedelta(days=1), datetime.min.time()))
+
+
+def _empty_room_type(name: str = "") -> dict:
+    return {
+        'room_type_name': name,
+        'total_rooms': 0,
+        'occupied_rooms': 0,
+        'arrivals': 0,
+        'departures': 0,
+        'revenue': Decimal('0'),
+    }
+
+
+def derive_metrics(values: dict) -> dict:
+    """根据计数重算入住率、ADR、RevPAR"""
+    sellable = values['sellable_rooms']
+    occupied = values['occupied_rooms']
+    revenue = values['revenue']
+    values['occupancy_rate'] = round(occupied / sellable * 100, 1) if sellable > 0 else 0
+    values['adr'] = (revenue / occupied).quantize(CENT) if occupied > 0 else Decimal('0')
+    values['revpar'] = (revenue / sellable).quantize(CENT) if sellable > 0 else Decimal('0')
+    return values
+
+
+class KPIRollupService:
+    """经营指标日汇总服务"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ==================== 计算 ====================
+
+    def room_snapshot(self) -> dict:
+        """当前房态计数（总数、可售数、各状态数、各房型房间数）"""
+        snapshot = {field: 0 for field in ROOM_SNAPSHOT_FIELDS}
+        snapshot['room_types'] = {
+            rt_id: _empty_room_type(name)
+            for rt_id, name in self.db.query(RoomType.id, RoomType.name).all()
+        }
+        rows = self.db.query(Room.room_type_id, Room.status, func.count(Room.id)).filter(
+            Room.is_active == True
+        ).group_by(Room.room_type_id, Room.status).all()
+        for rt_id, status, count in rows:
+            snapshot['total_rooms'] += count
+            field = _STATUS_FIELDS.get(status)
+            if field:
+                snapshot[field] += count
+            if status != RoomStatus.OUT_OF_ORDER:
+                snapshot['sellable_rooms'] += count
+                snapshot['room_types'].setdefault(rt_id, _empty_room_type())['total_rooms'] += count
+        return snapshot
+
+    @staticmethod
+    def apply_room_snapshot(values: dict, snapshot: dict) -> dict:
+        """把房态快照写入一天的指标（房型明细只更新房间数）"""
+        for field in ROOM_SNAPSHOT_FIELDS:
+            values[field] = snapshot[field]
+        breakdown = values['room_type_breakdown']
+        for rt_id, entry in snapshot['room_types'].items():
+            target = breakdown.setdefault(rt_id, _empty_room_type(entry['room_type_name']))
+            target['room_type_name'] = entry['room_type_name'] or target['room_type_name']
+            target['total_rooms'] = entry['total_rooms']
+        return derive_metrics(values)
+
+    def compute(self, start_date: date, end_date: date) -> Dict[date, dict]:
+        """
+        按明细表计算 [start_date, end_date] 每天的指标
+
+        房态计数取当前快照；其余指标各一次分组查询覆盖整个区间
+        """
+        if start_date > end_date:
+            return {}
+
+        snapshot = self.room_snapshot()
+        result = {}
+        current = start_date
+        while current <= end_date:
+            values = {
+                'business_date': current,
+                'occupied_rooms': 0,
+                'arrivals': 0,
+                'departures': 0,
+                'revenue': Decimal('0'),
+                'payment_count': 0,
+                'revenue_by_method': {},
+                'room_type_breakdown': {},
+            }
+            result[current] = self.apply_room_snapshot(values, snapshot)
+            current += timedelta(days=1)
+
+        def entry(day, rt_id) -> Optional[dict]:
+            if rt_id is None:
+                return None
+            return result[day]['room_type_breakdown'].setdefault(rt_id, _empty_room_type())
+
+        # 在住（口径同入住率报表）
+        days = date_series(start_date, end_date)
+        day_col = days.c.day
+        rows = self.db.query(day_col, Room.room_type_id, func.count(StayRecord.id)).select_from(days).join(
+            StayRecord, stay_occupies(day_col)
+        ).join(Room, Room.id == StayRecord.room_id).group_by(day_col, Room.room_type_id).all()
+        for day_value, rt_id, count in rows:
+            day = _as_date(day_value)
+            result[day]['occupied_rooms'] += count
+            entry(day, rt_id)['occupied_rooms'] += count
+
+        # 到店 / 离店
+        lower, upper = _day_bounds(start_date, end_date)
+        for time_col, field in ((StayRecord.check_in_time, 'arrivals'),
+                                (StayRecord.check_out_time, 'departures')):
+            stay_day = func.date(time_col)
+            rows = self.db.query(stay_day, Room.room_type_id, func.count(StayRecord.id)).join(
+                Room, Room.id == StayRecord.room_id
+            ).filter(time_col >= lower, time_col < upper).group_by(stay_day, Room.room_type_id).all()
+            for day_value, rt_id, count in rows:
+                day = _as_date(day_value)
+                result[day][field] += count
+                entry(day, rt_id)[field] += count
+
+        # 收款：按日期 × 支付方式 × 房型
+        payment_day = func.date(Payment.payment_time)
+        rows = self.db.query(
+            payment_day, Payment.method, Room.room_type_id,
+            func.sum(Payment.amount), func.count(Payment.id)
+        ).outerjoin(Bill, Bill.id == Payment.bill_id).outerjoin(
+            StayRecord, StayRecord.id == Bill.stay_record_id
+        ).outerjoin(Room, Room.id == StayRecord.room_id).filter(
+            Payment.payment_time >= lower, Payment.payment_time < upper
+        ).group_by(payment_day, Payment.method, Room.room_type_id).all()
+        for day_value, method, rt_id, amount, count in rows:
+            day = _as_date(day_value)
+            values = result[day]
+            amount = Decimal(amount or 0)
+            key = method.value if hasattr(method, 'value') else str(method)
+            values['revenue'] += amount
+            values['payment_count'] += count
+            values['revenue_by_method'][key] = values['revenue_by_method'].get(key, Decimal('0')) + amount
+            type_entry = entry(day, rt_id)
+            if type_entry is not None:
+                type_entry['revenue'] += amount
+
+        for values in result.values():
+            derive_metrics(values)
+        return result
+
+    # ==================== 行读写 ====================
+
+    @staticmethod
+    def load(row: DailyKPI) -> dict:
+        """行 -> 指标字典（金额为 Decimal，房型键为 int）"""
+        values = {field: getattr(row, field) or 0 for field in ROOM_SNAPSHOT_FIELDS}
+        values.update({
+            'business_date': row.business_date,
+            'occupied_rooms': row.occupied_rooms or 0,
+            'occupancy_rate': row.occupancy_rate or 0,
+            'arrivals': row.arrivals or 0,
+            'departures': row.departures or 0,
+            'revenue': Decimal(row.revenue or 0),
+            'payment_count': row.payment_count or 0,
+            'adr': Decimal(row.adr or 0),
+            'revpar': Decimal(row.revpar or 0),
+            'revenue_by_method': {
+                method: Decimal(amount)
+                for method, amount in json.loads(row.revenue_by_method or '{}').items()
+            },
+            'room_type_breakdown': {},
+        })
+        for rt_id, entry in json.loads(row.room_type_breakdown or '{}').items():
+            entry['revenue'] = Decimal(entry.get('revenue') or 0)
+            values['room_type_breakdown'][int(rt_id)] = entry
+        return values
+
+    @staticmethod
+    def store(row: DailyKPI, values: dict) -> None:
+        """指标字典 -> 行"""
+        for field in ROOM_SNAPSHOT_FIELDS + (
+            'occupied_rooms', 'occupancy_rate', 'arrivals', 'departures',
+            'revenue', 'payment_count', 'adr', 'revpar'
+        ):
+            setattr(row, field, values[field])
+        row.revenue_by_method = json.dumps(
+            {method: str(amount) for method, amount in sorted(values['revenue_by_method'].items())}
+        )
+        row.room_type_breakdown = json.dumps({
+            str(rt_id): {**entry, 'revenue': str(entry['revenue'])}
+            for rt_id, entry in sorted(values['room_type_breakdown'].items())
+        }, ensure_ascii=False)
+
+    def reconcile(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> dict:
+        """
+        按明细表重算并写入 [start_date, end_date] 的日汇总（默认昨天到今天）
+
+        未来日期不落库；历史日期保留行中原有的房态快照
+        """
+        today = date.today()
+        start_date = start_date or today - timedelta(days=1)
+        end_date = min(end_date or today, today)
+        if start_date > end_date:
+            return {'start': start_date.isoformat(), 'end': end_date.isoformat(), 'days': 0, 'created': 0}
+
+        computed = self.compute(start_date, end_date)
+        for attempt in range(2):
+            existing = {
+                row.business_date: row for row in self.db.query(DailyKPI).filter(
+                    DailyKPI.business_date >= start_date, DailyKPI.business_date <= end_date
+                ).all()
+            }
+            now = datetime.now()
+            created = 0
+            for day, values in computed.items():
+                row = existing.get(day)
+                if row is None:
+                    row = DailyKPI(business_date=day)
+                    self.db.add(row)
+                    created += 1
+                elif day != today:
+                    for field in ROOM_SNAPSHOT_FIELDS:
+                        values[field] = getattr(row, field) or 0
+                    derive_metrics(values)
+                self.store(row, values)
+                row.reconciled_at = now
+            try:
+                self.db.commit()
+                break
+            except IntegrityError:
+                # 并发请求先写入了同一天的行，重新读取后覆盖
+                self.db.rollback()
+                if attempt:
+                    raise
+
+        return {
+            'start': start_date.isoformat(),
+            'end': end_date.isoformat(),
+            'days': len(computed),
+            'created': created,
+        }
+
+    # ==================== 读取 ====================
+
+    def _today_is_stale(self, row: Optional[DailyKPI]) -> bool:
+        if row is None or row.reconciled_at is None:
+            return True
+        rollup = _kpi_rollup
+        if rollup is None or not rollup.maintains(self.db):
+            return True
+        from app.config import settings
+        age = (datetime.now() - row.reconciled_at).total_seconds()
+        return age > settings.KPI_ROLLUP_MAX_AGE_SECONDS
+
+    def _ensure_rows(self, start_date: date, end_date: date) -> None:
+        """补齐缺失的日汇总行（连续缺失的日期合并为一次重算）"""
+        today = date.today()
+        present = {
+            day for (day,) in self.db.query(DailyKPI.business_date).filter(
+                DailyKPI.business_date >= start_date, DailyKPI.business_date <= end_date
+            ).all()
+        }
+        if start_date <= today <= end_date and today in present:
+            today_row = self.db.query(DailyKPI).filter(DailyKPI.business_date == today).first()
+            if self._today_is_stale(today_row):
+                present.discard(today)
+
+        run_start = None
+        current = start_date
+        while current <= end_date + timedelta(days=1):
+            missing = current <= end_date and current not in present
+            if missing and run_start is None:
+                run_start = current
+            elif not missing and run_start is not None:
+                self.reconcile(run_start, current - timedelta(days=1))
+                run_start = None
+            current += timedelta(days=1)
+
+    def get_days(self, start_date: date, end_date: date) -> List[dict]:
+        """[start_date, end_date] 每天的指标（按日期升序）"""
+        if start_date > end_date:
+            return []
+
+        today = date.today()
+        result = {}
+        if start_date <= today:
+            last = min(end_date, today)
+            self._ensure_rows(start_date, last)
+            rows = self.db.query(DailyKPI).filter(
+                DailyKPI.business_date >= start_date, DailyKPI.business_date <= last
+            ).all()
+            result.update({row.business_date: self.load(row) for row in rows})
+        if end_date > today:
+            result.update(self.compute(max(start_date, today + timedelta(days=1)), end_date))
+        return [result[day] for day in sorted(result)]
+
+    def get_dashboard_stats(self) -> dict:
+        """仪表盘统计（字段同 ReportService.get_dashboard_stats）"""
+        today = date.today()
+        values = self.get_days(today, today)[0]
+        sellable = values['total_rooms'] - values['out_of_order']
+        occupancy_rate = (values['occupied'] / sellable * 100) if sellable > 0 else 0
+        return {
+            'total_rooms': values['total_rooms'],
+            'vacant_clean': values['vacant_clean'],
+            'occupied': values['occupied'],
+            'vacant_dirty': values['vacant_dirty'],
+            'out_of_order': values['out_of_order'],
+            'today_checkins': values['arrivals'],
+            'today_checkouts': values['departures'],
+            'occupancy_rate': round(occupancy_rate, 1),
+            'today_revenue': values['revenue']
+        }
+
+    def get_occupancy_report(self, start_date: date, end_date: date) -> List[dict]:
+        """入住率报表（字段同 ReportService.get_occupancy_report）"""
+        return [{
+            'date': values['business_date'],
+            'total_rooms': values['sellable_rooms'],
+            'occupied_rooms': values['occupied_rooms'],
+            'occupancy_rate': values['occupancy_rate']
+        } for values in self.get_days(start_date, end_date)]
+
+    def get_revenue_report(self, start_date: date, end_date: date) -> List[dict]:
+        """营收报表（字段同 ReportService.get_revenue_report）"""
+        return [{
+            'date': values['business_date'],
+            'revenue': values['revenue'] if values['payment_count'] else 0,
+            'payment_count': values['payment_count']
+        } for values in self.get_days(start_date, end_date)]
+
+
+class DailyKPIRollup:
+    """
+    日汇总的事件处理器：按事件内容修改事件当天的 daily_kpi 行
+
+    当天的行不存在时直接按明细表计算（已包含本次事件）。房态计数在
+    相关事件后用一次分组计数刷新，因为入住/退房/完成清洁不单独发布房态事件。
+
+    Example:
+        >>> rollup = DailyKPIRollup()
+        >>> rollup.register()
+        >>> rollup.get_stats()['events_applied']
+        0
+    """
+
+    def __init__(self, db_session_factory: Callable = None):
+        self._db_session_factory = db_session_factory or SessionLocal
+        self._lock = threading.Lock()
+        self._registered = False
+        self._bus = None
+        self._events_applied = 0
+        self._errors = 0
+
+    def maintains(self, db: Session) -> bool:
+        """是否由事件维护 db 所在数据库的汇总行"""
+        if not self._registered:
+            return False
+        bind = getattr(self._db_session_factory, 'kw', {}).get('bind')
+        return bind is None or bind is db.get_bind()
+
+    def _apply(self, day: Optional[date], mutate: Callable[[Session, dict], None],
+               refresh_rooms: bool = False, event: Optional[Event] = None) -> None:
+        """
+        在事件当天的行上执行修改
+
+        传入 event 且启用发件箱时，事件 ID 与行的修改在同一事务中登记，
+        已登记的（重复投递）直接跳过
+        """
+        today = date.today()
+        day = day or today
+        if day > today:
+            return
+        with self._lock:
+            db = self._db_session_factory()
+            try:
+                claim = event is not None and outbox_enabled()
+                if claim and not claim_event(db, "daily_kpi_rollup", event.event_id):
+                    logger.info(f"DailyKPIRollup: event {event.event_id} already applied, skipping")
+                    return
+                service = KPIRollupService(db)
+                row = db.query(DailyKPI).filter(DailyKPI.business_date == day).first()
+                if row is None:
+                    service.reconcile(day, day)
+                    if claim:
+                        # reconcile 遇并发写入会回滚重试，登记可能随之丢失，重新登记
+                        claim_event(db, "daily_kpi_rollup", event.event_id)
+                        db.commit()
+                else:
+                    values = service.load(row)
+                    mutate(db, values)
+                    if refresh_rooms and day == today:
+                        service.apply_room_snapshot(values, service.room_snapshot())
+                    service.store(row, derive_metrics(values))
+                    db.commit()
+                self._events_applied += 1
+            except Exception as e:
+                db.rollback()
+                self._errors += 1
+                logger.warning(f"DailyKPIRollup: failed to apply event for {day}: {e}")
+            finally:
+                db.close()
+
+    @staticmethod
+    def _type_entry(db: Session, values: dict, room_id) -> Optional[dict]:
+        room = db.get(Room, room_id) if room_id else None
+        if room is None:
+            return None
+        entry = values['room_type_breakdown'].setdefault(room.room_type_id, _empty_room_type())
+        if not entry['room_type_name'] and room.room_type is not None:
+            entry['room_type_name'] = room.room_type.name
+        return entry
+
+    # ==================== 事件处理 ====================
+
+    def handle_guest_checked_in(self, event: Event) -> None:
+        """入住：到店 +1，预计离店晚于当天则在住 +1"""
+        data = event.data
+        day = _event_date(data.get('check_in_time')) or event.timestamp.date()
+        expected_check_out = _event_date(data.get('expected_check_out'))
+
+        def mutate(db, values):
+            values['arrivals'] += 1
+            entry = self._type_entry(db, values, data.get('room_id'))
+            if entry is not None:
+                entry['arrivals'] += 1
+            if expected_check_out is None or expected_check_out > day:
+                values['occupied_rooms'] += 1
+                if entry is not None:
+                    entry['occupied_rooms'] += 1
+
+        self._apply(day, mutate, refresh_rooms=True, event=event)
+
+    def handle_guest_checked_out(self, event: Event) -> None:
+        """退房：离店 +1；超期未退的住宿原先不计在住，退房当天计入"""
+        data = event.data
+        day = _event_date(data.get('check_out_time')) or event.timestamp.date()
+
+        def mutate(db, values):
+            values['departures'] += 1
+            stay = db.get(StayRecord, data.get('stay_record_id'))
+            entry = self._type_entry(db, values, stay.room_id if stay else data.get('room_id'))
+            if entry is not None:
+                entry['departures'] += 1
+            if (stay is not None and stay.check_in_time.date() <= day
+                    and stay.expected_check_out <= day):
+                values['occupied_rooms'] += 1
+                if entry is not None:
+                    entry['occupied_rooms'] += 1
+
+        self._apply(day, mutate, refresh_rooms=True, event=event)
+
+    def handle_payment_received(self, event: Event) -> None:
+        """收款（退款为负数）：营收、笔数、支付方式、房型营收"""
+        data = event.data
+        # 收款日期以 Payment.payment_time 为准（与报表口径一致）
+        day = _event_date(data.get('payment_time')) or event.timestamp.date()
+
+        def mutate(db, values):
+            amount = Decimal(str(data.get('amount') or 0))
+            method = str(data.get('method') or '')
+            values['revenue'] += amount
+            values['payment_count'] += 1
+            values['revenue_by_method'][method] = values['revenue_by_method'].get(method, Decimal('0')) + amount
+            stay = db.get(StayRecord, data.get('stay_record_id')) if data.get('stay_record_id') else None
+            entry = self._type_entry(db, values, stay.room_id if stay else None)
+            if entry is not None:
+                entry['revenue'] += amount
+
+        self._apply(day, mutate, event=event)
+
+    def handle_stay_extended(self, event: Event) -> None:
+        """续住/缩短：超期住宿续住后当天重新计入在住，缩短到当天及以前则移出"""
+        data = event.data
+        today = date.today()
+        old_check_out = _event_date(data.get('old_check_out'))
+        new_check_out = _event_date(data.get('new_check_out'))
+        if old_check_out is None or new_check_out is None:
+            return
+        was_counted = old_check_out > today
+        now_counted = new_check_out > today
+        if was_counted == now_counted:
+            return
+
+        def mutate(db, values):
+            stay = db.get(StayRecord, data.get('stay_record_id'))
+            if stay is None or stay.check_in_time.date() > today:
+                return
+            delta = 1 if now_counted else -1
+            values['occupied_rooms'] += delta
+            entry = self._type_entry(db, values, stay.room_id)
+            if entry is not None:
+                entry['occupied_rooms'] += delta
+
+        self._apply(today, mutate, event=event)
+
+    def handle_rooms_changed(self, event: Event) -> None:
+        """房态变化、房间增删改、清洁完成：刷新当天房态计数"""
+        self._apply(date.today(), lambda db, values: None, refresh_rooms=True)
+
+    def handle_reconcile_today(self, event: Event) -> None:
+        """
+        换房、撤销操作：重算当天
+
+        换房后当天的到店、收款按新房型归属，撤销无法按事件内容回滚
+        """
+        with self._lock:
+            db = self._db_session_factory()
+            try:
+                KPIRollupService(db).reconcile(date.today(), date.today())
+                self._events_applied += 1
+            except Exception as e:
+                db.rollback()
+                self._errors += 1
+                logger.warning(f"DailyKPIRollup: failed to reconcile today after {event.event_type}: {e}")
+            finally:
+                db.close()
+
+    def _handlers(self):
+        return [
+            (EventType.GUEST_CHECKED_IN, self.handle_guest_checked_in),
+            (EventType.GUEST_CHECKED_OUT, self.handle_guest_checked_out),
+            (EventType.PAYMENT_RECEIVED, self.handle_payment_received),
+            (EventType.STAY_EXTENDED, self.handle_stay_extended),
+            (EventType.ROOM_CHANGED, self.handle_reconcile_today),
+            (EventType.ROOM_STATUS_CHANGED, self.handle_rooms_changed),
+            (EventType.ROOM_CREATED, self.handle_rooms_changed),
+            (EventType.ROOM_UPDATED, self.handle_rooms_changed),
+            (EventType.TASK_COMPLETED, self.handle_rooms_changed),
+            (EventType.OPERATION_UNDONE, self.handle_reconcile_today),
+        ]
+
+    def register(self, event_bus_instance=None) -> None:
+        """订阅事件总线"""
+        if self._registered:
+            return
+        bus = event_bus_instance or event_bus
+        for event_type, handler in self._handlers():
+            bus.subscribe(event_type, handler)
+        self._bus = bus
+        self._registered = True
+        logger.info("Daily KPI rollup registered")
+
+    def unregister(self) -> None:
+        """取消订阅（用于测试）"""
+        if not self._registered:
+            return
+        for event_type, handler in self._handlers():
+            self._bus.unsubscribe(event_type, handler)
+        self._bus = None
+        self._registered = False
+
+    def get_stats(self) -> dict:
+        """事件处理统计"""
+        return {
+            'registered': self._registered,
+            'events_applied': self._events_applied,
+            'errors': self._errors,
+        }
+
+
+# 全局实例（应用启动时注册到事件总线）
+_kpi_rollup: Optional[DailyKPIRollup] = None
+
+
+def get_kpi_rollup() -> Optional[DailyKPIRollup]:
+    """获取已注册的日汇总事件处理器"""
+    return _kpi_rollup
+
+
+def register_kpi_rollup(db_session_factory: Callable = None,
+                        event_bus_instance=None) -> Optional[DailyKPIRollup]:
+    """注册日汇总事件处理器（应用启动时调用）"""
+    global _kpi_rollup
+    from app.config import settings
+    if not settings.KPI_ROLLUP_ENABLED:
+        return None
+    if _kpi_rollup is None:
+        _kpi_rollup = DailyKPIRollup(db_session_factory)
+        _kpi_rollup.register(event_bus_instance)
+    return _kpi_rollup
+
+
+def reset_kpi_rollup() -> None:
+    """取消注册并丢弃全局实例（用于测试）"""
+    global _kpi_rollup
+    if _kpi_rollup is not None:
+        _kpi_rollup.unregister()
+    _kpi_rollup = None
+
+
+def reconcile_daily_kpi(days: Optional[int] = None) -> str:
+    """
+    定时任务入口：按明细表重算最近 days 天（含今天）的日汇总
+
+    默认天数 KPI_RECONCILE_DAYS；由 sys_job daily_kpi_reconcile 每晚调用
+    """
+    from app.config import settings
+    days = days or settings.KPI_RECONCILE_DAYS
+    today = date.today()
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        result = KPIRollupService(db).reconcile(today - timedelta(days=days - 1), today)
+    finally:
+        db.close()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return f"reconciled {result['days']} day(s) {result['start']}..{result['end']} in {elapsed_ms:.0f} ms"
+
+
+__all__ = [
+    "DailyKPIRollup",
+    "KPIRollupService",
+    "derive_metrics",
+    "get_kpi_rollup",
+    "reconcile_daily_kpi",
+    "register_kpi_rollup",
+    "reset_kpi_rollup",
+]
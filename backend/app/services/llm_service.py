@@ -5,10 +5,12 @@ LLM 服务 - 支持 OpenAI 兼容 API
 import json
 import os
 import re
+import threading
 from typing import Optional, Dict, Any, List
 from datetime import date, datetime
 from openai import OpenAI
 from app.config import settings
+from core.ai.response_cache import LLMResponseCache, usage_to_dict
 
 
 def extract_json_from_text(text: str) -> Optional[Dict]:
@@ -329,6 +331,39 @@ LANGUAGE_PROMPTS = {
 }
 
 
+
+# 全局 LLM 响应缓存（LLMService 按请求创建，缓存需要跨实例共享）
+_response_cache: Optional[LLMResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[LLMResponseCache]:
+    """获取共享的 LLM 响应缓存，LLM_CACHE_ENABLED=false 时返回 None"""
+    global _response_cache
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    with _response_cache_lock:
+        if _response_cache is None:
+            embedding_service = None
+            if settings.LLM_CACHE_SEMANTIC:
+                from core.ai import get_embedding_service
+                embedding_service = get_embedding_service()
+            _response_cache = LLMResponseCache(
+                max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+                ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+                embedding_service=embedding_service,
+                similarity_threshold=settings.LLM_CACHE_SIMILARITY,
+            )
+        return _response_cache
+
+
+def reset_response_cache() -> None:
+    """丢弃共享的 LLM 响应缓存（测试隔离用）"""
+    global _response_cache
+    with _response_cache_lock:
+        _response_cache = None
+
+
 class LLMService:
     """LLM 服务"""
 
@@ -496,6 +531,9 @@ ontology_query 用于动态字段级查询，params 结构如下：
         # Schema 缓存
         self._query_schema_cache = None
 
+        # 响应缓存（重复提示词不再请求 LLM）
+        self._response_cache = get_response_cache() if self.enabled else None
+
     def _instrumented_completion(self, messages, **kwargs):
         """
         Wrapper around self.client.chat.completions.create() that records
@@ -508,94 +546,184 @@ ontology_query 用于动态字段级查询，params 结构如下：
         ctx = LLMCallContext.get_current()
         started_at = datetime.now()
 
+        cache = getattr(self, '_response_cache', None)
+        if cache is not None and not kwargs.get('stream'):
+            cached = cache.get(kwargs.get('model'), kwargs.get('temperature'), messages,
+                               self._cache_params(kwargs))
+            if cached is not None:
+                response = cached.to_completion()
+                self._record_interaction(
+                    ctx, messages, kwargs, started_at,
+                    response_text=cached.content,
+                    usage=response.usage,
+                    cache_status=cached.match,
+                    saved_latency_ms=cached.latency_ms,
+                )
+                return response
+
         try:
             response = self.client.chat.completions.create(messages=messages, **kwargs)
-            ended_at = datetime.now()
-            latency_ms = int((ended_at - started_at).total_seconds() * 1000)
+        except Exception as e:
+            self._record_interaction(ctx, messages, kwargs, started_at, error=e)
+            raise
 
-            # Record interaction if we have an active debug context
-            if ctx and ctx.get('debug_logger') and ctx.get('session_id') and ctx.get('ooda_phase'):
-                try:
-                    seq = LLMCallContext.next_sequence()
-                    debug_logger = ctx['debug_logger']
-
-                    # Extract token usage
-                    tokens_input = None
-                    tokens_output = None
-                    tokens_total = None
-                    if hasattr(response, 'usage') and response.usage:
-                        tokens_input = getattr(response.usage, 'prompt_tokens', None)
-                        tokens_output = getattr(response.usage, 'completion_tokens', None)
-                        tokens_total = getattr(response.usage, 'total_tokens', None)
-
-                    # Extract response text
-                    resp_text = None
-                    if response.choices:
-                        resp_text = response.choices[0].message.content
-
-                    # Serialize prompt (messages array)
-                    prompt_json = json.dumps(messages, ensure_ascii=False, default=str)
-
-                    debug_logger.log_llm_interaction(
-                        session_id=ctx['session_id'],
-                        sequence_number=seq,
-                        ooda_phase=ctx['ooda_phase'],
-                        call_type=ctx.get('call_type', 'unknown'),
-                        started_at=started_at.isoformat(),
-                        ended_at=ended_at.isoformat(),
-                        latency_ms=latency_ms,
-                        model=kwargs.get('model', None),
-                        prompt=prompt_json,
-                        response=resp_text,
-                        tokens_input=tokens_input,
-                        tokens_output=tokens_output,
-                        tokens_total=tokens_total,
-                        temperature=kwargs.get('temperature', None),
-                        success=True,
-                    )
-                except Exception as log_err:
-                    import logging
-                    logging.getLogger(__name__).debug(f"Failed to log LLM interaction: {log_err}")
-
-            return response
+        resp_text = None
+        if response.choices:
+            resp_text = response.choices[0].message.content
+        usage = getattr(response, 'usage', None)
+
+        cache_status = None
+        if cache is not None and not kwargs.get('stream'):
+            cache_status = 'miss'
+            if isinstance(resp_text, str):
+                cache.put(
+                    kwargs.get('model'), kwargs.get('temperature'), messages, resp_text,
+                    usage=usage_to_dict(usage),
+                    latency_ms=int((datetime.now() - started_at).total_seconds() * 1000),
+                    params=self._cache_params(kwargs),
+                )
 
-        except Exception as e:
-            ended_at = datetime.now()
-            latency_ms = int((ended_at - started_at).total_seconds() * 1000)
+        self._record_interaction(
+            ctx, messages, kwargs, started_at,
+            response_text=resp_text,
+            usage=usage,
+            cache_status=cache_status,
+        )
+        return response
 
-            # Record failed interaction
-            if ctx and ctx.get('debug_logger') and ctx.get('session_id') and ctx.get('ooda_phase'):
-                try:
-                    seq = LLMCallContext.next_sequence()
-                    debug_logger = ctx['debug_logger']
-                    prompt_json = json.dumps(messages, ensure_ascii=False, default=str)
-                    debug_logger.log_llm_interaction(
-                        session_id=ctx['session_id'],
-                        sequence_number=seq,
-                        ooda_phase=ctx['ooda_phase'],
-                        call_type=ctx.get('call_type', 'unknown'),
-                        started_at=started_at.isoformat(),
-                        ended_at=ended_at.isoformat(),
-                        latency_ms=latency_ms,
-                        model=kwargs.get('model', None),
-                        prompt=prompt_json,
-                        tokens_input=None,
-                        tokens_output=None,
-                        tokens_total=None,
-                        temperature=kwargs.get('temperature', None),
-                        success=False,
-                        error=str(e),
-                    )
-                except Exception:
-                    pass
+    def _instrumented_stream(self, stream_handler, messages, **kwargs) -> str:
+        """
+        Streaming counterpart of _instrumented_completion().
+
+        The handler (installed via core.ai.llm_stream.set_stream_handler) forwards
+        tokens to the client while they are generated and returns the full
+        text, which is recorded to the debug logger like any other call.
+        """
+        from core.ai.llm_call_context import LLMCallContext
+
+        ctx = LLMCallContext.get_current()
+        started_at = datetime.now()
+
+        # A cached reply skips streaming; the client gets it in the final event
+        cache = getattr(self, '_response_cache', None)
+        if cache is not None:
+            cached = cache.get(kwargs.get('model'), kwargs.get('temperature'), messages,
+                               self._cache_params(kwargs))
+            if cached is not None:
+                self._record_interaction(
+                    ctx, messages, kwargs, started_at,
+                    response_text=cached.content,
+                    cache_status=cached.match,
+                    saved_latency_ms=cached.latency_ms,
+                )
+                return cached.content
 
+        try:
+            content = stream_handler(messages, **kwargs)
+        except Exception as e:
+            self._record_interaction(ctx, messages, kwargs, started_at, error=e)
             raise
 
+        if cache is not None and content:
+            cache.put(
+                kwargs.get('model'), kwargs.get('temperature'), messages, content,
+                latency_ms=int((datetime.now() - started_at).total_seconds() * 1000),
+                params=self._cache_params(kwargs),
+            )
+        self._record_interaction(
+            ctx, messages, kwargs, started_at,
+            response_text=content,
+            cache_status='miss' if cache is not None else None,
+        )
+        return content
+
+    @staticmethod
+    def _cache_params(kwargs) -> Dict[str, Any]:
+        """Request parameters that distinguish cache entries besides model/temperature/messages"""
+        return {
+            k: v for k, v in kwargs.items()
+            if k not in ('model', 'temperature', 'stream')
+        }
+
+    def _complete_text(self, messages, **kwargs) -> Optional[str]:
+        """
+        Run a completion and return its text, streaming it when the current
+        request installed a stream handler (POST /ai/chat/stream).
+        """
+        from core.ai.llm_stream import get_stream_handler
+
+        stream_handler = get_stream_handler()
+        if stream_handler is not None:
+            return self._instrumented_stream(stream_handler, messages, **kwargs)
+
+        response = self._instrumented_completion(messages=messages, **kwargs)
+        return response.choices[0].message.content
+
+    def _record_interaction(self, ctx, messages, kwargs, started_at,
+                            response_text=None, usage=None, error=None,
+                            cache_status=None, saved_latency_ms=None):
+        """Record one LLM call to the debug logger if a debug session is active"""
+        if not (ctx and ctx.get('debug_logger') and ctx.get('session_id') and ctx.get('ooda_phase')):
+            return
+
+        from core.ai.llm_call_context import LLMCallContext
+
+        ended_at = datetime.now()
+        latency_ms = int((ended_at - started_at).total_seconds() * 1000)
+
+        try:
+            seq = LLMCallContext.next_sequence()
+            debug_logger = ctx['debug_logger']
+
+            # Extract token usage
+            tokens_input = None
+            tokens_output = None
+            tokens_total = None
+            if usage:
+                tokens_input = getattr(usage, 'prompt_tokens', None)
+                tokens_output = getattr(usage, 'completion_tokens', None)
+                tokens_total = getattr(usage, 'total_tokens', None)
+
+            # Serialize prompt (messages array)
+            prompt_json = json.dumps(messages, ensure_ascii=False, default=str)
+
+            extra = {'response': response_text} if error is None else {'error': str(error)}
+            if cache_status is not None:
+                extra['cache_status'] = cache_status
+                extra['saved_latency_ms'] = saved_latency_ms
+            debug_logger.log_llm_interaction(
+                session_id=ctx['session_id'],
+                sequence_number=seq,
+                ooda_phase=ctx['ooda_phase'],
+                call_type=ctx.get('call_type', 'unknown'),
+                started_at=started_at.isoformat(),
+                ended_at=ended_at.isoformat(),
+                latency_ms=latency_ms,
+                model=kwargs.get('model', None),
+                prompt=prompt_json,
+                tokens_input=tokens_input,
+                tokens_output=tokens_output,
+                tokens_total=tokens_total,
+                temperature=kwargs.get('temperature', None),
+                success=error is None,
+                **extra,
+            )
+        except Exception as log_err:
+            import logging
+            logging.getLogger(__name__).debug(f"Failed to log LLM interaction: {log_err}")
+
     def on_ontology_changed(self):
-        """本体变化时调用 - 清除 PromptBuilder 缓存"""
+        """本体变化时调用 - 清除 PromptBuilder 缓存和 LLM 响应缓存"""
         if self._prompt_builder:
             self._prompt_builder.invalidate_cache()
         self._query_schema_cache = None
+        if _response_cache is not None:
+            _response_cache.invalidate()
+
+    def get_prompt_build_stats(self) -> Dict[str, Any]:
+        """最近一次系统提示词构建的耗时、片段 token 数与缓存命中率"""
+        builder = getattr(self, '_prompt_builder', None)
+        return dict(builder.last_build_stats) if builder else {}
 
     def get_query_schema(self) -> str:
         """
@@ -722,7 +850,7 @@ ontology_query 用于动态字段级查询，params 结构如下：
             # 领域关键词表（Domain Glossary）
             if include_glossary:
                 try:
-                    glossary = self._prompt_builder._build_domain_glossary()
+                    glossary = self._prompt_builder.build_domain_glossary()
                     if glossary:
                         system_prompt += f"\n\n{glossary}"
                 except Exception:
@@ -856,7 +984,7 @@ ontology_query 用于动态字段级查询，params 结构如下：
             from core.ai.llm_call_context import LLMCallContext
             LLMCallContext.before_call("decide", "chat")
             try:
-                response = self._instrumented_completion(
+                content = self._complete_text(
                     messages=messages,
                     model=settings.LLM_MODEL,
                     temperature=settings.LLM_TEMPERATURE,
@@ -880,15 +1008,13 @@ ontology_query 用于动态字段级查询，params 结构如下：
                 })
 
                 LLMCallContext.before_call("decide", "chat")
-                response = self._instrumented_completion(
+                content = self._complete_text(
                     messages=fallback_messages,
                     model=settings.LLM_MODEL,
                     temperature=settings.LLM_TEMPERATURE,
                     max_tokens=settings.LLM_MAX_TOKENS
                 )
 
-            content = response.choices[0].message.content
-
             # 使用增强的 JSON 提取和解析
             result = extract_and_validate_actions(content)
 
@@ -990,7 +1116,7 @@ ontology_query 用于动态字段级查询，params 结构如下：
             return {}
 
         try:
-            response = self.client.chat.completions.create(
+            response = self._instrumented_completion(
                 model=settings.LLM_MODEL,
                 messages=[
                     {"role": "system", "content": """
@@ -0,0 +1,359 @@
+"""
+事件发件箱服务 - 领域事件的持久化与中继发布
+
+- stage_event：在业务事务中写入 event_outbox，随业务变更一起提交
+- TransactionalEventPublisher：业务服务的事件发布入口，提交前 stage、提交后 publish
+- OutboxRelay：后台线程按 id 顺序批量读取未发布事件并发布到事件总线，
+  发布后在同一批次事务中标记 published_at；进程在发布与标记之间退出时
+  重启后会重发（至少一次投递），事件 ID 保持不变
+- claim_event：消费者在自己的事务中登记已处理的事件 ID，重复投递时跳过
+"""
+import json
+import logging
+import threading
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from enum import Enum
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.outbox import OutboxEvent, ProcessedEvent
+from app.services.event_bus import event_bus, Event
+
+logger = logging.getLogger(__name__)
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def stage_event(db: Session, event: Event) -> OutboxEvent:
+    """
+    将事件写入发件箱（不提交，由调用方的业务事务一起提交）
+
+    Args:
+        db: 业务操作所在的数据库会话
+        event: 领域事件，event_id 作为幂等键
+
+    Returns:
+        发件箱记录
+    """
+    row = OutboxEvent(
+        event_id=event.event_id,
+        event_type=str(getattr(event.event_type, 'value', event.event_type)),
+        source=event.source,
+        payload=json.dumps(event.data, default=_json_default, ensure_ascii=False),
+        occurred_at=event.timestamp,
+        created_at=datetime.now(),
+    )
+    db.add(row)
+    return row
+
+
+class TransactionalEventPublisher:
+    """
+    业务服务的领域事件发布：提交前 stage，提交后 publish
+
+    启用发件箱且未注入发布器时，stage 把事件写入发件箱、随业务事务一起提交，
+    publish 只唤醒中继；否则 stage 不写库，publish 在提交后直接发布到事件总线。
+
+    Example:
+        >>> events = TransactionalEventPublisher(db, event_publisher)
+        >>> event = events.stage(Event(...))
+        >>> db.commit()
+        >>> events.publish(event)
+    """
+
+    def __init__(self, db: Session, event_publisher: Callable[[Event], None] = None):
+        self.db = db
+        self.use_outbox = event_publisher is None and outbox_enabled()
+        self._publish = event_publisher or event_bus.publish
+
+    def stage(self, event: Event) -> Event:
+        """业务事务提交前调用"""
+        if self.use_outbox:
+            stage_event(self.db, event)
+        return event
+
+    def publish(self, event: Event) -> None:
+        """业务事务提交后调用"""
+        if self.use_outbox:
+            notify_outbox_relay()
+        else:
+            self._publish(event)
+
+
+def claim_event(db: Session, consumer: str, event_id: str) -> bool:
+    """
+    登记消费者处理的事件（不提交，与消费者的业务写入一起提交）
+
+    Args:
+        db: 消费者的数据库会话
+        consumer: 消费者名称
+        event_id: 事件 ID
+
+    Returns:
+        False 表示该消费者已处理过此事件，应跳过
+    """
+    exists = db.query(ProcessedEvent.id).filter(
+        ProcessedEvent.consumer == consumer,
+        ProcessedEvent.event_id == event_id
+    ).first()
+    if exists:
+        return False
+    db.add(ProcessedEvent(consumer=consumer, event_id=event_id))
+    return True
+
+
+def _to_event(row: OutboxEvent) -> Event:
+    return Event(
+        event_type=row.event_type,
+        timestamp=row.occurred_at,
+        data=json.loads(row.payload),
+        source=row.source or "",
+        event_id=row.event_id,
+    )
+
+
+class OutboxRelay:
+    """
+    发件箱中继：批量读取未发布事件并发布到事件总线
+
+    同一批次按 id 顺序发布；某条发布失败时记录错误并结束本批次，
+    保证后续事件不会越过它。失败达到 max_attempts 次的事件不再重试。
+
+    Example:
+        >>> relay = OutboxRelay()
+        >>> relay.relay_once()      # 同步处理一批（测试、脚本）
+        3
+        >>> relay.start()           # 后台线程：有新事件时被 notify 唤醒，否则按间隔轮询
+        >>> relay.get_stats()['published']
+        3
+    """
+
+    def __init__(
+        self,
+        db_session_factory: Callable = None,
+        publish: Callable[[Event], None] = None,
+        batch_size: int = 100,
+        poll_interval: float = 1.0,
+        max_attempts: int = 10,
+    ):
+        self._db_session_factory = db_session_factory or SessionLocal
+        self._publish = publish or event_bus.publish
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+
+        self._lock = threading.Lock()       # 同一时刻只有一个批次在发布
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._published = 0
+        self._batches = 0
+        self._errors = 0
+        self._lag_total_ms = 0.0
+        self._lag_max_ms = 0.0
+
+    def relay_once(self) -> int:
+        """
+        发布一批未发布事件
+
+        Returns:
+            本批次发布的事件数
+        """
+        with self._lock:
+            db = self._db_session_factory()
+            try:
+                rows = db.query(OutboxEvent).filter(
+                    OutboxEvent.published_at.is_(None),
+                    OutboxEvent.attempts < self.max_attempts
+                ).order_by(OutboxEvent.id).limit(self.batch_size).all()
+                if not rows:
+                    return 0
+
+                published = 0
+                lag_total_ms = 0.0
+                lag_max_ms = 0.0
+                for row in rows:
+                    try:
+                        self._publish(_to_event(row))
+                    except Exception as e:
+                        row.attempts += 1
+                        row.last_error = str(e)[:500]
+                        self._errors += 1
+                        logger.error(f"Outbox relay failed to publish {row.event_type} {row.event_id}: {e}")
+                        break
+                    now = datetime.now()
+                    row.published_at = now
+                    lag_ms = (now - row.created_at).total_seconds() * 1000
+                    lag_total_ms += lag_ms
+                    lag_max_ms = max(lag_max_ms, lag_ms)
+                    published += 1
+
+                db.commit()
+                self._published += published
+                self._batches += 1
+                self._lag_total_ms += lag_total_ms
+                self._lag_max_ms = max(self._lag_max_ms, lag_max_ms)
+                return published
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+
+    def relay_pending(self) -> int:
+        """连续发布直到没有可发布的事件，返回发布总数"""
+        total = 0
+        while True:
+            published = self.relay_once()
+            total += published
+            if published < self.batch_size:
+                return total
+
+    def pending_count(self) -> int:
+        """未发布（且未超过重试上限）的事件数"""
+        db = self._db_session_factory()
+        try:
+            return db.query(OutboxEvent).filter(
+                OutboxEvent.published_at.is_(None),
+                OutboxEvent.attempts < self.max_attempts
+            ).count()
+        finally:
+            db.close()
+
+    def purge_published(self, days: int = 7) -> int:
+        """删除 days 天前已发布的事件，返回删除条数"""
+        cutoff = datetime.now() - timedelta(days=days)
+        db = self._db_session_factory()
+        try:
+            deleted = db.query(OutboxEvent).filter(
+                OutboxEvent.published_at.isnot(None),
+                OutboxEvent.published_at < cutoff
+            ).delete(synchronize_session=False)
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+
+    # ==================== 后台线程 ====================
+
+    def notify(self) -> None:
+        """有新事件提交，唤醒中继线程"""
+        self._wakeup.set()
+
+    def start(self) -> None:
+        """启动后台中继线程"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="outbox-relay", daemon=True)
+        self._thread.start()
+        logger.info("Outbox relay started")
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """发布剩余事件后停止后台线程"""
+        thread = self._thread
+        if thread is None:
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        thread.join(timeout)
+        self._thread = None
+        logger.info("Outbox relay stopped")
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                published = self.relay_pending()
+            except Exception as e:
+                published = 0
+                self._errors += 1
+                logger.error(f"Outbox relay batch failed: {e}", exc_info=True)
+            if self._stopping.is_set():
+                return
+            if not published:
+                self._wakeup.wait(self.poll_interval)
+
+    def get_stats(self) -> dict:
+        """中继统计"""
+        return {
+            'running': self._thread is not None and self._thread.is_alive(),
+            'published': self._published,
+            'batches': self._batches,
+            'errors': self._errors,
+            'avg_lag_ms': round(self._lag_total_ms / self._published, 2) if self._published else 0.0,
+            'max_lag_ms': round(self._lag_max_ms, 2),
+        }
+
+
+# 全局实例（OUTBOX_ENABLED 时由应用启动）
+_outbox_relay: Optional[OutboxRelay] = None
+
+
+def outbox_enabled() -> bool:
+    """是否通过发件箱发布领域事件"""
+    from app.config import settings
+    return settings.OUTBOX_ENABLED
+
+
+def get_outbox_relay() -> Optional[OutboxRelay]:
+    """获取已启动的发件箱中继"""
+    return _outbox_relay
+
+
+def start_outbox_relay(db_session_factory: Callable = None,
+                       publish: Callable[[Event], None] = None) -> Optional[OutboxRelay]:
+    """启动发件箱中继（应用启动时调用）"""
+    global _outbox_relay
+    from app.config import settings
+    if not settings.OUTBOX_ENABLED:
+        return None
+    if _outbox_relay is None:
+        _outbox_relay = OutboxRelay(
+            db_session_factory, publish,
+            batch_size=settings.OUTBOX_BATCH_SIZE,
+            poll_interval=settings.OUTBOX_POLL_INTERVAL,
+            max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+        )
+        _outbox_relay.start()
+    return _outbox_relay
+
+
+def notify_outbox_relay() -> None:
+    """业务事务提交后唤醒中继（未启动时由下次轮询或重启后发布）"""
+    if _outbox_relay is not None:
+        _outbox_relay.notify()
+
+
+def stop_outbox_relay() -> None:
+    """停止并丢弃全局实例（应用关闭、测试）"""
+    global _outbox_relay
+    if _outbox_relay is not None:
+        _outbox_relay.stop()
+    _outbox_relay = None
+
+
+__all__ = [
+    "OutboxRelay",
+    "TransactionalEventPublisher",
+    "claim_event",
+    "get_outbox_relay",
+    "notify_outbox_relay",
+    "outbox_enabled",
+    "stage_event",
+    "start_outbox_relay",
+    "stop_outbox_relay",
+]
@@ -1,13 +1,15 @@
 """
 价格服务 - 本体操作层
 管理 RatePlan 对象和动态定价逻辑
+逐晚价格由 RateEngine 一次加载房型与价格策略后按数组计算
 """
-from typing import List, Optional
-from datetime import date
+from typing import List, Optional, Sequence
+from datetime import date, timedelta
 from decimal import Decimal
 from sqlalchemy.orm import Session
 from app.models.ontology import RatePlan, RoomType
 from app.models.schemas import RatePlanCreate, RatePlanUpdate
+from app.services.rate_engine import QuoteRequest, RateEngine
 
 
 class PriceService:
@@ -78,74 +80,21 @@ class PriceService:
 
     def get_price_for_date(self, room_type_id: int, target_date: date) -> Decimal:
         """获取指定日期的房型价格"""
-        room_type = self.db.query(RoomType).filter(RoomType.id == room_type_id).first()
-        if not room_type:
-            raise ValueError("房型不存在")
-
-        # 检查是否是周末
-        is_weekend = target_date.weekday() >= 4  # 周五(4)、周六(5)
-
-        # 查找适用的价格策略（按优先级排序）
-        query = self.db.query(RatePlan).filter(
-            RatePlan.room_type_id == room_type_id,
-            RatePlan.is_active == True,
-            RatePlan.start_date <= target_date,
-            RatePlan.end_date >= target_date
-        )
-
-        # 优先使用周末策略
-        if is_weekend:
-            weekend_plan = query.filter(RatePlan.is_weekend == True).order_by(
-                RatePlan.priority.desc()
-            ).first()
-            if weekend_plan:
-                return weekend_plan.price
-
-        # 使用非周末策略或通用策略
-        plan = query.filter(RatePlan.is_weekend == False).order_by(
-            RatePlan.priority.desc()
-        ).first()
-
-        if plan:
-            return plan.price
-
-        # 无匹配策略，使用基础价格
-        return room_type.base_price
+        calendar = RateEngine(self.db).load([room_type_id], target_date, target_date + timedelta(days=1))
+        return calendar[room_type_id].price_for_date(target_date)
 
     def calculate_total_price(self, room_type_id: int, check_in_date: date,
                               check_out_date: date, room_count: int = 1) -> Decimal:
         """计算总房费"""
-        total = Decimal('0')
-        current_date = check_in_date
-
-        while current_date < check_out_date:
-            daily_price = self.get_price_for_date(room_type_id, current_date)
-            total += daily_price * room_count
-            current_date = date(
-                current_date.year,
-                current_date.month,
-                current_date.day + 1
-            ) if current_date.day < 28 else self._next_day(current_date)
-
-        return total
+        return self.calculate_total_prices([(room_type_id, check_in_date, check_out_date, room_count)])[0]
 
-    def _next_day(self, d: date) -> date:
-        """获取下一天"""
-        from datetime import timedelta
-        return d + timedelta(days=1)
+    def calculate_total_prices(self, requests: Sequence[QuoteRequest]) -> List[Decimal]:
+        """批量计算总房费：[(room_type_id, check_in_date, check_out_date, room_count), ...]"""
+        return RateEngine(self.db).quote(requests)
 
     def get_price_calendar(self, room_type_id: int, start_date: date, end_date: date) -> List[dict]:
         """获取价格日历"""
-        result = []
-        current_date = start_date
-
-        while current_date <= end_date:
-            price = self.get_price_for_date(room_type_id, current_date)
-            result.append({
-                'date': current_date,
-                'price': price,
-                'is_weekend': current_date.weekday() >= 4
-            })
-            current_date = self._next_day(current_date)
-
-        return result
+        if start_date > end_date:
+            return []
+        calendar = RateEngine(self.db).load([room_type_id], start_date, end_date + timedelta(days=1))
+        return calendar[room_type_id].entries(start_date, end_date)
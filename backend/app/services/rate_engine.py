@@ -0,0 +1,165 @@
+"""
+房价日历引擎 - 按房型×日期窗口一次性解析价格策略
+一次查询加载窗口内所有房型及其启用的价格策略，按优先级绘制成逐晚价格数组，
+单晚价格、区间总价、价格日历都只是数组切片
+
+解析规则与 PriceService.get_price_for_date 一致：
+- 周末晚（周五、周六、周日，weekday >= 4）优先使用周末策略
+- 否则使用非周末策略；同一晚多条策略取优先级最高者，同优先级取 id 最小者
+- 无策略覆盖的晚上使用房型基础价格
+
+金额以分（int64）存储，求和后转回 Decimal，结果与逐日累加相同
+"""
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models.ontology import RatePlan, RoomType
+
+# (room_type_id, check_in_date, check_out_date, room_count)
+QuoteRequest = Tuple[int, date, date, int]
+
+
+def _to_cents(amount) -> int:
+    return int((Decimal(amount) * 100).to_integral_value())
+
+
+def _from_cents(cents) -> Decimal:
+    return Decimal(int(cents)).scaleb(-2)
+
+
+def weekday_array(start_date: date, nights: int) -> np.ndarray:
+    """从 start_date 起 nights 天的星期（周一为 0）"""
+    days = np.arange(nights, dtype=np.int64) + start_date.toordinal()
+    # date.toordinal() 的第 1 天（0001-01-01）是周一
+    return (days - 1) % 7
+
+
+@dataclass
+class RateCalendar:
+    """单个房型在 [start_date, start_date + len(prices)) 的逐晚价格"""
+    room_type_id: int
+    start_date: date
+    prices: np.ndarray        # int64，分
+    weekend: np.ndarray       # bool
+
+    def _slice(self, start_date: date, end_date: date) -> slice:
+        lo = (start_date - self.start_date).days
+        hi = (end_date - self.start_date).days
+        if lo < 0 or hi > len(self.prices):
+            raise ValueError("日期超出已加载的价格窗口")
+        return slice(lo, hi)
+
+    def price_for_date(self, target_date: date) -> Decimal:
+        """单晚价格"""
+        return _from_cents(self.prices[self._slice(target_date, target_date + timedelta(days=1))][0])
+
+    def total(self, check_in_date: date, check_out_date: date, room_count: int = 1) -> Decimal:
+        """[check_in_date, check_out_date) 的总房费"""
+        if check_out_date <= check_in_date:
+            return Decimal('0')
+        return _from_cents(int(self.prices[self._slice(check_in_date, check_out_date)].sum()) * room_count)
+
+    def entries(self, start_date: date, end_date: date) -> List[dict]:
+        """[start_date, end_date] 的价格日历（含 end_date 当晚）"""
+        window = self._slice(start_date, end_date + timedelta(days=1))
+        return [
+            {'date': start_date + timedelta(days=i), 'price': _from_cents(cents), 'is_weekend': bool(weekend)}
+            for i, (cents, weekend) in enumerate(zip(self.prices[window], self.weekend[window]))
+        ]
+
+
+class RateEngine:
+    """
+    房价日历引擎
+
+    Example:
+        >>> engine = RateEngine(db)
+        >>> calendars = engine.load([1, 2], date(2026, 10, 1), date(2026, 12, 1))
+        >>> calendars[1].total(date(2026, 10, 1), date(2026, 10, 8), room_count=2)
+        Decimal('4352.00')
+        >>> engine.quote([(1, date(2026, 10, 1), date(2026, 10, 3), 2),
+        ...               (2, date(2026, 11, 20), date(2026, 12, 1), 1)])
+        [Decimal('1152.00'), Decimal('6468.00')]
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def load(self, room_type_ids: Iterable[int], start_date: date, end_date: date) -> Dict[int, RateCalendar]:
+        """
+        加载房型在 [start_date, end_date) 各晚的价格
+
+        Raises:
+            ValueError: 房型不存在
+        """
+        ids = sorted(set(room_type_ids))
+        nights = max((end_date - start_date).days, 0)
+
+        base_prices = dict(
+            self.db.query(RoomType.id, RoomType.base_price).filter(RoomType.id.in_(ids)).all()
+        )
+        if len(base_prices) != len(ids):
+            raise ValueError("房型不存在")
+
+        weekend = weekday_array(start_date, nights) >= 4
+        regular = {rt_id: np.full(nights, -1, dtype=np.int64) for rt_id in ids}
+        weekend_only = {rt_id: np.full(nights, -1, dtype=np.int64) for rt_id in ids}
+
+        if nights:
+            # 按优先级升序绘制，后绘制的覆盖先绘制的；同优先级 id 小的最后绘制
+            plans = self.db.query(
+                RatePlan.room_type_id, RatePlan.start_date, RatePlan.end_date,
+                RatePlan.price, RatePlan.is_weekend
+            ).filter(
+                RatePlan.room_type_id.in_(ids),
+                RatePlan.is_active == True,
+                RatePlan.start_date < end_date,
+                RatePlan.end_date >= start_date
+            ).order_by(RatePlan.priority.asc(), RatePlan.id.desc()).all()
+            for rt_id, plan_start, plan_end, price, is_weekend in plans:
+                lo = max((plan_start - start_date).days, 0)
+                hi = min((plan_end - start_date).days + 1, nights)
+                target = weekend_only[rt_id] if is_weekend else regular[rt_id]
+                target[lo:hi] = _to_cents(price)
+
+        calendars = {}
+        for rt_id in ids:
+            prices = np.where(regular[rt_id] >= 0, regular[rt_id], _to_cents(base_prices[rt_id]))
+            prices = np.where(weekend & (weekend_only[rt_id] >= 0), weekend_only[rt_id], prices)
+            calendars[rt_id] = RateCalendar(rt_id, start_date, prices, weekend)
+        return calendars
+
+    def quote(self, requests: Sequence[QuoteRequest]) -> List[Decimal]:
+        """
+        批量计算多房型、多区间的总房费（一次加载覆盖全部请求的窗口）
+
+        Args:
+            requests: [(room_type_id, check_in_date, check_out_date, room_count), ...]
+
+        Returns:
+            与 requests 顺序对应的总房费
+        """
+        priced = [r for r in requests if r[2] > r[1]]
+        if not priced:
+            return [Decimal('0') for _ in requests]
+
+        start_date = min(r[1] for r in priced)
+        end_date = max(r[2] for r in priced)
+        calendars = self.load({r[0] for r in priced}, start_date, end_date)
+        return [
+            calendars[rt_id].total(check_in, check_out, room_count) if check_out > check_in else Decimal('0')
+            for rt_id, check_in, check_out, room_count in requests
+        ]
+
+
+__all__ = [
+    "QuoteRequest",
+    "RateCalendar",
+    "RateEngine",
+    "weekday_array",
+]
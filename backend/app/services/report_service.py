@@ -1,18 +1,42 @@
 """
 报表服务 - 本体操作层
 提供经营数据统计
+
+区间报表按日期序列（递归 CTE）与住宿/支付记录做分组聚合，一次查询得到
+整个区间的结果，而不是逐日、逐房型查询。
 """
 from typing import List
 from datetime import date, datetime, timedelta
 from decimal import Decimal
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import and_, func, literal, or_, select
 from app.models.ontology import (
     Room, RoomStatus, StayRecord, StayRecordStatus,
-    Payment, RoomType, Reservation, ReservationStatus
+    Payment, RoomType, Reservation, ReservationStatus, Bill
 )
 
 
+def date_series(start_date: date, end_date: date):
+    """[start_date, end_date] 逐日序列（递归 CTE，列 day 为 'YYYY-MM-DD'）"""
+    series = select(literal(start_date.isoformat()).label('day')).cte('date_series', recursive=True)
+    return series.union_all(
+        select(func.date(series.c.day, '+1 day')).where(series.c.day < end_date.isoformat())
+    )
+
+
+def stay_occupies(day):
+    """当天在住：在住记录预计离店晚于当天，或已退房记录当天退房"""
+    return and_(
+        func.date(StayRecord.check_in_time) <= day,
+        or_(
+            and_(StayRecord.status == StayRecordStatus.ACTIVE,
+                 StayRecord.expected_check_out > day),
+            and_(StayRecord.status == StayRecordStatus.CHECKED_OUT,
+                 func.date(StayRecord.check_out_time) == day)
+        )
+    )
+
+
 class ReportService:
     """报表服务"""
 
@@ -66,98 +90,89 @@ class ReportService:
 
     def get_occupancy_report(self, start_date: date, end_date: date) -> List[dict]:
         """获取入住率报表"""
-        result = []
-        current = start_date
+        if start_date > end_date:
+            return []
+
         total_rooms = self.db.query(Room).filter(
             Room.is_active == True,
             Room.status != RoomStatus.OUT_OF_ORDER
         ).count()
 
-        while current <= end_date:
-            # 统计当天入住的房间数
-            occupied = self.db.query(StayRecord).filter(
-                StayRecord.status == StayRecordStatus.ACTIVE,
-                func.date(StayRecord.check_in_time) <= current,
-                StayRecord.expected_check_out > current
-            ).count()
-
-            # 加上当天已退房但之前在住的
-            checked_out = self.db.query(StayRecord).filter(
-                StayRecord.status == StayRecordStatus.CHECKED_OUT,
-                func.date(StayRecord.check_in_time) <= current,
-                func.date(StayRecord.check_out_time) == current
-            ).count()
-
-            total_occupied = occupied + checked_out
-            rate = (total_occupied / total_rooms * 100) if total_rooms > 0 else 0
+        days = date_series(start_date, end_date)
+        day = days.c.day
+        rows = self.db.query(day, func.count(StayRecord.id)).select_from(days).outerjoin(
+            StayRecord, stay_occupies(day)
+        ).group_by(day).order_by(day).all()
 
+        result = []
+        for day_value, total_occupied in rows:
+            rate = (total_occupied / total_rooms * 100) if total_rooms > 0 else 0
             result.append({
-                'date': current,
+                'date': date.fromisoformat(day_value),
                 'total_rooms': total_rooms,
                 'occupied_rooms': total_occupied,
                 'occupancy_rate': round(rate, 1)
             })
 
-            current += timedelta(days=1)
-
         return result
 
     def get_revenue_report(self, start_date: date, end_date: date) -> List[dict]:
         """获取营收报表"""
-        result = []
-        current = start_date
-
-        while current <= end_date:
-            day_start = datetime.combine(current, datetime.min.time())
-            day_end = day_start + timedelta(days=1)
-
-            payments = self.db.query(Payment).filter(
-                Payment.payment_time >= day_start,
-                Payment.payment_time < day_end
-            ).all()
-
-            total = sum(p.amount for p in payments)
-
-            result.append({
-                'date': current,
-                'revenue': total,
-                'payment_count': len(payments)
-            })
-
-            current += timedelta(days=1)
-
-        return result
+        if start_date > end_date:
+            return []
+
+        payment_day = func.date(Payment.payment_time)
+        daily = select(
+            payment_day.label('day'),
+            func.sum(Payment.amount).label('revenue'),
+            func.count(Payment.id).label('payment_count')
+        ).where(
+            Payment.payment_time >= datetime.combine(start_date, datetime.min.time()),
+            Payment.payment_time < datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+        ).group_by(payment_day).subquery()
+
+        days = date_series(start_date, end_date)
+        rows = self.db.query(days.c.day, daily.c.revenue, daily.c.payment_count).select_from(days).outerjoin(
+            daily, daily.c.day == days.c.day
+        ).order_by(days.c.day).all()
+
+        return [
+            {
+                'date': date.fromisoformat(day_value),
+                'revenue': revenue if revenue is not None else 0,
+                'payment_count': payment_count or 0
+            }
+            for day_value, revenue, payment_count in rows
+        ]
 
     def get_room_type_report(self, start_date: date, end_date: date) -> List[dict]:
         """获取房型销售统计"""
-        room_types = self.db.query(RoomType).all()
-        result = []
-
-        for rt in room_types:
-            # 统计该房型的间夜数
-            stays = self.db.query(StayRecord).join(Room).filter(
-                Room.room_type_id == rt.id,
+        check_out_day = func.coalesce(func.date(StayRecord.check_out_time), StayRecord.expected_check_out)
+        nights = func.julianday(check_out_day) - func.julianday(func.date(StayRecord.check_in_time))
+
+        # 统计各房型的间夜数与已付金额
+        stats = {
+            room_type_id: (room_nights, revenue)
+            for room_type_id, room_nights, revenue in self.db.query(
+                Room.room_type_id, func.sum(nights), func.sum(Bill.paid_amount)
+            ).select_from(StayRecord).join(
+                Room, StayRecord.room_id == Room.id
+            ).outerjoin(
+                Bill, Bill.stay_record_id == StayRecord.id
+            ).filter(
                 StayRecord.check_in_time >= datetime.combine(start_date, datetime.min.time()),
                 StayRecord.check_in_time < datetime.combine(end_date + timedelta(days=1), datetime.min.time())
-            ).all()
-
-            room_nights = 0
-            revenue = Decimal('0')
-
-            for stay in stays:
-                check_in = stay.check_in_time.date()
-                check_out = stay.check_out_time.date() if stay.check_out_time else stay.expected_check_out
-                nights = (check_out - check_in).days
-                room_nights += nights
-
-                if stay.bill:
-                    revenue += stay.bill.paid_amount
+            ).group_by(Room.room_type_id)
+        }
 
+        result = []
+        for rt in self.db.query(RoomType).all():
+            room_nights, revenue = stats.get(rt.id, (0, None))
             result.append({
                 'room_type_id': rt.id,
                 'room_type_name': rt.name,
-                'room_nights': room_nights,
-                'revenue': revenue
+                'room_nights': int(round(room_nights or 0)),
+                'revenue': revenue if revenue is not None else Decimal('0')
             })
 
         return result
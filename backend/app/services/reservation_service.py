@@ -1,8 +1,9 @@
 """
 预订服务 - 本体操作层
 管理 Reservation 对象（预订阶段的聚合根）
+支持事件发布：预订创建/修改/取消/未到时发布事件（房态可售库存索引据此增量更新）
 """
-from typing import List, Optional
+from typing import Callable, List, Optional
 from datetime import datetime, date
 from decimal import Decimal
 from sqlalchemy.orm import Session
@@ -12,14 +13,58 @@ from app.models.ontology import (
 )
 from app.models.schemas import ReservationCreate, ReservationUpdate, ReservationCancel
 from app.services.price_service import PriceService
+from app.services.event_bus import Event
+from app.services.outbox_service import TransactionalEventPublisher
+from app.models.events import (
+    EventType, ReservationCreatedData, ReservationUpdatedData, ReservationCancelledData
+)
 
 
 class ReservationService:
     """预订服务"""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, event_publisher: Callable[[Event], None] = None):
         self.db = db
         self.price_service = PriceService(db)
+        # 支持依赖注入事件发布器，便于测试；未注入且启用发件箱时，事件随业务事务写入发件箱
+        self._events = TransactionalEventPublisher(db, event_publisher)
+
+    def _stage_reservation_event(self, event_type: EventType, reservation: Reservation,
+                                 operator_id: int = None, cancel_reason: str = "") -> Event:
+        """构建预订事件，并在提交前写入发件箱（需先 flush 取得主键）"""
+        self.db.flush()
+        if event_type in (EventType.RESERVATION_CANCELLED, EventType.RESERVATION_NO_SHOW):
+            data = ReservationCancelledData(
+                reservation_id=reservation.id,
+                reservation_no=reservation.reservation_no,
+                guest_id=reservation.guest_id,
+                guest_name=reservation.guest.name if reservation.guest else "",
+                cancel_reason=cancel_reason or "",
+                operator_id=operator_id or 0
+            )
+        else:
+            data_class = (ReservationCreatedData if event_type == EventType.RESERVATION_CREATED
+                          else ReservationUpdatedData)
+            data = data_class(
+                reservation_id=reservation.id,
+                reservation_no=reservation.reservation_no,
+                guest_id=reservation.guest_id,
+                guest_name=reservation.guest.name if reservation.guest else "",
+                room_type_id=reservation.room_type_id,
+                room_type_name=reservation.room_type.name if reservation.room_type else "",
+                check_in_date=str(reservation.check_in_date),
+                check_out_date=str(reservation.check_out_date),
+                room_count=reservation.room_count or 1,
+                total_amount=float(reservation.total_amount or 0),
+                operator_id=operator_id or 0
+            )
+
+        return self._events.stage(Event(
+            event_type=event_type,
+            timestamp=datetime.now(),
+            data=data.to_dict(),
+            source="reservation_service"
+        ))
 
     def _generate_reservation_no(self) -> str:
         """生成预订号：日期+序号"""
@@ -141,8 +186,12 @@ class ReservationService:
         from app.services.branch_utils import inject_branch_id
         inject_branch_id(reservation)
         self.db.add(reservation)
+        # 预订创建事件
+        event = self._stage_reservation_event(EventType.RESERVATION_CREATED, reservation, created_by)
         self.db.commit()
         self.db.refresh(reservation)
+
+        self._events.publish(event)
         return reservation
 
     def update_reservation(self, reservation_id: int, data: ReservationUpdate) -> Reservation:
@@ -175,8 +224,12 @@ class ReservationService:
             reservation.room_count
         )
 
+        # 预订修改事件
+        event = self._stage_reservation_event(EventType.RESERVATION_UPDATED, reservation)
         self.db.commit()
         self.db.refresh(reservation)
+
+        self._events.publish(event)
         return reservation
 
     def cancel_reservation(self, reservation_id: int, data: ReservationCancel) -> Reservation:
@@ -191,8 +244,14 @@ class ReservationService:
         reservation.status = ReservationStatus.CANCELLED
         reservation.cancel_reason = data.cancel_reason
 
+        # 预订取消事件
+        event = self._stage_reservation_event(
+            EventType.RESERVATION_CANCELLED, reservation, cancel_reason=data.cancel_reason
+        )
         self.db.commit()
         self.db.refresh(reservation)
+
+        self._events.publish(event)
         return reservation
 
     def mark_no_show(self, reservation_id: int) -> Reservation:
@@ -205,8 +264,12 @@ class ReservationService:
             raise ValueError("只有已确认的预订可以标记为未到")
 
         reservation.status = ReservationStatus.NO_SHOW
+        # 未到事件
+        event = self._stage_reservation_event(EventType.RESERVATION_NO_SHOW, reservation)
         self.db.commit()
         self.db.refresh(reservation)
+
+        self._events.publish(event)
         return reservation
 
     def get_reservation_detail(self, reservation_id: int) -> dict:
@@ -1,8 +1,9 @@
 """
 房间服务 - 本体操作层
 管理 Room 和 RoomType 对象
-支持事件发布：房间状态变更时发布事件
+支持事件发布：房间状态变更、房间增删改时发布事件
 SPEC-R13: State machine validation before status changes
+可用性查询基于房态可售库存索引（app/services/availability_index.py），计入已确认预订
 """
 from typing import List, Optional, Callable
 from datetime import date, datetime
@@ -13,8 +14,10 @@ from app.models.ontology import Room, RoomType, RoomStatus, StayRecord, StayReco
 from app.models.schemas import (
     RoomCreate, RoomUpdate, RoomTypeCreate, RoomTypeUpdate, RoomStatusUpdate
 )
-from app.services.event_bus import event_bus, Event
-from app.models.events import EventType, RoomStatusChangedData
+from app.services.event_bus import Event
+from app.services.outbox_service import TransactionalEventPublisher
+from app.models.events import EventType, RoomStatusChangedData, RoomCreatedData, RoomUpdatedData
+from app.services.availability_index import RoomAvailabilityIndex, get_availability_index
 
 logger = logging.getLogger(__name__)
 
@@ -37,10 +40,30 @@ def _validate_state_transition(entity_type: str, current_state: str, target_stat
 class RoomService:
     """房间服务"""
 
-    def __init__(self, db: Session, event_publisher: Callable[[Event], None] = None):
+    def __init__(self, db: Session, event_publisher: Callable[[Event], None] = None,
+                 availability_index: Optional[RoomAvailabilityIndex] = None):
         self.db = db
-        # 支持依赖注入事件发布器，便于测试
-        self._publish_event = event_publisher or event_bus.publish
+        # 支持依赖注入事件发布器，便于测试；未注入且启用发件箱时，事件随业务事务写入发件箱
+        self._events = TransactionalEventPublisher(db, event_publisher)
+        self._availability_index = availability_index
+
+    def _stage_room_event(self, event_type: EventType, room: Room, is_active: bool = None) -> Event:
+        """构建房间创建/更新事件（房态可售库存索引据此重建），提交前写入发件箱"""
+        self.db.flush()
+        data_class = RoomCreatedData if event_type == EventType.ROOM_CREATED else RoomUpdatedData
+        return self._events.stage(Event(
+            event_type=event_type,
+            timestamp=datetime.now(),
+            data=data_class(
+                room_id=room.id,
+                room_number=room.room_number,
+                room_type_id=room.room_type_id,
+                floor=room.floor,
+                status=room.status.value if room.status else "",
+                is_active=room.is_active if is_active is None else is_active
+            ).to_dict(),
+            source="room_service"
+        ))
 
     # ============== 房型操作 ==============
 
@@ -160,8 +183,11 @@ class RoomService:
         from app.services.branch_utils import inject_branch_id
         inject_branch_id(room)
         self.db.add(room)
+        event = self._stage_room_event(EventType.ROOM_CREATED, room)
         self.db.commit()
         self.db.refresh(room)
+
+        self._events.publish(event)
         return room
 
     def update_room(self, room_id: int, data: RoomUpdate) -> Room:
@@ -179,8 +205,11 @@ class RoomService:
         for key, value in update_data.items():
             setattr(room, key, value)
 
+        event = self._stage_room_event(EventType.ROOM_UPDATED, room)
         self.db.commit()
         self.db.refresh(room)
+
+        self._events.publish(event)
         return room
 
     def update_room_status(self, room_id: int, status: RoomStatus,
@@ -199,12 +228,10 @@ class RoomService:
         room.status = status
         room_number = room.room_number
 
-        self.db.commit()
-        self.db.refresh(room)
-
-        # 发布房间状态变更事件
+        # 房间状态变更事件
+        event = None
         if old_status != status:
-            self._publish_event(Event(
+            event = self._events.stage(Event(
                 event_type=EventType.ROOM_STATUS_CHANGED,
                 timestamp=datetime.now(),
                 data=RoomStatusChangedData(
@@ -218,6 +245,12 @@ class RoomService:
                 source="room_service"
             ))
 
+        self.db.commit()
+        self.db.refresh(room)
+
+        if event:
+            self._events.publish(event)
+
         return room
 
     def delete_room(self, room_id: int) -> bool:
@@ -231,51 +264,101 @@ class RoomService:
         if stay_count > 0:
             raise ValueError("该房间有历史入住记录，无法删除，请停用")
 
+        event = self._stage_room_event(EventType.ROOM_UPDATED, room, is_active=False)
         self.db.delete(room)
         self.db.commit()
+
+        self._events.publish(event)
         return True
 
     # ============== 可用性查询 ==============
 
+    def _get_availability_index(self, check_in_date: date, check_out_date: date) -> RoomAvailabilityIndex:
+        """
+        获取可售库存索引
+
+        优先使用注入的或已注册到事件总线的全局索引；否则（如脚本、单元测试）
+        为本次查询从数据库构建只覆盖该日期区间的临时索引。
+        """
+        if self._availability_index is not None:
+            return self._availability_index
+        index = get_availability_index()
+        if index.registered:
+            return index
+        index = RoomAvailabilityIndex(max_age_seconds=0)
+        index.rebuild(self.db, start=check_in_date, end=check_out_date)
+        return index
+
     def get_available_rooms(self, check_in_date: date, check_out_date: date,
-                            room_type_id: Optional[int] = None) -> List[Room]:
-        """获取指定日期范围内的可用房间"""
-        # 获取在该日期范围内已被预订或在住的房间ID
-        occupied_rooms = self.db.query(StayRecord.room_id).filter(
-            StayRecord.status == StayRecordStatus.ACTIVE,
-            StayRecord.expected_check_out > check_in_date
-        ).subquery()
+                            room_type_id: Optional[int] = None,
+                            exclude_reservation_id: Optional[int] = None) -> List[Room]:
+        """
+        获取指定日期范围内的可用房间
+
+        房间在 [check_in_date, check_out_date) 内没有在住记录且未停用；已确认预订
+        按房型占用库存，每个房型最多返回 可售数 - 区间内每晚最大占用 间房。
+        为某个预订办理入住或修改预订时传入 exclude_reservation_id，不计入该预订自身的占用。
+        入住日期为今天及以前时，数据库中 OCCUPIED 的房间不返回（索引只用于缩小候选范围）。
+        """
+        index = self._get_availability_index(check_in_date, check_out_date)
+        availability = index.get_availability(
+            self.db, check_in_date, check_out_date, room_type_id, exclude_reservation_id
+        )
+        free_by_type = index.get_free_room_ids(self.db, check_in_date, check_out_date, room_type_id)
+
+        candidate_ids = [
+            room_id
+            for rt_id, room_ids in free_by_type.items()
+            if availability.get(rt_id, {}).get('available', 0) > 0
+            for room_id in room_ids
+        ]
+        if not candidate_ids:
+            return []
 
         query = self.db.query(Room).filter(
+            Room.id.in_(candidate_ids),
             Room.is_active == True,
-            Room.status.in_([RoomStatus.VACANT_CLEAN, RoomStatus.VACANT_DIRTY]),
-            ~Room.id.in_(occupied_rooms)
+            Room.status != RoomStatus.OUT_OF_ORDER
         )
+        if check_in_date <= date.today():
+            # 索引可能过期或漏掉其他进程的变更，当前房态以数据库为准
+            query = query.filter(Room.status != RoomStatus.OCCUPIED)
+        rooms = query.order_by(Room.floor, Room.room_number).all()
 
-        if room_type_id:
-            query = query.filter(Room.room_type_id == room_type_id)
-
-        return query.order_by(Room.floor, Room.room_number).all()
+        remaining = {rt_id: info['available'] for rt_id, info in availability.items()}
+        result = []
+        for room in rooms:
+            if remaining.get(room.room_type_id, 0) > 0:
+                remaining[room.room_type_id] -= 1
+                result.append(room)
+        return result
 
-    def get_availability_by_room_type(self, check_in_date: date, check_out_date: date) -> dict:
-        """按房型统计可用房间数"""
-        room_types = self.get_room_types()
+    def get_availability_by_room_type(self, check_in_date: date, check_out_date: date,
+                                      exclude_reservation_id: Optional[int] = None) -> dict:
+        """
+        按房型统计可用房间数
+
+        total 为可售房间数（不含维修），booked 为区间内每晚最大占用，
+        nights 为逐晚的占用/可售明细。exclude_reservation_id 同 get_available_rooms。
+        """
+        index = self._get_availability_index(check_in_date, check_out_date)
+        availability = index.get_availability(
+            self.db, check_in_date, check_out_date, exclude_reservation_id=exclude_reservation_id
+        )
         result = {}
 
-        for rt in room_types:
-            total = self.db.query(Room).filter(
-                Room.room_type_id == rt.id,
-                Room.is_active == True,
-                Room.status != RoomStatus.OUT_OF_ORDER
-            ).count()
-
-            available = len(self.get_available_rooms(check_in_date, check_out_date, rt.id))
-
+        for rt in self.get_room_types():
+            info = availability.get(rt.id)
+            if info is None:
+                info = {'total': 0, 'blocked': 0, 'booked': 0, 'available': 0, 'nights': []}
             result[rt.id] = {
                 'room_type_id': rt.id,
                 'room_type_name': rt.name,
-                'total': total,
-                'available': available
+                'total': info['total'],
+                'available': info['available'],
+                'booked': info['booked'],
+                'blocked': info['blocked'],
+                'nights': info['nights']
             }
 
         return result
@@ -14,8 +14,9 @@ from app.models.ontology import Room, RoomType, RoomStatus, StayRecord, StayReco
 from app.models.schemas import (
     RoomCreate, RoomUpdate, RoomTypeCreate, RoomTypeUpdate, RoomStatusUpdate
 )
-from app.services.event_bus import event_bus, Event
-from app.models.events import EventType, RoomStatusChangedData
+from app.services.event_bus import Event
+from app.services.outbox_service import TransactionalEventPublisher
+from app.models.events import EventType, RoomStatusChangedData, RoomCreatedData, RoomUpdatedData
 
 
 class RoomServiceV2:
@@ -32,7 +33,26 @@ class RoomServiceV2:
     def __init__(self, db: Session, event_publisher: Callable[[Event], None] = None):
         self.db = db
         self._room_repo = RoomRepository(db)
-        self._publish_event = event_publisher or event_bus.publish
+        # 支持依赖注入事件发布器，便于测试；未注入且启用发件箱时，事件随业务事务写入发件箱
+        self._events = TransactionalEventPublisher(db, event_publisher)
+
+    def _stage_room_event(self, event_type: EventType, room: Room, is_active: bool = None) -> Event:
+        """构建房间创建/更新事件（房态可售库存索引据此重建），提交前写入发件箱"""
+        self.db.flush()
+        data_class = RoomCreatedData if event_type == EventType.ROOM_CREATED else RoomUpdatedData
+        return self._events.stage(Event(
+            event_type=event_type,
+            timestamp=datetime.now(),
+            data=data_class(
+                room_id=room.id,
+                room_number=room.room_number,
+                room_type_id=room.room_type_id,
+                floor=room.floor,
+                status=room.status.value if room.status else "",
+                is_active=room.is_active if is_active is None else is_active
+            ).to_dict(),
+            source="room_service_v2"
+        ))
 
     # ============== 房型操作 (保持原有实现) ==============
 
@@ -151,8 +171,11 @@ class RoomServiceV2:
 
         room = Room(**data.model_dump())
         self.db.add(room)
+        event = self._stage_room_event(EventType.ROOM_CREATED, room)
         self.db.commit()
         self.db.refresh(room)
+
+        self._events.publish(event)
         return room
 
     def update_room(self, room_id: int, data: RoomUpdate) -> Room:
@@ -170,8 +193,11 @@ class RoomServiceV2:
         for key, value in update_data.items():
             setattr(room, key, value)
 
+        event = self._stage_room_event(EventType.ROOM_UPDATED, room)
         self.db.commit()
         self.db.refresh(room)
+
+        self._events.publish(event)
         return room
 
     def update_room_status(self, room_id: int, status: RoomStatus,
@@ -203,12 +229,10 @@ class RoomServiceV2:
             # 正常入住应该通过 checkin_service，这里允许手动设置用于特殊情况
             old_orm_room.status = RoomStatus.OCCUPIED
 
-        self.db.commit()
-        self.db.refresh(old_orm_room)
-
-        # 发布房间状态变更事件
+        # 房间状态变更事件
+        event = None
         if old_status != status.value:
-            self._publish_event(Event(
+            event = self._events.stage(Event(
                 event_type=EventType.ROOM_STATUS_CHANGED,
                 timestamp=datetime.now(),
                 data=RoomStatusChangedData(
@@ -222,6 +246,12 @@ class RoomServiceV2:
                 source="room_service_v2"
             ))
 
+        self.db.commit()
+        self.db.refresh(old_orm_room)
+
+        if event:
+            self._events.publish(event)
+
         return old_orm_room
 
     def delete_room(self, room_id: int) -> bool:
@@ -234,59 +264,37 @@ class RoomServiceV2:
         if stay_count > 0:
             raise ValueError("该房间有历史入住记录，无法删除，请停用")
 
+        event = self._stage_room_event(EventType.ROOM_UPDATED, room, is_active=False)
         self.db.delete(room)
         self.db.commit()
+
+        self._events.publish(event)
         return True
 
     # ============== 可用性查询 (使用新领域层) ==============
 
     def get_available_rooms(self, check_in_date: date, check_out_date: date,
-                            room_type_id: Optional[int] = None) -> List[Room]:
-        """获取指定日期范围内的可用房间"""
-        occupied_rooms = self.db.query(StayRecord.room_id).filter(
-            StayRecord.status == StayRecordStatus.ACTIVE,
-            StayRecord.expected_check_out > check_in_date
-        ).subquery()
-
-        query = self.db.query(Room).filter(
-            Room.is_active == True,
-            Room.status.in_([RoomStatus.VACANT_CLEAN, RoomStatus.VACANT_DIRTY]),
-            ~Room.id.in_(occupied_rooms)
+                            room_type_id: Optional[int] = None,
+                            exclude_reservation_id: Optional[int] = None) -> List[Room]:
+        """获取指定日期范围内的可用房间（基于房态可售库存索引，计入已确认预订）"""
+        from app.services.room_service import RoomService
+        return RoomService(self.db).get_available_rooms(
+            check_in_date, check_out_date, room_type_id, exclude_reservation_id
         )
 
-        if room_type_id:
-            query = query.filter(Room.room_type_id == room_type_id)
-
-        return query.order_by(Room.floor, Room.room_number).all()
-
     def get_available_entities(self, check_in_date: date, check_out_date: date,
                                room_type_id: Optional[int] = None) -> List[RoomEntity]:
         """获取指定日期范围内的可用房间 (返回领域实体)"""
         rooms = self.get_available_rooms(check_in_date, check_out_date, room_type_id)
         return [RoomEntity(r) for r in rooms]
 
-    def get_availability_by_room_type(self, check_in_date: date, check_out_date: date) -> dict:
-        """按房型统计可用房间数"""
-        room_types = self.get_room_types()
-        result = {}
-
-        for rt in room_types:
-            total = self.db.query(Room).filter(
-                Room.room_type_id == rt.id,
-                Room.is_active == True,
-                Room.status != RoomStatus.OUT_OF_ORDER
-            ).count()
-
-            available = len(self.get_available_rooms(check_in_date, check_out_date, rt.id))
-
-            result[rt.id] = {
-                'room_type_id': rt.id,
-                'room_type_name': rt.name,
-                'total': total,
-                'available': available
-            }
-
-        return result
+    def get_availability_by_room_type(self, check_in_date: date, check_out_date: date,
+                                      exclude_reservation_id: Optional[int] = None) -> dict:
+        """按房型统计可用房间数（基于房态可售库存索引）"""
+        from app.services.room_service import RoomService
+        return RoomService(self.db).get_availability_by_room_type(
+            check_in_date, check_out_date, exclude_reservation_id
+        )
 
     def get_room_with_guest(self, room_id: int) -> dict:
         """获取房间及当前住客信息"""
@@ -10,7 +10,8 @@ import logging
 from sqlalchemy.orm import Session
 from app.models.ontology import Task, TaskType, TaskStatus, Room, RoomStatus, Employee, EmployeeRole
 from app.models.schemas import TaskCreate, TaskAssign, TaskUpdate
-from app.services.event_bus import event_bus, Event
+from app.services.event_bus import Event
+from app.services.outbox_service import TransactionalEventPublisher
 from app.models.events import (
     EventType, TaskCreatedData, TaskAssignedData,
     TaskStartedData, TaskCompletedData
@@ -40,8 +41,8 @@ class TaskService:
 
     def __init__(self, db: Session, event_publisher: Callable[[Event], None] = None):
         self.db = db
-        # 支持依赖注入事件发布器，便于测试
-        self._publish_event = event_publisher or event_bus.publish
+        # 支持依赖注入事件发布器，便于测试；未注入且启用发件箱时，事件随业务事务写入发件箱
+        self._events = TransactionalEventPublisher(db, event_publisher)
 
     def get_tasks(self, task_type: Optional[TaskType] = None,
                   status: Optional[TaskStatus] = None,
@@ -109,11 +110,10 @@ class TaskService:
         from app.services.branch_utils import inject_branch_id
         inject_branch_id(task)
         self.db.add(task)
-        self.db.commit()
-        self.db.refresh(task)
+        self.db.flush()
 
-        # 发布任务创建事件
-        self._publish_event(Event(
+        # 任务创建事件
+        event = self._events.stage(Event(
             event_type=EventType.TASK_CREATED,
             timestamp=datetime.now(),
             data=TaskCreatedData(
@@ -129,6 +129,11 @@ class TaskService:
             source="task_service"
         ))
 
+        self.db.commit()
+        self.db.refresh(task)
+
+        self._events.publish(event)
+
         return task
 
     def assign_task(self, task_id: int, data: TaskAssign, assigned_by: int = None) -> Task:
@@ -153,11 +158,8 @@ class TaskService:
         _validate_state_transition("Task", task.status.value, TaskStatus.ASSIGNED.value)
         task.status = TaskStatus.ASSIGNED
 
-        self.db.commit()
-        self.db.refresh(task)
-
-        # 发布任务分配事件
-        self._publish_event(Event(
+        # 任务分配事件
+        event = self._events.stage(Event(
             event_type=EventType.TASK_ASSIGNED,
             timestamp=datetime.now(),
             data=TaskAssignedData(
@@ -172,6 +174,11 @@ class TaskService:
             source="task_service"
         ))
 
+        self.db.commit()
+        self.db.refresh(task)
+
+        self._events.publish(event)
+
         return task
 
     def start_task(self, task_id: int, employee_id: int) -> Task:
@@ -190,11 +197,8 @@ class TaskService:
         task.status = TaskStatus.IN_PROGRESS
         task.started_at = datetime.now()
 
-        self.db.commit()
-        self.db.refresh(task)
-
-        # 发布任务开始事件
-        self._publish_event(Event(
+        # 任务开始事件
+        event = self._events.stage(Event(
             event_type=EventType.TASK_STARTED,
             timestamp=datetime.now(),
             data=TaskStartedData(
@@ -208,6 +212,11 @@ class TaskService:
             source="task_service"
         ))
 
+        self.db.commit()
+        self.db.refresh(task)
+
+        self._events.publish(event)
+
         return task
 
     def complete_task(self, task_id: int, employee_id: int, notes: Optional[str] = None) -> Task:
@@ -268,11 +277,8 @@ class TaskService:
                 operator_id=employee_id
             )
 
-        self.db.commit()
-        self.db.refresh(task)
-
-        # 发布任务完成事件（事件处理器会更新房间状态）
-        self._publish_event(Event(
+        # 任务完成事件（事件处理器会更新房间状态）
+        event = self._events.stage(Event(
             event_type=EventType.TASK_COMPLETED,
             timestamp=datetime.now(),
             data=TaskCompletedData(
@@ -287,6 +293,11 @@ class TaskService:
             source="task_service"
         ))
 
+        self.db.commit()
+        self.db.refresh(task)
+
+        self._events.publish(event)
+
         return task
 
     def update_task(self, task_id: int, data: TaskUpdate) -> Task:
@@ -14,7 +14,8 @@ from app.models.ontology import (
     StayRecord, StayRecordStatus, Room, RoomStatus,
     Reservation, ReservationStatus, Task, TaskStatus, Bill, Payment
 )
-from app.services.event_bus import event_bus, Event
+from app.services.event_bus import Event
+from app.services.outbox_service import TransactionalEventPublisher
 from app.models.events import EventType, OperationUndoneData
 
 logger = logging.getLogger(__name__)
@@ -32,7 +33,7 @@ class UndoService:
 
     def __init__(self, db: Session, event_publisher: Callable[[Event], None] = None):
         self.db = db
-        self._publish_event = event_publisher or event_bus.publish
+        self._events = TransactionalEventPublisher(db, event_publisher)
 
     def create_snapshot(
         self,
@@ -163,8 +164,8 @@ class UndoService:
         snapshot.undone_time = datetime.now()
         snapshot.undone_by = operator_id
 
-        # 发布撤销事件
-        self._publish_event(Event(
+        # 撤销事件：由调用方提交事务，启用发件箱时随回滚一并提交
+        event = self._events.stage(Event(
             event_type=EventType.OPERATION_UNDONE,
             timestamp=datetime.now(),
             data=OperationUndoneData(
@@ -176,6 +177,7 @@ class UndoService:
             ).to_dict(),
             source="undo_service"
         ))
+        self._events.publish(event)
 
         logger.info(f"Undone operation {snapshot.snapshot_uuid}")
         return result
@@ -1,33 +1,37 @@
 """
 RBACPermissionProvider — IPermissionProvider 的 app 层实现
 
-通过 PermissionService 查询数据库，带内存缓存。
+通过 PermissionService 查询数据库，带有界 LRU + TTL 内存缓存；
+rbac_service 修改角色/权限时按用户或全部失效。
 """
-from typing import Dict, List, Optional, Set
-from sqlalchemy.orm import Session
+from typing import List, Set
 from core.security.permission import IPermissionProvider
+from app.security.principal_cache import BoundedTTLCache
 from app.system.services.rbac_service import PermissionService
 
 
 class RBACPermissionProvider(IPermissionProvider):
     """基于数据库的 RBAC 权限提供者"""
 
-    def __init__(self, db_session_factory):
+    def __init__(self, db_session_factory, max_entries: int = 1024, ttl_seconds: float = 300.0):
         """
         Args:
             db_session_factory: callable that returns a new DB session
+            max_entries: max cached users per cache (LRU eviction)
+            ttl_seconds: lifetime of a cached entry
         """
         self._db_session_factory = db_session_factory
-        self._permission_cache: Dict[int, Set[str]] = {}
-        self._role_cache: Dict[int, List[str]] = {}
+        self._permission_cache = BoundedTTLCache(max_entries, ttl_seconds)  # user_id -> Set[str]
+        self._role_cache = BoundedTTLCache(max_entries, ttl_seconds)        # user_id -> List[str]
 
     def has_permission(self, user_id: int, permission_code: str) -> bool:
         permissions = self.get_user_permissions(user_id)
         return permission_code in permissions
 
     def get_user_permissions(self, user_id: int) -> Set[str]:
-        if user_id in self._permission_cache:
-            return self._permission_cache[user_id]
+        cached = self._permission_cache.get(user_id)
+        if cached is not None:
+            return cached
 
         db = self._db_session_factory()
         try:
@@ -39,8 +43,9 @@ class RBACPermissionProvider(IPermissionProvider):
             db.close()
 
     def get_user_roles(self, user_id: int) -> List[str]:
-        if user_id in self._role_cache:
-            return self._role_cache[user_id]
+        cached = self._role_cache.get(user_id)
+        if cached is not None:
+            return cached
 
         db = self._db_session_factory()
         try:
@@ -1,8 +1,11 @@
 """
 RBAC Service — 角色管理 + 权限管理
+
+修改角色、权限或用户角色后失效认证主体缓存与 PermissionProvider 缓存。
 """
 from typing import Dict, List, Optional, Set
 from sqlalchemy.orm import Session
+from app.security.principal_cache import invalidate_principals_on_commit
 from app.system.models.rbac import SysRole, SysPermission, SysRolePermission, SysUserRole
 
 
@@ -52,6 +55,7 @@ class RoleService:
                 setattr(role, key, value)
 
         self.db.flush()
+        invalidate_principals_on_commit(self.db)
         return role
 
     def delete_role(self, role_id: int) -> None:
@@ -66,6 +70,7 @@ class RoleService:
         self.db.query(SysUserRole).filter(SysUserRole.role_id == role_id).delete()
         self.db.delete(role)
         self.db.flush()
+        invalidate_principals_on_commit(self.db)
 
     def get_role_permissions(self, role_id: int) -> List[SysPermission]:
         role = self.get_role_by_id(role_id)
@@ -87,6 +92,7 @@ class RoleService:
             self.db.add(SysRolePermission(role_id=role_id, permission_id=pid))
 
         self.db.flush()
+        invalidate_principals_on_commit(self.db)
 
     def add_permission(self, role_id: int, permission_id: int) -> None:
         existing = self.db.query(SysRolePermission).filter(
@@ -96,6 +102,7 @@ class RoleService:
         if not existing:
             self.db.add(SysRolePermission(role_id=role_id, permission_id=permission_id))
             self.db.flush()
+            invalidate_principals_on_commit(self.db)
 
     def remove_permission(self, role_id: int, permission_id: int) -> None:
         self.db.query(SysRolePermission).filter(
@@ -103,6 +110,7 @@ class RoleService:
             SysRolePermission.permission_id == permission_id
         ).delete()
         self.db.flush()
+        invalidate_principals_on_commit(self.db)
 
 
 class PermissionService:
@@ -156,6 +164,7 @@ class PermissionService:
                 setattr(perm, key, value)
 
         self.db.flush()
+        invalidate_principals_on_commit(self.db)
         return perm
 
     def delete_permission(self, perm_id: int) -> None:
@@ -172,6 +181,7 @@ class PermissionService:
 
         self.db.delete(perm)
         self.db.flush()
+        invalidate_principals_on_commit(self.db)
 
     def get_permission_tree(self) -> List[Dict]:
         """Build hierarchical permission tree"""
@@ -219,6 +229,7 @@ class PermissionService:
         for rid in role_ids:
             self.db.add(SysUserRole(user_id=user_id, role_id=rid))
         self.db.flush()
+        invalidate_principals_on_commit(self.db, user_id)
 
     def add_user_role(self, user_id: int, role_id: int) -> None:
         existing = self.db.query(SysUserRole).filter(
@@ -228,6 +239,7 @@ class PermissionService:
         if not existing:
             self.db.add(SysUserRole(user_id=user_id, role_id=role_id))
             self.db.flush()
+            invalidate_principals_on_commit(self.db, user_id)
 
     def remove_user_role(self, user_id: int, role_id: int) -> None:
         self.db.query(SysUserRole).filter(
@@ -235,3 +247,4 @@ class PermissionService:
             SysUserRole.role_id == role_id
         ).delete()
         self.db.flush()
+        invalidate_principals_on_commit(self.db, user_id)
@@ -2,16 +2,44 @@
 APScheduler 调度后端 — 实现 core 层 ISchedulerBackend 接口
 """
 import logging
-from typing import Callable, Dict, List, Optional
+import os
+from typing import IO, Callable, Dict, List, Optional
 
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 
 from core.scheduler import ISchedulerBackend
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
 logger = logging.getLogger(__name__)
 
 
+def acquire_scheduler_lock(path: str) -> Optional[IO]:
+    """
+    获取调度器进程锁（非阻塞），保证多 worker 部署时只有一个进程运行调度器
+
+    Returns:
+        持有锁的文件对象（进程存活期间保持打开，关闭即释放）；
+        已被其他进程持有时返回 None。不支持 fcntl 的平台直接返回文件对象。
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    handle = open(path, "a")
+    if fcntl is None:
+        return handle
+    try:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return None
+    return handle
+
+
 class APSchedulerBackend(ISchedulerBackend):
     """基于 APScheduler 的调度后端"""
 
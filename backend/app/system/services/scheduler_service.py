@@ -14,6 +14,18 @@ from core.scheduler import SchedulerRegistry
 
 logger = logging.getLogger(__name__)
 
+# 系统内置任务：启动时补齐（已存在的任务保留用户修改的 cron 和启停状态）
+BUILTIN_JOBS = [
+    {
+        "name": "经营指标日汇总对账",
+        "code": "daily_kpi_reconcile",
+        "group": "system",
+        "invoke_target": "app.services.kpi_rollup_service:reconcile_daily_kpi",
+        "cron_expression": "5 0 * * *",
+        "description": "每晚按入住、退房、收款明细重算昨天和今天的 daily_kpi 汇总行",
+    },
+]
+
 
 class SchedulerService:
     """定时任务管理服务"""
@@ -192,6 +204,31 @@ class SchedulerService:
 
     # ── 启动时加载 ────────────────────────────────────
 
+    def seed_builtin_jobs(self) -> int:
+        """补齐系统内置任务（幂等），返回新建数量"""
+        created = 0
+        for spec in BUILTIN_JOBS:
+            if self.get_job_by_code(spec["code"]) is None:
+                self.db.add(SysJob(**spec))
+                created += 1
+        if created:
+            self.db.commit()
+        return created
+
+    def load_builtin_jobs(self) -> int:
+        """启动时只加载活跃的系统内置任务；其余任务在管理界面启动后才注册"""
+        codes = [spec["code"] for spec in BUILTIN_JOBS]
+        jobs = self.db.query(SysJob).filter(SysJob.code.in_(codes), SysJob.is_active == True).all()
+        count = 0
+        for job in jobs:
+            try:
+                self._register_job(job)
+                count += 1
+            except Exception as e:
+                logger.error(f"Failed to load builtin job {job.code}: {e}")
+        logger.info(f"Loaded {count}/{len(jobs)} builtin jobs")
+        return count
+
     def load_active_jobs(self) -> int:
         """启动时加载所有活跃任务到调度器"""
         active_jobs = self.list_jobs(is_active=True)
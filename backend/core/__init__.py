@@ -70,6 +70,7 @@ from core.ooda.intent import (
 from core.ai.llm_client import (
     LLMClient,
     OpenAICompatibleClient,
+    AsyncOpenAICompatibleClient,
     LLMResponse,
     extract_json_from_text,
     create_llm_client,
@@ -150,6 +151,7 @@ __all__ = [
     # AI 抽象层
     "LLMClient",
     "OpenAICompatibleClient",
+    "AsyncOpenAICompatibleClient",
     "LLMResponse",
     "extract_json_from_text",
     "create_llm_client",
@@ -6,11 +6,16 @@ core/ai/ - AI 抽象层
 import threading
 from typing import Optional
 
-from core.ai.llm_client import LLMClient, OpenAICompatibleClient
+from core.ai.llm_client import LLMClient, OpenAICompatibleClient, AsyncOpenAICompatibleClient
 from core.ai.prompt_builder import PromptBuilder
 from core.ai.hitl import HITLStrategy, ConfirmAlwaysStrategy, ConfirmByRiskStrategy, ConfirmByPolicyStrategy
-from core.ai.query_keywords import QUERY_KEYWORDS, ACTION_KEYWORDS, HELP_KEYWORDS
+from core.ai.query_keywords import (
+    QUERY_KEYWORDS, ACTION_KEYWORDS, HELP_KEYWORDS,
+    QUERY_MATCHER, ACTION_MATCHER, HELP_MATCHER, get_action_matcher,
+)
 from core.ai.embedding import EmbeddingService, create_embedding_service
+from core.ai.embedding_cache import EmbeddingCache
+from core.ai.response_cache import LLMResponseCache, CachedResponse
 from core.ai.vector_store import VectorStore, SchemaItem
 from core.ai.schema_retriever import SchemaRetriever
 from core.ai.actions import ActionDefinition, ActionRegistry, ActionCategory
@@ -65,6 +70,10 @@ def configure_embedding_service(
     model: str = None,
     cache_size: int = 1000,
     enabled: bool = True,
+    cache_path: Optional[str] = None,
+    cache_max_bytes: int = 256 * 1024 * 1024,
+    batch_size: int = 64,
+    max_concurrency: int = 4,
 ) -> None:
     """
     Configure the embedding service. Called by app layer at startup.
@@ -75,6 +84,10 @@ def configure_embedding_service(
         model: Model name for embeddings
         cache_size: Cache size for embedding results
         enabled: Whether embedding is enabled
+        cache_path: SQLite path of the persistent embedding cache (None disables it)
+        cache_max_bytes: Size bound of the persistent embedding cache
+        batch_size: Maximum texts per embedding API request
+        max_concurrency: Maximum concurrent embedding API requests
     """
     global _embedding_config, _embedding_service
     with _embedding_lock:
@@ -84,6 +97,10 @@ def configure_embedding_service(
             "model": model,
             "cache_size": cache_size,
             "enabled": enabled,
+            "cache_path": cache_path,
+            "cache_max_bytes": cache_max_bytes,
+            "batch_size": batch_size,
+            "max_concurrency": max_concurrency,
         }
         _embedding_service = None  # Reset singleton so next call uses new config
 
@@ -105,7 +122,12 @@ def get_embedding_service() -> EmbeddingService:
         if _embedding_service is not None:  # double-check after acquiring lock
             return _embedding_service
         if _embedding_config is not None:
-            _embedding_service = EmbeddingService(**_embedding_config)
+            config = dict(_embedding_config)
+            cache_path = config.pop("cache_path", None)
+            cache_max_bytes = config.pop("cache_max_bytes", 256 * 1024 * 1024)
+            if cache_path and config.get("enabled"):
+                config["persistent_cache"] = EmbeddingCache(cache_path, max_bytes=cache_max_bytes)
+            _embedding_service = EmbeddingService(**config)
         else:
             # Not configured - create disabled service
             import logging
@@ -154,6 +176,9 @@ def reset_embedding_service() -> None:
 __all__ = [
     "LLMClient",
     "OpenAICompatibleClient",
+    "AsyncOpenAICompatibleClient",
+    "LLMResponseCache",
+    "CachedResponse",
     "PromptBuilder",
     "HITLStrategy",
     "ConfirmAlwaysStrategy",
@@ -162,8 +187,13 @@ __all__ = [
     "QUERY_KEYWORDS",
     "ACTION_KEYWORDS",
     "HELP_KEYWORDS",
+    "QUERY_MATCHER",
+    "ACTION_MATCHER",
+    "HELP_MATCHER",
+    "get_action_matcher",
     "EmbeddingService",
     "create_embedding_service",
+    "EmbeddingCache",
     "configure_embedding_service",
     "get_embedding_service",
     "create_embedding_service_for_test",
@@ -197,6 +197,7 @@ class ActionRegistry:
         self._constraint_engine = constraint_engine
         self._guard_executor = guard_executor
         self._search_engine = None  # SPEC-P05: ActionSearchEngine for keyword search
+        self._version = 0  # bumped on every register(); lets prompt caches detect changes
 
         # SPEC-09: Auto-create VectorStore if not provided
         if vector_store is None:
@@ -242,6 +243,11 @@ class ActionRegistry:
 
         return None
 
+    @property
+    def version(self) -> int:
+        """Monotonic counter, incremented whenever an action is registered."""
+        return self._version
+
     def set_search_engine(self, engine) -> None:
         """Attach an ActionSearchEngine for keyword-based action discovery (SPEC-P05)."""
         self._search_engine = engine
@@ -341,6 +347,7 @@ class ActionRegistry:
 
             # Register
             self._actions[name] = definition
+            self._version += 1
             logger.info(f"Registered action: {name} (entity={entity}, category={category})")
 
             # Sync to OntologyRegistry if available
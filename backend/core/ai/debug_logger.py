@@ -12,15 +12,21 @@ This module provides comprehensive logging of AI interactions:
 
 Supports session replay for debugging and analysis.
 """
+import atexit
 import json
 import logging
+import queue
 import sqlite3
+import threading
 import uuid
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
 from dataclasses import dataclass, field, asdict
 from datetime import date, datetime, timedelta
 from decimal import Decimal
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
 
 logger = logging.getLogger(__name__)
 
@@ -232,6 +238,8 @@ class LLMInteraction:
     response_parsed: Optional[str] = None
     success: bool = True
     error: Optional[str] = None
+    cache_status: Optional[str] = None      # 'exact' | 'semantic' (served from cache) | 'miss' | None
+    saved_latency_ms: Optional[int] = None  # Latency of the original call when served from cache
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
@@ -254,6 +262,8 @@ class LLMInteraction:
             "response_parsed": self.response_parsed,
             "success": self.success,
             "error": self.error,
+            "cache_status": self.cache_status,
+            "saved_latency_ms": self.saved_latency_ms,
         }
 
     @classmethod
@@ -278,9 +288,45 @@ class LLMInteraction:
             response_parsed=row["response_parsed"],
             success=bool(row["success"]),
             error=row["error"],
+            cache_status=row["cache_status"] if "cache_status" in row.keys() else None,
+            saved_latency_ms=row["saved_latency_ms"] if "saved_latency_ms" in row.keys() else None,
         )
 
 
+# ==================== Write Path ====================
+
+# Sessions remembered per logger so updates skip the existence query
+_SESSION_CACHE_SIZE = 4096
+
+# Loggers with a write queue; flushed on application shutdown and at exit
+_live_loggers: "weakref.WeakSet[DebugLogger]" = weakref.WeakSet()
+
+
+def flush_debug_loggers(timeout: Optional[float] = 5.0) -> None:
+    """
+    Commit every live DebugLogger's buffered writes.
+
+    Args:
+        timeout: Seconds to wait per logger (None waits indefinitely)
+    """
+    for debug_logger in list(_live_loggers):
+        try:
+            debug_logger.flush(timeout)
+        except Exception as e:
+            logger.warning(f"DebugLogger: flush failed for {debug_logger.db_path}: {e}")
+
+
+def _close_debug_loggers() -> None:
+    for debug_logger in list(_live_loggers):
+        try:
+            debug_logger.close(timeout=5.0)
+        except Exception:
+            pass
+
+
+atexit.register(_close_debug_loggers)
+
+
 # ==================== Debug Logger ====================
 
 class DebugLogger:
@@ -295,6 +341,16 @@ class DebugLogger:
 
     Database stored at db_path (default: data/debug_logs.db)
 
+    Writes are buffered: create/update/log calls serialize their data,
+    enqueue the statement on a bounded queue and return. A background writer
+    drains the queue and commits each batch in one transaction on a
+    persistent WAL connection. Read methods (and ``_get_conn``) first wait
+    for the writes already queued, so callers always read their own writes.
+    When the queue is full, new writes are dropped. With
+    ``overflow_policy="sample"``, once the queue passes ``high_watermark``
+    only every ``sample_every``-th new session is recorded, so the sessions
+    that are kept stay complete.
+
     Example:
         ```python
         logger = DebugLogger()
@@ -342,6 +398,8 @@ class DebugLogger:
     # Default database path
     DEFAULT_DB_PATH = "data/debug_logs.db"
 
+    OVERFLOW_POLICIES = ("drop", "sample")
+
     @staticmethod
     def _safe_json(obj) -> Optional[str]:
         """JSON-serialize with SafeJSONEncoder; returns None for None input."""
@@ -352,25 +410,82 @@ class DebugLogger:
     # Session cleanup days
     DEFAULT_RETENTION_DAYS = 30
 
-    def __init__(self, db_path: Optional[str] = None):
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        async_writes: bool = True,
+        queue_size: int = 10000,
+        batch_size: int = 256,
+        overflow_policy: str = "drop",
+        high_watermark: float = 0.8,
+        sample_every: int = 10,
+        pool_size: int = 4,
+        idle_timeout: float = 5.0,
+    ):
         """
         Initialize DebugLogger.
 
         Args:
             db_path: Path to SQLite database. Defaults to DEFAULT_DB_PATH.
-                    Use ":memory:" for in-memory database (testing).
+                    Use ":memory:" for in-memory database (testing); it keeps
+                    one connection and always writes synchronously.
+            async_writes: Buffer writes for the background writer (False
+                    commits each write on the calling thread)
+            queue_size: Maximum number of buffered writes
+            batch_size: Maximum writes committed per transaction
+            overflow_policy: "drop" or "sample" (see class docstring)
+            high_watermark: Queue fill ratio at which sessions are sampled
+            sample_every: Record one of every N new sessions while sampling
+            pool_size: Idle read connections kept open
+            idle_timeout: Seconds the writer thread waits for work before exiting
         """
+        if overflow_policy not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"overflow_policy must be one of {self.OVERFLOW_POLICIES}")
+
         self.db_path = db_path or self.DEFAULT_DB_PATH
-        self._init_db()
+        self._memory = self.db_path == ":memory:"
+        self.async_writes = async_writes and not self._memory
+        self.batch_size = batch_size
+        self.overflow_policy = overflow_policy
+        self.high_watermark = high_watermark
+        self.sample_every = max(sample_every, 1)
+        self.idle_timeout = idle_timeout
+
+        # _cond guards the queue sequence numbers, the writer thread handle,
+        # session bookkeeping and counters; _lock serializes synchronous use
+        # of the write connection
+        self._cond = threading.Condition()
+        self._lock = threading.RLock()
+        self._queue: "queue.Queue[tuple]" = queue.Queue(maxsize=queue_size)
+        self._enqueued_seq = 0
+        self._committed_seq = 0
+        self._writer: Optional[threading.Thread] = None
+        self._pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=pool_size)
+
+        self._sessions: "OrderedDict[str, int]" = OrderedDict()      # session_id -> next attempt number
+        self._unrecorded: "OrderedDict[str, None]" = OrderedDict()   # sampled out or dropped
+        self._new_sessions = 0
+        self._stats = {
+            "queued": 0, "written": 0, "batches": 0, "dropped": 0,
+            "sampled_out": 0, "skipped": 0, "errors": 0,
+        }
 
-    def _init_db(self) -> None:
-        """Initialize database schema."""
         # Ensure directory exists
-        if self.db_path != ":memory:":
+        if not self._memory:
             Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
 
-        conn = self._get_conn()
-        try:
+        self._write_conn = self._connect()
+        self._write_conn.isolation_level = None  # explicit BEGIN/COMMIT per batch
+        if not self._memory:
+            self._write_conn.execute("PRAGMA journal_mode=WAL")
+            self._write_conn.execute("PRAGMA synchronous=NORMAL")
+        self._init_db()
+        _live_loggers.add(self)
+
+    def _init_db(self) -> None:
+        """Initialize database schema."""
+        conn = self._write_conn
+        with self._lock:
             # Create debug_sessions table
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS debug_sessions (
@@ -470,6 +585,8 @@ class DebugLogger:
                     response_parsed TEXT,
                     success BOOLEAN NOT NULL DEFAULT 1,
                     error TEXT,
+                    cache_status TEXT,
+                    saved_latency_ms INTEGER,
                     FOREIGN KEY (session_id) REFERENCES debug_sessions(id) ON DELETE CASCADE
                 )
             """)
@@ -496,18 +613,248 @@ class DebugLogger:
                 conn.execute("ALTER TABLE debug_sessions ADD COLUMN schema_shaping TEXT")
             except sqlite3.OperationalError:
                 pass  # Column already exists
-
-            conn.commit()
+            try:
+                conn.execute("ALTER TABLE llm_interactions ADD COLUMN cache_status TEXT")
+            except sqlite3.OperationalError:
+                pass
+            try:
+                conn.execute("ALTER TABLE llm_interactions ADD COLUMN saved_latency_ms INTEGER")
+            except sqlite3.OperationalError:
+                pass
             logger.debug(f"DebugLogger: Database initialized at {self.db_path}")
 
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30.0)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _get_conn(self) -> sqlite3.Connection:
+        """
+        Get a new database connection with row factory (caller closes it).
+
+        Buffered writes are flushed first so raw queries see them.
+        """
+        self.flush()
+        return self._connect()
+
+    @contextmanager
+    def _read_conn(self) -> Iterator[sqlite3.Connection]:
+        """Pooled read connection, after the caller's queued writes are committed."""
+        if self._memory:
+            with self._lock:
+                yield self._write_conn
+            return
+
+        self.flush()
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    # ==================== Write Queue ====================
+
+    def _submit(self, session_id: Optional[str], write: Callable[[sqlite3.Connection], Any]) -> bool:
+        """
+        Apply or enqueue a write.
+
+        Returns:
+            False when the write was skipped (unrecorded session) or dropped
+        """
+        if session_id is not None and session_id in self._unrecorded:
+            self._count("skipped")
+            return False
+
+        if not self.async_writes:
+            with self._lock:
+                self._apply_writes([write])
+            return True
+
+        with self._cond:
+            try:
+                self._queue.put_nowait((self._enqueued_seq + 1, write))
+            except queue.Full:
+                self._stats["dropped"] += 1
+                logger.debug(f"DebugLogger: write queue full, dropped write for session {session_id}")
+                return False
+            self._enqueued_seq += 1
+            self._stats["queued"] += 1
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._run_writer, name="debug-logger-writer", daemon=True
+                )
+                self._writer.start()
+        return True
+
+    def _run_writer(self) -> None:
+        """Drain the queue, committing up to batch_size writes per transaction."""
+        while True:
+            try:
+                item = self._queue.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                with self._cond:
+                    if self._queue.empty():
+                        self._writer = None
+                        return
+                continue
+
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            writes = [write for _, write in batch if write is not None]
+            self._apply_writes(writes)
+
+            with self._cond:
+                self._committed_seq = batch[-1][0]
+                self._cond.notify_all()
+                if len(writes) < len(batch):  # stop marker from close()
+                    self._writer = None
+                    return
+
+    def _apply_writes(self, writes: List[Callable[[sqlite3.Connection], Any]]) -> None:
+        """Commit writes in one transaction; on failure retry them one by one."""
+        if not writes:
+            return
+        conn = self._write_conn
+        try:
+            self._transaction(conn, lambda c: [write(c) for write in writes])
+            self._count("written", len(writes))
+            self._count("batches")
+            return
+        except Exception as e:
+            logger.warning(f"DebugLogger: batch of {len(writes)} writes failed ({e}), retrying individually")
+
+        for write in writes:
+            try:
+                self._transaction(conn, write)
+                self._count("written")
+            except Exception as e:
+                self._count("errors")
+                logger.warning(f"DebugLogger: write failed: {e}")
+
+    @staticmethod
+    def _transaction(conn: sqlite3.Connection, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        conn.execute("BEGIN")
+        try:
+            result = fn(conn)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+
+    def _call(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Run fn in its own transaction after the queued writes, returning its result."""
+        if self._memory:
+            with self._lock:
+                return self._transaction(self._write_conn, fn)
+
+        self.flush()
+        conn = self._connect()
+        conn.isolation_level = None
+        try:
+            return self._transaction(conn, fn)
         finally:
             conn.close()
 
-    def _get_conn(self) -> sqlite3.Connection:
-        """Get database connection with row factory."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every write queued before this call is committed.
+
+        Args:
+            timeout: Seconds to wait (None waits indefinitely)
+
+        Returns:
+            False if the timeout expired first
+        """
+        with self._cond:
+            target = self._enqueued_seq
+            return self._cond.wait_for(lambda: self._committed_seq >= target, timeout)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Flush buffered writes, stop the writer thread and close pooled connections.
+
+        Writes issued after close() are committed synchronously.
+        """
+        self.flush(timeout)
+        with self._cond:
+            writer = self._writer
+            if writer is not None:
+                try:
+                    self._queue.put_nowait((self._enqueued_seq, None))
+                except queue.Full:
+                    writer = None
+            self.async_writes = False
+        if writer is not None:
+            writer.join(timeout)
+
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def get_write_stats(self) -> Dict[str, Any]:
+        """Write-path counters and current queue depth."""
+        with self._cond:
+            return {
+                **self._stats,
+                "queue_depth": self._queue.qsize(),
+                "pending": self._enqueued_seq - self._committed_seq,
+                "async_writes": self.async_writes,
+            }
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._cond:
+            self._stats[name] += amount
+
+    # ==================== Session Bookkeeping ====================
+
+    def _admit_session(self) -> bool:
+        """Sampling decision for a new session under overflow_policy="sample"."""
+        if not self.async_writes or self.overflow_policy != "sample":
+            return True
+        if self._queue.qsize() < self.high_watermark * self._queue.maxsize:
+            return True
+        with self._cond:
+            self._new_sessions += 1
+            return self._new_sessions % self.sample_every == 0
+
+    def _remember(self, session_id: str, recorded: bool) -> None:
+        with self._cond:
+            cache = self._sessions if recorded else self._unrecorded
+            cache[session_id] = 0 if recorded else None
+            if len(cache) > _SESSION_CACHE_SIZE:
+                cache.popitem(last=False)
+
+    def _forget(self, session_ids: List[str]) -> None:
+        with self._cond:
+            for session_id in session_ids:
+                self._sessions.pop(session_id, None)
+                self._unrecorded.pop(session_id, None)
+
+    def _write_session(self, session_id: str, write: Callable[[sqlite3.Connection], Any]) -> bool:
+        """
+        Queue a write for a session created by this logger; for other
+        sessions apply it now and report whether the session exists.
+        """
+        if session_id in self._sessions:
+            return self._submit(session_id, write)
+        if session_id in self._unrecorded:
+            self._count("skipped")
+            return False
+        return bool(self._call(write))
 
     # ==================== Session Management ====================
 
@@ -534,26 +881,20 @@ class DebugLogger:
         if user_role and hasattr(user_role, "value"):
             user_role = user_role.value
 
-        conn = self._get_conn()
-        try:
-            conn.execute("""
-                INSERT INTO debug_sessions
-                (id, timestamp, user_id, user_role, input_message, status)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                session_id,
-                timestamp.isoformat(),
-                user_id,
-                user_role,
-                input_message,
-                "pending"
-            ))
-            conn.commit()
-            logger.debug(f"DebugLogger: Created session {session_id}")
+        if not self._admit_session():
+            self._count("sampled_out")
+            self._remember(session_id, recorded=False)
             return session_id
 
-        finally:
-            conn.close()
+        params = (session_id, timestamp.isoformat(), user_id, user_role, input_message, "pending")
+        recorded = self._submit(None, lambda conn: conn.execute("""
+            INSERT INTO debug_sessions
+            (id, timestamp, user_id, user_role, input_message, status)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, params))
+        self._remember(session_id, recorded)
+        logger.debug(f"DebugLogger: Created session {session_id}")
+        return session_id
 
     def update_session_retrieval(
         self,
@@ -572,22 +913,12 @@ class DebugLogger:
         Returns:
             True if update successful, False if session not found
         """
-        conn = self._get_conn()
-        try:
-            cursor = conn.execute("""
-                UPDATE debug_sessions
-                SET retrieved_schema = ?, retrieved_tools = ?
-                WHERE id = ?
-            """, (
-                self._safe_json(retrieved_schema),
-                self._safe_json(retrieved_tools),
-                session_id
-            ))
-            conn.commit()
-            return cursor.rowcount > 0
-
-        finally:
-            conn.close()
+        params = (self._safe_json(retrieved_schema), self._safe_json(retrieved_tools), session_id)
+        return self._write_session(session_id, lambda conn: conn.execute("""
+            UPDATE debug_sessions
+            SET retrieved_schema = ?, retrieved_tools = ?
+            WHERE id = ?
+        """, params).rowcount)
 
     def update_session_llm(
         self,
@@ -619,21 +950,15 @@ class DebugLogger:
         prompt_parts_json = json.dumps(prompt_parts, cls=SafeJSONEncoder) if prompt_parts else None
         response_parsed_json = json.dumps(response_parsed, cls=SafeJSONEncoder) if response_parsed else None
 
-        conn = self._get_conn()
-        try:
-            cursor = conn.execute("""
-                UPDATE debug_sessions
-                SET llm_prompt = ?, llm_response = ?, llm_tokens_used = ?, llm_model = ?,
-                    llm_prompt_parts = ?, llm_response_parsed = ?, llm_latency_ms = ?
-                WHERE id = ?
-            """, (prompt, response, tokens_used, model,
+        params = (prompt, response, tokens_used, model,
                   prompt_parts_json, response_parsed_json, latency_ms,
-                  session_id))
-            conn.commit()
-            return cursor.rowcount > 0
-
-        finally:
-            conn.close()
+                  session_id)
+        return self._write_session(session_id, lambda conn: conn.execute("""
+            UPDATE debug_sessions
+            SET llm_prompt = ?, llm_response = ?, llm_tokens_used = ?, llm_model = ?,
+                llm_prompt_parts = ?, llm_response_parsed = ?, llm_latency_ms = ?
+            WHERE id = ?
+        """, params).rowcount)
 
     def complete_session(
         self,
@@ -660,28 +985,23 @@ class DebugLogger:
         Returns:
             True if update successful, False if session not found
         """
-        conn = self._get_conn()
-        try:
-            cursor = conn.execute("""
-                UPDATE debug_sessions
-                SET final_result = ?, status = ?, execution_time_ms = ?,
-                    actions_executed = ?, errors = ?, metadata = ?
-                WHERE id = ?
-            """, (
-                self._safe_json(result),
-                status,
-                execution_time_ms,
-                self._safe_json(actions_executed),
-                self._safe_json(errors),
-                self._safe_json(metadata),
-                session_id
-            ))
-            conn.commit()
-            logger.debug(f"DebugLogger: Completed session {session_id} with status {status}")
-            return cursor.rowcount > 0
-
-        finally:
-            conn.close()
+        params = (
+            self._safe_json(result),
+            status,
+            execution_time_ms,
+            self._safe_json(actions_executed),
+            self._safe_json(errors),
+            self._safe_json(metadata),
+            session_id
+        )
+        updated = self._write_session(session_id, lambda conn: conn.execute("""
+            UPDATE debug_sessions
+            SET final_result = ?, status = ?, execution_time_ms = ?,
+                actions_executed = ?, errors = ?, metadata = ?
+            WHERE id = ?
+        """, params).rowcount)
+        logger.debug(f"DebugLogger: Completed session {session_id} with status {status}")
+        return updated
 
     def update_metadata(self, session_id: str, extra: dict) -> bool:
         """
@@ -697,16 +1017,16 @@ class DebugLogger:
         if not session_id:
             return False
 
-        conn = self._get_conn()
-        try:
-            # Read existing metadata
-            cursor = conn.execute(
+        extra = dict(extra)
+        self._safe_json(extra)  # surface serialization errors to the caller
+
+        def merge(conn: sqlite3.Connection) -> int:
+            row = conn.execute(
                 "SELECT metadata FROM debug_sessions WHERE id = ?",
                 (session_id,)
-            )
-            row = cursor.fetchone()
+            ).fetchone()
             if not row:
-                return False
+                return 0
 
             existing = {}
             if row["metadata"]:
@@ -717,15 +1037,12 @@ class DebugLogger:
 
             existing.update(extra)
 
-            cursor = conn.execute(
+            return conn.execute(
                 "UPDATE debug_sessions SET metadata = ? WHERE id = ?",
                 (self._safe_json(existing), session_id)
-            )
-            conn.commit()
-            return cursor.rowcount > 0
+            ).rowcount
 
-        finally:
-            conn.close()
+        return self._write_session(session_id, merge)
 
     def update_schema_shaping(
         self,
@@ -744,16 +1061,10 @@ class DebugLogger:
         if not session_id:
             return False
 
-        conn = self._get_conn()
-        try:
-            cursor = conn.execute(
-                "UPDATE debug_sessions SET schema_shaping = ? WHERE id = ?",
-                (self._safe_json(schema_shaping), session_id)
-            )
-            conn.commit()
-            return cursor.rowcount > 0
-        finally:
-            conn.close()
+        params = (self._safe_json(schema_shaping), session_id)
+        return self._write_session(session_id, lambda conn: conn.execute(
+            "UPDATE debug_sessions SET schema_shaping = ? WHERE id = ?", params
+        ).rowcount)
 
     # ==================== LLM Interaction Logging ====================
 
@@ -776,36 +1087,38 @@ class DebugLogger:
         response_parsed: Optional[str] = None,
         success: bool = True,
         error: Optional[str] = None,
+        cache_status: Optional[str] = None,
+        saved_latency_ms: Optional[int] = None,
     ) -> str:
         """
         Log an LLM interaction within a session.
 
+        cache_status is 'exact' or 'semantic' when the response came from the
+        LLM response cache (saved_latency_ms is then the original call's
+        latency), 'miss' when the cache was consulted but the provider was
+        called, and None when no cache is configured.
+
         Returns:
             interaction_id
         """
         interaction_id = str(uuid.uuid4())
 
-        conn = self._get_conn()
-        try:
-            conn.execute("""
-                INSERT INTO llm_interactions
-                (interaction_id, session_id, sequence_number, ooda_phase, call_type,
-                 started_at, ended_at, latency_ms, model, prompt, response,
-                 tokens_input, tokens_output, tokens_total, temperature,
-                 response_parsed, success, error)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                interaction_id, session_id, sequence_number, ooda_phase, call_type,
-                started_at, ended_at, latency_ms, model, prompt, response,
-                tokens_input, tokens_output, tokens_total, temperature,
-                response_parsed, success, error
-            ))
-            conn.commit()
-            logger.debug(f"DebugLogger: Logged LLM interaction {interaction_id} for session {session_id}")
-            return interaction_id
-
-        finally:
-            conn.close()
+        params = (
+            interaction_id, session_id, sequence_number, ooda_phase, call_type,
+            started_at, ended_at, latency_ms, model, prompt, response,
+            tokens_input, tokens_output, tokens_total, temperature,
+            response_parsed, success, error, cache_status, saved_latency_ms
+        )
+        self._submit(session_id, lambda conn: conn.execute("""
+            INSERT INTO llm_interactions
+            (interaction_id, session_id, sequence_number, ooda_phase, call_type,
+             started_at, ended_at, latency_ms, model, prompt, response,
+             tokens_input, tokens_output, tokens_total, temperature,
+             response_parsed, success, error, cache_status, saved_latency_ms)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, params))
+        logger.debug(f"DebugLogger: Logged LLM interaction {interaction_id} for session {session_id}")
+        return interaction_id
 
     def get_llm_interactions(self, session_id: str) -> List[LLMInteraction]:
         """
@@ -817,8 +1130,7 @@ class DebugLogger:
         Returns:
             List of LLMInteraction objects
         """
-        conn = self._get_conn()
-        try:
+        with self._read_conn() as conn:
             cursor = conn.execute("""
                 SELECT * FROM llm_interactions
                 WHERE session_id = ?
@@ -826,9 +1138,6 @@ class DebugLogger:
             """, (session_id,))
             return [LLMInteraction.from_row(row) for row in cursor.fetchall()]
 
-        finally:
-            conn.close()
-
     # ==================== Attempt Logging ====================
 
     def log_attempt(
@@ -856,45 +1165,46 @@ class DebugLogger:
         Returns:
             attempt_id if successful, None if session not found
         """
-        # Verify session exists first
-        if not self.get_session(session_id):
-            return None
-
-        # Auto-increment attempt_number
-        if attempt_number is None:
-            attempt_number = self._get_next_attempt_number(session_id)
+        with self._cond:
+            next_number = self._sessions.get(session_id)
+            if next_number is not None:
+                if attempt_number is None:
+                    attempt_number = next_number
+                self._sessions[session_id] = max(next_number, attempt_number + 1)
+
+        if next_number is None:
+            # Session not created by this logger: verify it exists first
+            if session_id in self._unrecorded or not self.get_session(session_id):
+                return None
+            if attempt_number is None:
+                attempt_number = self._get_next_attempt_number(session_id)
 
         attempt_id = str(uuid.uuid4())
         timestamp = datetime.now()
 
-        conn = self._get_conn()
-        try:
-            conn.execute("""
-                INSERT INTO attempt_logs
-                (attempt_id, session_id, attempt_number, action_name, params, success, error, result, timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                attempt_id,
-                session_id,
-                attempt_number,
-                action_name,
-                self._safe_json(params),
-                success,
-                self._safe_json(error),
-                self._safe_json(result),
-                timestamp.isoformat()
-            ))
-            conn.commit()
-            logger.debug(f"DebugLogger: Logged attempt {attempt_id} for session {session_id}")
-            return attempt_id
-
-        finally:
-            conn.close()
+        row = (
+            attempt_id,
+            session_id,
+            attempt_number,
+            action_name,
+            self._safe_json(params),
+            success,
+            self._safe_json(error),
+            self._safe_json(result),
+            timestamp.isoformat()
+        )
+        if not self._submit(session_id, lambda conn: conn.execute("""
+            INSERT INTO attempt_logs
+            (attempt_id, session_id, attempt_number, action_name, params, success, error, result, timestamp)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, row)):
+            return None
+        logger.debug(f"DebugLogger: Logged attempt {attempt_id} for session {session_id}")
+        return attempt_id
 
     def _get_next_attempt_number(self, session_id: str) -> Optional[int]:
         """Get next attempt number for a session."""
-        conn = self._get_conn()
-        try:
+        with self._read_conn() as conn:
             cursor = conn.execute("""
                 SELECT COALESCE(MAX(attempt_number), -1) + 1 as next_num
                 FROM attempt_logs
@@ -903,9 +1213,6 @@ class DebugLogger:
             row = cursor.fetchone()
             return row["next_num"] if row else None
 
-        finally:
-            conn.close()
-
     # ==================== Query Methods ====================
 
     def get_session(self, session_id: str) -> Optional[DebugSession]:
@@ -918,17 +1225,13 @@ class DebugLogger:
         Returns:
             DebugSession if found, None otherwise
         """
-        conn = self._get_conn()
-        try:
+        with self._read_conn() as conn:
             cursor = conn.execute("""
                 SELECT * FROM debug_sessions WHERE id = ?
             """, (session_id,))
             row = cursor.fetchone()
             return DebugSession.from_row(row) if row else None
 
-        finally:
-            conn.close()
-
     def list_sessions(
         self,
         user_id: Optional[int] = None,
@@ -948,8 +1251,7 @@ class DebugLogger:
         Returns:
             List of DebugSession objects
         """
-        conn = self._get_conn()
-        try:
+        with self._read_conn() as conn:
             query = "SELECT * FROM debug_sessions"
             params: List = []
 
@@ -970,9 +1272,6 @@ class DebugLogger:
             cursor = conn.execute(query, params)
             return [DebugSession.from_row(row) for row in cursor.fetchall()]
 
-        finally:
-            conn.close()
-
     def get_attempts(self, session_id: str) -> List[AttemptLog]:
         """
         Get all attempts for a session.
@@ -983,8 +1282,7 @@ class DebugLogger:
         Returns:
             List of AttemptLog objects ordered by attempt_number
         """
-        conn = self._get_conn()
-        try:
+        with self._read_conn() as conn:
             cursor = conn.execute("""
                 SELECT * FROM attempt_logs
                 WHERE session_id = ?
@@ -992,9 +1290,6 @@ class DebugLogger:
             """, (session_id,))
             return [AttemptLog.from_row(row) for row in cursor.fetchall()]
 
-        finally:
-            conn.close()
-
     def get_attempt(self, attempt_id: str) -> Optional[AttemptLog]:
         """
         Get a specific attempt by ID.
@@ -1005,17 +1300,13 @@ class DebugLogger:
         Returns:
             AttemptLog if found, None otherwise
         """
-        conn = self._get_conn()
-        try:
+        with self._read_conn() as conn:
             cursor = conn.execute("""
                 SELECT * FROM attempt_logs WHERE attempt_id = ?
             """, (attempt_id,))
             row = cursor.fetchone()
             return AttemptLog.from_row(row) if row else None
 
-        finally:
-            conn.close()
-
     # ==================== Management ====================
 
     def delete_session(self, session_id: str) -> bool:
@@ -1028,8 +1319,7 @@ class DebugLogger:
         Returns:
             True if deleted, False if not found
         """
-        conn = self._get_conn()
-        try:
+        def delete(conn: sqlite3.Connection) -> bool:
             conn.execute("""
                 DELETE FROM llm_interactions WHERE session_id = ?
             """, (session_id,))
@@ -1039,14 +1329,13 @@ class DebugLogger:
             cursor = conn.execute("""
                 DELETE FROM debug_sessions WHERE id = ?
             """, (session_id,))
-            conn.commit()
-            deleted = cursor.rowcount > 0
-            if deleted:
-                logger.debug(f"DebugLogger: Deleted session {session_id}")
-            return deleted
+            return cursor.rowcount > 0
 
-        finally:
-            conn.close()
+        deleted = self._call(delete)
+        self._forget([session_id])
+        if deleted:
+            logger.debug(f"DebugLogger: Deleted session {session_id}")
+        return deleted
 
     def cleanup_old_sessions(self, days: int = DEFAULT_RETENTION_DAYS) -> int:
         """
@@ -1060,8 +1349,11 @@ class DebugLogger:
         """
         cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
 
-        conn = self._get_conn()
-        try:
+        def cleanup(conn: sqlite3.Connection) -> List[str]:
+            session_ids = [row[0] for row in conn.execute(
+                "SELECT id FROM debug_sessions WHERE timestamp < ?", (cutoff_date,)
+            )]
+
             conn.execute("""
                 DELETE FROM llm_interactions
                 WHERE session_id IN (
@@ -1076,18 +1368,17 @@ class DebugLogger:
                 )
             """, (cutoff_date,))
 
-            cursor = conn.execute("""
+            conn.execute("""
                 DELETE FROM debug_sessions WHERE timestamp < ?
             """, (cutoff_date,))
+            return session_ids
 
-            conn.commit()
-            deleted = cursor.rowcount
-            if deleted > 0:
-                logger.info(f"DebugLogger: Cleaned up {deleted} old sessions (older than {days} days)")
-            return deleted
-
-        finally:
-            conn.close()
+        session_ids = self._call(cleanup)
+        self._forget(session_ids)
+        deleted = len(session_ids)
+        if deleted > 0:
+            logger.info(f"DebugLogger: Cleaned up {deleted} old sessions (older than {days} days)")
+        return deleted
 
     def get_statistics(self) -> Dict[str, Any]:
         """
@@ -1096,8 +1387,7 @@ class DebugLogger:
         Returns:
             Dict with total_sessions, total_attempts, status_counts, etc.
         """
-        conn = self._get_conn()
-        try:
+        with self._read_conn() as conn:
             # Total sessions
             cursor = conn.execute("SELECT COUNT(*) as count FROM debug_sessions")
             total_sessions = cursor.fetchone()["count"]
@@ -1122,16 +1412,33 @@ class DebugLogger:
             """)
             recent_sessions = cursor.fetchone()["count"]
 
+            # LLM response cache effectiveness
+            cursor = conn.execute("""
+                SELECT
+                    COALESCE(SUM(CASE WHEN cache_status IN ('exact', 'semantic') THEN 1 ELSE 0 END), 0) AS hits,
+                    COALESCE(SUM(CASE WHEN cache_status = 'miss' THEN 1 ELSE 0 END), 0) AS misses,
+                    COALESCE(SUM(CASE WHEN cache_status IN ('exact', 'semantic')
+                                      THEN saved_latency_ms ELSE 0 END), 0) AS saved_latency_ms,
+                    COALESCE(SUM(CASE WHEN cache_status IN ('exact', 'semantic')
+                                      THEN tokens_total ELSE 0 END), 0) AS saved_tokens
+                FROM llm_interactions
+            """)
+            row = cursor.fetchone()
+            llm_cache = {
+                "hits": row["hits"],
+                "misses": row["misses"],
+                "saved_latency_ms": row["saved_latency_ms"],
+                "saved_tokens": row["saved_tokens"],
+            }
+
             return {
                 "total_sessions": total_sessions,
                 "total_attempts": total_attempts,
                 "status_counts": status_counts,
-                "recent_sessions_24h": recent_sessions
+                "recent_sessions_24h": recent_sessions,
+                "llm_cache": llm_cache,
             }
 
-        finally:
-            conn.close()
-
     def export_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """
         Export a complete session with all attempts for replay.
@@ -1156,6 +1463,7 @@ class DebugLogger:
 
 __all__ = [
     "DebugLogger",
+    "flush_debug_loggers",
     "DebugSession",
     "AttemptLog",
     "LLMInteraction",
@@ -3,33 +3,45 @@ core/ai/embedding.py
 
 Embedding service with caching for semantic search.
 
-Provides OpenAI-compatible text embedding generation with in-memory caching
-to reduce API calls and improve performance.
+Provides OpenAI-compatible text embedding generation with an in-memory LRU
+and an optional persistent cache (see core/ai/embedding_cache.py) to reduce
+API calls and improve performance.
 """
+import logging
 import os
+import time
 from collections import OrderedDict
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Callable, Iterator, Optional, Tuple
 from dataclasses import field
 
+from core.ai.embedding_cache import EmbeddingCache
+
 try:
     from openai import OpenAI
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
 
+logger = logging.getLogger(__name__)
+
 
 class EmbeddingService:
     """
     Embedding service with caching
 
     Generates text embeddings using OpenAI-compatible API (text-embedding-3-small).
-    Caches results in memory to reduce redundant API calls.
+    Caches results in memory to reduce redundant API calls. When a
+    persistent_cache is given, lookups read through it before calling the API,
+    so restarts and index rebuilds reuse embeddings from earlier processes.
 
     Configuration:
         - api_key: OpenAI API key (from env or parameter)
         - model: Model name (default: text-embedding-3-small, 1536 dimensions)
         - base_url: API base URL (default: https://api.openai.com)
         - cache_size: Maximum number of cached embeddings
+        - persistent_cache: Optional EmbeddingCache shared across processes
+        - batch_size / max_concurrency / max_retries: batch pipeline tuning
 
     Example:
         >>> service = EmbeddingService(api_key="sk-...")
@@ -48,13 +60,25 @@ class EmbeddingService:
         "mxbai-embed-large:latest": 1024,
     }
 
+    # In-memory cache counters, optional disk cache and retry policy
+    _hits: int = 0
+    _misses: int = 0
+    _persistent_cache: Optional[EmbeddingCache] = None
+    max_retries: int = 2
+    retry_backoff: float = 0.5
+
     def __init__(
         self,
         api_key: Optional[str] = None,
         model: str = "text-embedding-3-small",
         base_url: str = "https://api.openai.com",
         cache_size: int = 1000,
-        enabled: bool = True
+        enabled: bool = True,
+        persistent_cache: Optional[EmbeddingCache] = None,
+        batch_size: int = 64,
+        max_concurrency: int = 4,
+        max_retries: int = 2,
+        retry_backoff: float = 0.5
     ):
         """
         Initialize embedding service
@@ -65,6 +89,11 @@ class EmbeddingService:
             base_url: API base URL for OpenAI-compatible services
             cache_size: Maximum cache entries (LRU eviction when exceeded)
             enabled: Whether to use real API (False for testing)
+            persistent_cache: Disk-backed cache consulted before the API
+            batch_size: Maximum texts per embedding API request
+            max_concurrency: Maximum concurrent embedding API requests
+            max_retries: Retries per failed request
+            retry_backoff: Initial retry delay in seconds (doubles per attempt)
         """
         if not OPENAI_AVAILABLE:
             raise ImportError("openai package is required. Install with: uv add openai")
@@ -74,11 +103,17 @@ class EmbeddingService:
         self.enabled = enabled
         self._cache: OrderedDict[str, List[float]] = OrderedDict()
         self._cache_size = cache_size
+        self._persistent_cache = persistent_cache
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max(0, max_retries)
+        self.retry_backoff = retry_backoff
 
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
 
         if self.api_key and enabled:
-            self._client = OpenAI(api_key=self.api_key, base_url=base_url, timeout=10.0)
+            # Retries are handled by _with_retry (embed and batch chunks), not by the SDK
+            self._client = OpenAI(api_key=self.api_key, base_url=base_url, timeout=10.0, max_retries=0)
         else:
             self._client = None
 
@@ -104,8 +139,10 @@ class EmbeddingService:
         """
         # Check cache
         if text in self._cache:
+            self._hits += 1
             self._cache.move_to_end(text)  # O(1) LRU touch
             return self._cache[text].copy()
+        self._misses += 1
 
         # Generate new embedding
         if not self._client or not self.enabled:
@@ -114,80 +151,160 @@ class EmbeddingService:
             self._cache_put(text, embedding)
             return embedding.copy()
 
+        # Read through the persistent cache
+        if self._persistent_cache is not None:
+            embedding = self._persistent_cache.get(self.model, text)
+            if embedding is not None:
+                self._cache_put(text, embedding)
+                return embedding.copy()
+
         try:
-            response = self._client.embeddings.create(
-                model=self.model,
-                input=text
+            response = self._with_retry(
+                lambda: self._client.embeddings.create(model=self.model, input=text)
             )
             embedding = response.data[0].embedding
             self._cache_put(text, embedding)
+            if self._persistent_cache is not None:
+                self._persistent_cache.put(self.model, text, embedding)
             return embedding.copy()
 
         except Exception as e:
-            import logging
-            logging.warning(f"Failed to generate embedding for text '{text[:50]}...': {e}")
+            logger.warning(f"Failed to generate embedding for text '{text[:50]}...': {e}")
             return None
 
     def batch_embed(self, texts: List[str]) -> List[List[float]]:
         """
         Generate embeddings for multiple texts efficiently
 
-        Uses batch API call when possible for better performance.
+        Collects the results of :meth:`iter_batch_embed` (deduplicated,
+        cache-filtered, chunked and concurrent).
 
         Args:
             texts: List of input texts
 
         Returns:
-            List of embedding vectors
+            List of embedding vectors aligned with texts (None where embedding failed)
         """
-        results = []
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+        for indices, chunk in self.iter_batch_embed(texts):
+            for idx, embedding in zip(indices, chunk):
+                embeddings[idx] = embedding
+        return embeddings
 
-        # Filter out cached texts
-        uncached_texts = []
-        uncached_indices = []
-        cached_embeddings = [None] * len(texts)
+    def iter_batch_embed(
+        self,
+        texts: List[str]
+    ) -> Iterator[Tuple[List[int], List[Optional[List[float]]]]]:
+        """
+        Embed texts, yielding results chunk by chunk as they become available
+
+        Pipeline:
+            1. Deduplicate texts (duplicates share one lookup)
+            2. Serve in-memory and persistent cache hits immediately
+            3. Split misses into chunks of ``batch_size`` (provider batch limit)
+            4. Run chunks on a pool of ``max_concurrency`` threads, retrying
+               failures with exponential backoff
+            5. Yield each chunk as soon as it completes
+
+        Args:
+            texts: List of input texts
 
+        Yields:
+            (indices, embeddings): positions in ``texts`` and their vectors;
+            embeddings are None for a chunk that failed after all retries
+        """
+        positions: Dict[str, List[int]] = {}
         for i, text in enumerate(texts):
+            positions.setdefault(text, []).append(i)
+
+        def expand(chunk_texts, chunk_embeddings):
+            indices, embeddings = [], []
+            for text, embedding in zip(chunk_texts, chunk_embeddings):
+                for idx in positions[text]:
+                    indices.append(idx)
+                    embeddings.append(embedding.copy() if embedding is not None else None)
+            return indices, embeddings
+
+        # In-memory cache hits
+        hit_texts, missing = [], []
+        for text in positions:
             if text in self._cache:
+                self._hits += 1
                 self._cache.move_to_end(text)  # O(1) LRU touch
-                cached_embeddings[i] = self._cache[text].copy()
+                hit_texts.append(text)
             else:
-                uncached_texts.append(text)
-                uncached_indices.append(i)
+                self._misses += 1
+                missing.append(text)
+        if hit_texts:
+            yield expand(hit_texts, [self._cache[text] for text in hit_texts])
 
-        # Generate embeddings for uncached texts
-        if uncached_texts and self._client and self.enabled:
-            try:
-                response = self._client.embeddings.create(
-                    model=self.model,
-                    input=uncached_texts
-                )
-
-                for i, embedding_result in enumerate(response.data):
-                    idx = uncached_indices[i]
-                    text = uncached_texts[i]
-                    embedding = embedding_result.embedding
-
-                    cached_embeddings[idx] = embedding
-                    results.append(embedding)
-                    self._cache_put(text, embedding)
-
-            except Exception as e:
-                import logging
-                logging.warning(f"Batch embedding failed: {e}")
-                # Fill remaining with None to signal failure
-                for idx in uncached_indices[len(results):]:
-                    cached_embeddings[idx] = None
+        if not missing:
+            return
 
-        elif uncached_texts and (not self.enabled or not self._client):
+        if not self._client or not self.enabled:
             # Zero vectors for testing or when client is unavailable, but still cache them
-            for i, idx in enumerate(uncached_indices):
-                text = uncached_texts[i]
+            zeros = []
+            for text in missing:
                 embedding = [0.0] * self.dimension
-                cached_embeddings[idx] = embedding
                 self._cache_put(text, embedding)
-
-        return cached_embeddings
+                zeros.append(embedding)
+            yield expand(missing, zeros)
+            return
+
+        # Read through the persistent cache before calling the API
+        if self._persistent_cache is not None:
+            stored = self._persistent_cache.get_many(self.model, missing)
+            stored_texts = [text for text, embedding in zip(missing, stored) if embedding is not None]
+            if stored_texts:
+                for text, embedding in zip(missing, stored):
+                    if embedding is not None:
+                        self._cache_put(text, embedding)
+                yield expand(stored_texts, [self._cache[text] for text in stored_texts])
+                missing = [text for text, embedding in zip(missing, stored) if embedding is None]
+            if not missing:
+                return
+
+        chunks = [missing[i:i + self.batch_size] for i in range(0, len(missing), self.batch_size)]
+        workers = max(1, min(self.max_concurrency, len(chunks)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embedding") as executor:
+            futures = {executor.submit(self._embed_chunk, chunk): chunk for chunk in chunks}
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    embeddings = future.result()
+                except Exception as e:
+                    logger.warning(f"Batch embedding failed for {len(chunk)} texts: {e}")
+                    yield expand(chunk, [None] * len(chunk))
+                    continue
+
+                for text, embedding in zip(chunk, embeddings):
+                    self._cache_put(text, embedding)
+                if self._persistent_cache is not None:
+                    self._persistent_cache.put_many(self.model, chunk, embeddings)
+                yield expand(chunk, embeddings)
+
+    def _embed_chunk(self, chunk: List[str]) -> List[List[float]]:
+        """Call the embedding API for one chunk, retrying with exponential backoff"""
+        def create():
+            response = self._client.embeddings.create(model=self.model, input=chunk)
+            embeddings = [item.embedding for item in response.data]
+            if len(embeddings) != len(chunk):
+                raise ValueError(f"expected {len(chunk)} embeddings, got {len(embeddings)}")
+            return embeddings
+
+        return self._with_retry(create)
+
+    def _with_retry(self, call: Callable[[], Any]) -> Any:
+        """Run call(), retrying up to max_retries times with exponential backoff"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return call()
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self.retry_backoff * (2 ** attempt)
+                logger.info(f"Embedding request failed ({e}), retrying in {delay:.2f}s")
+                time.sleep(delay)
 
     def _cache_put(self, key: str, value: List[float]) -> None:
         """Insert into LRU cache with O(1) eviction."""
@@ -199,7 +316,7 @@ class EmbeddingService:
         self._cache[key] = value
 
     def clear_cache(self) -> None:
-        """Clear the embedding cache"""
+        """Clear the in-memory embedding cache (the persistent cache is kept)"""
         self._cache.clear()
 
     def get_cache_stats(self) -> Dict[str, Any]:
@@ -207,14 +324,24 @@ class EmbeddingService:
         Get cache statistics
 
         Returns:
-            Dict with cache_size, cache_entries, and hit_rate (if tracked)
+            Dict with cache_size, cache_entries, in-memory hits/misses/hit_rate,
+            and "persistent" (EmbeddingCache stats with entries, bytes, hits,
+            misses) or None when no persistent cache is configured
         """
+        lookups = self._hits + self._misses
         return {
             "cache_size": self._cache_size,
             "cache_entries": len(self._cache),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / lookups if lookups else 0.0,
             "model": self.model,
             "dimension": self.dimension,
-            "enabled": self.enabled
+            "enabled": self.enabled,
+            "persistent": (
+                self._persistent_cache.get_stats()
+                if self._persistent_cache is not None else None
+            ),
         }
 
     def is_available(self) -> bool:
@@ -0,0 +1,232 @@
+"""
+core/ai/embedding_cache.py
+
+Persistent, content-addressed embedding cache.
+
+Embeddings are keyed by (model, sha256(text)) and stored as float32 blobs in
+SQLite (WAL mode), so every worker process and every index rebuild shares the
+same cache and only pays the embedding API once per distinct text.
+"""
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def text_digest(text: str) -> str:
+    """Content address for a text (hex sha256 of its UTF-8 bytes)"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Disk-backed embedding cache shared across processes
+
+    Lookups refresh ``last_access``; once the stored vectors exceed
+    ``max_bytes`` the least recently used rows are evicted until the cache is
+    back under ``evict_ratio * max_bytes``.
+
+    Example:
+        >>> cache = EmbeddingCache("data/embedding_cache.db", max_bytes=64 * 1024 * 1024)
+        >>> cache.put("nomic-embed-text", "客人姓名", [0.1, 0.2])
+        >>> cache.get("nomic-embed-text", "客人姓名")
+        [0.1..., 0.2...]
+    """
+
+    def __init__(
+        self,
+        db_path: str = ":memory:",
+        max_bytes: int = 256 * 1024 * 1024,
+        evict_ratio: float = 0.9
+    ):
+        """
+        Initialize embedding cache
+
+        Args:
+            db_path: SQLite database path (":memory:" for a private cache)
+            max_bytes: Upper bound on the total size of stored vectors
+            evict_ratio: Fraction of max_bytes to shrink to when evicting
+        """
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.evict_ratio = evict_ratio
+
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30.0)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS embedding_cache (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                nbytes INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+        """)
+        self.conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_embedding_cache_last_access
+            ON embedding_cache(last_access)
+        """)
+        self.conn.commit()
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        """Return the cached embedding for text, or None"""
+        return self.get_many(model, [text])[0]
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        Look up several texts in one query
+
+        Returns:
+            List aligned with ``texts``; None where the cache has no entry
+        """
+        if not texts:
+            return []
+
+        digests = [text_digest(text) for text in texts]
+        unique = list(dict.fromkeys(digests))
+        found: Dict[str, List[float]] = {}
+
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(unique), 500):
+                chunk = unique[start:start + 500]
+                placeholders = ", ".join("?" for _ in chunk)
+                rows = self.conn.execute(f"""
+                    SELECT text_hash, vector FROM embedding_cache
+                    WHERE model = ? AND text_hash IN ({placeholders})
+                """, [model, *chunk]).fetchall()
+                for text_hash, blob in rows:
+                    found[text_hash] = np.frombuffer(blob, dtype=np.float32).tolist()
+
+            if found:
+                placeholders = ", ".join("?" for _ in found)
+                self.conn.execute(f"""
+                    UPDATE embedding_cache SET last_access = ?
+                    WHERE model = ? AND text_hash IN ({placeholders})
+                """, [time.time(), model, *found])
+                self.conn.commit()
+
+            results = [found.get(digest) for digest in digests]
+            hits = sum(1 for r in results if r is not None)
+            self._hits += hits
+            self._misses += len(results) - hits
+
+        return results
+
+    def put(self, model: str, text: str, embedding: Sequence[float]) -> None:
+        """Store one embedding"""
+        self.put_many(model, [text], [embedding])
+
+    def put_many(
+        self,
+        model: str,
+        texts: Sequence[str],
+        embeddings: Sequence[Optional[Sequence[float]]]
+    ) -> None:
+        """Store embeddings (None entries are skipped), then evict if over budget"""
+        now = time.time()
+        rows = []
+        for text, embedding in zip(texts, embeddings):
+            if embedding is None:
+                continue
+            blob = np.asarray(embedding, dtype=np.float32).tobytes()
+            rows.append((model, text_digest(text), len(blob) // 4, blob, len(blob), now, now))
+        if not rows:
+            return
+
+        with self._lock:
+            self.conn.executemany("""
+                INSERT OR REPLACE INTO embedding_cache
+                (model, text_hash, dim, vector, nbytes, created_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            self._evict_locked()
+            self.conn.commit()
+
+    def _evict_locked(self) -> None:
+        """Drop least recently used rows while over max_bytes (caller holds lock)"""
+        total = self.conn.execute(
+            "SELECT COALESCE(SUM(nbytes), 0) FROM embedding_cache"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        target = int(self.max_bytes * self.evict_ratio)
+        freed = 0
+        victims = []
+        for model, text_hash, nbytes in self.conn.execute("""
+            SELECT model, text_hash, nbytes FROM embedding_cache
+            ORDER BY last_access
+        """):
+            if total - freed <= target:
+                break
+            victims.append((model, text_hash))
+            freed += nbytes
+
+        self.conn.executemany(
+            "DELETE FROM embedding_cache WHERE model = ? AND text_hash = ?", victims
+        )
+        self._evictions += len(victims)
+        logger.info(f"EmbeddingCache: evicted {len(victims)} entries ({freed} bytes)")
+
+    def clear(self, model: Optional[str] = None) -> None:
+        """Remove all entries, or only those of one model"""
+        with self._lock:
+            if model is None:
+                self.conn.execute("DELETE FROM embedding_cache")
+            else:
+                self.conn.execute("DELETE FROM embedding_cache WHERE model = ?", (model,))
+            self.conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+
+        Returns:
+            Dict with entries, bytes, max_bytes, hits, misses, hit_rate, evictions
+        """
+        with self._lock:
+            entries, total_bytes = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM embedding_cache"
+            ).fetchone()
+            lookups = self._hits + self._misses
+            return {
+                "db_path": self.db_path,
+                "entries": entries,
+                "bytes": total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+            }
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self.conn.close()
+
+
+__all__ = [
+    "EmbeddingCache",
+    "text_digest",
+]
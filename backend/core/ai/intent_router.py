@@ -13,10 +13,13 @@ Key components:
 - RoutingResult: Action routing decision with confidence score
 - IntentRouter: Multi-stage routing pipeline
 """
+from bisect import bisect_right
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 import logging
 
+from core.ontology.keyword_matcher import KeywordMatcher
+
 logger = logging.getLogger(__name__)
 
 
@@ -61,6 +64,63 @@ class RoutingResult:
     reasoning: str = ""
 
 
+class _ActionKeywordIndex:
+    """
+    Keyword lookup structures compiled once for a list of actions.
+
+    - exact / keyword: lowercased action name / search keyword -> action indexes
+    - name matcher: automaton over action names, finds names contained in a hint
+    - joined names: a hint contained in action names is located with str.find
+      over all names joined by a separator, instead of one test per action
+    """
+
+    _SEPARATOR = "\x00"
+
+    def __init__(self, actions):
+        self.actions = list(actions)
+        names = [action.name.lower() for action in self.actions]
+        self.exact: Dict[str, List[int]] = {}
+        self.keywords: Dict[str, List[int]] = {}
+        for i, (name, action) in enumerate(zip(names, self.actions)):
+            self.exact.setdefault(name, []).append(i)
+            for kw in action.search_keywords:
+                self.keywords.setdefault(kw.lower(), []).append(i)
+        self.name_matcher = KeywordMatcher(names)
+        self.joined = self._SEPARATOR.join(names)
+        self.offsets: List[int] = []
+        offset = 0
+        for name in names:
+            self.offsets.append(offset)
+            offset += len(name) + 1
+
+    def covers(self, actions) -> bool:
+        """Whether this index was compiled from exactly these action objects"""
+        return len(actions) == len(self.actions) and all(
+            a is b for a, b in zip(actions, self.actions)
+        )
+
+    def names_in_hint(self, hint_lower: str) -> Set[int]:
+        """Indexes of actions whose name occurs in the hint"""
+        return {i for name in self.name_matcher.find_all(hint_lower) for i in self.exact[name]}
+
+    def hint_in_names(self, hint_lower: str) -> Set[int]:
+        """Indexes of actions whose name contains the hint"""
+        if not hint_lower or self._SEPARATOR in hint_lower:
+            return {
+                i for i, action in enumerate(self.actions)
+                if hint_lower in action.name.lower()
+            }
+        found: Set[int] = set()
+        pos = self.joined.find(hint_lower)
+        while pos != -1:
+            i = bisect_right(self.offsets, pos) - 1
+            found.add(i)
+            # continue after the end of this name
+            next_start = self.offsets[i + 1] if i + 1 < len(self.offsets) else len(self.joined)
+            pos = self.joined.find(hint_lower, next_start)
+        return found
+
+
 class IntentRouter:
     """
     Rule-based intent-to-action router.
@@ -109,6 +169,7 @@ class IntentRouter:
         self._action_registry = action_registry
         self._ontology_registry = ontology_registry
         self._state_machine_executor = state_machine_executor
+        self._keyword_index: Optional[_ActionKeywordIndex] = None
 
     def route(self, intent: ExtractedIntent, user_role: str = "admin") -> RoutingResult:
         """
@@ -221,6 +282,9 @@ class IntentRouter:
         - Substring match in action name (e.g., "checkin" matches "walkin_checkin")
         - Exact match in action's search_keywords list
 
+        Lookups go through an index compiled once per action list, so each
+        hint costs one pass instead of one test per action.
+
         Args:
             action_hints: Keywords extracted from user intent
             actions: List of ActionDefinition objects
@@ -231,16 +295,24 @@ class IntentRouter:
         if not action_hints:
             return []
 
+        index = self._keyword_index
+        if index is None or not index.covers(actions):
+            index = _ActionKeywordIndex(actions)
+            self._keyword_index = index
+
         candidates = {}  # Use dict to deduplicate by action name
 
         for hint in action_hints:
             hint_lower = hint.lower()
+            exact = set(index.exact.get(hint_lower, ()))
+            substring = index.names_in_hint(hint_lower) | index.hint_in_names(hint_lower)
+            keyword = set(index.keywords.get(hint_lower, ()))
 
-            for action in actions:
-                action_name_lower = action.name.lower()
+            for i in sorted(exact | substring | keyword):
+                action = index.actions[i]
 
                 # Exact name match - highest score
-                if hint_lower == action_name_lower:
+                if i in exact:
                     if action.name not in candidates or candidates[action.name]["score"] < 1.0:
                         candidates[action.name] = {
                             "name": action.name,
@@ -250,7 +322,7 @@ class IntentRouter:
                     continue
 
                 # Substring match in action name
-                if hint_lower in action_name_lower or action_name_lower in hint_lower:
+                if i in substring:
                     if action.name not in candidates or candidates[action.name]["score"] < 0.8:
                         candidates[action.name] = {
                             "name": action.name,
@@ -260,14 +332,12 @@ class IntentRouter:
                     continue
 
                 # Match in search_keywords
-                keywords_lower = [kw.lower() for kw in action.search_keywords]
-                if hint_lower in keywords_lower:
-                    if action.name not in candidates or candidates[action.name]["score"] < 0.9:
-                        candidates[action.name] = {
-                            "name": action.name,
-                            "score": 0.9,
-                            "reason": f"Keyword match: '{hint}' in search_keywords of '{action.name}'",
-                        }
+                if action.name not in candidates or candidates[action.name]["score"] < 0.9:
+                    candidates[action.name] = {
+                        "name": action.name,
+                        "score": 0.9,
+                        "reason": f"Keyword match: '{hint}' in search_keywords of '{action.name}'",
+                    }
 
         return list(candidates.values())
 
@@ -6,20 +6,24 @@ LLM 客户端接口抽象
 提供统一的 LLM 调用接口，支持多种 LLM 提供商（OpenAI、DeepSeek、Azure、Ollama 等）。
 参考：app/services/llm_service.py
 """
+import asyncio
 import json
 import os
 import re
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any, List, Callable
+from typing import Optional, Dict, Any, List, Callable, Iterator, AsyncIterator
 from datetime import date
 from dataclasses import dataclass
 
 try:
-    from openai import OpenAI
+    import httpx
+    from openai import OpenAI, AsyncOpenAI
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
 
+JSON_ONLY_INSTRUCTION = "\n\n**重要：请务必只返回纯 JSON 格式，不要添加任何其他文字说明。**"
+
 
 @dataclass
 class LLMResponse:
@@ -213,6 +217,51 @@ class OpenAICompatibleClient(LLMClient):
                 )
             raise
 
+    def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        response_format: Optional[Dict[str, str]] = None
+    ) -> Iterator[str]:
+        """
+        流式对话，逐块产出增量文本（不缓冲整段回复）
+
+        Args:
+            messages: 消息列表
+            temperature: 温度参数
+            max_tokens: 最大 token 数
+            response_format: 响应格式
+
+        Yields:
+            模型输出的增量文本片段
+        """
+        if not self.is_enabled():
+            return
+
+        kwargs = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True
+        }
+        if response_format:
+            kwargs["response_format"] = response_format
+
+        try:
+            response = self._client.chat.completions.create(**kwargs)
+        except Exception:
+            if not (response_format and response_format.get("type") == "json_object"):
+                raise
+            kwargs.pop("response_format")
+            kwargs["messages"] = _with_json_instruction(messages)
+            response = self._client.chat.completions.create(**kwargs)
+
+        for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
     def _chat_without_json_format(
         self,
         messages: List[Dict[str, str]],
@@ -222,19 +271,9 @@ class OpenAICompatibleClient(LLMClient):
         """
         在不支持 JSON 模式时回退到普通模式
         """
-        # 在最后一条系统消息中强调返回 JSON
-        enhanced_messages = messages.copy()
-        for i, msg in enumerate(enhanced_messages):
-            if msg.get("role") == "system":
-                enhanced_messages[i] = {
-                    "role": "system",
-                    "content": msg["content"] + "\n\n**重要：请务必只返回纯 JSON 格式，不要添加任何其他文字说明。**"
-                }
-                break
-
         response = self._client.chat.completions.create(
             model=self.model,
-            messages=enhanced_messages,
+            messages=_with_json_instruction(messages),
             temperature=temperature,
             max_tokens=max_tokens
         )
@@ -249,6 +288,284 @@ class OpenAICompatibleClient(LLMClient):
         )
 
 
+class AsyncOpenAICompatibleClient:
+    """
+    异步 OpenAI 兼容客户端
+
+    与 OpenAICompatibleClient 接口一致，但所有调用都是协程，不占用工作线程：
+    - 所有请求共享一个 keep-alive 的 httpx 连接池
+    - 通过信号量限制同时在途的请求数，超出的请求排队等待
+    - 每次调用可单独指定超时（总时长，流式调用同样适用）
+    - stream_chat() 逐块产出 token，首个 token 到达即可转发
+
+    Example:
+        >>> client = AsyncOpenAICompatibleClient(api_key="sk-...", max_concurrency=8)
+        >>> response = await client.chat(messages, timeout=10.0)
+        >>> async for delta in client.stream_chat(messages):
+        ...     print(delta, end="")
+        >>> await client.aclose()
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: str = "https://api.deepseek.com",
+        model: str = "deepseek-chat",
+        timeout: float = 30.0,
+        max_retries: int = 2,
+        max_concurrency: int = 16,
+        max_connections: int = 32,
+        max_keepalive_connections: int = 16,
+        keepalive_expiry: float = 60.0,
+        connect_timeout: float = 5.0
+    ):
+        """
+        初始化异步 OpenAI 兼容客户端
+
+        Args:
+            api_key: API 密钥，为 None 时从环境变量读取
+            base_url: API 基础 URL
+            model: 模型名称
+            timeout: 默认单次调用超时时间（秒）
+            max_retries: 最大重试次数
+            max_concurrency: 同时在途的最大请求数
+            max_connections: 连接池最大连接数
+            max_keepalive_connections: 连接池保留的空闲 keep-alive 连接数
+            keepalive_expiry: 空闲连接保留时长（秒）
+            connect_timeout: 建立连接的超时时间（秒）
+        """
+        if not OPENAI_AVAILABLE:
+            raise ImportError("openai package is required. Install with: pip install openai")
+
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self.base_url = base_url or os.getenv("OPENAI_BASE_URL", "https://api.deepseek.com")
+        self.model = model or os.getenv("LLM_MODEL", "deepseek-chat")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_concurrency = max_concurrency
+
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_flight = 0
+        self._waiting = 0
+
+        if self.api_key:
+            self._http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_keepalive_connections,
+                    keepalive_expiry=keepalive_expiry
+                ),
+                timeout=httpx.Timeout(timeout, connect=connect_timeout)
+            )
+            self._client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                timeout=timeout,
+                max_retries=max_retries,
+                http_client=self._http_client
+            )
+            self._enabled = True
+        else:
+            self._http_client = None
+            self._client = None
+            self._enabled = False
+
+    def is_enabled(self) -> bool:
+        """检查客户端是否可用"""
+        return self._enabled and self._client is not None
+
+    def get_model_info(self) -> Dict[str, Any]:
+        """获取模型信息及连接池占用情况"""
+        return {
+            "model": self.model,
+            "base_url": self.base_url,
+            "enabled": self.is_enabled(),
+            "timeout": self.timeout,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self._in_flight,
+            "waiting": self._waiting
+        }
+
+    async def _acquire(self) -> None:
+        """占用一个并发名额"""
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+        self._in_flight += 1
+
+    def _release(self) -> None:
+        """归还并发名额"""
+        self._in_flight -= 1
+        self._semaphore.release()
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        response_format: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None
+    ) -> LLMResponse:
+        """
+        发起对话请求
+
+        Args:
+            messages: 消息列表
+            temperature: 温度参数
+            max_tokens: 最大 token 数
+            response_format: 响应格式
+            timeout: 本次调用超时时间（秒），None 使用默认值
+
+        Returns:
+            LLMResponse 对象
+
+        Raises:
+            asyncio.TimeoutError: 超过本次调用的超时时间
+        """
+        if not self.is_enabled():
+            return LLMResponse(content="", model=self.model, usage=None)
+
+        timeout = timeout or self.timeout
+        kwargs = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "timeout": timeout
+        }
+        if response_format:
+            kwargs["response_format"] = response_format
+
+        await self._acquire()
+        try:
+            try:
+                response = await asyncio.wait_for(
+                    self._client.chat.completions.create(**kwargs), timeout
+                )
+            except asyncio.TimeoutError:
+                raise
+            except Exception:
+                # 某些 API 不支持 json_object，回退到普通模式
+                if not (response_format and response_format.get("type") == "json_object"):
+                    raise
+                kwargs.pop("response_format")
+                kwargs["messages"] = _with_json_instruction(messages)
+                response = await asyncio.wait_for(
+                    self._client.chat.completions.create(**kwargs), timeout
+                )
+        finally:
+            self._release()
+
+        return LLMResponse(
+            content=response.choices[0].message.content or "",
+            raw_response=response,
+            model=self.model,
+            usage=getattr(response, "usage", None)
+        )
+
+    async def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        response_format: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """
+        流式对话，模型每产出一块文本就立即产出
+
+        超时覆盖整个流（从发起请求到最后一个 token），而不仅是建立连接。
+
+        Args:
+            messages: 消息列表
+            temperature: 温度参数
+            max_tokens: 最大 token 数
+            response_format: 响应格式
+            timeout: 本次调用超时时间（秒），None 使用默认值
+
+        Yields:
+            模型输出的增量文本片段
+
+        Raises:
+            asyncio.TimeoutError: 超过本次调用的超时时间
+        """
+        if not self.is_enabled():
+            return
+
+        loop = asyncio.get_running_loop()
+        timeout = timeout or self.timeout
+        deadline = loop.time() + timeout
+        kwargs = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "timeout": timeout,
+            "stream": True
+        }
+        if response_format:
+            kwargs["response_format"] = response_format
+
+        await self._acquire()
+        try:
+            try:
+                stream = await asyncio.wait_for(
+                    self._client.chat.completions.create(**kwargs), timeout
+                )
+            except asyncio.TimeoutError:
+                raise
+            except Exception:
+                if not (response_format and response_format.get("type") == "json_object"):
+                    raise
+                kwargs.pop("response_format")
+                kwargs["messages"] = _with_json_instruction(messages)
+                stream = await asyncio.wait_for(
+                    self._client.chat.completions.create(**kwargs),
+                    max(deadline - loop.time(), 0)
+                )
+
+            chunks = stream.__aiter__()
+            try:
+                while True:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError()
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), remaining)
+                    except StopAsyncIteration:
+                        break
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                close = getattr(stream, "close", None)
+                if close is not None:
+                    await close()
+        finally:
+            self._release()
+
+    async def aclose(self) -> None:
+        """关闭共享连接池"""
+        if self._client is not None:
+            await self._client.close()
+        elif self._http_client is not None:
+            await self._http_client.aclose()
+
+
+def _with_json_instruction(messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """在第一条系统消息末尾追加"只返回 JSON"的要求（用于不支持 json_object 的 API）"""
+    enhanced_messages = messages.copy()
+    for i, msg in enumerate(enhanced_messages):
+        if msg.get("role") == "system":
+            enhanced_messages[i] = {
+                "role": "system",
+                "content": msg["content"] + JSON_ONLY_INSTRUCTION
+            }
+            break
+    return enhanced_messages
+
+
 # ==================== JSON 提取工具 ====================
 
 def extract_json_from_text(text: str) -> Optional[Dict]:
@@ -432,6 +749,7 @@ def create_llm_client(
 __all__ = [
     "LLMClient",
     "OpenAICompatibleClient",
+    "AsyncOpenAICompatibleClient",
     "LLMResponse",
     "extract_json_from_text",
     "create_llm_client",
@@ -0,0 +1,223 @@
+"""
+core/ai/llm_stream.py
+
+Token streaming for the OODA chat path.
+
+OodaOrchestrator is synchronous (it drives a SQLAlchemy session), so a
+streaming request runs it in a worker thread while the HTTP response is
+produced on the event loop. ChatStreamBridge connects the two: installed
+with set_stream_handler() in the worker thread, it runs each user-facing
+completion on the event loop through AsyncOpenAICompatibleClient (shared
+keep-alive pool, concurrency limit, per-call timeout) and pushes the text of
+the JSON ``message`` field onto an asyncio.Queue as soon as it is generated.
+"""
+import asyncio
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from core.ai.llm_client import AsyncOpenAICompatibleClient
+
+_ESCAPES = {
+    '"': '"',
+    '\\': '\\',
+    '/': '/',
+    'b': '\b',
+    'f': '\f',
+    'n': '\n',
+    'r': '\r',
+    't': '\t',
+}
+
+_local = threading.local()
+
+
+def set_stream_handler(handler: Optional[Callable[..., str]]) -> None:
+    """
+    Route this thread's user-facing completions through a streaming handler
+
+    The handler is called as ``handler(messages, **completion_kwargs)`` and
+    must return the full response text; LLMService.chat uses it instead of a
+    blocking completion while it is set. Pass None to clear it.
+    """
+    _local.stream_handler = handler
+
+
+def get_stream_handler() -> Optional[Callable[..., str]]:
+    """Streaming handler installed for this thread, or None"""
+    return getattr(_local, "stream_handler", None)
+
+
+class JsonFieldStreamer:
+    """
+    Incrementally decode one string field of a JSON object being streamed
+
+    LLM chat replies are JSON ({"message": ..., "suggested_actions": ...}), so
+    forwarding raw chunks would show the user JSON syntax. feed() returns only
+    the newly decoded characters of the target field, holding back incomplete
+    escape sequences until the next chunk completes them.
+
+    Example:
+        >>> streamer = JsonFieldStreamer("message")
+        >>> streamer.feed('{"mess')
+        ''
+        >>> streamer.feed('age": "房间 2')
+        '房间 2'
+        >>> streamer.feed('01", "suggested_actions": []}')
+        '01'
+    """
+
+    def __init__(self, field: str = "message"):
+        self._pattern = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self._buffer = ""
+        self._pos = 0
+        self._state = "seek"  # seek -> value -> done
+
+    @property
+    def done(self) -> bool:
+        """Whether the closing quote of the field has been seen"""
+        return self._state == "done"
+
+    def feed(self, chunk: str) -> str:
+        """
+        Consume a chunk of raw model output
+
+        Args:
+            chunk: Next piece of the streamed response
+
+        Returns:
+            Decoded field text that became available with this chunk
+        """
+        if self._state == "done":
+            return ""
+
+        self._buffer += chunk
+        if self._state == "seek":
+            match = self._pattern.search(self._buffer)
+            if not match:
+                return ""
+            self._state = "value"
+            self._pos = match.end()
+
+        buf = self._buffer
+        n = len(buf)
+        i = self._pos
+        out: List[str] = []
+
+        while i < n:
+            c = buf[i]
+            if c == '"':
+                self._state = "done"
+                i += 1
+                break
+            if c != '\\':
+                j = i
+                while j < n and buf[j] not in '"\\':
+                    j += 1
+                out.append(buf[i:j])
+                i = j
+                continue
+
+            # Escape sequence: wait for the rest of it if it is split across chunks
+            if i + 1 >= n:
+                break
+            esc = buf[i + 1]
+            if esc != 'u':
+                out.append(_ESCAPES.get(esc, esc))
+                i += 2
+                continue
+            if i + 6 > n:
+                break
+            try:
+                code = int(buf[i + 2:i + 6], 16)
+            except ValueError:
+                out.append(buf[i:i + 6])
+                i += 6
+                continue
+            if 0xD800 <= code < 0xDC00:
+                if i + 12 > n:
+                    break
+                if buf[i + 6:i + 8] == '\\u':
+                    try:
+                        low = int(buf[i + 8:i + 12], 16)
+                    except ValueError:
+                        low = None
+                    if low is not None and 0xDC00 <= low < 0xE000:
+                        out.append(chr(0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)))
+                        i += 12
+                        continue
+            out.append(chr(code))
+            i += 6
+
+        self._pos = i
+        return "".join(out)
+
+
+class ChatStreamBridge:
+    """
+    Stream handler that forwards tokens to an asyncio.Queue
+
+    Called from the worker thread running the orchestrator; blocks that thread
+    until the completion finishes on ``loop`` and returns the full response
+    text, so LLMService parses it exactly as in the non-streaming path.
+
+    Queue items are ``(event, data)`` tuples; token events carry the decoded
+    delta and the index of the completion it belongs to (a later completion,
+    e.g. result formatting, supersedes the text of an earlier one).
+    """
+
+    def __init__(
+        self,
+        client: AsyncOpenAICompatibleClient,
+        loop: asyncio.AbstractEventLoop,
+        queue: asyncio.Queue,
+        field: str = "message",
+        timeout: Optional[float] = None
+    ):
+        """
+        Args:
+            client: Async client that performs the completions
+            loop: Event loop the client (and queue consumer) runs on
+            queue: Queue receiving ("token", {...}) events
+            field: JSON field whose text is streamed to the user
+            timeout: Per-completion timeout, None for the client default
+        """
+        self.client = client
+        self.loop = loop
+        self.queue = queue
+        self.field = field
+        self.timeout = timeout
+        self._completions = 0
+
+    def __call__(self, messages: List[Dict[str, str]], **kwargs: Any) -> str:
+        """Run one completion on the event loop (called from a worker thread)"""
+        future = asyncio.run_coroutine_threadsafe(self._complete(messages, kwargs), self.loop)
+        return future.result()
+
+    async def _complete(self, messages: List[Dict[str, str]], kwargs: Dict[str, Any]) -> str:
+        index = self._completions
+        self._completions += 1
+        streamer = JsonFieldStreamer(self.field)
+        parts: List[str] = []
+
+        async for delta in self.client.stream_chat(
+            messages,
+            temperature=kwargs.get("temperature", 0.7),
+            max_tokens=kwargs.get("max_tokens", 1000),
+            response_format=kwargs.get("response_format"),
+            timeout=self.timeout,
+        ):
+            parts.append(delta)
+            text = streamer.feed(delta)
+            if text:
+                self.queue.put_nowait(("token", {"delta": text, "stream": index}))
+
+        return "".join(parts)
+
+
+__all__ = [
+    "set_stream_handler",
+    "get_stream_handler",
+    "JsonFieldStreamer",
+    "ChatStreamBridge",
+]
@@ -1246,6 +1246,9 @@ class OodaOrchestrator:
                     "duration_ms": int((t_decide_end - t_decide_start).total_seconds() * 1000),
                     "output": {"path": "llm", "action": result.get("suggested_actions", [{}])[0].get("action_type", "") if result.get("suggested_actions") else ""},
                 }
+                prompt_build = self._extract_prompt_build_stats()
+                if prompt_build:
+                    ooda_phases["decide"]["prompt_build"] = prompt_build
                 t_act_start = t_decide_end
 
                 # ========== DebugLogger: 记录 LLM 调用 ==========
@@ -1391,6 +1394,15 @@ class OodaOrchestrator:
             logger.debug(f"Failed to extract LLM debug info: {e}")
         return None
 
+    def _extract_prompt_build_stats(self) -> Optional[Dict[str, Any]]:
+        """从 LLMService 提取最近一次提示词构建统计（耗时、token、缓存命中率）"""
+        try:
+            stats = self.llm_service.get_prompt_build_stats()
+        except Exception as e:
+            logger.debug(f"Failed to extract prompt build stats: {e}")
+            return None
+        return stats if isinstance(stats, dict) and stats else None
+
     def _build_llm_context(self, user: Any) -> Dict[str, Any]:
         """构建 LLM 上下文 — delegates domain-specific data to adapter"""
         context = {
@@ -1705,17 +1717,17 @@ class OodaOrchestrator:
         从 OntologyRegistry 获取实体关键字
         从 ActionRegistry 获取操作 search_keywords
         """
-        from core.ai import QUERY_KEYWORDS, ACTION_KEYWORDS, HELP_KEYWORDS
+        from core.ai import QUERY_MATCHER, HELP_MATCHER, get_action_matcher
         from core.ontology.registry import registry
 
         message_lower = message.lower()
 
         # 帮助意图 - 优先检查
-        if any(kw in message_lower for kw in HELP_KEYWORDS):
+        if HELP_MATCHER.contains_any(message_lower):
             return 'help'
 
         # 查询类意图 - 使用通用查询动词 + 实体关键字匹配
-        if any(kw in message_lower for kw in QUERY_KEYWORDS):
+        if QUERY_MATCHER.contains_any(message_lower):
             matched_entities = registry.find_entities_by_keywords(message)
             if matched_entities:
                 entity = matched_entities[0]
@@ -1744,8 +1756,8 @@ class OodaOrchestrator:
                 return f'action_{best_match}'
 
         # Fallback: check generic ACTION_KEYWORDS + domain-injected keywords
-        all_action_keywords = list(ACTION_KEYWORDS) + list(self._domain_action_keywords)
-        if any(kw in message_lower for kw in all_action_keywords):
+        action_matcher = get_action_matcher(tuple(self._domain_action_keywords))
+        if action_matcher.contains_any(message_lower):
             return 'action_unknown'
 
         return 'unknown'
@@ -6,21 +6,64 @@ PromptBuilder - 动态提示词构建器
 从 OntologyRegistry 获取元数据，动态构建系统提示词。
 支持模板变量替换、实体描述注入、操作描述注入、规则描述注入。
 
+各段（实体、操作、状态机、规则、权限……）作为独立片段缓存，键为注册表版本 +
+角色 / PromptShaper 过滤条件；每轮对话只拼装片段，片段的 token 数预先估算。
+
 SPEC-51: 动态注入本体元数据
 SPEC-52: 完整的 build_system_prompt() 实现
 SPEC-13: 语义查询语法提示词 (Semantic Query Syntax)
 """
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Callable, Dict, FrozenSet, List, Optional, Any, Tuple
 from datetime import date, timedelta
 from dataclasses import dataclass, field
+from functools import lru_cache
 import logging
+import time
 
 from core.ontology.registry import registry, OntologyRegistry
 from core.ontology.metadata import EntityMetadata, ActionMetadata, PropertyMetadata, StateMachine
+from core.ontology.query_plan import PlanCache
 
 logger = logging.getLogger(__name__)
 
 
+def estimate_tokens(text: str) -> int:
+    """
+    估算文本 token 数（不依赖分词器）
+
+    中日韩字符按 1 字 1 token，其余按 4 字符 1 token。
+
+    Example:
+        >>> estimate_tokens("查询空房 room")
+        6
+    """
+    if not text:
+        return 0
+    wide = sum(1 for ch in text if ch >= "\u2e80")
+    return wide + (len(text) - wide + 3) // 4
+
+
+# 模板、领域提示词等固定文本的 token 数只估算一次
+_static_tokens = lru_cache(maxsize=64)(estimate_tokens)
+
+
+@dataclass(frozen=True)
+class PromptFragment:
+    """提示词片段（带预估 token 数）"""
+    name: str
+    text: str
+    tokens: int
+
+    @classmethod
+    def of(cls, name: str, text: str) -> "PromptFragment":
+        return cls(name, text, estimate_tokens(text))
+
+
+def _name_filter(names: Optional[List[str]]) -> Optional[FrozenSet[str]]:
+    """allowed_entities / allowed_actions 转为缓存键（None = 不过滤）"""
+    return frozenset(names) if names is not None else None
+
+
 @dataclass
 class PromptContext:
     """提示词上下文"""
@@ -148,6 +191,10 @@ class PromptBuilder:
         self._admin_roles: set = set(admin_roles) if admin_roles else set()
         self._adapter = adapter
         self._context: Optional[PromptContext] = None
+        # 片段缓存：注册表版本变化时整体失效
+        self._sections = PlanCache(max_entries=128)
+        self._section_hits: Dict[str, bool] = {}
+        self.last_build_stats: Dict[str, Any] = {}
 
     def build_system_prompt(
         self,
@@ -175,47 +222,137 @@ class PromptBuilder:
         if context is None:
             context = PromptContext()
 
+        start = time.perf_counter()
+        sections = self.build_sections(context)
+        prompt = self._assemble(sections, context, base_template)
+
+        # 注入分店上下文
+        if context.branch_name:
+            prompt += f"\n\n## 当前分店\n当前操作分店: {context.branch_name}。所有查询和操作结果仅限于此分店范围内的数据。"
+
+        # 应用自定义变量替换
+        if context.custom_variables:
+            prompt = self._apply_custom_variables(prompt, context.custom_variables)
+
+        self._record_build(sections, context, base_template, start)
+        return prompt
+
+    def build_sections(
+        self,
+        context: PromptContext,
+        include_actions: Optional[bool] = None,
+    ) -> Dict[str, PromptFragment]:
+        """
+        构建模板各占位符对应的片段
+
+        除角色上下文外，各段按 (注册表版本, 段名, 过滤条件) 缓存：
+        实体/状态机按 allowed_entities，操作按 allowed_actions + ActionRegistry 版本，
+        权限按角色，日期按当天。
+
+        Args:
+            context: 提示词上下文
+            include_actions: 覆盖 context.include_actions（发现模式传 False）
+
+        Returns:
+            占位符名 -> PromptFragment（按模板顺序）
+        """
+        if include_actions is None:
+            include_actions = context.include_actions
+        entities = _name_filter(context.allowed_entities)
+        actions = _name_filter(context.allowed_actions)
+        fragment = PromptFragment.of
+
         # Store context for sub-methods (e.g. action/entity filtering)
-        self._context = context
+        previous, self._context = self._context, context
+        self._section_hits = {}
         try:
-            # 构建各部分描述
-            role_context = self._build_role_context(context) if context.user_role else ""
-            semantic_query_syntax = self._build_semantic_query_syntax() if context.include_entities else ""
-            entity_descriptions = self._build_entity_descriptions(context) if context.include_entities else ""
-            action_descriptions = self._build_action_descriptions() if context.include_actions else ""
-            state_machine_descriptions = self._build_state_machine_descriptions() if context.include_state_machines else ""
-            rule_descriptions = self._build_rule_descriptions() if context.include_rules else ""
-            permission_context = self._build_permission_context(context) if context.include_permissions else ""
-            date_context = self._build_date_context(context.current_date)
-
-            # 使用模板构建
-            template = base_template or self.BASE_SYSTEM_PROMPT
-
-            domain_prompt = context.domain_prompt if context.domain_prompt else ""
-
-            prompt = template.format(
-                domain_prompt=domain_prompt,
-                role_context=role_context,
-                semantic_query_syntax=semantic_query_syntax,
-                entity_descriptions=entity_descriptions,
-                action_descriptions=action_descriptions,
-                state_machine_descriptions=state_machine_descriptions,
-                rule_descriptions=rule_descriptions,
-                permission_context=permission_context,
-                date_context=date_context
-            )
-
-            # 注入分店上下文
-            if context.branch_name:
-                prompt += f"\n\n## 当前分店\n当前操作分店: {context.branch_name}。所有查询和操作结果仅限于此分店范围内的数据。"
-
-            # 应用自定义变量替换
-            if context.custom_variables:
-                prompt = self._apply_custom_variables(prompt, context.custom_variables)
-
-            return prompt
+            return {
+                "role_context": fragment(
+                    "role_context", self._build_role_context(context) if context.user_role else ""),
+                "semantic_query_syntax": self._section(
+                    "semantic_query_syntax", (), self._build_semantic_query_syntax
+                ) if context.include_entities else fragment("semantic_query_syntax", ""),
+                "entity_descriptions": self._section(
+                    "entity_descriptions",
+                    (entities, self._should_include_system_entities(context)),
+                    lambda: self._build_entity_descriptions(context),
+                ) if context.include_entities else fragment("entity_descriptions", ""),
+                "action_descriptions": self._section(
+                    "action_descriptions",
+                    (actions, self._action_registry_version()),
+                    self._build_action_descriptions,
+                ) if include_actions else fragment("action_descriptions", ""),
+                "state_machine_descriptions": self._section(
+                    "state_machine_descriptions", (entities,), self._build_state_machine_descriptions
+                ) if context.include_state_machines else fragment("state_machine_descriptions", ""),
+                "rule_descriptions": self._section(
+                    "rule_descriptions", (), self._build_rule_descriptions
+                ) if context.include_rules else fragment("rule_descriptions", ""),
+                "permission_context": self._section(
+                    "permission_context", (context.user_role,),
+                    lambda: self._build_permission_context(context),
+                ) if context.include_permissions else fragment("permission_context", ""),
+                "date_context": self._section(
+                    "date_context", (context.current_date,),
+                    lambda: self._build_date_context(context.current_date),
+                ),
+            }
         finally:
-            self._context = None
+            self._context = previous
+
+    def _section(self, name: str, key: Tuple, build: Callable[[], str]) -> PromptFragment:
+        """取缓存片段，未命中时构建并估算 token 数"""
+        built = []
+
+        def _build() -> PromptFragment:
+            built.append(True)
+            return PromptFragment.of(name, build())
+
+        fragment = self._sections.get_or_build((name,) + key, _build, self.registry)
+        self._section_hits[name] = not built
+        return fragment
+
+    def _action_registry_version(self) -> Any:
+        if self._action_registry is None:
+            return None
+        return getattr(self._action_registry, "version", None)
+
+    def _assemble(
+        self,
+        sections: Dict[str, PromptFragment],
+        context: PromptContext,
+        base_template: Optional[str],
+    ) -> str:
+        """用片段填充模板"""
+        template = base_template or self.BASE_SYSTEM_PROMPT
+        return template.format(
+            domain_prompt=context.domain_prompt or "",
+            **{name: fragment.text for name, fragment in sections.items()},
+        )
+
+    def _record_build(
+        self,
+        sections: Dict[str, PromptFragment],
+        context: PromptContext,
+        base_template: Optional[str],
+        start: float,
+    ) -> None:
+        """记录本次构建的耗时、片段 token 数与缓存命中率（供调试会话使用）"""
+        cached = sorted(name for name, hit in self._section_hits.items() if hit)
+        tokens = {name: fragment.tokens for name, fragment in sections.items()}
+        static = _static_tokens(base_template or self.BASE_SYSTEM_PROMPT) + _static_tokens(context.domain_prompt or "")
+        self.last_build_stats = {
+            "build_ms": round((time.perf_counter() - start) * 1000, 3),
+            "estimated_tokens": static + sum(tokens.values()),
+            "section_tokens": tokens,
+            "cached_sections": cached,
+            "cache_hit_rate": round(len(cached) / len(self._section_hits), 3) if self._section_hits else 0.0,
+            "registry_version": self.registry.version,
+        }
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """片段缓存统计（累计命中/未命中、条目数）"""
+        return self._sections.get_stats()
 
     # SPEC-P06: Phase 3 discovery prompt template
     DISCOVERY_TOOL_PROTOCOL = """
@@ -263,34 +400,11 @@ class PromptBuilder:
         if context is None:
             context = PromptContext()
 
-        # SPEC-P01: Store context for sub-methods
-        self._context = context
-
-        # Build parts — same as normal but skip actions
-        role_context = self._build_role_context(context) if context.user_role else ""
-        semantic_query_syntax = self._build_semantic_query_syntax() if context.include_entities else ""
-        entity_descriptions = self._build_entity_descriptions(context) if context.include_entities else ""
-        # No action_descriptions — that's the whole point of discovery mode
-        action_descriptions = ""
-        state_machine_descriptions = self._build_state_machine_descriptions() if context.include_state_machines else ""
-        rule_descriptions = self._build_rule_descriptions() if context.include_rules else ""
-        permission_context = self._build_permission_context(context) if context.include_permissions else ""
-        date_context = self._build_date_context(context.current_date)
-
-        template = base_template or self.BASE_SYSTEM_PROMPT
-        domain_prompt = context.domain_prompt if context.domain_prompt else ""
-
-        prompt = template.format(
-            domain_prompt=domain_prompt,
-            role_context=role_context,
-            semantic_query_syntax=semantic_query_syntax,
-            entity_descriptions=entity_descriptions,
-            action_descriptions=action_descriptions,
-            state_machine_descriptions=state_machine_descriptions,
-            rule_descriptions=rule_descriptions,
-            permission_context=permission_context,
-            date_context=date_context,
-        )
+        start = time.perf_counter()
+        # Same cached sections as normal mode, but no action_descriptions —
+        # that's the whole point of discovery mode
+        sections = self.build_sections(context, include_actions=False)
+        prompt = self._assemble(sections, context, base_template)
 
         if context.custom_variables:
             prompt = self._apply_custom_variables(prompt, context.custom_variables)
@@ -298,6 +412,7 @@ class PromptBuilder:
         # Append tool protocol
         prompt += self.DISCOVERY_TOOL_PROTOCOL
 
+        self._record_build(sections, context, base_template, start)
         return prompt
 
     def _build_role_context(self, context: PromptContext) -> str:
@@ -948,6 +1063,7 @@ class PromptBuilder:
     def invalidate_cache(self):
         """清除缓存 - 当本体发生变化时调用"""
         self._schema_cache = None
+        self._sections.clear()
 
     # ==================== NL2OntologyQuery 支持 ====================
 
@@ -1039,6 +1155,14 @@ class PromptBuilder:
 
         return "\n".join(lines)
 
+    def build_domain_glossary(self) -> str:
+        """领域关键词表（按 ActionRegistry 版本缓存，见 _build_domain_glossary）"""
+        if self._action_registry is None:
+            return ""
+        return self._section(
+            "domain_glossary", (self._action_registry_version(),), self._build_domain_glossary
+        ).text
+
     def _build_domain_glossary(self) -> str:
         """
         构建领域关键词表（Domain Glossary）
@@ -1151,5 +1275,7 @@ def build_system_prompt(
 __all__ = [
     "PromptBuilder",
     "PromptContext",
+    "PromptFragment",
     "build_system_prompt",
+    "estimate_tokens",
 ]
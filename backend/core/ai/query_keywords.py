@@ -5,7 +5,13 @@ core/ai/query_keywords.py
 
 这些是用于识别用户查询意图的通用动词/介词，
 与具体领域无关，适用于所有业务领域。
+
+*_MATCHER 为对应关键字编译好的匹配自动机，对小写消息单遍扫描。
 """
+from functools import lru_cache
+from typing import Tuple
+
+from core.ontology.keyword_matcher import KeywordMatcher
 
 # 查询类关键词 - 用于识别用户是否在执行查询操作
 QUERY_KEYWORDS = [
@@ -31,4 +37,19 @@ HELP_KEYWORDS = [
     'help', 'how to', 'how do i'
 ]
 
-__all__ = ['QUERY_KEYWORDS', 'ACTION_KEYWORDS', 'HELP_KEYWORDS']
+QUERY_MATCHER = KeywordMatcher(QUERY_KEYWORDS)
+ACTION_MATCHER = KeywordMatcher(ACTION_KEYWORDS)
+HELP_MATCHER = KeywordMatcher(HELP_KEYWORDS)
+
+
+@lru_cache(maxsize=32)
+def get_action_matcher(domain_keywords: Tuple[str, ...] = ()) -> KeywordMatcher:
+    """通用操作关键词 + 领域注入关键词的匹配器（按领域关键词元组缓存）"""
+    if not domain_keywords:
+        return ACTION_MATCHER
+    return KeywordMatcher(list(ACTION_KEYWORDS) + list(domain_keywords))
+
+__all__ = [
+    'QUERY_KEYWORDS', 'ACTION_KEYWORDS', 'HELP_KEYWORDS',
+    'QUERY_MATCHER', 'ACTION_MATCHER', 'HELP_MATCHER', 'get_action_matcher',
+]
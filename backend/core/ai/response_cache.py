@@ -0,0 +1,361 @@
+"""
+core/ai/response_cache.py
+
+LLM response cache
+
+Sits between LLMService and the provider so repeated prompts (topic relevance
+checks, parameter extraction for common phrases, discovery prompts) are
+answered without a round trip.
+
+- Exact mode: key = sha256(model, temperature, request params, normalized messages)
+- Semantic mode (optional, temperature 0 only): when the exact key misses, the
+  last user message is embedded and compared with cached calls that share the
+  same preceding messages (system prompt, history); a cosine similarity above
+  the threshold is served as a hit
+- Entries expire after ``ttl_seconds`` and the least recently used entry is
+  evicted beyond ``max_entries``; invalidate() drops everything (called when
+  the ontology changes, because prompts embed the schema)
+"""
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class CachedResponse:
+    """A cached completion"""
+    content: str
+    usage: Optional[Dict[str, int]] = None
+    latency_ms: int = 0
+    created_at: float = field(default_factory=time.monotonic)
+    match: str = "exact"  # "exact" | "semantic"
+
+    @property
+    def total_tokens(self) -> int:
+        """Tokens the original call consumed (0 if unknown)"""
+        if not self.usage:
+            return 0
+        return self.usage.get("total_tokens") or 0
+
+    def to_completion(self) -> Any:
+        """
+        Shape the entry like an OpenAI chat completion
+
+        Callers read ``response.choices[0].message.content`` and
+        ``response.usage``, so a hit can be returned in place of a provider
+        response.
+        """
+        usage = SimpleNamespace(**self.usage) if self.usage else None
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=self.content))],
+            usage=usage,
+            cached=self.match,
+        )
+
+
+def usage_to_dict(usage: Any) -> Optional[Dict[str, int]]:
+    """Convert an SDK usage object (or dict) to a plain dict"""
+    if usage is None:
+        return None
+    if isinstance(usage, dict):
+        return dict(usage)
+    values = {
+        name: getattr(usage, name, None)
+        for name in ("prompt_tokens", "completion_tokens", "total_tokens")
+    }
+    if not any(isinstance(v, int) for v in values.values()):
+        return None
+    return values
+
+
+class LLMResponseCache:
+    """
+    TTL + LRU cache of LLM completions
+
+    Example:
+        >>> cache = LLMResponseCache(max_entries=256, ttl_seconds=300)
+        >>> cache.get("deepseek-chat", 0.0, messages) is None
+        True
+        >>> cache.put("deepseek-chat", 0.0, messages, '{"relevance": "continuation"}',
+        ...           usage={"total_tokens": 120}, latency_ms=850)
+        >>> cache.get("deepseek-chat", 0.0, messages).content
+        '{"relevance": "continuation"}'
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl_seconds: float = 600.0,
+        embedding_service: Optional[Any] = None,
+        similarity_threshold: float = 0.97
+    ):
+        """
+        Initialize response cache
+
+        Args:
+            max_entries: Maximum cached completions (LRU eviction when exceeded)
+            ttl_seconds: Lifetime of an entry
+            embedding_service: EmbeddingService enabling semantic matching of
+                deterministic (temperature 0) calls; None for exact matching only
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.embedding_service = embedding_service
+        self.similarity_threshold = similarity_threshold
+
+        self._lock = threading.Lock()
+        # key -> (entry, prefix key for semantic lookup or None)
+        self._entries: "OrderedDict[str, Tuple[CachedResponse, Optional[str]]]" = OrderedDict()
+        # prefix key -> {key: unit vector of the last user message}
+        self._semantic: Dict[str, Dict[str, np.ndarray]] = {}
+
+        self._hits = 0
+        self._semantic_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+        self._saved_latency_ms = 0
+        self._saved_tokens = 0
+
+    # ==================== Keys ====================
+
+    @staticmethod
+    def normalize_messages(messages: List[Dict[str, Any]]) -> List[List[str]]:
+        """Role + content with runs of whitespace collapsed"""
+        return [
+            [str(m.get("role", "")), _WHITESPACE.sub(" ", str(m.get("content") or "")).strip()]
+            for m in messages
+        ]
+
+    @staticmethod
+    def _digest(payload: Any) -> str:
+        data = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def make_key(
+        self,
+        model: Optional[str],
+        temperature: Optional[float],
+        messages: List[Dict[str, Any]],
+        params: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Exact cache key for a request"""
+        return self._digest([model, temperature, params or {}, self.normalize_messages(messages)])
+
+    def _prefix_key(self, model, temperature, messages, params) -> Optional[str]:
+        """Key of everything except the final user message (semantic bucket)"""
+        if not messages or messages[-1].get("role") != "user":
+            return None
+        return self._digest(
+            ["semantic", model, temperature, params or {}, self.normalize_messages(messages[:-1])]
+        )
+
+    def _semantic_eligible(self, temperature: Optional[float]) -> bool:
+        return self.embedding_service is not None and temperature is not None and temperature <= 0
+
+    def _embed_last_message(self, messages: List[Dict[str, Any]]) -> Optional[np.ndarray]:
+        text = self.normalize_messages(messages[-1:])[0][1]
+        if not text:
+            return None
+        try:
+            vector = self.embedding_service.embed(text)
+        except Exception as e:
+            logger.debug(f"LLMResponseCache: embedding failed: {e}")
+            return None
+        if vector is None:
+            return None
+        vec = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(vec))
+        if norm == 0.0:
+            # Disabled embedding services return zero vectors
+            return None
+        return vec / norm
+
+    # ==================== Lookup ====================
+
+    def get(
+        self,
+        model: Optional[str],
+        temperature: Optional[float],
+        messages: List[Dict[str, Any]],
+        params: Optional[Dict[str, Any]] = None
+    ) -> Optional[CachedResponse]:
+        """
+        Look up a cached completion
+
+        Returns:
+            CachedResponse (``match`` is "exact" or "semantic"), or None on a miss
+        """
+        key = self.make_key(model, temperature, messages, params)
+        with self._lock:
+            entry = self._lookup_locked(key)
+            if entry is not None:
+                self._record_hit_locked(entry, semantic=False)
+                return entry
+
+        if self._semantic_eligible(temperature):
+            prefix = self._prefix_key(model, temperature, messages, params)
+            entry = self._semantic_lookup(prefix, messages) if prefix else None
+            if entry is not None:
+                return entry
+
+        with self._lock:
+            self._misses += 1
+        return None
+
+    def _lookup_locked(self, key: str) -> Optional[CachedResponse]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        entry, _ = item
+        if time.monotonic() - entry.created_at > self.ttl_seconds:
+            self._remove_locked(key)
+            self._expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _semantic_lookup(self, prefix: str, messages: List[Dict[str, Any]]) -> Optional[CachedResponse]:
+        with self._lock:
+            if not self._semantic.get(prefix):
+                return None
+
+        query = self._embed_last_message(messages)
+        if query is None:
+            return None
+
+        with self._lock:
+            bucket = self._semantic.get(prefix)
+            if not bucket:
+                return None
+            keys = list(bucket.keys())
+            scores = np.stack([bucket[k] for k in keys]) @ query
+            best = int(np.argmax(scores))
+            if float(scores[best]) < self.similarity_threshold:
+                return None
+            entry = self._lookup_locked(keys[best])
+            if entry is None:
+                return None
+            self._record_hit_locked(entry, semantic=True)
+            return CachedResponse(
+                content=entry.content,
+                usage=entry.usage,
+                latency_ms=entry.latency_ms,
+                created_at=entry.created_at,
+                match="semantic",
+            )
+
+    def _record_hit_locked(self, entry: CachedResponse, semantic: bool) -> None:
+        if semantic:
+            self._semantic_hits += 1
+        else:
+            self._hits += 1
+        self._saved_latency_ms += entry.latency_ms
+        self._saved_tokens += entry.total_tokens
+
+    # ==================== Store ====================
+
+    def put(
+        self,
+        model: Optional[str],
+        temperature: Optional[float],
+        messages: List[Dict[str, Any]],
+        content: str,
+        usage: Optional[Dict[str, int]] = None,
+        latency_ms: int = 0,
+        params: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Cache a completion (empty content is not cached)"""
+        if not content:
+            return
+
+        key = self.make_key(model, temperature, messages, params)
+        prefix = None
+        vector = None
+        if self._semantic_eligible(temperature):
+            prefix = self._prefix_key(model, temperature, messages, params)
+            if prefix:
+                vector = self._embed_last_message(messages)
+            if vector is None:
+                prefix = None
+
+        entry = CachedResponse(
+            content=content, usage=usage, latency_ms=latency_ms, created_at=time.monotonic()
+        )
+        with self._lock:
+            if key in self._entries:
+                self._remove_locked(key)
+            self._entries[key] = (entry, prefix)
+            if prefix is not None:
+                self._semantic.setdefault(prefix, {})[key] = vector
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove_locked(oldest)
+                self._evictions += 1
+
+    def _remove_locked(self, key: str) -> None:
+        _, prefix = self._entries.pop(key)
+        if prefix is not None:
+            bucket = self._semantic.get(prefix)
+            if bucket is not None:
+                bucket.pop(key, None)
+                if not bucket:
+                    del self._semantic[prefix]
+
+    # ==================== Maintenance ====================
+
+    def invalidate(self) -> None:
+        """Drop every entry (prompts embed the ontology, so schema changes stale them)"""
+        with self._lock:
+            self._entries.clear()
+            self._semantic.clear()
+            self._invalidations += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+
+        Returns:
+            Dict with entries, hits, semantic_hits, misses, hit_rate, evictions,
+            expirations, invalidations, saved_latency_ms, saved_tokens
+        """
+        with self._lock:
+            hits = self._hits + self._semantic_hits
+            lookups = hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "semantic": self.embedding_service is not None,
+                "hits": self._hits,
+                "semantic_hits": self._semantic_hits,
+                "misses": self._misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+                "saved_latency_ms": self._saved_latency_ms,
+                "saved_tokens": self._saved_tokens,
+            }
+
+
+__all__ = [
+    "CachedResponse",
+    "LLMResponseCache",
+    "usage_to_dict",
+]
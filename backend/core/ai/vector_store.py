@@ -3,19 +3,27 @@ core/ai/vector_store.py
 
 SQLite-based vector storage for semantic search.
 
-Uses pure Python implementation for compatibility (no external extension required).
+SQLite is the durable store. Similarity search runs inside SQLite through the
+sqlite-vec ``vec0`` virtual table when the extension can be loaded, and falls
+back to an in-memory NumPy matrix of pre-normalized float32 vectors otherwise.
 Supports indexing schema items (entities, properties, actions) with semantic search.
 """
 import sqlite3
 import json
+import logging
 import os
-from typing import List, Dict, Any, Optional, Set, Literal
+import re
+from typing import List, Dict, Any, Optional, Set, Literal, Sequence, Tuple
 from dataclasses import dataclass, field, asdict
 from functools import lru_cache
 import math
 
+import numpy as np
+
 from core.ai.embedding import EmbeddingService
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class SchemaItem:
@@ -111,16 +119,393 @@ def cosine_similarity(a: List[float], b: List[float]) -> float:
     return dot_product / (magnitude_a * magnitude_b)
 
 
+class VectorMatrix:
+    """
+    In-memory similarity index over pre-normalized float32 vectors
+
+    Rows live in one contiguous ``(capacity, dim)`` matrix so a query costs a
+    single matrix-vector product. Type and entity are stored as integer codes
+    so filters become boolean masks instead of per-row string comparisons.
+
+    Each row carries an insertion sequence number; ties are broken by it so
+    ranking matches the SQLite scan order of the previous row-by-row search.
+
+    Example:
+        >>> matrix = VectorMatrix()
+        >>> matrix.upsert("Guest.name", [0.1, 0.2], "property", "Guest")
+        >>> matrix.search([0.1, 0.2], top_k=1)
+        [('Guest.name', 1.0)]
+    """
+
+    name = "matrix"
+    persistent = False
+
+    _INITIAL_CAPACITY = 64
+
+    def __init__(self, dim: Optional[int] = None):
+        """
+        Args:
+            dim: Vector dimension (inferred from the first vector if None)
+        """
+        self.dim = dim
+        self._size = 0
+        self._next_seq = 0
+        self._ids: List[str] = []
+        self._row_of: Dict[str, int] = {}
+        self._codes: Dict[str, int] = {}
+        self._matrix = np.zeros((0, dim or 0), dtype=np.float32)
+        self._type_codes = np.zeros(0, dtype=np.int32)
+        self._entity_codes = np.zeros(0, dtype=np.int32)
+        self._seq = np.zeros(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._row_of
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the vector matrix"""
+        return int(self._matrix.nbytes)
+
+    def upsert(self, item_id: str, vector: Sequence[float], item_type: str, entity: str) -> None:
+        """
+        Insert or replace a vector
+
+        A replaced row gets a fresh sequence number, mirroring SQLite's
+        INSERT OR REPLACE which moves the row to the end of the table.
+        """
+        row_vector = self._normalize(vector)
+
+        row = self._row_of.get(item_id)
+        if row is None:
+            self._ensure_capacity(self._size + 1)
+            row = self._size
+            self._size += 1
+            self._ids.append(item_id)
+            self._row_of[item_id] = row
+
+        self._matrix[row] = row_vector
+        self._type_codes[row] = self._code(item_type)
+        self._entity_codes[row] = self._code(entity)
+        self._seq[row] = self._next_seq
+        self._next_seq += 1
+
+    def remove(self, item_id: str) -> bool:
+        """Remove a vector by swapping the last row into its slot (O(dim))"""
+        row = self._row_of.pop(item_id, None)
+        if row is None:
+            return False
+
+        last = self._size - 1
+        if row != last:
+            moved_id = self._ids[last]
+            self._matrix[row] = self._matrix[last]
+            self._type_codes[row] = self._type_codes[last]
+            self._entity_codes[row] = self._entity_codes[last]
+            self._seq[row] = self._seq[last]
+            self._ids[row] = moved_id
+            self._row_of[moved_id] = row
+
+        self._ids.pop()
+        self._size = last
+        return True
+
+    def clear(self) -> None:
+        """Drop all vectors and filter codes and release the arrays (keeps the dimension)"""
+        self._size = 0
+        self._next_seq = 0
+        self._ids.clear()
+        self._row_of.clear()
+        self._codes.clear()
+        self._matrix = np.zeros((0, self.dim or 0), dtype=np.float32)
+        self._type_codes = np.zeros(0, dtype=np.int32)
+        self._entity_codes = np.zeros(0, dtype=np.int32)
+        self._seq = np.zeros(0, dtype=np.int64)
+
+    def search(
+        self,
+        query: Sequence[float],
+        top_k: int = 5,
+        item_type: Optional[str] = None,
+        entity_filter: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Return the ``top_k`` most similar ids with their cosine scores
+
+        Args:
+            query: Query vector (need not be normalized)
+            top_k: Maximum number of results
+            item_type: Restrict to this item type
+            entity_filter: Restrict to this entity
+
+        Returns:
+            List of (item_id, score) ordered by descending score
+        """
+        if self._size == 0 or top_k <= 0:
+            return []
+
+        query_vector = self._normalize(query)
+        n = self._size
+
+        candidates = None
+        for value, codes in ((item_type, self._type_codes), (entity_filter, self._entity_codes)):
+            if not value:
+                continue
+            code = self._codes.get(value)
+            if code is None:
+                return []
+            mask = codes[:n] == code
+            candidates = mask if candidates is None else candidates & mask
+
+        if candidates is None:
+            rows = np.arange(n)
+            scores = self._matrix[:n] @ query_vector
+        else:
+            rows = np.flatnonzero(candidates)
+            if rows.size == 0:
+                return []
+            if rows.size * 2 < n:
+                # Selective filter: gathering the rows beats scoring all of them
+                scores = self._matrix[rows] @ query_vector
+            else:
+                scores = (self._matrix[:n] @ query_vector)[rows]
+
+        if rows.size > top_k:
+            # Partition to the k-th best score, then keep every row tied with it
+            threshold = np.partition(scores, rows.size - top_k)[rows.size - top_k]
+            keep = scores >= threshold
+            rows, scores = rows[keep], scores[keep]
+
+        order = np.lexsort((self._seq[rows], -scores))[:top_k]
+        return [(self._ids[rows[i]], float(scores[i])) for i in order]
+
+    def _normalize(self, vector: Sequence[float]) -> np.ndarray:
+        arr = np.asarray(vector, dtype=np.float32).reshape(-1)
+        if self.dim is None or (self._size == 0 and arr.shape[0] != self.dim):
+            self.dim = arr.shape[0]
+            self._matrix = np.zeros((self._matrix.shape[0], self.dim), dtype=np.float32)
+        elif arr.shape[0] != self.dim:
+            raise ValueError("Vectors must have the same length")
+
+        norm = float(np.linalg.norm(arr))
+        if norm == 0.0:
+            return arr
+        return arr / norm
+
+    def _code(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self._codes)
+            self._codes[value] = code
+        return code
+
+    def _ensure_capacity(self, needed: int) -> None:
+        capacity = self._matrix.shape[0]
+        if needed <= capacity:
+            return
+        new_capacity = max(self._INITIAL_CAPACITY, capacity * 2, needed)
+
+        matrix = np.zeros((new_capacity, self.dim), dtype=np.float32)
+        matrix[:self._size] = self._matrix[:self._size]
+        self._matrix = matrix
+        for name in ("_type_codes", "_entity_codes", "_seq"):
+            old = getattr(self, name)
+            grown = np.zeros(new_capacity, dtype=old.dtype)
+            grown[:self._size] = old[:self._size]
+            setattr(self, name, grown)
+
+
+def load_sqlite_vec(conn: sqlite3.Connection) -> bool:
+    """
+    Load the sqlite-vec extension into a connection
+
+    Returns:
+        True if ``vec0`` is available on the connection, False if the package
+        is missing or this Python's sqlite3 cannot load extensions
+    """
+    try:
+        import sqlite_vec
+        conn.enable_load_extension(True)
+        try:
+            sqlite_vec.load(conn)
+        finally:
+            conn.enable_load_extension(False)
+        return True
+    except (ImportError, AttributeError, sqlite3.Error) as e:
+        logger.info(f"sqlite-vec unavailable, using in-memory vector matrix: {e}")
+        return False
+
+
+class SqliteVecIndex:
+    """
+    KNN index stored in a sqlite-vec ``vec0`` virtual table
+
+    Shares the VectorStore connection, so vector writes commit in the same
+    transaction as ``schema_items`` and persist with the database file.
+    Vectors are normalized before insert; L2 distance on unit vectors orders
+    results exactly like cosine similarity (cos = 1 - d^2 / 2) and keeps zero
+    vectors well-defined.
+
+    The table is created on the first insert, using that vector's dimension.
+    Rows carry an insertion sequence so ties rank like :class:`VectorMatrix`.
+    """
+
+    name = "sqlite_vec"
+    persistent = True
+
+    TABLE = "schema_item_vectors"
+
+    # sqlite-vec's upper bound on k for a KNN query
+    MAX_K = 4096
+
+    def __init__(self, conn: sqlite3.Connection):
+        """
+        Args:
+            conn: Connection with the sqlite-vec extension already loaded
+        """
+        self.conn = conn
+        self.dim = self._existing_dim()
+        self._next_seq = 0
+        if self.dim is not None:
+            max_seq = self.conn.execute(f"SELECT MAX(seq) FROM {self.TABLE}").fetchone()[0]
+            self._next_seq = (max_seq or 0) + 1
+
+    def __len__(self) -> int:
+        if self.dim is None:
+            return 0
+        return self.conn.execute(f"SELECT COUNT(*) FROM {self.TABLE}").fetchone()[0]
+
+    @property
+    def nbytes(self) -> int:
+        """Vectors live in SQLite pages, not in process memory"""
+        return 0
+
+    def upsert(self, item_id: str, vector: Sequence[float], item_type: str, entity: str) -> None:
+        """Insert or replace a vector"""
+        arr = self._normalize(vector)
+        self.conn.execute(f"DELETE FROM {self.TABLE} WHERE item_id = ?", (item_id,))
+        self.conn.execute(
+            f"INSERT INTO {self.TABLE} (item_id, embedding, item_type, entity, seq) VALUES (?, ?, ?, ?, ?)",
+            (item_id, arr.tobytes(), item_type, entity, self._next_seq),
+        )
+        self._next_seq += 1
+
+    def remove(self, item_id: str) -> bool:
+        """Remove a vector"""
+        if self.dim is None:
+            return False
+        cursor = self.conn.execute(f"DELETE FROM {self.TABLE} WHERE item_id = ?", (item_id,))
+        return cursor.rowcount > 0
+
+    def clear(self) -> None:
+        """Drop the virtual table; the next insert recreates it"""
+        self.conn.execute(f"DROP TABLE IF EXISTS {self.TABLE}")
+        self.dim = None
+        self._next_seq = 0
+
+    def search(
+        self,
+        query: Sequence[float],
+        top_k: int = 5,
+        item_type: Optional[str] = None,
+        entity_filter: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Return the ``top_k`` most similar ids with their cosine scores
+
+        Filters run as vec0 metadata constraints inside the KNN query. One
+        extra neighbour is fetched to detect a tie at the k-th position; only
+        then are the tied rows re-read by a filtered scan ordered by sequence.
+        """
+        if self.dim is None or top_k <= 0:
+            return []
+
+        query_blob = self._normalize(query).tobytes()
+
+        filters, filter_params = [], []
+        if item_type:
+            filters.append("item_type = ?")
+            filter_params.append(item_type)
+        if entity_filter:
+            filters.append("entity = ?")
+            filter_params.append(entity_filter)
+
+        knn_where = " AND ".join(["embedding MATCH ?", "k = ?"] + filters)
+        rows = self.conn.execute(f"""
+            SELECT item_id, seq, distance FROM {self.TABLE}
+            WHERE {knn_where}
+            ORDER BY distance
+        """, [query_blob, min(top_k + 1, self.MAX_K)] + filter_params).fetchall()
+
+        if len(rows) > top_k and rows[top_k][2] == rows[top_k - 1][2]:
+            scan_where = " AND ".join(filters + ["dist <= ?"])
+            rows = self.conn.execute(f"""
+                SELECT item_id, seq, vec_distance_l2(embedding, ?) AS dist
+                FROM {self.TABLE}
+                WHERE {scan_where}
+                ORDER BY dist, seq
+                LIMIT ?
+            """, [query_blob] + filter_params + [rows[top_k - 1][2], top_k]).fetchall()
+        else:
+            rows = sorted(rows[:top_k], key=lambda row: (row[2], row[1]))
+
+        return [(row[0], 1.0 - (row[2] * row[2]) / 2.0) for row in rows]
+
+    def _normalize(self, vector: Sequence[float]) -> np.ndarray:
+        arr = np.asarray(vector, dtype=np.float32).reshape(-1)
+        if self.dim is None:
+            self._create_table(arr.shape[0])
+        elif arr.shape[0] != self.dim:
+            if len(self) > 0:
+                raise ValueError("Vectors must have the same length")
+            self.clear()
+            self._create_table(arr.shape[0])
+
+        norm = float(np.linalg.norm(arr))
+        if norm == 0.0:
+            return arr
+        return arr / norm
+
+    def _create_table(self, dim: int) -> None:
+        self.conn.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {self.TABLE} USING vec0(
+                item_id TEXT PRIMARY KEY,
+                embedding FLOAT[{dim}],
+                item_type TEXT,
+                entity TEXT,
+                seq INTEGER
+            )
+        """)
+        self.dim = dim
+
+    def _existing_dim(self) -> Optional[int]:
+        row = self.conn.execute(
+            "SELECT sql FROM sqlite_master WHERE name = ?", (self.TABLE,)
+        ).fetchone()
+        if not row or not row[0]:
+            return None
+        match = re.search(r"float\[(\d+)\]", row[0], re.IGNORECASE)
+        return int(match.group(1)) if match else None
+
+
 class VectorStore:
     """
     SQLite-based vector storage with semantic search
 
-    Uses pure Python cosine similarity for vector search (no external dependencies).
-    Stores schema items with their embeddings for semantic retrieval.
+    SQLite persists items and embeddings. Search runs against a pluggable
+    index kept in sync by ``index_items``/``delete_item``:
+
+        - ``sqlite_vec``: KNN inside SQLite via the ``vec0`` virtual table
+        - ``matrix``: in-memory :class:`VectorMatrix` (one matrix-vector product)
+
+    ``search_backend="auto"`` (default) uses sqlite-vec when the extension
+    loads and falls back to the matrix otherwise.
 
     Features:
         - SQLite-based (no external service needed)
-        - Pure Python vector similarity (cosine similarity)
+        - Vectorized cosine similarity
         - Supports filtering by type, entity
         - Automatic embedding generation
         - In-memory option for testing
@@ -137,7 +522,8 @@ class VectorStore:
         self,
         db_path: str = ":memory:",
         embedding_service: Optional[EmbeddingService] = None,
-        embedding_dim: int = 1536
+        embedding_dim: int = 1536,
+        search_backend: Literal["auto", "sqlite_vec", "matrix"] = "auto"
     ):
         """
         Initialize vector store
@@ -146,13 +532,19 @@ class VectorStore:
             db_path: SQLite database path (":memory:" for in-memory)
             embedding_service: EmbeddingService instance (creates default if None)
             embedding_dim: Embedding vector dimension
+            search_backend: "auto", "sqlite_vec" or "matrix"
+
+        Raises:
+            ValueError: Unknown search_backend
+            RuntimeError: search_backend="sqlite_vec" but the extension cannot load
         """
+        if search_backend not in ("auto", "sqlite_vec", "matrix"):
+            raise ValueError(f"Unknown search backend: {search_backend}")
+
         self.db_path = db_path
         self.embedding_dim = embedding_dim
         self.embedding_service = embedding_service or EmbeddingService(enabled=False)
-
-        # In-memory cache of embeddings for faster search
-        self._embeddings_cache: Dict[str, List[float]] = {}
+        self._requested_backend = search_backend
 
         # Initialize database
         self._init_db()
@@ -188,23 +580,50 @@ class VectorStore:
 
         self.conn.commit()
 
+        self._index = self._create_index()
+
         # Rebuild cache on init
         self._rebuild_cache()
 
+    def _create_index(self):
+        """Pick the search index for this connection"""
+        if self._requested_backend != "matrix" and load_sqlite_vec(self.conn):
+            return SqliteVecIndex(self.conn)
+        if self._requested_backend == "sqlite_vec":
+            raise RuntimeError("sqlite-vec extension could not be loaded")
+        return VectorMatrix(self.embedding_dim)
+
+    @property
+    def search_backend(self) -> str:
+        """Name of the active search index ("sqlite_vec" or "matrix")"""
+        return self._index.name
+
     def _rebuild_cache(self) -> None:
-        """Rebuild in-memory embeddings cache from database"""
-        self._embeddings_cache.clear()
+        """Rebuild the search index from stored embeddings if it is out of date"""
+        if self._index.persistent:
+            stored = self.conn.execute(
+                "SELECT COUNT(*) FROM schema_items WHERE embedding IS NOT NULL"
+            ).fetchone()[0]
+            if stored == len(self._index):
+                return
+
+        self._index.clear()
 
         cursor = self.conn.execute("""
-            SELECT id, embedding FROM schema_items
+            SELECT id, type, entity, embedding FROM schema_items
             WHERE embedding IS NOT NULL
+            ORDER BY rowid
         """)
 
         for row in cursor.fetchall():
-            item_id = row["id"]
             embedding_blob = row["embedding"]
             if embedding_blob:
-                self._embeddings_cache[item_id] = self._bytes_to_float_array(embedding_blob)
+                self._index.upsert(
+                    row["id"],
+                    np.frombuffer(embedding_blob, dtype=np.float32),
+                    row["type"],
+                    row["entity"],
+                )
 
     def index_items(self, items: List[SchemaItem]) -> None:
         """
@@ -214,36 +633,59 @@ class VectorStore:
             items: List of SchemaItem objects to index
 
         Note:
-            Updates existing items if ID already exists.
+            Updates existing items if ID already exists. Items whose embedding
+            failed are stored without a vector and excluded from search.
         """
         if not items:
             return
 
-        # Generate embeddings for all items
+        # Write items as their embeddings arrive, keeping input order so
+        # duplicate ids and insertion-order tie-breaking behave as before
         texts = [item.to_searchable_text() for item in items]
-        embeddings = self.embedding_service.batch_embed(texts)
-
-        for item, embedding in zip(items, embeddings):
-            # Insert or replace schema item
-            self.conn.execute("""
-                INSERT OR REPLACE INTO schema_items
-                (id, type, entity, name, description, synonyms, metadata, embedding)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                item.id,
-                item.type,
-                item.entity,
-                item.name,
-                item.description,
-                json.dumps(item.synonyms, ensure_ascii=False),
-                json.dumps(item.metadata, ensure_ascii=False),
-                self._float_array_to_bytes(embedding)
-            ))
-
-            # Update cache
-            self._embeddings_cache[item.id] = embedding
+        pending: Dict[int, Optional[List[float]]] = {}
+        next_idx = 0
+        for indices, embeddings in self._iter_embeddings(texts):
+            pending.update(zip(indices, embeddings))
+            while next_idx in pending:
+                self._write_item(items[next_idx], pending.pop(next_idx))
+                next_idx += 1
+            self.conn.commit()
+
+    def _iter_embeddings(self, texts: List[str]):
+        """
+        Yield (indices, embeddings) chunks for texts
 
-        self.conn.commit()
+        Streams through EmbeddingService.iter_batch_embed; services that
+        customise batch_embed (adapters, test doubles) are called in one shot.
+        """
+        batch_embed = getattr(self.embedding_service.batch_embed, "__func__", None)
+        if batch_embed is EmbeddingService.batch_embed:
+            yield from self.embedding_service.iter_batch_embed(texts)
+        else:
+            yield list(range(len(texts))), self.embedding_service.batch_embed(texts)
+
+    def _write_item(self, item: SchemaItem, embedding: Optional[List[float]]) -> None:
+        """Insert or replace one item and keep the search index in sync"""
+        self.conn.execute("""
+            INSERT OR REPLACE INTO schema_items
+            (id, type, entity, name, description, synonyms, metadata, embedding)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            item.id,
+            item.type,
+            item.entity,
+            item.name,
+            item.description,
+            json.dumps(item.synonyms, ensure_ascii=False),
+            json.dumps(item.metadata, ensure_ascii=False),
+            self._float_array_to_bytes(embedding) if embedding is not None else None
+        ))
+
+        # Keep the search index in sync
+        if embedding is not None:
+            self._index.upsert(item.id, embedding, item.type, item.entity)
+        else:
+            self._index.remove(item.id)
 
     def search(
         self,
@@ -269,65 +711,41 @@ class VectorStore:
         if query_embedding is None:
             return []  # Embedding failed; return empty results gracefully
 
-        # Build WHERE clause for filters
-        where_conditions = []
-        params = []
-
-        if item_type:
-            where_conditions.append("type = ?")
-            params.append(item_type)
-
-        if entity_filter:
-            where_conditions.append("entity = ?")
-            params.append(entity_filter)
+        ranked = self._index.search(
+            query_embedding,
+            top_k=top_k,
+            item_type=item_type,
+            entity_filter=entity_filter,
+        )
+        return self._load_items([item_id for item_id, _ in ranked])
 
-        where_clause = " WHERE " + " AND ".join(where_conditions) if where_conditions else ""
+    def _load_items(self, item_ids: List[str]) -> List[SchemaItem]:
+        """Fetch items by id in one query, preserving the given order"""
+        if not item_ids:
+            return []
 
-        # Get candidate items from database
+        placeholders = ", ".join("?" for _ in item_ids)
         cursor = self.conn.execute(f"""
             SELECT id, type, entity, name, description, synonyms, metadata
             FROM schema_items
-            {where_clause}
-        """, params)
-
-        # Calculate similarity for each item
-        results_with_scores = []
-        for row in cursor.fetchall():
-            item_id = row["id"]
-
-            # Get embedding from cache
-            item_embedding = self._embeddings_cache.get(item_id)
-            if not item_embedding:
-                # If not in cache, try to get from database
-                emb_cursor = self.conn.execute(
-                    "SELECT embedding FROM schema_items WHERE id = ?",
-                    (item_id,)
-                )
-                emb_row = emb_cursor.fetchone()
-                if emb_row and emb_row["embedding"]:
-                    item_embedding = self._bytes_to_float_array(emb_row["embedding"])
-                    self._embeddings_cache[item_id] = item_embedding
-                else:
-                    continue
-
-            # Calculate cosine similarity
-            similarity = cosine_similarity(query_embedding, item_embedding)
-
-            item = SchemaItem(
-                id=row["id"],
-                type=row["type"],
-                entity=row["entity"],
-                name=row["name"],
-                description=row["description"],
-                synonyms=json.loads(row["synonyms"]) if row["synonyms"] else [],
-                metadata=json.loads(row["metadata"]) if row["metadata"] else {}
-            )
+            WHERE id IN ({placeholders})
+        """, item_ids)
 
-            results_with_scores.append((similarity, item))
+        by_id = {row["id"]: self._row_to_item(row) for row in cursor.fetchall()}
+        return [by_id[item_id] for item_id in item_ids if item_id in by_id]
 
-        # Sort by similarity (descending) and return top_k
-        results_with_scores.sort(key=lambda x: x[0], reverse=True)
-        return [item for _, item in results_with_scores[:top_k]]
+    @staticmethod
+    def _row_to_item(row: sqlite3.Row) -> SchemaItem:
+        """Convert a schema_items row to a SchemaItem"""
+        return SchemaItem(
+            id=row["id"],
+            type=row["type"],
+            entity=row["entity"],
+            name=row["name"],
+            description=row["description"],
+            synonyms=json.loads(row["synonyms"]) if row["synonyms"] else [],
+            metadata=json.loads(row["metadata"]) if row["metadata"] else {}
+        )
 
     def get_item(self, item_id: str) -> Optional[SchemaItem]:
         """
@@ -423,9 +841,8 @@ class VectorStore:
             DELETE FROM schema_items WHERE id = ?
         """, (item_id,))
 
-        # Remove from cache
-        if item_id in self._embeddings_cache:
-            del self._embeddings_cache[item_id]
+        # Remove from search index
+        self._index.remove(item_id)
 
         self.conn.commit()
         return cursor.rowcount > 0
@@ -433,7 +850,7 @@ class VectorStore:
     def clear(self) -> None:
         """Clear all indexed items (useful for testing)"""
         self.conn.execute("DELETE FROM schema_items")
-        self._embeddings_cache.clear()
+        self._index.clear()
         self.conn.commit()
 
     def close(self) -> None:
@@ -481,15 +898,16 @@ class VectorStore:
             "total_items": total_items,
             "by_type_entity": by_type_entity,
             "embedding_dim": self.embedding_dim,
-            "cache_size": len(self._embeddings_cache),
+            "cache_size": len(self._index),
+            "matrix_bytes": self._index.nbytes,
+            "search_backend": self._index.name,
             "db_path": self.db_path
         }
 
     @staticmethod
     def _float_array_to_bytes(arr: List[float]) -> bytes:
-        """Convert float array to bytes for storage"""
-        import struct
-        return struct.pack(f"{len(arr)}f", *arr)
+        """Convert float array to bytes for storage (native float32)"""
+        return np.asarray(arr, dtype=np.float32).tobytes()
 
     @staticmethod
     def _bytes_to_float_array(data: bytes) -> List[float]:
@@ -501,6 +919,9 @@ class VectorStore:
 
 __all__ = [
     "VectorStore",
+    "VectorMatrix",
+    "SqliteVecIndex",
+    "load_sqlite_vec",
     "SchemaItem",
     "cosine_similarity",
 ]
@@ -19,8 +19,11 @@ from core.engine.event_bus import (
     EventId,
     CorrelationId,
     EventHandler,
+    DispatchMode,
     Event,
     PublishResult,
+    Subscription,
+    DeadLetter,
     EventBusStatistics,
     EventBus,
     event_bus,
@@ -67,8 +70,11 @@ __all__ = [
     "EventId",
     "CorrelationId",
     "EventHandler",
+    "DispatchMode",
     "Event",
     "PublishResult",
+    "Subscription",
+    "DeadLetter",
     "EventBusStatistics",
     "EventBus",
     "event_bus",
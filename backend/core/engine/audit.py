@@ -4,11 +4,15 @@ core/engine/audit.py
 Audit log engine - records critical system operations.
 Enhanced migration from app/services/audit_service.py.
 """
-from typing import Dict, Any, Optional, List
+from typing import Callable, Deque, Dict, Any, Iterable, Iterator, Optional, List
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
+from itertools import islice
 import logging
+import threading
+import uuid
 
 logger = logging.getLogger(__name__)
 
@@ -77,10 +81,13 @@ class AuditEngine:
     Audit log engine.
 
     Features:
-    - Log recording
-    - Log querying
-    - Filtering by entity or operator
-    - In-memory storage (extensible to persistent)
+    - Log recording into a fixed-capacity ring buffer (O(1) per log, oldest
+      entry overwritten once full)
+    - Secondary indexes by operator, entity and action, tagged with each
+      entry's sequence number and trimmed incrementally on eviction
+    - Log querying and statistics
+    - Optional spill of every entry to persistent storage in batches, from a
+      background thread (see ``start_spill``)
 
     Example:
         >>> engine = AuditEngine()
@@ -95,17 +102,55 @@ class AuditEngine:
         >>> logs = engine.get_by_entity("Room", 101)
     """
 
-    def __init__(self, max_logs: int = 10000):
+    def __init__(
+        self,
+        max_logs: int = 10000,
+        spill: Optional[Callable[[List[AuditLog]], None]] = None,
+        spill_batch_size: int = 500,
+        spill_interval: float = 1.0,
+        max_pending_spill: Optional[int] = None,
+    ):
         """
         Initialize the audit engine.
 
         Args:
-            max_logs: Maximum log entries (in-memory storage).
+            max_logs: Ring buffer capacity (in-memory storage).
+            spill: Optional sink receiving batches of entries to persist
+                (e.g. SystemLog rows). Called from the spill thread or
+                ``flush_spill``; an exception keeps the batch queued.
+            spill_batch_size: Maximum entries handed to ``spill`` per call.
+            spill_interval: Seconds the spill thread waits between polls.
+            max_pending_spill: Bound on queued, not-yet-spilled entries;
+                the oldest are dropped beyond it. Defaults to ``max_logs``.
         """
-        self._logs: List[AuditLog] = []
+        if max_logs < 1:
+            raise ValueError("max_logs must be >= 1")
         self._max_logs = max_logs
-        self._operator_logs: Dict[int, List[str]] = {}  # operator_id -> log indices
-        self._entity_logs: Dict[str, List[str]] = {}  # f"{type}:{id}" -> log indices
+        self._ring: List[Optional[AuditLog]] = [None] * max_logs
+        self._next_seq = 0  # sequence number of the next entry; entry seq lives in slot seq % max_logs
+        self._lock = threading.Lock()
+
+        # Secondary indexes hold sequence numbers in ascending order, so the
+        # entry being evicted is always at the left end of its deques.
+        self._by_id: Dict[str, int] = {}
+        self._operator_logs: Dict[int, Deque[int]] = {}
+        self._entity_logs: Dict[str, Deque[int]] = {}  # f"{type}:{id}" -> sequence numbers
+        self._action_logs: Dict[str, Deque[int]] = {}
+        self._severity_counts: Dict[AuditSeverity, int] = {severity: 0 for severity in AuditSeverity}
+
+        self._spill = spill
+        self._spill_batch_size = spill_batch_size
+        self._spill_interval = spill_interval
+        self._spill_queue: Deque[AuditLog] = deque()
+        self._max_pending_spill = max_pending_spill or max_logs
+        self._spill_lock = threading.Lock()  # one batch in flight at a time
+        self._spill_wakeup = threading.Event()
+        self._spill_stopping = threading.Event()
+        self._spill_thread: Optional[threading.Thread] = None
+        self._spilled = 0
+        self._spill_batches = 0
+        self._spill_errors = 0
+        self._spill_dropped = 0
 
     def log(
         self,
@@ -138,8 +183,6 @@ class AuditEngine:
         Returns:
             The created audit log entry.
         """
-        import uuid
-
         log = AuditLog(
             log_id=str(uuid.uuid4()),
             timestamp=datetime.utcnow(),
@@ -155,57 +198,105 @@ class AuditEngine:
             extra=extra or {},
         )
 
-        # Add to log list
-        log_index = len(self._logs)
-        self._logs.append(log)
-
-        # Index by operator
-        if operator_id is not None:
-            if operator_id not in self._operator_logs:
-                self._operator_logs[operator_id] = []
-            self._operator_logs[operator_id].append(log_index)
-
-        # Index by entity
-        if entity_type is not None and entity_id is not None:
-            key = f"{entity_type}:{entity_id}"
-            if key not in self._entity_logs:
-                self._entity_logs[key] = []
-            self._entity_logs[key].append(log_index)
-
-        # Limit log count
-        if len(self._logs) > self._max_logs:
-            self._logs.pop(0)
-            # Rebuild indices
-            self._rebuild_indices()
-
-        logger.info(f"Audit log: {action} by {operator_id} on {entity_type}:{entity_id}")
+        with self._lock:
+            seq = self._next_seq
+            slot = seq % self._max_logs
+            evicted = self._ring[slot]
+            if evicted is not None:
+                self._evict(evicted, seq - self._max_logs)
+
+            self._ring[slot] = log
+            self._next_seq = seq + 1
+            self._by_id[log.log_id] = seq
+            self._severity_counts[severity] += 1
+            self._index(self._action_logs, action, seq)
+            if operator_id is not None:
+                self._index(self._operator_logs, operator_id, seq)
+            if entity_type is not None and entity_id is not None:
+                self._index(self._entity_logs, f"{entity_type}:{entity_id}", seq)
+
+            if self._spill is not None:
+                if len(self._spill_queue) >= self._max_pending_spill:
+                    self._spill_queue.popleft()
+                    self._spill_dropped += 1
+                self._spill_queue.append(log)
+                wake = len(self._spill_queue) >= self._spill_batch_size
+            else:
+                wake = False
+
+        if wake:
+            self._spill_wakeup.set()
+
+        logger.info("Audit log: %s by %s on %s:%s", action, operator_id, entity_type, entity_id)
         return log
 
+    @staticmethod
+    def _index(index: Dict[Any, Deque[int]], key: Any, seq: int) -> None:
+        entries = index.get(key)
+        if entries is None:
+            index[key] = entries = deque()
+        entries.append(seq)
+
+    @staticmethod
+    def _unindex(index: Dict[Any, Deque[int]], key: Any, seq: int) -> None:
+        entries = index.get(key)
+        if entries and entries[0] == seq:
+            entries.popleft()
+            if not entries:
+                del index[key]
+
+    def _evict(self, log: AuditLog, seq: int) -> None:
+        """Drop the entry with sequence number ``seq`` from every index (O(1))."""
+        self._by_id.pop(log.log_id, None)
+        self._severity_counts[log.severity] -= 1
+        self._unindex(self._action_logs, log.action, seq)
+        if log.operator_id is not None:
+            self._unindex(self._operator_logs, log.operator_id, seq)
+        if log.entity_type is not None and log.entity_id is not None:
+            self._unindex(self._entity_logs, f"{log.entity_type}:{log.entity_id}", seq)
+
+    @property
+    def _oldest_seq(self) -> int:
+        return max(0, self._next_seq - self._max_logs)
+
+    def _resolve(self, seqs: Optional[Deque[int]], limit: int) -> List[AuditLog]:
+        """Map indexed sequence numbers (oldest first) to live entries."""
+        if not seqs:
+            return []
+        oldest = self._oldest_seq
+        ring, size = self._ring, self._max_logs
+        return [ring[seq % size] for seq in islice((s for s in seqs if s >= oldest), limit)]
+
+    def _iter_logs(self) -> Iterator[AuditLog]:
+        """Live entries, oldest first."""
+        ring, size = self._ring, self._max_logs
+        for seq in range(self._oldest_seq, self._next_seq):
+            yield ring[seq % size]
+
     def get_by_id(self, log_id: str) -> Optional[AuditLog]:
         """Get a log entry by ID."""
-        for log in self._logs:
-            if log.log_id == log_id:
-                return log
-        return None
+        with self._lock:
+            seq = self._by_id.get(log_id)
+            return self._ring[seq % self._max_logs] if seq is not None else None
 
     def get_by_operator(
         self, operator_id: int, limit: int = 100
     ) -> List[AuditLog]:
         """Get log entries for a specific operator."""
-        indices = self._operator_logs.get(operator_id, [])
-        return [self._logs[i] for i in indices if i < len(self._logs)][:limit]
+        with self._lock:
+            return self._resolve(self._operator_logs.get(operator_id), limit)
 
     def get_by_entity(
         self, entity_type: str, entity_id: int, limit: int = 100
     ) -> List[AuditLog]:
         """Get log entries for a specific entity."""
-        key = f"{entity_type}:{entity_id}"
-        indices = self._entity_logs.get(key, [])
-        return [self._logs[i] for i in indices if i < len(self._logs)][:limit]
+        with self._lock:
+            return self._resolve(self._entity_logs.get(f"{entity_type}:{entity_id}"), limit)
 
     def get_by_action(self, action: str, limit: int = 100) -> List[AuditLog]:
         """Get log entries for a specific action type."""
-        return [log for log in self._logs if log.action == action][:limit]
+        with self._lock:
+            return self._resolve(self._action_logs.get(action), limit)
 
     def get_all(
         self,
@@ -224,53 +315,130 @@ class AuditEngine:
         Returns:
             List of audit log entries.
         """
-        logs = self._logs
-
-        if severity is not None:
-            logs = [log for log in logs if log.severity == severity]
-
-        return logs[offset : offset + limit]
+        with self._lock:
+            logs: Iterable[AuditLog] = self._iter_logs()
+            if severity is not None:
+                logs = (log for log in logs if log.severity == severity)
+            return list(islice(logs, offset, offset + limit))
 
     def get_statistics(self) -> Dict[str, Any]:
         """Get audit statistics."""
-        return {
-            "total_logs": len(self._logs),
-            "by_severity": {
-                severity.value: len([log for log in self._logs if log.severity == severity])
-                for severity in AuditSeverity
-            },
-            "by_action": self._get_action_counts(),
-        }
+        with self._lock:
+            return {
+                "total_logs": self._next_seq - self._oldest_seq,
+                "by_severity": {
+                    severity.value: count for severity, count in self._severity_counts.items()
+                },
+                "by_action": self._get_action_counts(),
+            }
 
     def _get_action_counts(self) -> Dict[str, int]:
         """Get action counts."""
-        counts: Dict[str, int] = {}
-        for log in self._logs:
-            counts[log.action] = counts.get(log.action, 0) + 1
-        return counts
-
-    def _rebuild_indices(self) -> None:
-        """Rebuild indices (after removing old logs)."""
-        self._operator_logs.clear()
-        self._entity_logs.clear()
-
-        for i, log in enumerate(self._logs):
-            if log.operator_id is not None:
-                if log.operator_id not in self._operator_logs:
-                    self._operator_logs[log.operator_id] = []
-                self._operator_logs[log.operator_id].append(i)
-
-            if log.entity_type is not None and log.entity_id is not None:
-                key = f"{log.entity_type}:{log.entity_id}"
-                if key not in self._entity_logs:
-                    self._entity_logs[key] = []
-                self._entity_logs[key].append(i)
+        return {action: len(seqs) for action, seqs in self._action_logs.items()}
 
     def clear(self) -> None:
         """Clear all logs (for testing)."""
-        self._logs.clear()
-        self._operator_logs.clear()
-        self._entity_logs.clear()
+        with self._lock:
+            self._ring = [None] * self._max_logs
+            self._next_seq = 0
+            self._by_id.clear()
+            self._operator_logs.clear()
+            self._entity_logs.clear()
+            self._action_logs.clear()
+            self._severity_counts = {severity: 0 for severity in AuditSeverity}
+            self._spill_queue.clear()
+
+    # ==================== Persistent spill ====================
+
+    def set_spill(self, spill: Optional[Callable[[List[AuditLog]], None]]) -> None:
+        """Attach (or detach with None) the persistent sink; entries logged from now on are queued."""
+        with self._lock:
+            self._spill = spill
+            if spill is None:
+                self._spill_queue.clear()
+
+    def spill_once(self) -> int:
+        """
+        Hand one batch of queued entries to the sink.
+
+        Returns:
+            Number of entries spilled (0 if the queue is empty or the sink failed).
+        """
+        with self._spill_lock:
+            with self._lock:
+                spill = self._spill
+                if spill is None or not self._spill_queue:
+                    return 0
+                batch = [self._spill_queue.popleft()
+                         for _ in range(min(self._spill_batch_size, len(self._spill_queue)))]
+            try:
+                spill(batch)
+            except Exception as e:
+                with self._lock:
+                    # Put the batch back in front; drop the oldest if that overflows the bound.
+                    self._spill_queue.extendleft(reversed(batch))
+                    overflow = len(self._spill_queue) - self._max_pending_spill
+                    for _ in range(max(0, overflow)):
+                        self._spill_queue.popleft()
+                    self._spill_dropped += max(0, overflow)
+                    self._spill_errors += 1
+                logger.error(f"Audit spill failed for {len(batch)} entries: {e}")
+                return 0
+            with self._lock:
+                self._spilled += len(batch)
+                self._spill_batches += 1
+            return len(batch)
+
+    def flush_spill(self) -> int:
+        """Spill until the queue is empty (or the sink fails); returns entries spilled."""
+        total = 0
+        while True:
+            spilled = self.spill_once()
+            total += spilled
+            if spilled < self._spill_batch_size:
+                return total
+
+    def start_spill(self) -> None:
+        """Start the background spill thread."""
+        if self._spill_thread is not None and self._spill_thread.is_alive():
+            return
+        self._spill_stopping.clear()
+        self._spill_thread = threading.Thread(target=self._run_spill, name="audit-spill", daemon=True)
+        self._spill_thread.start()
+        logger.info("Audit spill started")
+
+    def stop_spill(self, timeout: Optional[float] = 5.0) -> None:
+        """Spill remaining entries and stop the background thread."""
+        thread = self._spill_thread
+        if thread is None:
+            return
+        self._spill_stopping.set()
+        self._spill_wakeup.set()
+        thread.join(timeout)
+        self._spill_thread = None
+        logger.info("Audit spill stopped")
+
+    def _run_spill(self) -> None:
+        while True:
+            self._spill_wakeup.clear()
+            spilled = self.flush_spill()
+            if self._spill_stopping.is_set():
+                return
+            if spilled < self._spill_batch_size:
+                self._spill_wakeup.wait(self._spill_interval)
+
+    def get_spill_stats(self) -> Dict[str, Any]:
+        """Spill statistics."""
+        with self._lock:
+            return {
+                "enabled": self._spill is not None,
+                "running": self._spill_thread is not None and self._spill_thread.is_alive(),
+                "pending": len(self._spill_queue),
+                "spilled": self._spilled,
+                "batches": self._spill_batches,
+                "errors": self._spill_errors,
+                "dropped": self._spill_dropped,
+            }
 
 
 # Global audit engine instance
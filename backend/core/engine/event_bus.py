@@ -3,14 +3,19 @@ core/engine/event_bus.py
 
 Framework-level event bus - in-memory publish/subscribe pattern.
 Implements a lightweight event-driven architecture with synchronous
-handlers and error tracking.
+handlers and error tracking, plus an opt-in asynchronous dispatch mode
+(prioritized worker pool, per-aggregate ordering, retry and dead letters).
 """
-from typing import Callable, Dict, List, Any, Optional, Protocol, Tuple
+from typing import Callable, Dict, List, Any, Optional, Protocol, Tuple, Union
 from dataclasses import dataclass, field
 from datetime import datetime
 from collections import deque
+from enum import Enum
+import itertools
 import logging
+import queue
 import threading
+import time
 import uuid
 
 logger = logging.getLogger(__name__)
@@ -25,6 +30,17 @@ def _generate_event_id() -> EventId:
     return f"{datetime.now().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:8]}"
 
 
+def _handler_name(handler: Callable) -> str:
+    return getattr(handler, "__name__", repr(handler))
+
+
+class DispatchMode(str, Enum):
+    """How a subscription is invoked."""
+
+    SYNC = "sync"    # inline on the publishing thread
+    ASYNC = "async"  # queued for the worker pool
+
+
 class EventHandler(Protocol):
     """Event handler protocol."""
 
@@ -79,6 +95,8 @@ class PublishResult:
         success_count: Number of successfully handled events
         failure_count: Number of failed handlers
         errors: List of (handler, exception) tuples
+        queued_count: Number of async handlers the event was queued for
+            (their outcome is reported in statistics and dead letters)
     """
 
     event_type: str
@@ -86,6 +104,84 @@ class PublishResult:
     success_count: int
     failure_count: int
     errors: List[Tuple[Callable, Exception]] = field(default_factory=list)
+    queued_count: int = 0
+
+
+@dataclass
+class Subscription:
+    """
+    A handler subscribed to an event type.
+
+    Attributes:
+        event_type: Event type
+        handler: Callable receiving an Event, or a list of Events if batch
+        mode: SYNC or ASYNC dispatch
+        priority: Higher runs first (sync order; async worker pick order)
+        batch: Handler accepts List[Event]; publish_many coalesces events
+        aggregate_key: Data key (or callable) giving the aggregate id. Async
+            events with the same aggregate id are handled in publish order;
+            different ids may run concurrently. Events without an id share
+            one lane per subscription.
+        max_retries: Async retries before the event is dead-lettered
+        retry_backoff: Seconds before the first retry, doubled per retry
+        max_batch_size: Maximum events per async batch handler call
+    """
+
+    event_type: str
+    handler: Callable
+    mode: DispatchMode = DispatchMode.SYNC
+    priority: int = 0
+    batch: bool = False
+    aggregate_key: Union[str, Callable[["Event"], Any], None] = "aggregate_id"
+    max_retries: int = 3
+    retry_backoff: float = 0.1
+    max_batch_size: int = 100
+
+    @property
+    def name(self) -> str:
+        return _handler_name(self.handler)
+
+    def aggregate_of(self, event: "Event") -> Any:
+        """Ordering key for an event (None for batch handlers)."""
+        if self.batch or self.aggregate_key is None:
+            return None
+        if callable(self.aggregate_key):
+            return self.aggregate_key(event)
+        return event.data.get(self.aggregate_key)
+
+
+@dataclass
+class DeadLetter:
+    """
+    Async delivery that failed after all retries.
+
+    Attributes:
+        event_type: Event type
+        handler: Handler that failed
+        events: Events of the failed delivery (more than one for batch handlers)
+        error: Last exception message
+        attempts: Number of attempts made
+        failed_at: Time of the last failure
+    """
+
+    event_type: str
+    handler: Callable
+    events: List["Event"]
+    error: str
+    attempts: int
+    failed_at: datetime = field(default_factory=datetime.now)
+
+
+class _Lane:
+    """Pending async events of one subscription and aggregate id, in publish order."""
+
+    __slots__ = ("key", "subscription", "pending", "scheduled")
+
+    def __init__(self, key: Tuple, subscription: Subscription):
+        self.key = key
+        self.subscription = subscription
+        self.pending: deque = deque()  # (event, enqueued monotonic time)
+        self.scheduled = False         # in the ready queue or held by a worker
 
 
 @dataclass
@@ -98,12 +194,22 @@ class EventBusStatistics:
         total_processed: Total successfully processed
         total_failed: Total failed
         subscriber_count: Subscriber count per event type
+        total_retried: Total async handler retries
+        total_dead_lettered: Total events moved to the dead-letter list
+        queue_depth: Pending async events per event type
+        queue_lag_ms: Age of the oldest pending async event per event type
+        handler_latency_ms: Per handler name: count, avg and max latency
     """
 
     total_published: int = 0
     total_processed: int = 0
     total_failed: int = 0
     subscriber_count: Dict[str, int] = field(default_factory=dict)
+    total_retried: int = 0
+    total_dead_lettered: int = 0
+    queue_depth: Dict[str, int] = field(default_factory=dict)
+    queue_lag_ms: Dict[str, float] = field(default_factory=dict)
+    handler_latency_ms: Dict[str, Dict[str, float]] = field(default_factory=dict)
 
 
 class EventBus:
@@ -116,6 +222,10 @@ class EventBus:
     - Configurable event history
     - Handler exception isolation
     - Statistics collection
+    - Opt-in async dispatch: handlers subscribed with mode="async" run on a
+      worker pool. Each (handler, aggregate id) lane is handled in publish
+      order; ready lanes are picked by subscription priority. Failures are
+      retried with exponential backoff, then dead-lettered.
 
     Example:
         >>> bus = EventBus()
@@ -123,6 +233,8 @@ class EventBus:
         ...     print(f"Received: {event.event_type}")
         >>> bus.subscribe("test.event", handler)
         >>> bus.publish(Event(event_type="test.event", timestamp=datetime.now(), data={}))
+        >>> bus.subscribe("room.status_changed", notify, mode="async", aggregate_key="room_id")
+        >>> bus.drain(timeout=5)
 
     Thread Safety:
         All public methods are thread-safe.
@@ -140,66 +252,129 @@ class EventBus:
                     cls._instance._initialized = False
         return cls._instance
 
-    def __init__(self, history_size: int = 100):
+    def __init__(self, history_size: int = 100, max_workers: int = 4, dead_letter_size: int = 1000):
         """
         Initialize the event bus.
 
         Args:
             history_size: Maximum number of events to keep in history.
+            max_workers: Worker threads for async subscriptions (started lazily).
+            dead_letter_size: Maximum number of dead letters kept.
         """
         if self._initialized:
             return
 
-        self._subscribers: Dict[str, List[EventHandler]] = {}
+        # Subscriptions per event type, highest priority first
+        self._subscribers: Dict[str, List[Subscription]] = {}
         self._event_history: deque[Event] = deque(maxlen=history_size)
         self._subscriber_lock = threading.RLock()
 
         # Statistics
         self._stats = EventBusStatistics()
         self._stats_lock = threading.Lock()
+        self._latency: Dict[str, List[float]] = {}  # handler name -> [count, total_ms, max_ms]
+
+        # Async dispatch: lanes keyed by (subscription id, aggregate id); a
+        # lane is in the ready queue (or held by one worker) at most once
+        self.max_workers = max_workers
+        self._lanes: Dict[Tuple, _Lane] = {}
+        self._ready: "queue.PriorityQueue[Tuple[float, int, Optional[_Lane]]]" = queue.PriorityQueue()
+        self._ready_seq = itertools.count()
+        self._pending = 0
+        self._dispatch_lock = threading.Condition()
+        self._workers: List[threading.Thread] = []
+        self._dead_letters: deque[DeadLetter] = deque(maxlen=dead_letter_size)
 
         self._history_size = history_size
         self._initialized = True
         logger.info("EventBus initialized")
 
-    def subscribe(self, event_type: str, handler: EventHandler) -> None:
+    def subscribe(
+        self,
+        event_type: str,
+        handler: EventHandler,
+        mode: Union[DispatchMode, str] = DispatchMode.SYNC,
+        priority: int = 0,
+        batch: bool = False,
+        aggregate_key: Union[str, Callable[[Event], Any], None] = "aggregate_id",
+        max_retries: int = 3,
+        retry_backoff: float = 0.1,
+        max_batch_size: int = 100,
+    ) -> None:
         """
         Subscribe to an event type.
 
         Args:
             event_type: Event type (e.g., "room.status_changed")
-            handler: Handler function that accepts an Event parameter.
+            handler: Handler function that accepts an Event parameter
+                (a List[Event] if batch is True).
+            mode: "sync" (default) runs inline in publish; "async" queues
+                the event for the worker pool.
+            priority: Higher priorities run first.
+            batch: Handler accepts a list of events. With publish it runs in
+                its priority slot with a one-element list. With publish_many
+                a sync batch handler is called once with all events of its
+                type, after every non-batch sync handler of that call; batch
+                handlers keep priority order among themselves.
+            aggregate_key: Event data key (or callable) giving the aggregate
+                id that async delivery is ordered by.
+            max_retries: Async retries before dead-lettering.
+            retry_backoff: Seconds before the first async retry, doubled per retry.
+            max_batch_size: Maximum events per async batch call.
+
+        Raises:
+            ValueError: Unknown mode.
 
         Example:
             >>> def my_handler(event: Event) -> None:
             ...     print(event.data)
             >>> bus.subscribe("my.event", my_handler)
+            >>> bus.subscribe("guest.checked_out", create_task, mode="async", aggregate_key="room_id")
         """
+        subscription = Subscription(
+            event_type=event_type,
+            handler=handler,
+            mode=DispatchMode(mode),
+            priority=priority,
+            batch=batch,
+            aggregate_key=aggregate_key,
+            max_retries=max_retries,
+            retry_backoff=retry_backoff,
+            max_batch_size=max_batch_size,
+        )
         with self._subscriber_lock:
-            if event_type not in self._subscribers:
-                self._subscribers[event_type] = []
-            if handler not in self._subscribers[event_type]:
-                self._subscribers[event_type].append(handler)
-                logger.info(f"Handler {handler.__name__} subscribed to {event_type}")
+            subscriptions = self._subscribers.setdefault(event_type, [])
+            if any(s.handler == handler for s in subscriptions):
+                return
+            # Copy-on-write so publishers can iterate without the lock
+            subscriptions = subscriptions + [subscription]
+            subscriptions.sort(key=lambda s: -s.priority)
+            self._subscribers[event_type] = subscriptions
+            logger.info(f"Handler {subscription.name} subscribed to {event_type} ({subscription.mode.value})")
 
     def unsubscribe(self, event_type: str, handler: EventHandler) -> None:
         """
         Unsubscribe from an event type.
 
+        Events already queued for an async handler are still delivered.
+
         Args:
             event_type: Event type.
             handler: Handler to remove.
         """
         with self._subscriber_lock:
-            if event_type in self._subscribers and handler in self._subscribers[event_type]:
-                self._subscribers[event_type].remove(handler)
-                logger.info(f"Handler {handler.__name__} unsubscribed from {event_type}")
+            subscriptions = self._subscribers.get(event_type, [])
+            remaining = [s for s in subscriptions if s.handler != handler]
+            if len(remaining) < len(subscriptions):
+                self._subscribers[event_type] = remaining
+                logger.info(f"Handler {_handler_name(handler)} unsubscribed from {event_type}")
 
     def publish(self, event: Event) -> PublishResult:
         """
-        Publish an event (synchronously executes all handlers).
+        Publish an event.
 
-        Handler exceptions do not affect other handlers.
+        Sync handlers run inline in priority order; async handlers are
+        queued. Handler exceptions do not affect other handlers.
 
         Args:
             event: The event to publish.
@@ -207,50 +382,15 @@ class EventBus:
         Returns:
             PublishResult with processing statistics.
         """
-        # Record event
-        self._event_history.append(event)
-
-        # Copy handlers under lock to avoid holding lock during execution
-        with self._subscriber_lock:
-            handlers = self._subscribers.get(event.event_type, []).copy()
-
-        # Update statistics
-        with self._stats_lock:
-            self._stats.total_published += 1
-
-        result = PublishResult(
-            event_type=event.event_type,
-            subscriber_count=len(handlers),
-            success_count=0,
-            failure_count=0,
-            errors=[],
-        )
-
-        if handlers:
-            logger.info(f"Publishing {event.event_type} to {len(handlers)} handlers")
-
-        for handler in handlers:
-            try:
-                handler(event)
-                result.success_count += 1
-                with self._stats_lock:
-                    self._stats.total_processed += 1
-            except Exception as e:
-                result.failure_count += 1
-                result.errors.append((handler, e))
-                with self._stats_lock:
-                    self._stats.total_failed += 1
-                logger.error(
-                    f"Event handler {handler.__name__} error for {event.event_type}: {e}",
-                    exc_info=True,
-                )
-
-        return result
+        return self._dispatch([event])[0]
 
     def publish_many(self, events: List[Event]) -> List[PublishResult]:
         """
         Publish multiple events.
 
+        Batch handlers are called once per event type with all of its
+        events (async batch handlers in chunks of max_batch_size).
+
         Args:
             events: List of events.
 
@@ -266,7 +406,243 @@ class EventBus:
             >>> for r in results:
             ...     print(f"{r.event_type}: {r.success_count} successes")
         """
-        return [self.publish(event) for event in events]
+        return self._dispatch(events)
+
+    def _dispatch(self, events: List[Event]) -> List[PublishResult]:
+        results = []
+        # Sync batch subscriptions: id -> (subscription, events, results).
+        # A single event needs no coalescing, so its batch handlers run in
+        # their priority slot with a one-element list.
+        coalesce = len(events) > 1
+        batches: Dict[int, Tuple[Subscription, List[Event], List[PublishResult]]] = {}
+
+        for event in events:
+            # Record event
+            self._event_history.append(event)
+
+            # Subscription lists are replaced, never mutated, so no copy is needed
+            with self._subscriber_lock:
+                subscriptions = self._subscribers.get(event.event_type, [])
+
+            # Update statistics
+            with self._stats_lock:
+                self._stats.total_published += 1
+
+            result = PublishResult(
+                event_type=event.event_type,
+                subscriber_count=len(subscriptions),
+                success_count=0,
+                failure_count=0,
+                errors=[],
+            )
+            results.append(result)
+
+            if subscriptions:
+                logger.info(f"Publishing {event.event_type} to {len(subscriptions)} handlers")
+
+            for subscription in subscriptions:
+                if subscription.mode is DispatchMode.ASYNC:
+                    self._enqueue(subscription, event)
+                    result.queued_count += 1
+                elif subscription.batch and coalesce:
+                    entry = batches.setdefault(id(subscription), (subscription, [], []))
+                    entry[1].append(event)
+                    entry[2].append(result)
+                else:
+                    self._run_sync(subscription, [event] if subscription.batch else event, [result])
+
+        for subscription, batch_events, batch_results in batches.values():
+            self._run_sync(subscription, batch_events, batch_results)
+
+        return results
+
+    def _run_sync(
+        self, subscription: Subscription, payload: Union[Event, List[Event]], results: List[PublishResult]
+    ) -> None:
+        start = time.perf_counter()
+        try:
+            subscription.handler(payload)
+        except Exception as e:
+            self._record_latency(subscription, start)
+            for result in results:
+                result.failure_count += 1
+                result.errors.append((subscription.handler, e))
+            with self._stats_lock:
+                self._stats.total_failed += len(results)
+            logger.error(
+                f"Event handler {subscription.name} error for {subscription.event_type}: {e}",
+                exc_info=True,
+            )
+            return
+        self._record_latency(subscription, start)
+        for result in results:
+            result.success_count += 1
+        with self._stats_lock:
+            self._stats.total_processed += len(results)
+
+    def _record_latency(self, subscription: Subscription, start: float) -> None:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._stats_lock:
+            entry = self._latency.setdefault(subscription.name, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed_ms
+            entry[2] = max(entry[2], elapsed_ms)
+
+    # ==================== Async dispatch ====================
+
+    def _enqueue(self, subscription: Subscription, event: Event) -> None:
+        key = (id(subscription), subscription.aggregate_of(event))
+        with self._dispatch_lock:
+            lane = self._lanes.get(key)
+            if lane is None:
+                lane = self._lanes[key] = _Lane(key, subscription)
+            lane.pending.append((event, time.monotonic()))
+            self._pending += 1
+            if not lane.scheduled:
+                lane.scheduled = True
+                self._ready.put((-subscription.priority, next(self._ready_seq), lane))
+            if len(self._workers) < self.max_workers:
+                worker = threading.Thread(target=self._run_worker, name="event-bus-worker", daemon=True)
+                self._workers.append(worker)
+                worker.start()
+
+    def _run_worker(self) -> None:
+        """Take ready lanes by priority; deliver one event (or batch) per turn."""
+        while True:
+            lane = self._ready.get()[2]
+            if lane is None:  # shutdown sentinel
+                return
+
+            subscription = lane.subscription
+            with self._dispatch_lock:
+                size = subscription.max_batch_size if subscription.batch else 1
+                items = [lane.pending.popleft() for _ in range(min(size, len(lane.pending)))]
+
+            if items:
+                self._deliver(subscription, items)
+
+            with self._dispatch_lock:
+                self._pending -= len(items)
+                if lane.pending:
+                    # Requeue behind lanes of the same priority
+                    self._ready.put((-subscription.priority, next(self._ready_seq), lane))
+                else:
+                    lane.scheduled = False
+                    if self._lanes.get(lane.key) is lane:
+                        del self._lanes[lane.key]
+                if self._pending == 0:
+                    self._dispatch_lock.notify_all()
+
+    def _deliver(self, subscription: Subscription, items: List[Tuple[Event, float]]) -> None:
+        events = [event for event, _ in items]
+        payload = events if subscription.batch else events[0]
+
+        attempt = 0
+        while True:
+            attempt += 1
+            start = time.perf_counter()
+            try:
+                subscription.handler(payload)
+            except Exception as e:
+                self._record_latency(subscription, start)
+                if attempt <= subscription.max_retries:
+                    with self._stats_lock:
+                        self._stats.total_retried += 1
+                    time.sleep(subscription.retry_backoff * 2 ** (attempt - 1))
+                    continue
+
+                with self._stats_lock:
+                    self._stats.total_failed += len(events)
+                    self._stats.total_dead_lettered += len(events)
+                self._dead_letters.append(DeadLetter(
+                    event_type=subscription.event_type,
+                    handler=subscription.handler,
+                    events=events,
+                    error=str(e),
+                    attempts=attempt,
+                ))
+                logger.error(
+                    f"Event handler {subscription.name} error for {subscription.event_type} "
+                    f"after {attempt} attempts, dead-lettered: {e}",
+                    exc_info=True,
+                )
+                return
+
+            self._record_latency(subscription, start)
+            with self._stats_lock:
+                self._stats.total_processed += len(events)
+            return
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued async event has been handled.
+
+        Args:
+            timeout: Seconds to wait (None waits indefinitely).
+
+        Returns:
+            False if the timeout expired first.
+        """
+        with self._dispatch_lock:
+            return self._dispatch_lock.wait_for(lambda: self._pending == 0, timeout)
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        """
+        Drain queued async events and stop the worker threads.
+
+        Workers are started again by the next async publish.
+
+        Args:
+            timeout: Seconds to wait for the drain and for each worker.
+        """
+        self.drain(timeout)
+        with self._dispatch_lock:
+            workers, self._workers = self._workers, []
+            for _ in workers:
+                self._ready.put((float("inf"), next(self._ready_seq), None))
+        for worker in workers:
+            worker.join(timeout)
+
+    def get_dead_letters(self, limit: int = 50) -> List[DeadLetter]:
+        """
+        Get async deliveries that failed after all retries.
+
+        Args:
+            limit: Maximum number of results.
+
+        Returns:
+            List of dead letters, newest first.
+        """
+        return list(reversed(self._dead_letters))[:limit]
+
+    def replay_dead_letters(self) -> int:
+        """
+        Queue dead-lettered events again for handlers that are still subscribed.
+
+        Returns:
+            Number of events queued.
+        """
+        letters = list(self._dead_letters)
+        self._dead_letters.clear()
+
+        replayed = 0
+        for letter in letters:
+            with self._subscriber_lock:
+                subscription = next(
+                    (s for s in self._subscribers.get(letter.event_type, []) if s.handler == letter.handler),
+                    None,
+                )
+            if subscription is None or subscription.mode is not DispatchMode.ASYNC:
+                self._dead_letters.append(letter)
+                continue
+            for event in letter.events:
+                self._enqueue(subscription, event)
+                replayed += 1
+        return replayed
+
+    def clear_dead_letters(self) -> None:
+        """Clear the dead-letter list."""
+        self._dead_letters.clear()
 
     def get_history(
         self, event_type: Optional[str] = None, limit: int = 50
@@ -300,11 +676,11 @@ class EventBus:
         """
         with self._subscriber_lock:
             if event_type:
-                handlers = self._subscribers.get(event_type, [])
-                return {event_type: [h.__name__ for h in handlers]}
+                subscriptions = self._subscribers.get(event_type, [])
+                return {event_type: [s.name for s in subscriptions]}
             return {
-                et: [h.__name__ for h in handlers]
-                for et, handlers in self._subscribers.items()
+                et: [s.name for s in subscriptions]
+                for et, subscriptions in self._subscribers.items()
             }
 
     def get_statistics(self) -> EventBusStatistics:
@@ -319,13 +695,29 @@ class EventBus:
                 total_published=self._stats.total_published,
                 total_processed=self._stats.total_processed,
                 total_failed=self._stats.total_failed,
+                total_retried=self._stats.total_retried,
+                total_dead_lettered=self._stats.total_dead_lettered,
             )
+            stats.handler_latency_ms = {
+                name: {"count": count, "avg": total / count, "max": max_ms}
+                for name, (count, total, max_ms) in self._latency.items()
+            }
 
         with self._subscriber_lock:
             stats.subscriber_count = {
-                et: len(handlers) for et, handlers in self._subscribers.items()
+                et: len(subscriptions) for et, subscriptions in self._subscribers.items()
             }
 
+        now = time.monotonic()
+        with self._dispatch_lock:
+            for lane in self._lanes.values():
+                if not lane.pending:
+                    continue
+                event_type = lane.subscription.event_type
+                stats.queue_depth[event_type] = stats.queue_depth.get(event_type, 0) + len(lane.pending)
+                lag_ms = (now - lane.pending[0][1]) * 1000
+                stats.queue_lag_ms[event_type] = max(stats.queue_lag_ms.get(event_type, 0.0), lag_ms)
+
         return stats
 
     def clear_subscribers(self) -> None:
@@ -362,16 +754,26 @@ class EventBus:
         """
         with self._stats_lock:
             self._stats = EventBusStatistics()
+            self._latency = {}
 
     def clear(self) -> None:
         """
         Fully clear the event bus (for testing).
 
+        Pending async events are discarded.
+
         Warning:
             This clears all data. Only use in test environments.
         """
         self.clear_subscribers()
         self.clear_history()
+        with self._dispatch_lock:
+            for lane in self._lanes.values():
+                self._pending -= len(lane.pending)
+                lane.pending.clear()
+            self._lanes.clear()
+            self._dispatch_lock.notify_all()
+        self.clear_dead_letters()
         self.reset_statistics()
 
 
@@ -383,8 +785,11 @@ __all__ = [
     "EventId",
     "CorrelationId",
     "EventHandler",
+    "DispatchMode",
     "Event",
     "PublishResult",
+    "Subscription",
+    "DeadLetter",
     "EventBusStatistics",
     "EventBus",
     "event_bus",
@@ -4,10 +4,12 @@ core/engine/rule_engine.py
 Rule engine - decorator-registered business rule execution.
 Supports runtime rule definitions, condition evaluation, and side-effect triggers.
 """
-from typing import Callable, Dict, List, Any, Optional
+from typing import Callable, Dict, Hashable, List, Any, Optional, Sequence, Tuple
 from dataclasses import dataclass, field
 from abc import ABC, abstractmethod
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +25,7 @@ class RuleContext:
         action: Action being executed
         parameters: Action parameters
         metadata: Additional metadata
+        facts: Derived values memoized by fact() for this context
     """
 
     entity: Any
@@ -30,6 +33,20 @@ class RuleContext:
     action: str
     parameters: Dict[str, Any]
     metadata: Dict[str, Any] = field(default_factory=dict)
+    facts: Dict[str, Any] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def fact(self, name: str, compute: Callable[["RuleContext"], Any]) -> Any:
+        """
+        Get a derived value, computing it at most once per context.
+
+        Lets several rule conditions share parsing/lookups of the same input,
+        e.g. the check-in date used by weekend, holiday and long-stay pricing.
+        """
+        try:
+            return self.facts[name]
+        except KeyError:
+            value = self.facts[name] = compute(self)
+            return value
 
     def get_parameter(self, name: str, default: Any = None) -> Any:
         """Get a parameter value."""
@@ -56,6 +73,16 @@ class RuleCondition(ABC):
         """
         raise NotImplementedError
 
+    @property
+    def cache_key(self) -> Optional[Hashable]:
+        """
+        Identity of the condition for decision-table memoization.
+
+        Rules whose conditions share a key are evaluated once per evaluate()
+        call in decision-table mode. None disables memoization.
+        """
+        return None
+
 
 class FunctionCondition(RuleCondition):
     """Function condition - evaluates using a callable."""
@@ -67,42 +94,51 @@ class FunctionCondition(RuleCondition):
     def evaluate(self, context: RuleContext) -> bool:
         return self._func(context)
 
+    @property
+    def cache_key(self) -> Optional[Hashable]:
+        return self._func
+
     def __repr__(self) -> str:
         return f"FunctionCondition({self._description or self._func.__name__})"
 
 
 class ExpressionCondition(RuleCondition):
-    """Expression condition - evaluates using string expressions (simplified, no eval)."""
+    """Expression condition - evaluates using string expressions (simplified, no eval).
+
+    Only simple ``attr == 'value'`` / ``attr != 'value'`` checks are supported;
+    the expression is split once at construction instead of on every evaluation.
+    """
 
     def __init__(self, expression: str):
         self._expression = expression
+        self._parsed = self._parse(expression)
+
+    @staticmethod
+    def _parse(expression: str) -> Optional[tuple]:
+        """Split into (attribute, is_equality, expected) or None if unsupported."""
+        for token, is_equality in ((" == ", True), (" != ", False)):
+            if token in expression:
+                attr, value = expression.split(token, 1)
+                return attr.strip(), is_equality, value.strip().strip("'\"")
+        return None
 
     def evaluate(self, context: RuleContext) -> bool:
-        # Simplified expression parsing: only supports simple == / != checks
-        # e.g. "status == 'active'" or "count > 5"
-        # A full implementation should use a safe expression parser
-
-        # Helper to get attribute value (supports both dict and object)
-        def get_attr_value(entity, attr_name):
-            if isinstance(entity, dict):
-                return entity.get(attr_name)
-            return getattr(entity, attr_name, None)
-
-        # Currently only supports simple attribute checks
-        if " == " in self._expression:
-            attr, value = self._expression.split(" == ", 1)
-            attr_value = get_attr_value(context.entity, attr.strip())
-            expected = value.strip().strip("'\"")
-            return str(attr_value) == expected
-
-        if " != " in self._expression:
-            attr, value = self._expression.split(" != ", 1)
-            attr_value = get_attr_value(context.entity, attr.strip())
-            expected = value.strip().strip("'\"")
-            return str(attr_value) != expected
-
-        logger.warning(f"Unsupported expression: {self._expression}")
-        return False
+        if self._parsed is None:
+            logger.warning(f"Unsupported expression: {self._expression}")
+            return False
+
+        attr, is_equality, expected = self._parsed
+        entity = context.entity
+        # Supports both dict and object entities
+        if isinstance(entity, dict):
+            attr_value = entity.get(attr)
+        else:
+            attr_value = getattr(entity, attr, None)
+        return (str(attr_value) == expected) is is_equality
+
+    @property
+    def cache_key(self) -> Optional[Hashable]:
+        return ("expression", self._expression)
 
     def __repr__(self) -> str:
         return f"ExpressionCondition({self._expression})"
@@ -121,6 +157,8 @@ class Rule:
         action: Triggered action (callable)
         priority: Priority (higher number = higher priority)
         enabled: Whether the rule is enabled
+        entity_type: Entity type the rule applies to (defaults to the rule_id prefix)
+        events: Actions the rule applies to (None = every action)
     """
 
     rule_id: str
@@ -130,6 +168,39 @@ class Rule:
     action: Callable[[RuleContext], None]
     priority: int = 0
     enabled: bool = True
+    entity_type: Optional[str] = None
+    events: Optional[Sequence[str]] = None
+
+    def __post_init__(self):
+        if self.entity_type is None and "_" in self.rule_id:
+            self.entity_type = self.rule_id.split("_")[0]
+
+
+@dataclass
+class RuleStats:
+    """Per-rule counters for tuning (times in seconds)."""
+
+    evaluations: int = 0
+    hits: int = 0
+    errors: int = 0
+    memoized: int = 0
+    condition_time: float = 0.0
+    action_time: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "evaluations": self.evaluations,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.evaluations if self.evaluations else 0.0,
+            "errors": self.errors,
+            "memoized": self.memoized,
+            "condition_ms": self.condition_time * 1000,
+            "action_ms": self.action_time * 1000,
+            "avg_condition_us": (
+                self.condition_time / (self.evaluations - self.memoized) * 1e6
+                if self.evaluations > self.memoized else 0.0
+            ),
+        }
 
 
 class RuleEngine:
@@ -140,7 +211,10 @@ class RuleEngine:
     - Rule registration and unregistration
     - Condition evaluation
     - Action execution
-    - Priority-based ordering
+    - Priority-based ordering, pre-sorted per (entity_type, action)
+    - Optional decision-table mode: conditions shared by several rules
+      (same cache_key) are evaluated once per evaluate() call
+    - Per-rule hit counters and timing (get_rule_stats)
 
     Example:
         >>> engine = RuleEngine()
@@ -158,9 +232,15 @@ class RuleEngine:
         >>> engine.evaluate(RuleContext(...))
     """
 
-    def __init__(self):
+    def __init__(self, decision_table: bool = False):
         self._rules: Dict[str, Rule] = {}
         self._entity_rules: Dict[str, List[str]] = {}  # entity_type -> rule_ids
+        # (entity_type, action) -> [(rule, condition cache_key)], priority order;
+        # rebuilt lazily after register/unregister
+        self._dispatch: Dict[Tuple[str, str], List[Tuple[Rule, Optional[Hashable]]]] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, RuleStats] = {}
+        self.decision_table = decision_table
 
     def register_rule(self, rule: Rule) -> None:
         """
@@ -172,17 +252,15 @@ class RuleEngine:
         Raises:
             ValueError: If the rule_id already exists.
         """
-        if rule.rule_id in self._rules:
-            raise ValueError(f"Rule {rule.rule_id} already exists")
+        with self._lock:
+            if rule.rule_id in self._rules:
+                raise ValueError(f"Rule {rule.rule_id} already exists")
 
-        self._rules[rule.rule_id] = rule
-
-        # Index rules by entity type (extracted from rule_id prefix)
-        entity_type = rule.rule_id.split("_")[0] if "_" in rule.rule_id else None
-        if entity_type:
-            if entity_type not in self._entity_rules:
-                self._entity_rules[entity_type] = []
-            self._entity_rules[entity_type].append(rule.rule_id)
+            self._rules[rule.rule_id] = rule
+            if rule.entity_type:
+                self._entity_rules.setdefault(rule.entity_type, []).append(rule.rule_id)
+            self._stats[rule.rule_id] = RuleStats()
+            self._dispatch = {}
 
         logger.info(f"Rule {rule.rule_id} registered")
 
@@ -193,34 +271,56 @@ class RuleEngine:
         Args:
             rule_id: Rule ID.
         """
-        if rule_id in self._rules:
-            rule = self._rules[rule_id]
-
-            # Remove from entity index
-            for entity_type, rule_ids in self._entity_rules.items():
-                if rule_id in rule_ids:
-                    rule_ids.remove(rule_id)
-
-            del self._rules[rule_id]
-            logger.info(f"Rule {rule_id} unregistered")
+        with self._lock:
+            rule = self._rules.pop(rule_id, None)
+            if rule is None:
+                return
+            rule_ids = self._entity_rules.get(rule.entity_type)
+            if rule_ids and rule_id in rule_ids:
+                rule_ids.remove(rule_id)
+            self._stats.pop(rule_id, None)
+            self._dispatch = {}
+        logger.info(f"Rule {rule_id} unregistered")
 
     def get_rule(self, rule_id: str) -> Optional[Rule]:
         """Get a rule by ID."""
         return self._rules.get(rule_id)
 
-    def get_rules_for_entity(self, entity_type: str) -> List[Rule]:
+    def _sorted_rules(self, entity_type: str) -> List[Rule]:
+        rules = [self._rules[rid] for rid in self._entity_rules.get(entity_type, [])]
+        return sorted(rules, key=lambda r: r.priority, reverse=True)
+
+    def _get_dispatch(self, entity_type: str, action: str) -> List[Tuple[Rule, Optional[Hashable]]]:
+        """Pre-sorted rules for (entity_type, action); enabled is checked at call time."""
+        dispatch = self._dispatch
+        key = (entity_type, action)
+        entries = dispatch.get(key)
+        if entries is None:
+            with self._lock:
+                entries = [
+                    (rule, rule.condition.cache_key)
+                    for rule in self._sorted_rules(entity_type)
+                    if rule.events is None or action in rule.events
+                ]
+                # Only publish if no registration happened meanwhile
+                if dispatch is self._dispatch:
+                    dispatch[key] = entries
+        return entries
+
+    def get_rules_for_entity(self, entity_type: str, action: Optional[str] = None) -> List[Rule]:
         """
         Get all rules for an entity type.
 
         Args:
             entity_type: Entity type name.
+            action: Only rules applying to this action (None = ignore events).
 
         Returns:
             List of rules sorted by priority (highest first).
         """
-        rule_ids = self._entity_rules.get(entity_type, [])
-        rules = [self._rules[rid] for rid in rule_ids if rid in self._rules and self._rules[rid].enabled]
-        return sorted(rules, key=lambda r: r.priority, reverse=True)
+        if action is not None:
+            return [rule for rule, _ in self._get_dispatch(entity_type, action) if rule.enabled]
+        return [rule for rule in self._sorted_rules(entity_type) if rule.enabled]
 
     def evaluate(self, context: RuleContext) -> List[Rule]:
         """
@@ -233,18 +333,60 @@ class RuleEngine:
             List of triggered rules.
         """
         triggered = []
-
-        for rule in self.get_rules_for_entity(context.entity_type):
+        memo: Optional[Dict[Hashable, bool]] = {} if self.decision_table else None
+        perf_counter = time.perf_counter
+
+        for rule, cache_key in self._get_dispatch(context.entity_type, context.action):
+            if not rule.enabled:
+                continue
+            stats = self._stats.get(rule.rule_id)
+            if stats is None:
+                continue
+            stats.evaluations += 1
             try:
-                if rule.condition.evaluate(context):
+                if memo is not None and cache_key is not None and cache_key in memo:
+                    matched = memo[cache_key]
+                    stats.memoized += 1
+                else:
+                    start = perf_counter()
+                    matched = rule.condition.evaluate(context)
+                    stats.condition_time += perf_counter() - start
+                    if memo is not None and cache_key is not None:
+                        memo[cache_key] = matched
+                if matched:
+                    stats.hits += 1
+                    start = perf_counter()
                     rule.action(context)
+                    stats.action_time += perf_counter() - start
                     triggered.append(rule)
-                    logger.info(f"Rule {rule.rule_id} triggered for {context.entity_type}")
+                    logger.info("Rule %s triggered for %s", rule.rule_id, context.entity_type)
             except Exception as e:
+                stats.errors += 1
                 logger.error(f"Error executing rule {rule.rule_id}: {e}", exc_info=True)
 
         return triggered
 
+    def get_rule_stats(self, rule_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get per-rule counters and timing.
+
+        Args:
+            rule_id: A single rule, or None for all rules.
+
+        Returns:
+            {rule_id: {evaluations, hits, hit_rate, errors, memoized,
+            condition_ms, action_ms, avg_condition_us}} or one rule's dict.
+        """
+        if rule_id is not None:
+            stats = self._stats.get(rule_id)
+            return stats.to_dict() if stats else {}
+        return {rid: stats.to_dict() for rid, stats in list(self._stats.items())}
+
+    def reset_stats(self) -> None:
+        """Reset all rule counters."""
+        for rule_id in list(self._stats):
+            self._stats[rule_id] = RuleStats()
+
     def enable_rule(self, rule_id: str) -> None:
         """Enable a rule."""
         if rule_id in self._rules:
@@ -257,8 +399,11 @@ class RuleEngine:
 
     def clear(self) -> None:
         """Clear all rules (for testing)."""
-        self._rules.clear()
-        self._entity_rules.clear()
+        with self._lock:
+            self._rules.clear()
+            self._entity_rules.clear()
+            self._stats.clear()
+            self._dispatch = {}
 
 
 # Global rule engine instance
@@ -271,6 +416,7 @@ __all__ = [
     "FunctionCondition",
     "ExpressionCondition",
     "Rule",
+    "RuleStats",
     "RuleEngine",
     "rule_engine",
 ]
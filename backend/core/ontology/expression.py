@@ -0,0 +1,184 @@
+"""
+core/ontology/expression.py
+
+约束/守卫/规则表达式编译器 - 白名单校验一次，编译为闭包树后按表达式字符串缓存
+
+原实现每次求值都 ast.parse 再递归解释 AST；validate_action / GuardExecutor
+对每个动作的每条约束重复这一过程。编译后求值只剩闭包调用：
+
+    >>> check = compile_expression("state.status == 'VACANT_CLEAN'")
+    >>> check({"state": SimpleNamespace(status="VACANT_CLEAN")})
+    True
+
+支持：常量、名字、属性访问（None 安全）、list/tuple/set 字面量、比较（含链式）、
+and/or、not/负号、算术 + - * / // %、条件表达式、下标。
+其余节点（函数调用、lambda、推导式等）在编译时拒绝，抛出 ValueError。
+表达式与注册表无关，缓存不随注册表版本失效。
+"""
+import ast
+import operator
+from functools import lru_cache
+from typing import Any, Callable, Dict, Mapping
+
+CompiledExpression = Callable[[Mapping[str, Any]], Any]
+
+EXPRESSION_CACHE_SIZE = 1024
+
+_COMPARE_OPS = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Is: operator.is_,
+    ast.IsNot: operator.is_not,
+    ast.In: lambda a, b: a in b,
+    ast.NotIn: lambda a, b: a not in b,
+}
+
+_BIN_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+}
+
+
+def _compile_node(node: ast.AST) -> CompiledExpression:
+    """把单个 AST 节点编译为 ns -> value 的闭包（白名单外的节点直接拒绝）"""
+    if isinstance(node, ast.Constant):
+        value = node.value
+        return lambda ns: value
+
+    if isinstance(node, ast.Name):
+        name = node.id
+
+        def _name(ns):
+            if name in ns:
+                return ns[name]
+            raise ValueError(f"Undefined name: {name}")
+        return _name
+
+    if isinstance(node, ast.Attribute):
+        value_fn, attr = _compile_node(node.value), node.attr
+
+        def _attribute(ns):
+            obj = value_fn(ns)
+            if obj is None:
+                return None
+            return getattr(obj, attr, None)
+        return _attribute
+
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        element_fns = [_compile_node(el) for el in node.elts]
+        container = {ast.List: list, ast.Tuple: tuple, ast.Set: set}[type(node)]
+        return lambda ns: container(fn(ns) for fn in element_fns)
+
+    if isinstance(node, ast.Compare):
+        left_fn = _compile_node(node.left)
+        steps = []
+        for op_node, comparator in zip(node.ops, node.comparators):
+            op_func = _COMPARE_OPS.get(type(op_node))
+            if op_func is None:
+                raise ValueError(f"Unsupported comparison operator: {type(op_node).__name__}")
+            steps.append((op_func, _compile_node(comparator)))
+
+        if len(steps) == 1:
+            (op_func, right_fn), = steps
+            return lambda ns: bool(op_func(left_fn(ns), right_fn(ns)))
+
+        def _chain(ns):
+            left = left_fn(ns)
+            for op_func, right_fn in steps:
+                right = right_fn(ns)
+                if not op_func(left, right):
+                    return False
+                left = right
+            return True
+        return _chain
+
+    if isinstance(node, ast.BoolOp):
+        value_fns = [_compile_node(v) for v in node.values]
+        if isinstance(node.op, ast.And):
+            return lambda ns: all(fn(ns) for fn in value_fns)
+        return lambda ns: any(fn(ns) for fn in value_fns)
+
+    if isinstance(node, ast.UnaryOp):
+        operand_fn = _compile_node(node.operand)
+        if isinstance(node.op, ast.Not):
+            return lambda ns: not operand_fn(ns)
+        if isinstance(node.op, ast.USub):
+            return lambda ns: -operand_fn(ns)
+
+    if isinstance(node, ast.BinOp):
+        op_func = _BIN_OPS.get(type(node.op))
+        if op_func is None:
+            raise ValueError(f"Unsupported binary operator: {type(node.op).__name__}")
+        left_fn, right_fn = _compile_node(node.left), _compile_node(node.right)
+        return lambda ns: op_func(left_fn(ns), right_fn(ns))
+
+    if isinstance(node, ast.IfExp):
+        test_fn, body_fn, orelse_fn = (
+            _compile_node(node.test), _compile_node(node.body), _compile_node(node.orelse)
+        )
+        return lambda ns: body_fn(ns) if test_fn(ns) else orelse_fn(ns)
+
+    if isinstance(node, ast.Subscript):
+        value_fn, key_fn = _compile_node(node.value), _compile_node(node.slice)
+        return lambda ns: value_fn(ns)[key_fn(ns)]
+
+    raise ValueError(f"Unsupported expression node: {type(node).__name__}")
+
+
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def compile_expression(expression: str) -> CompiledExpression:
+    """
+    编译表达式（按字符串缓存）
+
+    Args:
+        expression: 表达式源码，如 "param.amount <= state.outstanding_amount"
+
+    Returns:
+        求值函数，接收命名空间映射并返回表达式的值
+
+    Raises:
+        ValueError: 语法错误或包含白名单外的节点（失败结果不缓存）
+    """
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression syntax: {expression!r}: {e.msg}") from e
+    return _compile_node(tree.body)
+
+
+def evaluate_expression(expression: str, namespace: Mapping[str, Any]) -> bool:
+    """编译（命中缓存）并求值，结果转为 bool"""
+    return bool(compile_expression(expression)(namespace))
+
+
+def get_expression_cache_stats() -> Dict[str, Any]:
+    info = compile_expression.cache_info()
+    return {
+        "size": info.currsize,
+        "max_entries": info.maxsize,
+        "hits": info.hits,
+        "misses": info.misses,
+    }
+
+
+def clear_expression_cache() -> None:
+    """清空已编译表达式（主要用于测试）"""
+    compile_expression.cache_clear()
+
+
+__all__ = [
+    "CompiledExpression",
+    "EXPRESSION_CACHE_SIZE",
+    "compile_expression",
+    "evaluate_expression",
+    "get_expression_cache_stats",
+    "clear_expression_cache",
+]
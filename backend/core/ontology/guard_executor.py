@@ -14,6 +14,7 @@ from dataclasses import dataclass, field
 from typing import Dict, List, Any, Optional
 import logging
 
+from core.ontology.expression import evaluate_expression
 from core.ontology.metadata import ConstraintSeverity
 
 logger = logging.getLogger(__name__)
@@ -229,11 +230,7 @@ class GuardExecutor:
                 continue
 
             try:
-                is_valid = bool(eval(
-                    constraint.condition_code,
-                    {"__builtins__": {}},
-                    namespace
-                ))
+                is_valid = evaluate_expression(constraint.condition_code, namespace)
             except Exception as e:
                 logger.warning(
                     f"Failed to evaluate constraint {constraint.id}: {e}"
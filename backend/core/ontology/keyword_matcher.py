@@ -0,0 +1,131 @@
+"""
+core/ontology/keyword_matcher.py
+
+关键字匹配自动机 - Aho–Corasick 多模式匹配
+
+一次编译、对消息单遍扫描即可找出所有出现的关键字，代替逐个关键字做
+``keyword in message`` 的子串测试。用于：
+- OntologyRegistry 的 searchable 关键字（实体/属性）解析
+- core/ai/query_keywords 的通用查询/操作/帮助关键字
+- IntentRouter 的动作名匹配
+
+匹配区分大小写；需要忽略大小写时，用小写关键字编译并传入小写文本。
+"""
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+class KeywordMatcher:
+    """
+    Aho–Corasick 自动机
+
+    Example:
+        >>> matcher = KeywordMatcher(['房间', '空闲', '空闲房间'])
+        >>> sorted(matcher.find_all('查看空闲房间'))
+        ['房间', '空闲', '空闲房间']
+        >>> matcher.contains_any('你好')
+        False
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        """
+        编译自动机
+
+        Args:
+            keywords: 关键字（重复项与空字符串会被合并；空字符串视为总能匹配，
+                与 ``'' in message`` 的语义一致）
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[str, ...]] = [()]
+        self._keywords: Set[str] = set()
+        self._matches_empty = False
+
+        for keyword in keywords:
+            if not keyword:
+                self._matches_empty = True
+                continue
+            if keyword in self._keywords:
+                continue
+            self._keywords.add(keyword)
+            self._insert(keyword)
+        self._link()
+
+    def _insert(self, keyword: str) -> None:
+        node = 0
+        for char in keyword:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            node = nxt
+        self._out[node] = self._out[node] + (keyword,)
+
+    def _link(self) -> None:
+        """广度优先计算失败指针，并把失败链上的输出合并到每个节点"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+                queue.append(child)
+
+    @property
+    def keywords(self) -> Set[str]:
+        """编译进自动机的关键字"""
+        return set(self._keywords)
+
+    def __len__(self) -> int:
+        return len(self._keywords) + (1 if self._matches_empty else 0)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, str]]:
+        """
+        按出现顺序产出 (起始位置, 关键字)，重叠的出现都会产出
+
+        Args:
+            text: 待扫描文本
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for keyword in out[node]:
+                yield index - len(keyword) + 1, keyword
+
+    def find_all(self, text: str) -> Set[str]:
+        """文本中出现过的所有关键字"""
+        found = {keyword for _, keyword in self.iter_matches(text)}
+        if self._matches_empty:
+            found.add("")
+        return found
+
+    def contains_any(self, text: str) -> bool:
+        """文本中是否出现任一关键字（找到第一个即返回）"""
+        if self._matches_empty:
+            return True
+        for _ in self.iter_matches(text):
+            return True
+        return False
+
+    def longest(self, text: str) -> Optional[str]:
+        """文本中出现的最长关键字（等长时取先出现的）"""
+        best: Optional[str] = None
+        for _, keyword in self.iter_matches(text):
+            if best is None or len(keyword) > len(best):
+                best = keyword
+        if best is None and self._matches_empty:
+            return ""
+        return best
+
+
+__all__ = ["KeywordMatcher"]
@@ -619,6 +619,8 @@ class EntityMetadata:
 # type: 'entity' 或 'property'
 # name: 实体名或属性路径 (如 'Room.status')
 _SEARCHABLE_KEYWORDS: Dict[str, List[Tuple[str, str]]] = {}
+# 每次注册关键字递增，供编译好的关键字匹配器判断是否需要重建
+_SEARCHABLE_VERSION = 0
 
 
 def register_searchable_keyword(keyword: str, item_type: str, name: str):
@@ -630,9 +632,11 @@ def register_searchable_keyword(keyword: str, item_type: str, name: str):
         item_type: 类型 ('entity' 或 'property')
         name: 实体名或属性路径 (如 'Room', 'Room.status')
     """
+    global _SEARCHABLE_VERSION
     if keyword not in _SEARCHABLE_KEYWORDS:
         _SEARCHABLE_KEYWORDS[keyword] = []
     _SEARCHABLE_KEYWORDS[keyword].append((item_type, name))
+    _SEARCHABLE_VERSION += 1
 
 
 def get_searchable_mapping() -> Dict[str, List[Tuple[str, str]]]:
@@ -640,6 +644,11 @@ def get_searchable_mapping() -> Dict[str, List[Tuple[str, str]]]:
     return _SEARCHABLE_KEYWORDS.copy()
 
 
+def get_searchable_version() -> int:
+    """可搜索关键字映射的版本号（每次注册递增）"""
+    return _SEARCHABLE_VERSION
+
+
 def ontology_entity(
     name: str = "",
     description: str = "",
@@ -754,4 +763,5 @@ __all__ = [
     "ontology_property",
     "register_searchable_keyword",
     "get_searchable_mapping",
+    "get_searchable_version",
 ]
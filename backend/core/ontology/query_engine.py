@@ -9,17 +9,22 @@ Ontology 查询引擎 - 动态构建并执行 SQLAlchemy 查询
 - 支持复杂过滤条件
 - 字段级结果映射
 - 无硬编码实体逻辑
+- 按查询形状缓存编译计划（参数化语句，复用时只绑定过滤值）
+- 列投影：只查询请求的列（多对一关联字段经显式 OUTER JOIN 取出）
+- 流式导出：按批产出行；总数由独立的 COUNT(*) 给出
 """
 import logging
+from dataclasses import dataclass
 from datetime import datetime, date, timedelta
-from typing import List, Any, Dict, Optional, Type
-from sqlalchemy import and_, func
-from sqlalchemy.orm import Session
+from typing import Callable, Iterator, List, Any, Dict, Optional, Sequence, Tuple, Type
+from sqlalchemy import and_, bindparam, func, inspect, select
+from sqlalchemy.orm import Session, aliased, selectinload
 from sqlalchemy.sql.elements import BinaryExpression
 
 from core.ontology.query import (
     StructuredQuery, FilterClause, JoinClause, FilterOperator, JoinType
 )
+from core.ontology.query_plan import _join_filter_value, structured_plan_cache, structured_query_shape
 from core.ontology.registry import OntologyRegistry
 from core.security.data_scope import DataScopeLevel, DataScopeType
 
@@ -78,23 +83,15 @@ def get_display_name(field_name: str, default: Optional[str] = None) -> str:
 
     Fallback chain: Registry → default → field_name
     """
-    registry = _get_registry()
-    for entity in registry.get_entities():
-        prop = entity.properties.get(field_name)
-        if prop and prop.display_name:
-            return prop.display_name
+    display_name = _get_registry().get_display_name_index().get(field_name)
+    if display_name:
+        return display_name
     return default if default is not None else field_name
 
 
 def _get_display_names_from_registry() -> Dict[str, str]:
     """SPEC-R05: Build DISPLAY_NAMES from registry for backward compat."""
-    registry = _get_registry()
-    result: Dict[str, str] = {}
-    for entity in registry.get_entities():
-        for name, prop in entity.properties.items():
-            if prop.display_name and name not in result:
-                result[name] = prop.display_name
-    return result
+    return dict(_get_registry().get_display_name_index())
 
 
 DISPLAY_NAMES = _get_display_names_from_registry
@@ -102,7 +99,20 @@ DISPLAY_NAMES = _get_display_names_from_registry
 
 def _get_relationship_map_from_registry() -> Dict[str, Dict[str, tuple]]:
     """SPEC-R04: Build RELATIONSHIP_MAP from registry for backward compat."""
-    registry = _get_registry()
+    return get_relationship_tuple_map()
+
+
+def get_relationship_tuple_map(registry: Optional[OntologyRegistry] = None) -> Dict[str, Dict[str, tuple]]:
+    """
+    元组格式的关系映射 {source: {target: (rel_attr, foreign_key)}}
+
+    按注册表版本记忆，调用方不应修改。
+    """
+    registry = registry or _get_registry()
+    return registry.memoize("relationship_tuple_map", lambda: _build_relationship_tuple_map(registry))
+
+
+def _build_relationship_tuple_map(registry: OntologyRegistry) -> Dict[str, Dict[str, tuple]]:
     rmap = registry.get_relationship_map()
     result: Dict[str, Dict[str, tuple]] = {}
     for src, targets in rmap.items():
@@ -114,6 +124,49 @@ def _get_relationship_map_from_registry() -> Dict[str, Dict[str, tuple]]:
 
 RELATIONSHIP_MAP = _get_relationship_map_from_registry
 
+# 参数绑定函数：从同形状的 StructuredQuery 中取出字面值，返回 {参数名: 值}
+Binder = Callable[[StructuredQuery], Dict[str, Any]]
+
+
+def _no_params(value: Any) -> Dict[str, Any]:
+    return {}
+
+
+@dataclass
+class QueryPlan:
+    """
+    结构化查询的编译计划（按查询形状缓存，跨会话共享）
+
+    Attributes:
+        model_class: 根实体 ORM 模型
+        statement: 参数化 select 语句（已含 JOIN/WHERE/ORDER BY/DISTINCT，
+            不含数据作用域过滤与分页——二者随请求变化）
+        binders: 参数绑定函数列表
+        columns: 列显示名
+        slots: 列投影模式下每个字段在结果行中的位置（None 表示字段不存在，恒为空）；
+            为 None 时语句选取整个实体（关联以 selectinload 预加载），按属性路径取值
+    """
+    model_class: Type
+    statement: Any
+    binders: List[Binder]
+    columns: List[str]
+    slots: Optional[List[Optional[int]]] = None
+
+    @property
+    def projected(self) -> bool:
+        return self.slots is not None
+
+    def bind(self, query: StructuredQuery) -> Dict[str, Any]:
+        """为同形状查询绑定参数值"""
+        return _bind_params(self.binders, query)
+
+
+def _bind_params(binders: List[Binder], query: StructuredQuery) -> Dict[str, Any]:
+    params: Dict[str, Any] = {}
+    for binder in binders:
+        params.update(binder(query))
+    return params
+
 
 class QueryEngine:
     """
@@ -155,27 +208,27 @@ class QueryEngine:
             if query.aggregate or query.group_by:
                 return self._execute_aggregate_query(model_class=get_model_class(query.entity), query=query)
 
-            # 1. 获取 ORM 模型类
-            model_class = get_model_class(query.entity)
+            # 1. 取编译计划（同形状查询复用 JOIN 与参数化语句）
+            plan = self.get_plan(query)
 
-            # 2. 构建 SQLAlchemy Query
-            db_query = self._build_query(model_class, query)
+            # 2. 注入数据作用域过滤，绑定过滤值
+            statement = self._apply_data_scope_filter(plan.statement, query.entity, plan.model_class)
+            params = plan.bind(query)
 
-            # 3. 执行查询
-            results = db_query.limit(query.limit).offset(query.offset).all()
+            # 3. 分页执行并映射结果
+            page = statement.limit(query.limit).offset(query.offset)
+            rows = self._map_plan_rows(plan, self._fetch(plan, page, params).all(), query)
 
-            # 4. 映射结果
-            rows = self._map_results(results, query)
-
-            # 5. 构建列名
-            columns = self._get_column_names(query)
+            # 4. 真实总数（不受分页影响）
+            total = self._count_total(statement, params, query, len(rows))
 
             return {
                 "display_type": "table",
-                "columns": columns,
+                "columns": list(plan.columns),
                 "column_keys": query.fields,
                 "rows": rows,
-                "summary": f"共 {len(results)} 条记录"
+                "total": total,
+                "summary": f"共 {total} 条记录"
             }
 
         except Exception as e:
@@ -187,32 +240,209 @@ class QueryEngine:
                 "summary": "查询失败"
             }
 
-    def _build_query(self, model_class: Type, query: StructuredQuery):
-        """构建 SQLAlchemy Query"""
-        q = self.db.query(model_class)
+    def stream(self, query: StructuredQuery, batch_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+        """
+        流式执行 - 按批产出行，用于大结果集导出
+
+        不应用 limit/offset（导出全部匹配行），不支持聚合查询。
+        结果通过服务端游标分批读取（yield_per），内存占用与批大小成正比。
+
+        Args:
+            query: StructuredQuery 实例
+            batch_size: 每批行数
+
+        Yields:
+            行字典列表（格式同 execute 的 rows）
+        """
+        if query.aggregate or query.group_by:
+            raise ValueError("Aggregate queries cannot be streamed")
+
+        plan = self.get_plan(query)
+        statement = self._apply_data_scope_filter(plan.statement, query.entity, plan.model_class)
+        result = self._fetch(plan, statement.execution_options(yield_per=batch_size), plan.bind(query))
+        for batch in result.partitions(batch_size):
+            yield self._map_plan_rows(plan, batch, query)
+
+    def count(self, query: StructuredQuery) -> int:
+        """符合过滤条件的总行数（SELECT COUNT(*)，不受 limit/offset 影响）"""
+        plan = self.get_plan(query)
+        statement = self._apply_data_scope_filter(plan.statement, query.entity, plan.model_class)
+        return self._count_statement(statement, plan.bind(query))
+
+    def _fetch(self, plan: QueryPlan, statement, params: Dict[str, Any]):
+        """执行计划语句：列投影返回行元组，实体模式返回 ORM 对象"""
+        result = self.db.execute(statement, params)
+        return result if plan.projected else result.scalars()
+
+    def _count_total(self, statement, params: Dict[str, Any], query: StructuredQuery, page_size: int) -> int:
+        """分页未满时总数可直接推出，否则执行 COUNT(*)"""
+        if page_size < query.limit and (page_size or not query.offset):
+            return query.offset + page_size
+        return self._count_statement(statement, params)
+
+    def _count_statement(self, statement, params: Dict[str, Any]) -> int:
+        count_statement = select(func.count()).select_from(statement.order_by(None).subquery())
+        return self.db.execute(count_statement, params).scalar_one()
+
+    def _map_plan_rows(self, plan: QueryPlan, results: Sequence[Any], query: StructuredQuery) -> List[Dict[str, Any]]:
+        if not plan.projected:
+            return self._map_results(results, query)
+        format_value = self._format_value
+        slots = list(zip(query.fields, plan.slots))
+        return [
+            {field: format_value(row[slot]) if slot is not None else "" for field, slot in slots}
+            for row in results
+        ]
+
+    def get_plan(self, query: StructuredQuery) -> QueryPlan:
+        """
+        获取查询计划 - 按形状（实体/字段/JOIN/过滤字段与操作符/排序）缓存
+
+        注册表版本变化时缓存整体失效。
+        """
+        registry = self.registry or _get_registry()
+        return structured_plan_cache.get_or_build(
+            structured_query_shape(query),
+            lambda: self._compile_plan(query),
+            registry,
+        )
+
+    def _compile_plan(self, query: StructuredQuery) -> QueryPlan:
+        """
+        编译查询计划（不含字面值）
+
+        字段全部可投影（列属性，经由多对一关系到达）时只选取这些列；
+        否则选取整个实体，字段路径上的关系以 selectinload 预加载，避免逐行懒加载。
+        """
+        model_class = get_model_class(query.entity)
+        projection = self._resolve_projection(model_class, query.fields)
+
+        if projection is not None:
+            columns, slots, outer_joins = projection
+            statement = select(*columns).select_from(model_class)
+        else:
+            slots, outer_joins = None, []
+            statement = select(model_class)
+            loader_options = self._relationship_loaders(model_class, query.fields)
+            if loader_options:
+                statement = statement.options(*loader_options)
+
+        statement, binders = self._build_query(statement, model_class, query)
+        for target, on_clause in outer_joins:
+            statement = statement.outerjoin(target, on_clause)
 
         # 处理 DISTINCT
         if query.distinct:
-            q = q.distinct()
+            statement = statement.distinct()
+
+        # 处理 ORDER BY
+        for order_expr in query.order_by:
+            statement = self._apply_order_by(statement, model_class, order_expr)
+
+        return QueryPlan(
+            model_class=model_class,
+            statement=statement,
+            binders=binders,
+            columns=self._get_column_names(query),
+            slots=slots,
+        )
+
+    def _resolve_projection(self, model_class: Type, fields: List[str]):
+        """
+        把字段路径解析为列投影
+
+        Returns:
+            (列表达式列表, 每个字段的列位置, [(别名实体, ON 子句)])；
+            有字段无法投影（Python 属性、以关系结尾、经过非关系属性）时返回 None
+        """
+        columns: List[Any] = []
+        slots: List[Optional[int]] = []
+        outer_joins: List[Tuple[Any, Any]] = []
+        aliases: Dict[Tuple[str, ...], Any] = {}
+
+        for field in fields:
+            parts = field.split(".")
+            entity, mapper = model_class, inspect(model_class)
+            missing = False
+
+            for depth, part in enumerate(parts[:-1]):
+                rel = mapper.relationships.get(part)
+                if rel is None:
+                    if hasattr(mapper.class_, part):
+                        return None
+                    missing = True
+                    break
+                if rel.uselist:
+                    # 一对多路径在表格中没有单一取值（与原按属性取值的结果一致：空）
+                    missing = True
+                    break
+                path = tuple(parts[:depth + 1])
+                target = aliases.get(path)
+                if target is None:
+                    target = aliased(rel.mapper.class_)
+                    aliases[path] = target
+                    outer_joins.append((target, getattr(entity, part).of_type(target)))
+                entity, mapper = target, rel.mapper
+
+            if not missing:
+                name = parts[-1]
+                if name in mapper.column_attrs:
+                    slots.append(len(columns))
+                    columns.append(getattr(entity, name).label(f"c{len(columns)}"))
+                    continue
+                if hasattr(mapper.class_, name):
+                    return None
+            slots.append(None)
+
+        if not columns:
+            return None
+        return columns, slots, outer_joins
+
+    def _relationship_loaders(self, model_class: Type, fields: List[str]) -> List[Any]:
+        """字段路径上的关系链 → selectinload 选项"""
+        options: Dict[Tuple[str, ...], Any] = {}
+        for field in fields:
+            mapper = inspect(model_class)
+            loader = None
+            path: Tuple[str, ...] = ()
+            for part in field.split("."):
+                rel = mapper.relationships.get(part)
+                if rel is None:
+                    break
+                attr = getattr(mapper.class_, part)
+                loader = selectinload(attr) if loader is None else loader.selectinload(attr)
+                path += (part,)
+                mapper = rel.mapper
+            if loader is not None:
+                # 同一前缀只保留最长的链
+                options = {p: o for p, o in options.items() if path[:len(p)] != p}
+                if not any(p[:len(path)] == path for p in options):
+                    options[path] = loader
+        return list(options.values())
+
+    def _build_query(self, statement, model_class: Type, query: StructuredQuery) -> Tuple[Any, List[Binder]]:
+        """
+        应用 JOIN / WHERE（参数化），select 语句与 ORM Query 均可
+
+        Returns:
+            (语句, 参数绑定函数列表)
+        """
+        binders: List[Binder] = []
 
         # 处理 JOIN
-        for join_clause in query.joins:
-            q = self._apply_join(q, model_class, join_clause)
+        for index, join_clause in enumerate(query.joins):
+            statement = self._apply_join(statement, model_class, join_clause, index, binders)
 
         # 处理 WHERE 条件
         if query.filters:
-            conditions = [self._parse_filter(model_class, f) for f in query.filters]
-            if conditions:
-                q = q.filter(and_(*conditions))
+            conditions = []
+            for index, filter_clause in enumerate(query.filters):
+                condition, bind = self._parse_filter(model_class, filter_clause, f"f{index}")
+                conditions.append(condition)
+                binders.append(lambda q, i=index, bind=bind: bind(q.filters[i].value))
+            statement = statement.filter(and_(*conditions))
 
-        # 自动注入数据作用域过滤
-        q = self._apply_data_scope_filter(q, query.entity, model_class)
-
-        # 处理 ORDER BY
-        for order_expr in query.order_by:
-            q = self._apply_order_by(q, model_class, order_expr)
-
-        return q
+        return statement, binders
 
     def _apply_data_scope_filter(self, query, entity_name: str, model_class: Type):
         """自动注入数据作用域过滤条件"""
@@ -247,8 +477,9 @@ class QueryEngine:
 
         return query
 
-    def _apply_join(self, query, base_model: Type, join_clause: JoinClause):
-        """应用 JOIN 子句"""
+    def _apply_join(self, query, base_model: Type, join_clause: JoinClause,
+                    join_index: int, binders: List[Binder]):
+        """应用 JOIN 子句（关联表过滤条件参数化，绑定函数追加到 binders）"""
         try:
             related_model = get_model_class(join_clause.entity)
 
@@ -273,33 +504,49 @@ class QueryEngine:
 
             # 应用关联表的过滤条件
             if join_clause.filters:
-                for field, value in join_clause.filters.items():
+                for position, (field, value) in enumerate(join_clause.filters.items()):
                     if isinstance(value, (list, tuple)) and len(value) == 2:
-                        op, val = value
-                        filter_obj = FilterClause(field=f"{rel_attr}.{field}", operator=FilterOperator(op), value=val)
+                        operator = FilterOperator(value[0])
                     else:
-                        filter_obj = FilterClause(field=f"{rel_attr}.{field}", operator=FilterOperator.EQ, value=value)
-                    condition = self._parse_filter(base_model, filter_obj)
+                        operator = FilterOperator.EQ
+                    filter_obj = FilterClause(field=f"{rel_attr}.{field}", operator=operator,
+                                              value=_join_filter_value(value))
+                    condition, bind = self._parse_filter(base_model, filter_obj, f"j{join_index}_{position}")
                     if condition is not None:
                         query = query.filter(condition)
+                        binders.append(
+                            lambda q, j=join_index, key=field, bind=bind:
+                                bind(_join_filter_value(q.joins[j].filters[key]))
+                        )
 
         except Exception as e:
             logger.warning(f"Join failed for {join_clause.entity}: {e}")
 
         return query
 
-    def _parse_filter(self, model_class: Type, filter_clause: FilterClause) -> Optional[BinaryExpression]:
+    def _parse_filter(
+        self, model_class: Type, filter_clause: FilterClause, name: str
+    ) -> Tuple[Optional[BinaryExpression], Callable[[Any], Dict[str, Any]]]:
         """
-        解析过滤条件为 SQLAlchemy 表达式
+        解析过滤条件为参数化 SQLAlchemy 表达式
 
         支持字段路径：
         - "status" → 直接属性比较
         - "stay_records.status" → 使用 relationship.any() 或 has() 进行过滤
         - "room_type.name" → 使用 relationship.has() 进行过滤
+
+        Args:
+            model_class: 根实体模型
+            filter_clause: 过滤条件（使用 field/operator 及值是否为 None，值在执行时绑定）
+            name: 绑定参数名前缀
+
+        Returns:
+            (表达式, 绑定函数)；绑定函数接收原始过滤值，返回 {参数名: 值}。
+            字段不存在时表达式为 None
         """
         field_path = filter_clause.field
         operator = filter_clause.operator
-        value = self._parse_value(filter_clause.value)
+        null_value = filter_clause.value is None
 
         # 解析字段路径
         parts = field_path.split(".")
@@ -309,8 +556,8 @@ class QueryEngine:
             attr = getattr(model_class, parts[0], None)
             if attr is None:
                 logger.warning(f"Field not found: {field_path}")
-                return None
-            return self._apply_operator(attr, operator, value)
+                return None, _no_params
+            return self._apply_operator(attr, operator, name, null_value)
 
         # 嵌套字段 (如 stay_records.status, room_type.name)
         rel_name = parts[0]  # 关系属性名
@@ -320,110 +567,83 @@ class QueryEngine:
         rel_attr = getattr(model_class, rel_name, None)
         if rel_attr is None:
             logger.warning(f"Relationship not found: {rel_name}")
-            return None
+            return None, _no_params
 
-        # 检查关系的类型（一对多用 any()，一对多用 has()）
+        # 检查关系的类型（一对多用 any()，多对一用 has()）
         # 通过检查关系的 uselist 属性来判断
         try:
             is_collection = rel_attr.property.uselist
+            related_model = rel_attr.property.mapper.class_
         except (AttributeError, NotImplementedError):
-            # 如果无法判断，尝试通过导入检查
-            is_collection = None
-
-        # 构建过滤条件
-        if is_collection is True:
-            # 一对多关系：使用 any()
-            if operator == FilterOperator.EQ:
-                return rel_attr.any(**{target_field: value})
-            elif operator == FilterOperator.NE:
-                return ~rel_attr.any(**{target_field: value})
-            elif operator == FilterOperator.IN:
-                return rel_attr.any(**{f"{target_field}__in": value})
-            elif operator == FilterOperator.LIKE:
-                # 对于 LIKE，需要使用 and_ 组合条件
-                from sqlalchemy import and_
-                return rel_attr.any(and_(
-                    getattr(rel_attr.property.mapper.class_, target_field).like(f"%{value}%")
-                ))
-            else:
-                # 其他操作符，尝试构建条件
-                related_model = rel_attr.property.mapper.class_
-                related_attr = getattr(related_model, target_field, None)
-                if related_attr is not None:
-                    return rel_attr.any(self._apply_operator(related_attr, operator, value))
-                else:
-                    logger.warning(f"Field not found in related model: {target_field}")
-                    return None
-
-        elif is_collection is False:
-            # 多对一或一对一关系：使用 has()
-            if operator == FilterOperator.EQ:
-                return rel_attr.has(**{target_field: value})
-            elif operator == FilterOperator.NE:
-                return ~rel_attr.has(**{target_field: value})
-            elif operator == FilterOperator.LIKE:
-                from sqlalchemy import and_
-                related_model = rel_attr.property.mapper.class_
-                related_attr = getattr(related_model, target_field, None)
-                if related_attr is not None:
-                    return rel_attr.has(related_attr.like(f"%{value}%"))
-                return None
-            else:
-                # 其他操作符
-                related_model = rel_attr.property.mapper.class_
-                related_attr = getattr(related_model, target_field, None)
-                if related_attr is not None:
-                    return rel_attr.has(self._apply_operator(related_attr, operator, value))
-                else:
-                    logger.warning(f"Field not found in related model: {target_field}")
-                    return None
-
-        else:
-            # 无法确定关系类型，使用通用方法
-            # 尝试通过 has() 处理
-            try:
-                related_model = rel_attr.property.mapper.class_
-                related_attr = getattr(related_model, target_field, None)
-                if related_attr is not None:
-                    return rel_attr.has(**{target_field: value})
-            except (AttributeError, TypeError):
-                logger.warning(f"Cannot build filter for nested field: {field_path}")
-                return None
-
-        return None
+            logger.warning(f"Cannot build filter for nested field: {field_path}")
+            return None, _no_params
+
+        related_attr = getattr(related_model, target_field, None)
+        if related_attr is None:
+            logger.warning(f"Field not found in related model: {target_field}")
+            return None, _no_params
+
+        # 一对多关系用 any()，多对一或一对一关系用 has()
+        exists_in = rel_attr.any if is_collection else rel_attr.has
+        if operator == FilterOperator.NE:
+            condition, bind = self._apply_operator(related_attr, FilterOperator.EQ, name, null_value)
+            return ~exists_in(condition), bind
+        condition, bind = self._apply_operator(related_attr, operator, name, null_value)
+        return exists_in(condition), bind
+
+    def _apply_operator(
+        self, attr, operator: FilterOperator, name: str, null_value: bool = False
+    ) -> Tuple[BinaryExpression, Callable[[Any], Dict[str, Any]]]:
+        """
+        应用操作符（参数化），返回 (表达式, 绑定函数)
 
-    def _apply_operator(self, attr, operator: FilterOperator, value: Any) -> BinaryExpression:
-        """应用操作符"""
-        if operator == FilterOperator.EQ:
-            return attr == value
-        elif operator == FilterOperator.NE:
-            return attr != value
+        null_value 为 True 时 EQ/NE 编译为 IS NULL / IS NOT NULL（= NULL 不匹配任何行），
+        与计划缓存形状键中的值是否为 None 对应
+        """
+        parse = self._parse_value
+
+        if operator == FilterOperator.IS_NULL or (null_value and operator == FilterOperator.EQ):
+            return attr.is_(None), _no_params
+        if operator == FilterOperator.IS_NOT_NULL or (null_value and operator == FilterOperator.NE):
+            return attr.isnot(None), _no_params
+
+        if operator in (FilterOperator.IN, FilterOperator.NOT_IN):
+            param = bindparam(name, expanding=True)
+            condition = attr.in_(param) if operator == FilterOperator.IN else attr.notin_(param)
+
+            def bind_list(value: Any) -> Dict[str, Any]:
+                value = parse(value)
+                return {name: value if isinstance(value, list) else [value]}
+            return condition, bind_list
+
+        if operator == FilterOperator.BETWEEN:
+            low, high = f"{name}_low", f"{name}_high"
+
+            def bind_range(value: Any) -> Dict[str, Any]:
+                value = parse(value)
+                if isinstance(value, list) and len(value) == 2:
+                    return {low: value[0], high: value[1]}
+                return {low: value, high: value}
+            return attr.between(bindparam(low), bindparam(high)), bind_range
+
+        param = bindparam(name)
+        if operator in (FilterOperator.LIKE, FilterOperator.NOT_LIKE):
+            condition = attr.like(param) if operator == FilterOperator.LIKE else attr.notlike(param)
+            return condition, lambda value: {name: f"%{parse(value)}%"}
+
+        if operator == FilterOperator.NE:
+            condition = attr != param
         elif operator == FilterOperator.GT:
-            return attr > value
+            condition = attr > param
         elif operator == FilterOperator.GTE:
-            return attr >= value
+            condition = attr >= param
         elif operator == FilterOperator.LT:
-            return attr < value
+            condition = attr < param
         elif operator == FilterOperator.LTE:
-            return attr <= value
-        elif operator == FilterOperator.IN:
-            return attr.in_(value if isinstance(value, list) else [value])
-        elif operator == FilterOperator.NOT_IN:
-            return attr.notin_(value if isinstance(value, list) else [value])
-        elif operator == FilterOperator.LIKE:
-            return attr.like(f"%{value}%")
-        elif operator == FilterOperator.NOT_LIKE:
-            return attr.notlike(f"%{value}%")
-        elif operator == FilterOperator.BETWEEN:
-            if isinstance(value, list) and len(value) == 2:
-                return attr.between(value[0], value[1])
-            return attr.between(value, value)
-        elif operator == FilterOperator.IS_NULL:
-            return attr.is_(None)
-        elif operator == FilterOperator.IS_NOT_NULL:
-            return attr.isnot(None)
+            condition = attr <= param
         else:
-            return attr == value
+            condition = attr == param
+        return condition, lambda value: {name: parse(value)}
 
     def _parse_value(self, value: Any) -> Any:
         """解析特殊值"""
@@ -537,18 +757,8 @@ class QueryEngine:
         支持嵌套字段（如 guest.name）
         """
         try:
-            # 构建基础查询
-            base_query = self.db.query(model_class)
-
-            # 处理 JOIN
-            for join_clause in query.joins:
-                base_query = self._apply_join(base_query, model_class, join_clause)
-
-            # 处理 WHERE 条件
-            if query.filters:
-                conditions = [self._parse_filter(model_class, f) for f in query.filters]
-                if conditions:
-                    base_query = base_query.filter(and_(*conditions))
+            # 构建基础查询（JOIN / WHERE 参数化）
+            base_query, binders = self._build_query(self.db.query(model_class), model_class, query)
 
             # 自动注入数据作用域过滤
             base_query = self._apply_data_scope_filter(base_query, query.entity, model_class)
@@ -667,7 +877,8 @@ class QueryEngine:
                         break
 
             # 执行查询
-            results = aggregate_query.limit(query.limit).offset(query.offset).all()
+            params = _bind_params(binders, query)
+            results = aggregate_query.params(**params).limit(query.limit).offset(query.offset).all()
 
             # 映射结果
             rows = []
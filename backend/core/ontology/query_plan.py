@@ -0,0 +1,184 @@
+"""
+core/ontology/query_plan.py
+
+查询计划缓存 - 按查询"形状"复用已编译的计划
+
+形状 = 实体 + 字段 + JOIN 路径 + 过滤字段与操作符 + 排序/去重等，不含字面值。
+OODA 管道反复发出同样形状的查询（如"各楼层在住客人"、"今日预抵"），
+只有过滤值不同：
+- SemanticPathResolver 缓存路径解析结果（JOIN、字段/过滤/排序路径）
+- QueryEngine 缓存预解析的 JOIN 与参数化 SQLAlchemy 语句，复用时只绑定新值
+
+注册表版本变化（register_* / clear）时整体失效。
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from core.ontology.query import StructuredQuery
+from core.ontology.registry import OntologyRegistry
+from core.ontology.semantic_query import SemanticQuery
+
+
+def _freeze(value: Any) -> Hashable:
+    """把 list/dict 转成可哈希的形状片段"""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _join_filter_operator(value: Any) -> str:
+    """JoinClause.filters 的值可以是 (op, value) 或直接的值（等值）"""
+    if isinstance(value, (list, tuple)) and len(value) == 2:
+        return str(value[0])
+    return "eq"
+
+
+def _join_filter_value(value: Any) -> Any:
+    """JoinClause.filters 的值：(op, value) 取 value，否则原值"""
+    if isinstance(value, (list, tuple)) and len(value) == 2:
+        return value[1]
+    return value
+
+
+def structured_query_shape(query: StructuredQuery) -> Tuple:
+    """
+    StructuredQuery 的形状键（不含过滤值、limit/offset）
+
+    过滤值只记录是否为 None：EQ/NE 与 None 比较编译为 IS NULL / IS NOT NULL，
+    与普通值的参数化比较不是同一计划。
+
+    Example:
+        >>> q1 = StructuredQuery(entity="Room", fields=["room_number"],
+        ...                      filters=[FilterClause("floor", FilterOperator.EQ, 2)])
+        >>> q2 = StructuredQuery(entity="Room", fields=["room_number"],
+        ...                      filters=[FilterClause("floor", FilterOperator.EQ, 3)])
+        >>> structured_query_shape(q1) == structured_query_shape(q2)
+        True
+    """
+    return (
+        query.entity,
+        tuple(query.fields),
+        tuple((f.field, f.operator, f.value is None) for f in query.filters),
+        tuple(
+            (j.entity, j.join_type, j.on,
+             tuple((k, _join_filter_operator(v), _join_filter_value(v) is None)
+                   for k, v in j.filters.items()))
+            for j in query.joins
+        ),
+        tuple(query.order_by),
+        query.distinct,
+        _freeze(query.aggregate.to_dict()) if query.aggregate else None,
+        tuple(query.group_by) if query.group_by else None,
+    )
+
+
+def semantic_query_shape(query: SemanticQuery) -> Tuple:
+    """SemanticQuery 的形状键（不含过滤值、limit/offset）"""
+    return (
+        query.root_object,
+        tuple(query.fields),
+        tuple((f.path, f.operator) for f in query.filters),
+        tuple(query.order_by),
+        query.distinct,
+    )
+
+
+class PlanCache:
+    """
+    有界 LRU 计划缓存，绑定注册表版本
+
+    Example:
+        >>> cache = PlanCache(max_entries=128)
+        >>> plan = cache.get_or_build(shape, lambda: compile_plan(query))
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(
+        self,
+        key: Hashable,
+        build: Callable[[], Any],
+        registry: Optional[OntologyRegistry] = None,
+    ) -> Any:
+        """
+        取出计划，未命中时构建并缓存
+
+        Args:
+            key: 形状键
+            build: 无参构建函数；抛出异常时不缓存
+            registry: 用于版本校验的注册表（默认全局单例）
+
+        Returns:
+            计划对象（共享，调用方不应修改）
+        """
+        registry = registry or OntologyRegistry()
+        version = registry.version
+        with self._lock:
+            if self._version != version:
+                self._entries.clear()
+                self._version = version
+            plan = self._entries.get(key)
+            if plan is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return plan
+            self.misses += 1
+
+        plan = build()
+
+        with self._lock:
+            # 构建期间注册表发生变化则不缓存
+            if self._version == version == registry.version:
+                self._entries[key] = plan
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return plan
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "registry_version": self._version,
+        }
+
+
+# 进程级缓存：结构化查询计划 / 语义路径编译结果
+structured_plan_cache = PlanCache()
+semantic_plan_cache = PlanCache()
+
+
+def clear_plan_caches() -> None:
+    """清空所有计划缓存（主要用于测试）"""
+    structured_plan_cache.clear()
+    semantic_plan_cache.clear()
+
+
+__all__ = [
+    "PlanCache",
+    "structured_query_shape",
+    "semantic_query_shape",
+    "structured_plan_cache",
+    "semantic_plan_cache",
+    "clear_plan_caches",
+]
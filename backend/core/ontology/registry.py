@@ -7,7 +7,9 @@ core/ontology/registry.py
 Enhanced for domain-agnostic LLM reasoning framework (Phase 0)
 """
 import threading
-from typing import Dict, List, Set, Optional, Any, TYPE_CHECKING
+from typing import Callable, Dict, List, Set, Optional, Any, Tuple, TYPE_CHECKING
+
+from core.ontology.keyword_matcher import KeywordMatcher
 
 from core.ontology.metadata import (
     EntityMetadata,
@@ -64,8 +66,56 @@ class OntologyRegistry:
             cls._instance._models: Dict[str, Any] = {}
             cls._instance._relationships: Dict[str, List[RelationshipMetadata]] = {}
             cls._instance._events: Dict[str, EventMetadata] = {}
+            # searchable 关键字自动机：(映射版本, 匹配器, 关键字 -> [(type, name)])
+            cls._instance._keyword_index: Optional[Tuple[int, KeywordMatcher, Dict[str, List[Tuple[str, str]]]]] = None
+            # 注册表版本：每次 register_* / clear 单调递增，派生视图按版本记忆
+            cls._instance._version: int = 0
+            cls._instance._derived: Tuple[int, Dict[Any, Any]] = (0, {})
         return cls._instance
 
+    @property
+    def version(self) -> int:
+        """注册表版本号（单调递增），派生缓存可据此判断是否过期"""
+        return self._version
+
+    def invalidate(self) -> None:
+        """
+        递增版本号，使所有派生视图失效
+
+        register_* / clear 会自动调用；注册后又直接修改元数据对象
+        （如 EntityMetadata.add_property）时需手动调用。
+        """
+        self._version += 1
+
+    def memoize(self, key: Any, build: Callable[[], Any]) -> Any:
+        """
+        按注册表版本记忆派生视图
+
+        同一版本内相同 key 只构建一次；版本变化后整体丢弃。
+        返回的是共享对象，调用方不应修改。
+
+        Args:
+            key: 视图标识（可哈希）
+            build: 无参构建函数
+
+        Returns:
+            构建结果
+        """
+        version = self._version
+        derived = self._derived
+        if derived[0] != version:
+            derived = (version, {})
+            self._derived = derived
+        try:
+            return derived[1][key]
+        except KeyError:
+            pass
+        value = build()
+        # 构建期间发生了注册则不缓存，避免把旧视图挂到新版本上
+        if self._version == version:
+            derived[1][key] = value
+        return value
+
     def register_entity(self, metadata: EntityMetadata) -> "OntologyRegistry":
         """
         注册实体元数据
@@ -77,6 +127,7 @@ class OntologyRegistry:
             self (for fluent API)
         """
         self._entities[metadata.name] = metadata
+        self.invalidate()
         return self
 
     def register_action(self, entity: str, metadata: ActionMetadata) -> "OntologyRegistry":
@@ -93,6 +144,7 @@ class OntologyRegistry:
         if entity not in self._actions:
             self._actions[entity] = []
         self._actions[entity].append(metadata)
+        self.invalidate()
         return self
 
     def register_state_machine(self, metadata: StateMachine) -> "OntologyRegistry":
@@ -106,6 +158,7 @@ class OntologyRegistry:
             self (for fluent API)
         """
         self._state_machines[metadata.entity] = metadata
+        self.invalidate()
         return self
 
     def register_business_rule(self, entity: str, rule: BusinessRule) -> "OntologyRegistry":
@@ -122,6 +175,7 @@ class OntologyRegistry:
         if entity not in self._business_rules:
             self._business_rules[entity] = []
         self._business_rules[entity].append(rule)
+        self.invalidate()
         return self
 
     def register_constraint(self, constraint: ConstraintMetadata) -> "OntologyRegistry":
@@ -135,6 +189,7 @@ class OntologyRegistry:
             self (for fluent API)
         """
         self._constraints[constraint.id] = constraint
+        self.invalidate()
         return self
 
     def register_permission(self, action_type: str, roles: Set[str]) -> "OntologyRegistry":
@@ -151,6 +206,7 @@ class OntologyRegistry:
         if action_type not in self._permission_matrix:
             self._permission_matrix[action_type] = set()
         self._permission_matrix[action_type].update(roles)
+        self.invalidate()
         return self
 
     def register_interface(self, interface_cls: Any) -> "OntologyRegistry":
@@ -164,6 +220,7 @@ class OntologyRegistry:
             self (for fluent API)
         """
         self._interfaces[interface_cls.__name__] = interface_cls
+        self.invalidate()
         return self
 
     def register_interface_implementation(self, interface_name: str, entity_name: str) -> "OntologyRegistry":
@@ -181,6 +238,7 @@ class OntologyRegistry:
             self._interface_implementations[interface_name] = []
         if entity_name not in self._interface_implementations[interface_name]:
             self._interface_implementations[interface_name].append(entity_name)
+        self.invalidate()
         return self
 
     def register_model(self, entity_name: str, model_class: Any) -> "OntologyRegistry":
@@ -195,6 +253,7 @@ class OntologyRegistry:
             self (for fluent API)
         """
         self._models[entity_name] = model_class
+        self.invalidate()
         return self
 
     def register_relationship(self, entity_name: str, rel: RelationshipMetadata) -> "OntologyRegistry":
@@ -215,6 +274,7 @@ class OntologyRegistry:
         entity = self._entities.get(entity_name)
         if entity:
             entity.add_relationship(rel)
+        self.invalidate()
         return self
 
     def register_event(self, metadata: EventMetadata) -> "OntologyRegistry":
@@ -228,6 +288,7 @@ class OntologyRegistry:
             self (for fluent API)
         """
         self._events[metadata.name] = metadata
+        self.invalidate()
         return self
 
     # Getters
@@ -528,7 +589,11 @@ class OntologyRegistry:
 
         Returns:
             {source_entity: {target_entity: {"rel_attr": name, "foreign_key": fk}}}
+            （按注册表版本记忆，调用方不应修改）
         """
+        return self.memoize("relationship_map", self._build_relationship_map)
+
+    def _build_relationship_map(self) -> Dict[str, Dict[str, Dict[str, str]]]:
         result: Dict[str, Dict[str, Dict[str, str]]] = {}
         for entity_name, rels in self._relationships.items():
             if entity_name not in result:
@@ -540,6 +605,25 @@ class OntologyRegistry:
                 }
         return result
 
+    def get_display_name_index(self) -> Dict[str, str]:
+        """
+        字段名 -> 显示名 反向索引
+
+        同名字段在多个实体中定义时，取注册顺序中第一个有 display_name 的实体。
+
+        Returns:
+            {field_name: display_name}（按注册表版本记忆，调用方不应修改）
+        """
+        return self.memoize("display_name_index", self._build_display_name_index)
+
+    def _build_display_name_index(self) -> Dict[str, str]:
+        result: Dict[str, str] = {}
+        for entity in self._entities.values():
+            for name, prop in entity.properties.items():
+                if prop.display_name and name not in result:
+                    result[name] = prop.display_name
+        return result
+
     # Schema Export
 
     def export_schema(self) -> Dict[str, Any]:
@@ -552,8 +636,11 @@ class OntologyRegistry:
         - API 文档生成
 
         Returns:
-            完整 schema 字典
+            完整 schema 字典（按注册表版本记忆，调用方不应修改）
         """
+        return self.memoize("export_schema", self._build_schema)
+
+    def _build_schema(self) -> Dict[str, Any]:
         schema: Dict[str, Any] = {
             "entity_types": {},
             "interfaces": {},
@@ -636,12 +723,13 @@ class OntologyRegistry:
             entity_name: 实体名称
 
         Returns:
-            实体描述字典，如果不存在返回空字典
+            实体描述字典，如果不存在返回空字典（按注册表版本记忆，调用方不应修改）
         """
         entity = self._entities.get(entity_name)
         if not entity:
             return {}
-        return self._export_entity(entity_name, entity)
+        return self.memoize(("describe_type", entity_name),
+                            lambda: self._export_entity(entity_name, entity))
 
     def _export_entity(self, name: str, entity: EntityMetadata) -> Dict[str, Any]:
         """导出单个实体 schema"""
@@ -786,6 +874,8 @@ class OntologyRegistry:
         self._models.clear()
         self._relationships.clear()
         self._events.clear()
+        self._keyword_index = None
+        self.invalidate()
 
     def to_llm_knowledge_base(self) -> str:
         """
@@ -794,6 +884,9 @@ class OntologyRegistry:
         Returns:
             包含实体、操作、约束、状态机描述的文本
         """
+        return self.memoize("llm_knowledge_base", self._build_llm_knowledge_base)
+
+    def _build_llm_knowledge_base(self) -> str:
         sections = []
 
         # 实体
@@ -849,6 +942,21 @@ class OntologyRegistry:
 
     # ============== Searchable 关键字查询方法 ==============
 
+    def _get_keyword_index(self) -> Tuple[KeywordMatcher, Dict[str, List[Tuple[str, str]]]]:
+        """获取 searchable 关键字自动机，关键字映射有新注册时重新编译"""
+        from core.ontology.metadata import get_searchable_mapping, get_searchable_version
+
+        version = get_searchable_version()
+        index = self._keyword_index
+        if index is None or index[0] != version:
+            with self._lock:
+                index = self._keyword_index
+                if index is None or index[0] != version:
+                    mapping = get_searchable_mapping()
+                    index = (version, KeywordMatcher(mapping.keys()), mapping)
+                    self._keyword_index = index
+        return index[1], index[2]
+
     def find_entities_by_keywords(self, message: str) -> List[str]:
         """
         根据消息中的关键字查找匹配的实体
@@ -859,19 +967,7 @@ class OntologyRegistry:
         Returns:
             匹配的实体名称列表（可能有多个，需要 LLM 消歧）
         """
-        from core.ontology.metadata import get_searchable_mapping
-
-        keyword_mapping = get_searchable_mapping()
-        matched_entities: Set[str] = set()
-
-        # 检查所有注册的关键字
-        for keyword, targets in keyword_mapping.items():
-            if keyword in message:
-                for target_type, target_name in targets:
-                    if target_type == 'entity':
-                        matched_entities.add(target_name)
-
-        return sorted(list(matched_entities))
+        return self.resolve_keyword_matches(message)['entities']
 
     def find_properties_by_keywords(self, message: str) -> List[str]:
         """
@@ -883,18 +979,7 @@ class OntologyRegistry:
         Returns:
             匹配的属性路径列表 (如 ['Room.status', 'Task.status'])
         """
-        from core.ontology.metadata import get_searchable_mapping
-
-        keyword_mapping = get_searchable_mapping()
-        matched_properties: Set[str] = set()
-
-        for keyword, targets in keyword_mapping.items():
-            if keyword in message:
-                for target_type, target_name in targets:
-                    if target_type == 'property':
-                        matched_properties.add(target_name)
-
-        return sorted(list(matched_properties))
+        return self.resolve_keyword_matches(message)['properties']
 
     def resolve_keyword_matches(
         self,
@@ -903,6 +988,8 @@ class OntologyRegistry:
         """
         解析消息中的关键字，返回匹配的实体和属性
 
+        关键字自动机对消息单遍扫描，实体和属性一次得出。
+
         Args:
             message: 用户输入的消息
 
@@ -912,9 +999,20 @@ class OntologyRegistry:
                 'properties': ['Room.status', 'Task.task_type']
             }
         """
+        matcher, keyword_mapping = self._get_keyword_index()
+        matched_entities: Set[str] = set()
+        matched_properties: Set[str] = set()
+
+        for keyword in matcher.find_all(message):
+            for target_type, target_name in keyword_mapping[keyword]:
+                if target_type == 'entity':
+                    matched_entities.add(target_name)
+                elif target_type == 'property':
+                    matched_properties.add(target_name)
+
         return {
-            'entities': self.find_entities_by_keywords(message),
-            'properties': self.find_properties_by_keywords(message)
+            'entities': sorted(matched_entities),
+            'properties': sorted(matched_properties)
         }
 
     def export_query_schema(self) -> Dict[str, Any]:
@@ -947,7 +1045,12 @@ class OntologyRegistry:
                 "aggregate_functions": ["COUNT", "SUM", "AVG", "MAX", "MIN"],
                 "filter_operators": ["eq", "ne", "gt", "gte", "lt", "lte", "in", "like", "between"]
             }
+
+            按注册表版本记忆，调用方不应修改。
         """
+        return self.memoize("export_query_schema", self._build_query_schema)
+
+    def _build_query_schema(self) -> Dict[str, Any]:
         schema: Dict[str, Any] = {
             "entities": {},
             "aggregate_functions": ["COUNT", "SUM", "AVG", "MAX", "MIN"],
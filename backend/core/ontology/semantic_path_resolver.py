@@ -26,7 +26,7 @@ Example:
     # ]
 """
 import logging
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from typing import List, Optional, Dict, Any, Tuple, Set
 from difflib import get_close_matches
 
@@ -43,7 +43,8 @@ from core.ontology.query import (
     FilterOperator,
     JoinType,
 )
-from core.ontology.query_engine import get_model_class, get_relationship_info
+from core.ontology.query_engine import get_model_class, get_relationship_info, get_relationship_tuple_map
+from core.ontology.query_plan import semantic_plan_cache, semantic_query_shape
 from core.ontology.registry import OntologyRegistry
 
 logger = logging.getLogger(__name__)
@@ -124,13 +125,8 @@ class SemanticPathResolver:
     @property
     def relationship_map(self):
         """Dynamic relationship map from OntologyRegistry (SPEC-14)"""
-        rmap = self.registry.get_relationship_map()
-        # Convert to legacy tuple format: {source: {target: (rel_attr, foreign_key)}}
-        result = {}
-        for source, targets in rmap.items():
-            result[source] = {}
-            for target, info in targets.items():
-                result[source][target] = (info["rel_attr"], info["foreign_key"])
+        # Legacy tuple format: {source: {target: (rel_attr, foreign_key)}}, memoized per registry version
+        result = get_relationship_tuple_map(self.registry)
         # SPEC-R04: No fallback - registry is the single source of truth
         if not result:
             logger.warning("Relationship map is empty - ensure HotelDomainAdapter is bootstrapped")
@@ -161,6 +157,30 @@ class SemanticPathResolver:
             ValueError: 根实体不存在
             PathResolutionError: 路径无法解析（带建议）
         """
+        # 1-6. 路径解析结果按查询形状缓存（不含过滤值），注册表版本变化时失效
+        plan = semantic_plan_cache.get_or_build(
+            semantic_query_shape(semantic_query),
+            lambda: self._compile_plan(semantic_query),
+            self.registry,
+        )
+
+        # 7. 绑定本次的过滤值，返回 StructuredQuery
+        return StructuredQuery(
+            entity=semantic_query.root_object,
+            fields=list(plan.fields),
+            filters=[
+                FilterClause(field=compiled.field, operator=compiled.operator, value=sf.value)
+                for compiled, sf in zip(plan.filters, semantic_query.filters)
+            ],
+            joins=[replace(join, filters=dict(join.filters)) for join in plan.joins],
+            order_by=list(plan.order_by),
+            limit=semantic_query.limit,
+            offset=semantic_query.offset,
+            distinct=semantic_query.distinct
+        )
+
+    def _compile_plan(self, semantic_query: SemanticQuery) -> StructuredQuery:
+        """编译路径部分（过滤值留空，由 compile 绑定）"""
         # 1. 验证根实体
         self._validate_root_entity(semantic_query.root_object)
 
@@ -172,6 +192,8 @@ class SemanticPathResolver:
 
         # 4. 编译过滤器
         filters = self._compile_filters(semantic_query.root_object, semantic_query.filters)
+        for compiled in filters:
+            compiled.value = None
 
         # 5. 编译字段路径（转换为正确的关系属性名）
         fields = self._compile_field_paths(semantic_query.root_object, semantic_query.fields)
@@ -179,16 +201,12 @@ class SemanticPathResolver:
         # 6. 编译 order_by 路径
         order_by = self._compile_order_by_paths(semantic_query.root_object, semantic_query.order_by)
 
-        # 7. 返回 StructuredQuery
         return StructuredQuery(
             entity=semantic_query.root_object,
             fields=fields,
             filters=filters,
             joins=joins,
             order_by=order_by,
-            limit=semantic_query.limit,
-            offset=semantic_query.offset,
-            distinct=semantic_query.distinct
         )
 
     def resolve_path(self, root_entity: str, path: str) -> ResolvedPath:
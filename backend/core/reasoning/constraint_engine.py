@@ -7,9 +7,7 @@ Part of the universal ontology-driven LLM reasoning framework
 OAG Enhancement: Adds property-level constraint validation with structured Decision results.
 """
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any, TYPE_CHECKING
-import ast
-import operator
+from typing import Dict, Iterator, List, Optional, Any, Sequence, Tuple, Union, TYPE_CHECKING
 import re
 import logging
 
@@ -24,99 +22,27 @@ from core.ontology.metadata import (
     IConstraintValidator,
     ConstraintSeverity,
 )
+from core.ontology.expression import evaluate_expression
 
 logger = logging.getLogger(__name__)
 
+# IN 查询每块的值数量（低于 SQLite 默认的绑定参数上限）
+_IN_CHUNK_SIZE = 500
 
-# --- Safe expression evaluator (replaces eval()) ---
 
-_COMPARE_OPS = {
-    ast.Eq: operator.eq,
-    ast.NotEq: operator.ne,
-    ast.Lt: operator.lt,
-    ast.LtE: operator.le,
-    ast.Gt: operator.gt,
-    ast.GtE: operator.ge,
-    ast.Is: operator.is_,
-    ast.IsNot: operator.is_not,
-    ast.In: lambda a, b: a in b,
-    ast.NotIn: lambda a, b: a not in b,
-}
-
-
-def _eval_node(node: ast.AST, ns: Dict[str, Any]) -> Any:
-    """Recursively evaluate an AST node against a namespace (whitelist-based)."""
-    if isinstance(node, ast.Expression):
-        return _eval_node(node.body, ns)
-
-    if isinstance(node, ast.Constant):
-        return node.value
-
-    if isinstance(node, ast.Name):
-        if node.id in ns:
-            return ns[node.id]
-        raise ValueError(f"Undefined name: {node.id}")
-
-    if isinstance(node, ast.Attribute):
-        obj = _eval_node(node.value, ns)
-        if obj is None:
-            return None
-        return getattr(obj, node.attr, None)
-
-    if isinstance(node, ast.List):
-        return [_eval_node(el, ns) for el in node.elts]
-
-    if isinstance(node, ast.Tuple):
-        return tuple(_eval_node(el, ns) for el in node.elts)
-
-    if isinstance(node, ast.Set):
-        return {_eval_node(el, ns) for el in node.elts}
-
-    if isinstance(node, ast.Compare):
-        left = _eval_node(node.left, ns)
-        for op_node, comparator in zip(node.ops, node.comparators):
-            right = _eval_node(comparator, ns)
-            op_func = _COMPARE_OPS.get(type(op_node))
-            if op_func is None:
-                raise ValueError(f"Unsupported comparison operator: {type(op_node).__name__}")
-            if not op_func(left, right):
-                return False
-            left = right
-        return True
-
-    if isinstance(node, ast.BoolOp):
-        if isinstance(node.op, ast.And):
-            return all(_eval_node(v, ns) for v in node.values)
-        if isinstance(node.op, ast.Or):
-            return any(_eval_node(v, ns) for v in node.values)
-
-    if isinstance(node, ast.UnaryOp):
-        operand = _eval_node(node.operand, ns)
-        if isinstance(node.op, ast.Not):
-            return not operand
-        if isinstance(node.op, ast.USub):
-            return -operand
-
-    if isinstance(node, ast.IfExp):
-        test = _eval_node(node.test, ns)
-        return _eval_node(node.body, ns) if test else _eval_node(node.orelse, ns)
-
-    if isinstance(node, ast.Subscript):
-        obj = _eval_node(node.value, ns)
-        key = _eval_node(node.slice, ns)
-        return obj[key]
-
-    raise ValueError(f"Unsupported expression node: {type(node).__name__}")
+def _chunks(values: Sequence[Any], size: int = _IN_CHUNK_SIZE) -> Iterator[Sequence[Any]]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
 
 
 def _safe_eval(expression: str, namespace: Dict[str, Any]) -> bool:
     """Evaluate a constraint expression safely using AST whitelist.
 
     Supports: comparisons, boolean ops, attribute access, list/tuple literals,
-    subscripts, unary not/neg, and ternary if/else.
+    subscripts, unary not/neg, and ternary if/else. The expression is validated
+    and compiled once, then served from the shared expression cache.
     """
-    tree = ast.parse(expression, mode='eval')
-    return bool(_eval_node(tree.body, namespace))
+    return evaluate_expression(expression, namespace)
 
 
 class _DotDict:
@@ -330,34 +256,78 @@ class FieldUniquenessValidator:
         Returns:
             (is_valid, error_message)
         """
-        if new_value is None or new_value == "" or new_value == old_value:
-            return True, ""  # 空值或未变更，无需检查唯一性
+        return self.validate_many([(old_value, new_value, entity_id)], db)[0]
 
-        if db is None:
-            # 无数据库会话时跳过检查（记录警告）
-            return True, ""
+    def validate_many(
+        self,
+        updates: Sequence[Tuple[Any, Any, Optional[int]]],
+        db: Optional["Session"] = None
+    ) -> List[tuple[bool, str]]:
+        """
+        批量验证字段唯一性：所有新值合并为 IN 查询（按块），而非每个值一次查询
 
-        model = self._get_model(db)
-        field_attr = getattr(model, self._field_name, None)
-        if field_attr is None:
-            return True, ""
+        同一批次内多个实体写入相同的值时，第一次之后的写入同样判为冲突。
 
-        # 查询是否有其他记录使用此值
-        query = db.query(model).filter(field_attr == new_value)
-        if entity_id is not None:
-            query = query.filter(model.id != entity_id)
+        Args:
+            updates: [(old_value, new_value, entity_id), ...]
+            db: 数据库会话
 
-        existing = query.first()
-        if existing:
-            display_name = getattr(existing, 'name', str(entity_id))
-            return False, f"「{new_value}」已被「{display_name}」使用"
+        Returns:
+            与 updates 一一对应的 (is_valid, error_message)
+        """
+        results: List[tuple[bool, str]] = [(True, "")] * len(updates)
+        # 空值或未变更，无需检查唯一性
+        pending = [
+            (index, new_value, entity_id)
+            for index, (old_value, new_value, entity_id) in enumerate(updates)
+            if not (new_value is None or new_value == "" or new_value == old_value)
+        ]
+        if not pending or db is None:
+            # 无数据库会话时跳过检查
+            return results
 
-        return True, ""
+        model = self._get_model(db)
+        field_attr = getattr(model, self._field_name, None)
+        if field_attr is None:
+            return results
+
+        # 查询是否有其他记录使用这些值
+        existing: Dict[Any, List[Any]] = {}
+        values = list(dict.fromkeys(new_value for _, new_value, _ in pending))
+        for chunk in _chunks(values):
+            for row in db.query(model).filter(field_attr.in_(chunk)).all():
+                existing.setdefault(getattr(row, self._field_name), []).append(row)
+
+        claimed: Dict[Any, Optional[int]] = {}
+        for index, new_value, entity_id in pending:
+            other = next(
+                (row for row in existing.get(new_value, ()) if entity_id is None or row.id != entity_id),
+                None
+            )
+            if other is not None:
+                display_name = getattr(other, 'name', str(entity_id))
+                results[index] = (False, f"「{new_value}」已被「{display_name}」使用")
+            elif new_value in claimed and (entity_id is None or claimed[new_value] != entity_id):
+                results[index] = (False, f"「{new_value}」在本批次中重复")
+            else:
+                claimed.setdefault(new_value, entity_id)
+        return results
 
     def __call__(self, old_value: Any, new_value: Any, entity_id: Optional[int] = None, db: Optional["Session"] = None) -> tuple[bool, str]:
         return self.validate(old_value, new_value, entity_id, db)
 
 
+@dataclass
+class BatchValidationItem:
+    """validate_batch 的单个条目"""
+    entity_type: str
+    action_type: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    current_state: Optional[Dict[str, Any]] = None  # None 时按 entity_id 预取
+    entity_id: Optional[Any] = None
+    user_context: Optional[Dict[str, Any]] = None  # None 时使用批次级 user_context
+
+
 class ConstraintEngine:
     """约束推理引擎 - 领域无关"""
 
@@ -422,17 +392,104 @@ class ConstraintEngine:
             user_context=user_context
         )
 
-        # 评估每个约束
+        # 评估每个约束（命名空间按上下文构建一次，所有约束共用）
+        namespace = self._build_namespace(context)
         for constraint in constraints:
-            self._evaluate_constraint(constraint, context, result)
+            self._evaluate_constraint(constraint, context, result, namespace)
 
         return result
 
+    def validate_batch(
+        self,
+        items: Sequence[Union[BatchValidationItem, Tuple]],
+        user_context: Optional[Dict[str, Any]] = None,
+        db: Optional["Session"] = None
+    ) -> List[ConstraintValidationResult]:
+        """
+        批量验证操作（批量删除、团体入住、批量改价等）
+
+        每个 (entity_type, action_type) 只取一次约束；未提供 current_state 但给出
+        entity_id 的条目，按实体类型合并为 IN 查询预取状态，而不是逐条查询。
+
+        Args:
+            items: BatchValidationItem 或
+                (entity_type, action_type, params, current_state[, entity_id]) 元组
+            user_context: 条目未单独指定时使用的用户上下文
+            db: 数据库会话（预取状态时需要）
+
+        Returns:
+            与 items 一一对应的 ConstraintValidationResult
+        """
+        batch = [
+            item if isinstance(item, BatchValidationItem) else BatchValidationItem(*item)
+            for item in items
+        ]
+
+        constraints_by_key: Dict[Tuple[str, str], List[Any]] = {}
+        for item in batch:
+            key = (item.entity_type, item.action_type)
+            if key not in constraints_by_key:
+                constraints_by_key[key] = self.registry.get_constraints_for_entity_action(*key)
+
+        states = self._prefetch_states(
+            [item for item in batch
+             if item.current_state is None and constraints_by_key[(item.entity_type, item.action_type)]],
+            db
+        )
+
+        results = []
+        for item in batch:
+            result = ConstraintValidationResult()
+            constraints = constraints_by_key[(item.entity_type, item.action_type)]
+            if constraints:
+                current_state = item.current_state
+                if current_state is None:
+                    current_state = states.get((item.entity_type, item.entity_id), {})
+                context = ConstraintEvaluationContext(
+                    entity_type=item.entity_type,
+                    action_type=item.action_type,
+                    parameters=item.params or {},
+                    current_state=current_state,
+                    user_context=item.user_context if item.user_context is not None else (user_context or {})
+                )
+                namespace = self._build_namespace(context)
+                for constraint in constraints:
+                    self._evaluate_constraint(constraint, context, result, namespace)
+            results.append(result)
+        return results
+
+    def _prefetch_states(
+        self,
+        items: Sequence[BatchValidationItem],
+        db: Optional["Session"]
+    ) -> Dict[Tuple[str, Any], Dict[str, Any]]:
+        """按实体类型把 entity_id 合并为 IN 查询，返回 {(entity_type, id): 列值字典}"""
+        ids_by_entity: Dict[str, List[Any]] = {}
+        for item in items:
+            if item.entity_id is not None:
+                ids_by_entity.setdefault(item.entity_type, []).append(item.entity_id)
+        if db is None or not ids_by_entity:
+            return {}
+
+        from sqlalchemy import inspect as sa_inspect
+
+        states: Dict[Tuple[str, Any], Dict[str, Any]] = {}
+        for entity_type, ids in ids_by_entity.items():
+            model = self.registry.get_model(entity_type)
+            if model is None or not hasattr(model, "id"):
+                continue
+            columns = [attr.key for attr in sa_inspect(model).column_attrs]
+            for chunk in _chunks(list(dict.fromkeys(ids))):
+                for row in db.query(model).filter(model.id.in_(chunk)).all():
+                    states[(entity_type, row.id)] = {name: getattr(row, name) for name in columns}
+        return states
+
     def _evaluate_constraint(
         self,
         constraint: "ConstraintMetadata",
         context: ConstraintEvaluationContext,
-        result: ConstraintValidationResult
+        result: ConstraintValidationResult,
+        namespace: Optional[Dict[str, Any]] = None
     ) -> None:
         """
         评估单个约束
@@ -441,11 +498,12 @@ class ConstraintEngine:
             constraint: 约束元数据
             context: 评估上下文
             result: 验证结果对象
+            namespace: 预先构建的求值命名空间（默认按 context 构建）
         """
         # 检查触发条件
         if hasattr(constraint, 'trigger_conditions') and constraint.trigger_conditions:
             if not self._check_trigger_conditions(
-                constraint.trigger_conditions, context
+                constraint.trigger_conditions, context, namespace
             ):
                 return
 
@@ -466,7 +524,7 @@ class ConstraintEngine:
         # 尝试表达式求值
         if hasattr(constraint, 'condition_code') and constraint.condition_code:
             try:
-                is_valid = self._evaluate_expression(constraint.condition_code, context)
+                is_valid = self._evaluate_expression(constraint.condition_code, context, namespace)
                 if not is_valid:
                     if constraint.severity == ConstraintSeverity.ERROR:
                         result.add_violation(constraint, constraint.error_message or constraint.description)
@@ -486,10 +544,28 @@ class ConstraintEngine:
         elif hasattr(constraint, 'severity') and constraint.severity == ConstraintSeverity.WARNING:
             result.add_warning(constraint, constraint.description)
 
+    @staticmethod
+    def _build_namespace(context: ConstraintEvaluationContext) -> Dict[str, Any]:
+        """构建安全的求值命名空间（触发条件额外可用 context.state/param/user）"""
+        return {
+            "state": _DotDict(context.current_state),
+            "param": _DotDict(context.parameters),
+            "user": _DotDict(context.user_context),
+            "context": _DotDict({
+                "state": context.current_state,
+                "param": context.parameters,
+                "user": context.user_context,
+            }),
+            "True": True,
+            "False": False,
+            "None": None,
+        }
+
     def _evaluate_expression(
         self,
         expression: str,
-        context: ConstraintEvaluationContext
+        context: ConstraintEvaluationContext,
+        namespace: Optional[Dict[str, Any]] = None
     ) -> bool:
         """
         求值约束表达式
@@ -500,15 +576,8 @@ class ConstraintEngine:
         - "state.field in ['a', 'b']" - 状态字段在列表中
         - "param.field > 0" - 参数比较
         """
-        # 构建安全的求值命名空间
-        namespace = {
-            "state": _DotDict(context.current_state),
-            "param": _DotDict(context.parameters),
-            "user": _DotDict(context.user_context),
-            "True": True,
-            "False": False,
-            "None": None,
-        }
+        if namespace is None:
+            namespace = self._build_namespace(context)
 
         try:
             return _safe_eval(expression, namespace)
@@ -518,7 +587,8 @@ class ConstraintEngine:
     def _check_trigger_conditions(
         self,
         conditions: List[str],
-        context: ConstraintEvaluationContext
+        context: ConstraintEvaluationContext,
+        namespace: Optional[Dict[str, Any]] = None
     ) -> bool:
         """
         Check whether trigger conditions are met.
@@ -526,25 +596,15 @@ class ConstraintEngine:
         Args:
             conditions: List of condition expressions
             context: Evaluation context
+            namespace: Prebuilt evaluation namespace (built from context if omitted)
 
         Returns:
             True if all conditions are met (constraint should fire)
         """
         if not conditions:
             return True
-        namespace = {
-            "state": _DotDict(context.current_state),
-            "param": _DotDict(context.parameters),
-            "user": _DotDict(context.user_context),
-            "context": _DotDict({
-                "state": context.current_state,
-                "param": context.parameters,
-                "user": context.user_context,
-            }),
-            "True": True,
-            "False": False,
-            "None": None,
-        }
+        if namespace is None:
+            namespace = self._build_namespace(context)
         try:
             for condition in conditions:
                 if not _safe_eval(condition, namespace):
@@ -617,30 +677,56 @@ class ConstraintEngine:
         Returns:
             Decision 结构化决策结果
         """
-        violations = []
+        return self.validate_property_update_batch(
+            entity_type, property_name, [(entity_id, old_value, new_value)], user_context, db
+        )[0]
+
+    def validate_property_update_batch(
+        self,
+        entity_type: str,
+        property_name: str,
+        updates: Sequence[Tuple[Optional[int], Any, Any]],
+        user_context: Dict[str, Any],
+        db: Optional["Session"] = None
+    ) -> List[Decision]:
+        """
+        OAG: 批量验证同一属性的多次更新（如批量改价、批量导入手机号）
+
+        元数据、可变性与权限只检查一次；提供 validate_many 的验证规则
+        （如 FieldUniquenessValidator）对整个批次只调用一次。
 
+        Args:
+            entity_type: 实体类型
+            property_name: 属性名
+            updates: [(entity_id, old_value, new_value), ...]
+            user_context: 用户上下文（包含 role 等信息）
+            db: 数据库会话（用于唯一性检查等）
+
+        Returns:
+            与 updates 一一对应的 Decision
+        """
         # 1. 获取属性元数据
         entity_metadata = self.registry.get_entity(entity_type)
         if not entity_metadata:
-            return Decision(
+            return [Decision(
                 allowed=False,
                 reason=f"实体 {entity_type} 不存在",
                 violations=[],
                 suggested_action="reject"
-            )
+            ) for _ in updates]
 
         prop_metadata = entity_metadata.get_property(property_name)
         if not prop_metadata:
-            return Decision(
+            return [Decision(
                 allowed=False,
                 reason=f"属性 {entity_type}.{property_name} 不存在",
                 violations=[],
                 suggested_action="reject"
-            )
+            ) for _ in updates]
 
         # 2. 检查可变性
         if not getattr(prop_metadata, 'mutable', True):
-            return Decision(
+            return [Decision(
                 allowed=False,
                 reason=f"属性「{property_name}」不可修改",
                 violations=[ConstraintViolation(
@@ -651,13 +737,13 @@ class ConstraintEngine:
                     severity="error"
                 )],
                 suggested_action="reject"
-            )
+            ) for _ in updates]
 
         # 3. 检查更新权限
         updatable_by = getattr(prop_metadata, 'updatable_by', [])
         user_role = user_context.get('role', '')
         if updatable_by and user_role not in updatable_by:
-            return Decision(
+            return [Decision(
                 allowed=False,
                 reason=f"当前角色「{user_role}」无权修改属性「{property_name}」",
                 violations=[ConstraintViolation(
@@ -668,56 +754,85 @@ class ConstraintEngine:
                     severity="error"
                 )],
                 suggested_action="reject"
-            )
+            ) for _ in updates]
+
+        violations: List[List[ConstraintViolation]] = [[] for _ in updates]
 
         # 4. 格式验证
         format_regex = getattr(prop_metadata, 'format_regex', None)
-        if format_regex and new_value:
-            if not re.match(format_regex, str(new_value)):
-                violations.append(ConstraintViolation(
-                    type="FormatValidation",
-                    field=property_name,
-                    constraint="format_regex",
-                    message=f"值「{new_value}」不符合格式要求",
-                    severity="error"
-                ))
+        if format_regex:
+            pattern = re.compile(format_regex)
+            for item_violations, (_, _, new_value) in zip(violations, updates):
+                if new_value and not pattern.match(str(new_value)):
+                    item_violations.append(ConstraintViolation(
+                        type="FormatValidation",
+                        field=property_name,
+                        constraint="format_regex",
+                        message=f"值「{new_value}」不符合格式要求",
+                        severity="error"
+                    ))
 
         # 5. 运行属性级别的验证规则
         validation_rules = getattr(prop_metadata, 'update_validation_rules', [])
+        rule_args = [(old_value, new_value, entity_id) for entity_id, old_value, new_value in updates]
         for rule_func in validation_rules:
-            try:
-                is_valid, error_msg = rule_func(old_value, new_value, entity_id, db)
-                if not is_valid:
-                    violations.append(ConstraintViolation(
+            for item_violations, outcome in zip(violations, self._run_validation_rule(rule_func, rule_args, db)):
+                if isinstance(outcome, Exception):
+                    item_violations.append(ConstraintViolation(
+                        type="ValidationError",
+                        field=property_name,
+                        constraint="custom_rule",
+                        message=f"验证规则执行错误: {str(outcome)}",
+                        severity="error"
+                    ))
+                elif not outcome[0]:
+                    item_violations.append(ConstraintViolation(
                         type="CustomValidation",
                         field=property_name,
                         constraint="custom_rule",
-                        message=error_msg,
+                        message=outcome[1],
                         severity="error"
                     ))
-            except Exception as e:
-                violations.append(ConstraintViolation(
-                    type="ValidationError",
-                    field=property_name,
-                    constraint="custom_rule",
-                    message=f"验证规则执行错误: {str(e)}",
-                    severity="error"
-                ))
 
         # 6. 返回决策结果
-        if violations:
-            return Decision(
-                allowed=False,
-                reason=f"属性「{property_name}」更新验证失败",
-                violations=violations,
-                suggested_action="reject_with_correction",
-                correction_prompt=self._generate_correction_prompt(violations, new_value)
-            )
+        decisions = []
+        for item_violations, (_, _, new_value) in zip(violations, updates):
+            if item_violations:
+                decisions.append(Decision(
+                    allowed=False,
+                    reason=f"属性「{property_name}」更新验证失败",
+                    violations=item_violations,
+                    suggested_action="reject_with_correction",
+                    correction_prompt=self._generate_correction_prompt(item_violations, new_value)
+                ))
+            else:
+                decisions.append(Decision(
+                    allowed=True,
+                    reason=f"属性「{property_name}」可以更新"
+                ))
+        return decisions
+
+    @staticmethod
+    def _run_validation_rule(
+        rule_func: Any,
+        rule_args: List[Tuple[Any, Any, Optional[int]]],
+        db: Optional["Session"]
+    ) -> List[Union[tuple, Exception]]:
+        """执行验证规则，返回每个条目的 (is_valid, error_msg) 或异常"""
+        validate_many = getattr(rule_func, "validate_many", None)
+        if validate_many is not None:
+            try:
+                return list(validate_many(rule_args, db))
+            except Exception as e:
+                return [e] * len(rule_args)
 
-        return Decision(
-            allowed=True,
-            reason=f"属性「{property_name}」可以更新"
-        )
+        outcomes: List[Union[tuple, Exception]] = []
+        for old_value, new_value, entity_id in rule_args:
+            try:
+                outcomes.append(rule_func(old_value, new_value, entity_id, db))
+            except Exception as e:
+                outcomes.append(e)
+        return outcomes
 
     def _generate_correction_prompt(self, violations: List[ConstraintViolation], new_value: Any) -> str:
         """生成纠正提示"""
@@ -739,6 +854,7 @@ class ConstraintEngine:
 __all__ = [
     "ConstraintValidationResult",
     "ConstraintEngine",
+    "BatchValidationItem",
     "ConstraintViolation",
     "Decision",
     "PhoneFormatValidator",
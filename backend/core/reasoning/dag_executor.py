@@ -6,12 +6,16 @@ DAG Execution Engine for composite action plans.
 Executes multi-step plans with:
 - Topological sort for dependency resolution
 - Sequential step execution with guard pre-checks
+- Optional parallel execution of independent steps on a bounded pool
 - Snapshot-based rollback on failure
-- Structured execution results
+- Structured execution results with critical-path vs serial timing
 
 SPEC-4: Action Composition & DAG Execution Engine
 """
 import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
 from typing import Dict, List, Any, Optional, Callable
 
@@ -29,6 +33,7 @@ class StepResult:
     result: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
     snapshot_id: Optional[str] = None
+    duration_ms: float = 0.0
 
 
 @dataclass
@@ -40,6 +45,10 @@ class ExecutionResult:
     failed_step: Optional[str] = None
     rollback_status: Optional[str] = None  # "success", "partial", "failed", None
     error: Optional[str] = None
+    mode: str = "serial"  # "serial" or "parallel"
+    wall_ms: float = 0.0  # Elapsed time of execute()
+    serial_ms: float = 0.0  # Sum of step durations (serial lower bound)
+    critical_path_ms: float = 0.0  # Longest dependency chain (parallel lower bound)
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -51,12 +60,19 @@ class ExecutionResult:
                     "action_type": sr.action_type,
                     "success": sr.success,
                     "error": sr.error,
+                    "duration_ms": sr.duration_ms,
                 }
                 for sr in self.step_results
             ],
             "failed_step": self.failed_step,
             "rollback_status": self.rollback_status,
             "error": self.error,
+            "timing": {
+                "mode": self.mode,
+                "wall_ms": self.wall_ms,
+                "serial_ms": self.serial_ms,
+                "critical_path_ms": self.critical_path_ms,
+            },
         }
 
 
@@ -69,21 +85,37 @@ class DAGExecutor:
     - Automatic snapshots for rollback capability
     - Structured results for each step
 
+    In parallel mode, independent steps run concurrently on a bounded thread
+    pool: a step is submitted as soon as all of its dependencies completed.
+    Each step gets its own DB session from ``session_factory`` (a shared
+    Session is not thread-safe, so without a factory a context carrying
+    ``db`` is executed serially). On the first failure no further steps are
+    started, running ones are awaited, and every completed step is rolled
+    back in reverse completion order, as in serial mode.
+
     Args:
         action_dispatcher: Callable(action_name, params, context) -> Dict
             Typically ActionRegistry.dispatch or a wrapper around it.
         guard_executor: Optional GuardExecutor for pre-step validation.
         snapshot_engine: Optional SnapshotEngine for rollback support.
+        parallel: Run independent steps concurrently by default.
+        max_workers: Upper bound on concurrently running steps.
+        session_factory: Optional callable returning a new DB session; each
+            step then runs with ``context["db"]`` set to its own session,
+            committed on success and rolled back on failure.
 
     Example:
         executor = DAGExecutor(
             action_dispatcher=registry.dispatch,
             guard_executor=guard,
             snapshot_engine=snapshot_engine,
+            parallel=True,
+            session_factory=SessionLocal,
         )
         result = executor.execute(plan, context)
         if not result.success:
             print(f"Failed at step {result.failed_step}: {result.error}")
+        print(result.critical_path_ms, result.serial_ms)
     """
 
     def __init__(
@@ -91,24 +123,36 @@ class DAGExecutor:
         action_dispatcher: Callable,
         guard_executor=None,
         snapshot_engine=None,
+        parallel: bool = False,
+        max_workers: int = 4,
+        session_factory: Optional[Callable[[], Any]] = None,
     ):
+        if max_workers < 1:
+            raise ValueError("max_workers must be >= 1")
         self._dispatch = action_dispatcher
         self._guard_executor = guard_executor
         self._snapshot_engine = snapshot_engine
+        self._parallel = parallel
+        self._max_workers = max_workers
+        self._session_factory = session_factory
+        # SnapshotEngine is not thread-safe; serialize access from workers
+        self._snapshot_lock = threading.Lock()
 
     def execute(
         self,
         plan: ExecutionPlan,
         context: Dict[str, Any],
+        parallel: Optional[bool] = None,
     ) -> ExecutionResult:
         """Execute a plan with dependency resolution and rollback support.
 
         Args:
             plan: The execution plan to run
             context: Execution context (db, user, etc.)
+            parallel: Override the executor's default execution mode
 
         Returns:
-            ExecutionResult with per-step results and rollback status
+            ExecutionResult with per-step results, rollback status and timing
         """
         result = ExecutionResult(success=True, plan_id=plan.plan_id)
 
@@ -122,7 +166,36 @@ class DAGExecutor:
                 error=f"Dependency cycle detected: {e}",
             )
 
+        if parallel is None:
+            parallel = self._parallel
+        if parallel and "db" in context and self._session_factory is None:
+            logger.warning("Parallel DAG execution needs a session_factory when context has 'db'; running serially")
+            parallel = False
+        parallel = (
+            parallel and self._max_workers > 1 and len(ordered_steps) > 1
+            and self._is_topological(ordered_steps)  # cycle fallback order runs serially
+        )
+
         plan.status = "executing"
+        start = time.perf_counter()
+        if parallel:
+            result.mode = "parallel"
+            self._execute_parallel(ordered_steps, context, result)
+        else:
+            self._execute_serial(ordered_steps, context, result)
+        result.wall_ms = (time.perf_counter() - start) * 1000
+        self._record_timing(ordered_steps, result)
+
+        plan.status = "completed" if result.success else "failed"
+        return result
+
+    def _execute_serial(
+        self,
+        ordered_steps: List[PlanningStep],
+        context: Dict[str, Any],
+        result: ExecutionResult,
+    ) -> None:
+        """Run steps one by one in topological order."""
         completed_snapshots: List[str] = []  # For rollback
 
         for step in ordered_steps:
@@ -133,58 +206,161 @@ class DAGExecutor:
             result.step_results.append(step_result)
 
             if step_result.success:
-                step.status = StepStatus.COMPLETED
-                step.result = step_result.result
-                if step_result.snapshot_id:
-                    completed_snapshots.append(step_result.snapshot_id)
+                self._complete(step, step_result, completed_snapshots)
             else:
-                step.status = StepStatus.FAILED
-                step.error_message = step_result.error
-                result.success = False
-                result.failed_step = step.step_id
-                result.error = step_result.error
-
-                # Rollback completed steps
-                if completed_snapshots:
-                    result.rollback_status = self._rollback(completed_snapshots)
-                else:
-                    result.rollback_status = None
+                self._fail(step, step_result, ordered_steps, completed_snapshots, result)
+                return
 
-                # Mark remaining steps as skipped
-                for remaining in ordered_steps:
-                    if remaining.status == StepStatus.PENDING:
-                        remaining.status = StepStatus.SKIPPED
-
-                plan.status = "failed"
-                return result
+    def _execute_parallel(
+        self,
+        ordered_steps: List[PlanningStep],
+        context: Dict[str, Any],
+        result: ExecutionResult,
+    ) -> None:
+        """Run each step as soon as its dependencies completed, bounded by max_workers."""
+        step_ids = {s.step_id for s in ordered_steps}
+        waiting = {
+            s.step_id: {dep for dep in s.dependencies if dep in step_ids}
+            for s in ordered_steps
+        }
+        completed_snapshots: List[str] = []
+        failed: List[tuple] = []  # (step, step_result)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="dag-step") as pool:
+            while True:
+                if not failed:
+                    for step in ordered_steps:
+                        if step.status == StepStatus.PENDING and not waiting[step.step_id]:
+                            step.status = StepStatus.IN_PROGRESS
+                            running[pool.submit(self._execute_step, step, context)] = step
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step = running.pop(future)
+                    step_result = future.result()
+                    result.step_results.append(step_result)
+                    if step_result.success:
+                        self._complete(step, step_result, completed_snapshots)
+                        for deps in waiting.values():
+                            deps.discard(step.step_id)
+                    else:
+                        failed.append((step, step_result))
+
+        if failed:
+            # Report the earliest failed step in plan order
+            position = {s.step_id: i for i, s in enumerate(ordered_steps)}
+            step, step_result = min(failed, key=lambda item: position[item[0].step_id])
+            for other, other_result in failed:
+                other.status = StepStatus.FAILED
+                other.error_message = other_result.error
+            self._fail(step, step_result, ordered_steps, completed_snapshots, result)
+
+    @staticmethod
+    def _is_topological(ordered_steps: List[PlanningStep]) -> bool:
+        """True if every in-plan dependency precedes its dependent."""
+        step_ids = {s.step_id for s in ordered_steps}
+        seen = set()
+        for step in ordered_steps:
+            if any(dep in step_ids and dep not in seen for dep in step.dependencies):
+                return False
+            seen.add(step.step_id)
+        return True
+
+    @staticmethod
+    def _complete(step: PlanningStep, step_result: StepResult, completed_snapshots: List[str]) -> None:
+        step.status = StepStatus.COMPLETED
+        step.result = step_result.result
+        if step_result.snapshot_id:
+            completed_snapshots.append(step_result.snapshot_id)
+
+    def _fail(
+        self,
+        step: PlanningStep,
+        step_result: StepResult,
+        ordered_steps: List[PlanningStep],
+        completed_snapshots: List[str],
+        result: ExecutionResult,
+    ) -> None:
+        """Record the failure, roll back completed steps and skip the rest."""
+        step.status = StepStatus.FAILED
+        step.error_message = step_result.error
+        result.success = False
+        result.failed_step = step.step_id
+        result.error = step_result.error
+
+        # Rollback completed steps
+        if completed_snapshots:
+            result.rollback_status = self._rollback(completed_snapshots)
+        else:
+            result.rollback_status = None
 
-        plan.status = "completed"
-        return result
+        # Mark remaining steps as skipped
+        for remaining in ordered_steps:
+            if remaining.status == StepStatus.PENDING:
+                remaining.status = StepStatus.SKIPPED
 
     def _execute_step(
         self,
         step: PlanningStep,
         context: Dict[str, Any],
     ) -> StepResult:
-        """Execute a single plan step.
+        """Execute a single plan step, timing it.
+
+        With a session_factory the step runs on its own session, committed
+        on success and rolled back otherwise.
 
         Args:
             step: The step to execute
             context: Execution context
 
         Returns:
-            StepResult with success status and optional snapshot
+            StepResult with success status, optional snapshot and duration
         """
+        start = time.perf_counter()
+        if self._session_factory is None:
+            step_result = self._run_step(step, context)
+        else:
+            session = self._session_factory()
+            try:
+                step_result = self._run_step(step, {**context, "db": session})
+                if step_result.success:
+                    session.commit()
+                else:
+                    session.rollback()
+            except Exception as e:
+                logger.error(f"Step {step.step_id} session error: {e}")
+                session.rollback()
+                step_result = StepResult(
+                    step_id=step.step_id,
+                    action_type=step.action_type,
+                    success=False,
+                    error=str(e),
+                )
+            finally:
+                session.close()
+        step_result.duration_ms = (time.perf_counter() - start) * 1000
+        return step_result
+
+    def _run_step(
+        self,
+        step: PlanningStep,
+        context: Dict[str, Any],
+    ) -> StepResult:
+        """Snapshot, dispatch and check a single step."""
         # Create snapshot before execution (for rollback)
         snapshot_id = None
         if self._snapshot_engine:
             try:
-                snapshot = self._snapshot_engine.create_snapshot(
-                    operation_type=step.action_type,
-                    entity_type=step.action_type,
-                    entity_id=step.step_id,
-                    before_state={"params": step.params},
-                )
+                with self._snapshot_lock:
+                    snapshot = self._snapshot_engine.create_snapshot(
+                        operation_type=step.action_type,
+                        entity_type=step.action_type,
+                        entity_id=step.step_id,
+                        before_state={"params": step.params},
+                    )
                 snapshot_id = snapshot.snapshot_id
             except Exception as e:
                 logger.warning(f"Failed to create snapshot for step {step.step_id}: {e}")
@@ -209,7 +385,8 @@ class DAGExecutor:
 
             # Mark snapshot as executed
             if snapshot_id and self._snapshot_engine:
-                self._snapshot_engine.mark_executed(snapshot_id, {"result": action_result})
+                with self._snapshot_lock:
+                    self._snapshot_engine.mark_executed(snapshot_id, {"result": action_result})
 
             return StepResult(
                 step_id=step.step_id,
@@ -229,6 +406,23 @@ class DAGExecutor:
                 snapshot_id=snapshot_id,
             )
 
+    @staticmethod
+    def _record_timing(ordered_steps: List[PlanningStep], result: ExecutionResult) -> None:
+        """Fill serial_ms (sum of step durations) and critical_path_ms.
+
+        The critical path is the longest chain of dependent steps that ran,
+        i.e. the best latency a fully parallel execution could achieve.
+        """
+        durations = {sr.step_id: sr.duration_ms for sr in result.step_results}
+        finish: Dict[str, float] = {}
+        for step in ordered_steps:
+            if step.step_id not in durations:
+                continue
+            earliest_start = max((finish[dep] for dep in step.dependencies if dep in finish), default=0.0)
+            finish[step.step_id] = earliest_start + durations[step.step_id]
+        result.serial_ms = sum(durations.values())
+        result.critical_path_ms = max(finish.values(), default=0.0)
+
     def _rollback(self, snapshot_ids: List[str]) -> str:
         """Rollback completed steps in reverse order.
 
@@ -249,7 +443,9 @@ class DAGExecutor:
         # Rollback in reverse order
         for sid in reversed(snapshot_ids):
             try:
-                if self._snapshot_engine.undo(sid):
+                with self._snapshot_lock:
+                    undone = self._snapshot_engine.undo(sid)
+                if undone:
                     successes += 1
                 else:
                     failures += 1
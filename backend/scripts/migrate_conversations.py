@@ -0,0 +1,159 @@
+"""
+scripts/migrate_conversations.py
+
+Conversation index migration CLI.
+
+Indexes an existing JSONL conversation tree
+({base_dir}/{user_id}/{YYYY-MM-DD}.jsonl) into the SQLite/FTS5 index used by
+ConversationService, and verifies the index against the log files.
+"""
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.conversation_service import ConversationService
+
+
+logger = logging.getLogger(__name__)
+
+
+def setup_logging(level: str = "INFO"):
+    """Setup logging configuration"""
+    logging.basicConfig(
+        level=getattr(logging, level.upper()),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+
+
+def build_index(service: ConversationService) -> int:
+    """
+    Index log files and lines not yet in the index (incremental)
+
+    Returns:
+        Exit code (0 for success, 1 for failure)
+    """
+    logger.info(f"Indexing conversation logs under: {service.base_dir}")
+    try:
+        service.index.sync_all()
+        counts = service.index.counts()
+        logger.info(f"✓ Indexed {counts['messages']} messages in {counts['files']} files "
+                    f"for {counts['users']} users")
+        return 0
+    except Exception as e:
+        logger.error(f"✗ Failed to build index: {e}")
+        return 1
+
+
+def rebuild_index(service: ConversationService) -> int:
+    """
+    Drop the index and re-read every log file from the start
+
+    Returns:
+        Exit code (0 for success, 1 for failure)
+    """
+    logger.info(f"Rebuilding conversation index at: {service.index.db_path}")
+    try:
+        counts = service.rebuild_index()
+        logger.info(f"✓ Rebuilt index: {counts['messages']} messages in {counts['files']} files "
+                    f"for {counts['users']} users")
+        return 0
+    except Exception as e:
+        logger.error(f"✗ Failed to rebuild index: {e}")
+        return 1
+
+
+def verify_index(service: ConversationService) -> int:
+    """
+    Compare every log file, parsed line by line, with the indexed messages
+
+    Returns:
+        Exit code (0 for success, 1 for mismatches)
+    """
+    logger.info(f"Verifying conversation index at: {service.index.db_path}")
+    mismatches = 0
+    for user_id in service.get_users_with_conversations():
+        for date_str in service.get_available_dates(user_id):
+            expected = [msg.id for msg in service._read_file(service._get_file_path(user_id, date_str))]
+            indexed = [msg.id for msg in service.get_messages_by_date(user_id, date_str)]
+            if indexed != expected:
+                mismatches += 1
+                logger.warning(f"⚠ user {user_id} {date_str}: log has {len(expected)} messages, "
+                               f"index has {len(indexed)}")
+
+    if mismatches:
+        logger.error(f"✗ {mismatches} log files differ from the index; run 'rebuild'")
+        return 1
+    logger.info("✓ Index matches the conversation logs")
+    return 0
+
+
+def show_stats(service: ConversationService) -> int:
+    """Print index statistics"""
+    service.index.sync_all()
+    counts = service.index.counts()
+    print("\n=== Conversation Index Statistics ===")
+    print(f"Index: {service.index.db_path}")
+    print(f"Full-text search: {'FTS5 trigram' if service.index.fts_enabled else 'content scan'}")
+    print(f"Users: {counts['users']}")
+    print(f"Log files: {counts['files']}")
+    print(f"Messages: {counts['messages']}")
+    print()
+    return 0
+
+
+def main():
+    """CLI entry point"""
+    parser = argparse.ArgumentParser(
+        description="Conversation log index migration",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python -m scripts.migrate_conversations build
+  python -m scripts.migrate_conversations rebuild
+  python -m scripts.migrate_conversations verify
+  python -m scripts.migrate_conversations --base-dir /srv/pms/conversations stats
+        """
+    )
+    parser.add_argument(
+        "--base-dir",
+        default=None,
+        help="Conversation log directory (default: backend/data/conversations)"
+    )
+    parser.add_argument(
+        "--index-path",
+        default=None,
+        help="Index database path (default: <base-dir>/index.db)"
+    )
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="Logging level (default: INFO)"
+    )
+
+    subparsers = parser.add_subparsers(dest="command", help="Available commands")
+    subparsers.required = True
+    subparsers.add_parser("build", help="Index new log files and appended lines")
+    subparsers.add_parser("rebuild", help="Clear and rebuild the index from all logs")
+    subparsers.add_parser("verify", help="Check the index against the log files")
+    subparsers.add_parser("stats", help="Show index statistics")
+
+    args = parser.parse_args()
+    setup_logging(args.log_level)
+
+    service = ConversationService(base_dir=args.base_dir, index_path=args.index_path)
+    commands = {
+        "build": build_index,
+        "rebuild": rebuild_index,
+        "verify": verify_index,
+        "stats": show_stats,
+    }
+    return commands[args.command](service)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,9 +5,14 @@ LLM 客户端单元测试
 """
 import pytest
 
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
 from core.ai.llm_client import (
     LLMClient,
     OpenAICompatibleClient,
+    AsyncOpenAICompatibleClient,
     LLMResponse,
     extract_json_from_text,
     _try_parse_json,
@@ -186,5 +191,154 @@ class TestJSONHelpers:
         assert result == {"outer": {"inner": "value"}}
 
 
+def _completion(content):
+    """构造非流式响应"""
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=None,
+    )
+
+
+def _chunk(content):
+    """构造流式响应块"""
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])
+
+
+class _FakeStream:
+    """模拟 openai AsyncStream"""
+
+    def __init__(self, parts, delay=0.0):
+        self.parts = parts
+        self.delay = delay
+        self.closed = False
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for part in self.parts:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            yield _chunk(part)
+
+    async def close(self):
+        self.closed = True
+
+
+class TestOpenAICompatibleClientStream:
+    """同步客户端流式输出测试"""
+
+    def test_stream_chat_yields_deltas(self):
+        client = OpenAICompatibleClient(api_key="test-key")
+        client._client = MagicMock()
+        client._client.chat.completions.create.return_value = iter(
+            [_chunk("你"), _chunk(None), _chunk("好")]
+        )
+
+        assert list(client.stream_chat([{"role": "user", "content": "hi"}])) == ["你", "好"]
+        assert client._client.chat.completions.create.call_args.kwargs["stream"] is True
+
+
+class TestAsyncOpenAICompatibleClient:
+    """异步 OpenAI 兼容客户端测试"""
+
+    def _client(self, create, **kwargs):
+        client = AsyncOpenAICompatibleClient(api_key="test-key", **kwargs)
+        client._client = MagicMock()
+        client._client.chat.completions.create = AsyncMock(side_effect=create)
+        return client
+
+    async def test_client_without_api_key(self, monkeypatch):
+        monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+        client = AsyncOpenAICompatibleClient(api_key=None)
+
+        assert not client.is_enabled()
+        assert (await client.chat([{"role": "user", "content": "hi"}])).content == ""
+        assert [d async for d in client.stream_chat([{"role": "user", "content": "hi"}])] == []
+
+    async def test_shares_pooled_http_client(self):
+        client = AsyncOpenAICompatibleClient(api_key="test-key", max_connections=7)
+
+        assert client._client._client is client._http_client
+        await client.aclose()
+
+    async def test_chat_returns_content(self):
+        client = self._client(lambda **kwargs: _completion('{"message": "ok"}'))
+
+        response = await client.chat([{"role": "user", "content": "hi"}], timeout=5.0)
+
+        assert response.to_json() == {"message": "ok"}
+        assert client._client.chat.completions.create.call_args.kwargs["timeout"] == 5.0
+
+    async def test_chat_falls_back_without_json_format(self):
+        calls = []
+
+        def create(**kwargs):
+            calls.append(kwargs)
+            if "response_format" in kwargs:
+                raise RuntimeError("json_object not supported")
+            return _completion("{}")
+
+        client = self._client(create)
+        messages = [{"role": "system", "content": "sys"}, {"role": "user", "content": "hi"}]
+
+        await client.chat(messages, response_format={"type": "json_object"})
+
+        assert len(calls) == 2
+        assert "纯 JSON" in calls[1]["messages"][0]["content"]
+
+    async def test_chat_times_out(self):
+        async def slow(**kwargs):
+            await asyncio.sleep(1)
+            return _completion("late")
+
+        client = self._client(slow)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await client.chat([{"role": "user", "content": "hi"}], timeout=0.05)
+        assert client.get_model_info()["in_flight"] == 0
+
+    async def test_concurrency_is_bounded(self):
+        state = {"active": 0, "peak": 0}
+
+        async def create(**kwargs):
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+            await asyncio.sleep(0.01)
+            state["active"] -= 1
+            return _completion("ok")
+
+        client = self._client(create, max_concurrency=2)
+
+        await asyncio.gather(*[
+            client.chat([{"role": "user", "content": str(i)}]) for i in range(8)
+        ])
+
+        assert state["peak"] == 2
+
+    async def test_stream_chat_yields_tokens(self):
+        stream = _FakeStream(["房间", None, "201"])
+        client = self._client(lambda **kwargs: stream)
+
+        deltas = [d async for d in client.stream_chat([{"role": "user", "content": "hi"}])]
+
+        assert deltas == ["房间", "201"]
+        assert stream.closed
+        assert client._client.chat.completions.create.call_args.kwargs["stream"] is True
+
+    async def test_stream_timeout_covers_whole_stream(self):
+        stream = _FakeStream(["a", "b", "c"], delay=0.05)
+        client = self._client(lambda **kwargs: stream)
+
+        received = []
+        with pytest.raises(asyncio.TimeoutError):
+            async for delta in client.stream_chat([{"role": "user", "content": "hi"}], timeout=0.08):
+                received.append(delta)
+
+        assert received == ["a"]
+        assert stream.closed
+        assert client.get_model_info()["in_flight"] == 0
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,161 @@
+"""
+tests/ai/test_llm_stream.py
+
+流式对话桥接测试
+"""
+import asyncio
+import json
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.ai.llm_stream import (
+    ChatStreamBridge,
+    JsonFieldStreamer,
+    get_stream_handler,
+    set_stream_handler,
+)
+
+
+def _feed_all(streamer, chunks):
+    return [streamer.feed(chunk) for chunk in chunks]
+
+
+class TestJsonFieldStreamer:
+    """JSON 字段增量解码测试"""
+
+    def test_extracts_message_across_chunks(self):
+        streamer = JsonFieldStreamer()
+        out = _feed_all(streamer, ['{"mes', 'sage": "已为', '您查询', '", "suggested_actions": []}'])
+
+        assert out == ["", "已为", "您查询", ""]
+        assert streamer.done
+
+    def test_matches_json_decoding(self):
+        text = json.dumps({"message": 'a"b\\c\n\t😀 é', "context": {}})
+        streamer = JsonFieldStreamer()
+
+        # 逐字符输入，覆盖所有转义序列被拆分的情况
+        decoded = "".join(_feed_all(streamer, list(text)))
+
+        assert decoded == json.loads(text)["message"]
+
+    def test_ignores_other_fields(self):
+        streamer = JsonFieldStreamer("message")
+        out = streamer.feed('{"context": {"note": "x"}, "message": "hi", "other": "y"}')
+
+        assert out == "hi"
+        assert streamer.feed('"more"') == ""
+
+    def test_no_field_yields_nothing(self):
+        streamer = JsonFieldStreamer()
+
+        assert _feed_all(streamer, ["plain ", "text"]) == ["", ""]
+        assert not streamer.done
+
+
+class TestStreamHandler:
+    """线程级流式处理器测试"""
+
+    def test_handler_is_thread_local(self):
+        handler = MagicMock()
+        set_stream_handler(handler)
+        seen = []
+        try:
+            thread = threading.Thread(target=lambda: seen.append(get_stream_handler()))
+            thread.start()
+            thread.join()
+
+            assert get_stream_handler() is handler
+            assert seen == [None]
+        finally:
+            set_stream_handler(None)
+
+
+class _FakeAsyncClient:
+    def __init__(self, parts):
+        self.parts = parts
+        self.calls = []
+
+    async def stream_chat(self, messages, **kwargs):
+        self.calls.append(kwargs)
+        for part in self.parts:
+            yield part
+
+
+class TestChatStreamBridge:
+    """ChatStreamBridge 测试"""
+
+    async def test_forwards_message_tokens_from_worker_thread(self):
+        parts = ['{"message": "房间', '201', '已清洁", "suggested_actions": []}']
+        client = _FakeAsyncClient(parts)
+        queue = asyncio.Queue()
+        bridge = ChatStreamBridge(client, asyncio.get_running_loop(), queue, timeout=3.0)
+
+        content = await asyncio.to_thread(
+            bridge, [{"role": "user", "content": "hi"}],
+            temperature=0.2, max_tokens=50, response_format={"type": "json_object"},
+        )
+
+        assert content == "".join(parts)
+        events = [queue.get_nowait() for _ in range(queue.qsize())]
+        assert events == [
+            ("token", {"delta": "房间", "stream": 0}),
+            ("token", {"delta": "201", "stream": 0}),
+            ("token", {"delta": "已清洁", "stream": 0}),
+        ]
+        assert client.calls[0] == {
+            "temperature": 0.2,
+            "max_tokens": 50,
+            "response_format": {"type": "json_object"},
+            "timeout": 3.0,
+        }
+
+    async def test_each_completion_gets_new_stream_index(self):
+        client = _FakeAsyncClient(['{"message": "x"}'])
+        queue = asyncio.Queue()
+        bridge = ChatStreamBridge(client, asyncio.get_running_loop(), queue)
+
+        await asyncio.to_thread(bridge, [])
+        await asyncio.to_thread(bridge, [])
+
+        assert [queue.get_nowait()[1]["stream"] for _ in range(2)] == [0, 1]
+
+
+class TestLLMServiceStreaming:
+    """LLMService 在安装流式处理器时走流式路径"""
+
+    @patch("app.services.llm_service.settings")
+    def test_chat_uses_stream_handler(self, mock_settings):
+        from app.services.llm_service import LLMService
+
+        mock_settings.LLM_MODEL = "test-model"
+        mock_settings.LLM_TEMPERATURE = 0.7
+        mock_settings.LLM_MAX_TOKENS = 2000
+
+        with patch.object(LLMService, "__init__", lambda self: None):
+            svc = LLMService()
+        svc.enabled = True
+        svc.client = MagicMock()
+        svc._prompt_builder = None
+        svc._query_schema_cache = None
+        svc.build_system_prompt_with_schema = MagicMock(return_value="system")
+
+        handler = MagicMock(return_value=json.dumps({
+            "message": "streamed", "suggested_actions": [], "context": {}
+        }))
+        set_stream_handler(handler)
+        try:
+            result = svc.chat("hello")
+        finally:
+            set_stream_handler(None)
+
+        assert result["message"] == "streamed"
+        handler.assert_called_once()
+        assert handler.call_args.kwargs["response_format"] == {"type": "json_object"}
+        svc.client.chat.completions.create.assert_not_called()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
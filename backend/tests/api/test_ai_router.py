@@ -3,10 +3,12 @@ Tests for app/routers/ai.py — AI chat and execute endpoints.
 
 Covers:
 - POST /ai/chat — chat endpoint with mocked AIService and ConversationService
+- POST /ai/chat/stream — SSE token streaming
 - POST /ai/execute — execute action (confirmed and cancelled cases)
 - Follow-up context handling
 - Topic ID generation
 """
+import json
 import uuid
 from unittest.mock import MagicMock, patch
 
@@ -15,7 +17,7 @@ from fastapi.testclient import TestClient
 
 from app.hotel.models.ontology import Employee, EmployeeRole
 from app.main import app
-from app.routers.ai import get_conversation_service
+from app.routers.ai import get_async_llm_client, get_conversation_service
 from app.security.auth import create_access_token, get_password_hash
 from app.services.conversation_service import (
     ConversationMessage,
@@ -462,6 +464,111 @@ class TestAiChat:
         assert data["follow_up"]["action_type"] == "create_reservation"
 
 
+# ==================== POST /ai/chat/stream ====================
+
+def _parse_sse(body):
+    """Split an SSE body into (event, data) pairs."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class _FakeStreamingClient:
+    """Stands in for AsyncOpenAICompatibleClient."""
+
+    def __init__(self, parts):
+        self.parts = parts
+
+    def is_enabled(self):
+        return True
+
+    async def stream_chat(self, messages, **kwargs):
+        for part in self.parts:
+            yield part
+
+
+class TestAiChatStream:
+    """Tests for POST /ai/chat/stream."""
+
+    @pytest.fixture(autouse=True)
+    def _override_llm_client(self):
+        app.dependency_overrides[get_async_llm_client] = lambda: _FakeStreamingClient(
+            ['{"message": "Room ', '201 is ', 'clean", "suggested_actions": []}']
+        )
+        yield
+        app.dependency_overrides.pop(get_async_llm_client, None)
+
+    @patch("app.routers.ai.AIService")
+    def test_stream_forwards_tokens_then_done(
+        self, MockAIService, client, manager_auth_headers, mock_conv_service
+    ):
+        """LLM tokens are sent as they arrive, followed by the full response."""
+        def process_message(**kwargs):
+            from core.ai.llm_stream import get_stream_handler
+            content = get_stream_handler()([{"role": "user", "content": kwargs["message"]}])
+            return {**json.loads(content), "context": {}}
+
+        MockAIService.return_value.process_message.side_effect = process_message
+
+        resp = client.post(
+            "/ai/chat/stream",
+            json={"content": "room 201?"},
+            headers=manager_auth_headers,
+        )
+
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        events = _parse_sse(resp.text)
+        assert [e for e, _ in events] == ["token", "token", "token", "done"]
+        assert "".join(d["delta"] for e, d in events if e == "token") == "Room 201 is clean"
+        done = events[-1][1]
+        assert done["message"] == "Room 201 is clean"
+        assert done["topic_id"] == "abcd1234"
+        mock_conv_service.save_message_pair.assert_called_once()
+
+    @patch("app.routers.ai.AIService")
+    def test_stream_without_llm_sends_done_only(
+        self, MockAIService, client, manager_auth_headers
+    ):
+        """Rule-based replies (no LLM call) still end with a done event."""
+        app.dependency_overrides[get_async_llm_client] = lambda: None
+        MockAIService.return_value.process_message.return_value = {
+            "message": "rule reply",
+            "suggested_actions": [],
+            "context": {},
+        }
+
+        resp = client.post(
+            "/ai/chat/stream",
+            json={"content": "hello"},
+            headers=manager_auth_headers,
+        )
+
+        events = _parse_sse(resp.text)
+        assert events == [("done", events[0][1])]
+        assert events[0][1]["message"] == "rule reply"
+
+    @patch("app.routers.ai.AIService")
+    def test_stream_reports_errors(self, MockAIService, client, manager_auth_headers):
+        """Failures during processing become an error event."""
+        MockAIService.return_value.process_message.side_effect = RuntimeError("boom")
+
+        resp = client.post(
+            "/ai/chat/stream",
+            json={"content": "hello"},
+            headers=manager_auth_headers,
+        )
+
+        assert _parse_sse(resp.text) == [("error", {"detail": "boom"})]
+
+    def test_stream_requires_auth(self, client):
+        """Unauthenticated request returns 401 or 403."""
+        resp = client.post("/ai/chat/stream", json={"content": "hello"})
+        assert resp.status_code in (401, 403)
+
+
 # ==================== POST /ai/execute ====================
 
 class TestAiExecute:
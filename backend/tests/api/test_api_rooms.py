@@ -290,6 +290,30 @@ class TestRooms:
         data = response.json()
         assert isinstance(data, list)
 
+    def test_available_rooms_exclude_own_reservation(self, client: TestClient, manager_auth_headers,
+                                                     db_session, sample_room, sample_room_type, sample_guest):
+        """测试预订自身的占用不挡住它预订的房间"""
+        from app.models.ontology import Reservation, ReservationStatus
+
+        check_in = date.today()
+        check_out = date.today() + timedelta(days=2)
+        reservation = Reservation(
+            reservation_no="RAVAIL001", guest_id=sample_guest.id, room_type_id=sample_room_type.id,
+            check_in_date=check_in, check_out_date=check_out, room_count=1,
+            status=ReservationStatus.CONFIRMED
+        )
+        db_session.add(reservation)
+        db_session.commit()
+        url = (f"/rooms/available?check_in_date={check_in}&check_out_date={check_out}"
+               f"&room_type_id={sample_room_type.id}")
+
+        others = client.get(url, headers=manager_auth_headers)
+        own = client.get(f"{url}&reservation_id={reservation.id}", headers=manager_auth_headers)
+
+        assert others.status_code == own.status_code == 200
+        assert others.json() == []
+        assert [r["id"] for r in own.json()] == [sample_room.id]
+
     def test_get_availability_by_type(self, client: TestClient, manager_auth_headers, sample_room, sample_room_type):
         """测试按房型统计可用房间"""
         from datetime import date, timedelta
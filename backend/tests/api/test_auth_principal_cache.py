@@ -0,0 +1,141 @@
+"""
+认证主体缓存测试
+覆盖：LRU/TTL 淘汰、命中时不查询 employees、员工变更与 RBAC 变更失效、
+权限快照用于 require_permission、关闭缓存
+"""
+import pytest
+from sqlalchemy import event
+
+from app.models.ontology import Employee, EmployeeRole
+from app.security import principal_cache as pc
+from app.security.auth import create_access_token, get_password_hash
+from app.security.principal_cache import BoundedTTLCache, get_principal_cache
+from app.system.models.rbac import SysRole
+from app.system.services.rbac_service import PermissionService
+
+
+@pytest.fixture
+def employee_selects(db_engine):
+    """记录查询 employees 表的 SELECT 语句"""
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM employees" in statement:
+            statements.append(statement)
+
+    event.listen(db_engine, "before_cursor_execute", _record)
+    yield statements
+    event.remove(db_engine, "before_cursor_execute", _record)
+
+
+@pytest.fixture
+def receptionist(db_session):
+    employee = Employee(
+        username="front_cache", password_hash=get_password_hash("123456"),
+        name="前台缓存", role=EmployeeRole.RECEPTIONIST, is_active=True
+    )
+    db_session.add(employee)
+    db_session.commit()
+    return employee
+
+
+def _auth(employee):
+    return {"Authorization": f"Bearer {create_access_token(employee.id, employee.role)}"}
+
+
+class TestBoundedTTLCache:
+
+    def test_lru_eviction(self):
+        cache = BoundedTTLCache(max_entries=2, ttl_seconds=60)
+        cache[1] = "a"
+        cache[2] = "b"
+        cache.get(1)
+        cache[3] = "c"
+
+        assert 1 in cache and 3 in cache
+        assert 2 not in cache
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_ttl_expiry(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(pc.time, "monotonic", lambda: now[0])
+        cache = BoundedTTLCache(max_entries=8, ttl_seconds=10)
+        cache[1] = "a"
+
+        now[0] += 11
+        assert cache.get(1) is None
+        assert cache.get_stats()["expirations"] == 1
+
+
+class TestPrincipalCache:
+
+    def test_repeat_request_skips_employee_query(self, client, receptionist, employee_selects):
+        headers = _auth(receptionist)
+        employee_selects.clear()
+
+        first = client.get("/auth/me", headers=headers)
+        selects_after_first = len(employee_selects)
+        second = client.get("/auth/me", headers=headers)
+
+        assert first.status_code == second.status_code == 200
+        assert second.json()["username"] == "front_cache"
+        assert selects_after_first == 1
+        assert len(employee_selects) == 1
+        assert get_principal_cache().get_stats()["hits"] == 1
+
+    def test_deactivated_employee_invalidated(self, client, db_session, receptionist):
+        headers = _auth(receptionist)
+        assert client.get("/auth/me", headers=headers).status_code == 200
+
+        receptionist.is_active = False
+        db_session.commit()
+
+        response = client.get("/auth/me", headers=headers)
+        assert response.status_code == 401
+        assert "账号已停用" in response.json()["detail"]
+
+    def test_user_role_change_invalidates(self, client, db_session, receptionist):
+        assert client.get("/auth/me", headers=_auth(receptionist)).status_code == 200
+        assert len(get_principal_cache()) == 1
+
+        role = SysRole(code="night_audit", name="夜审", data_scope="ALL")
+        db_session.add(role)
+        db_session.flush()
+        PermissionService(db_session).assign_user_roles(receptionist.id, [role.id])
+        db_session.commit()
+
+        assert len(get_principal_cache()) == 0
+
+    def test_permission_snapshot_used_by_require_permission(self, client, db_session, receptionist, monkeypatch):
+        from core.security.permission import permission_provider_registry
+
+        class Provider:
+            calls = 0
+
+            def get_user_permissions(self, user_id):
+                Provider.calls += 1
+                return {"benchmark:write"}
+
+            def has_permission(self, user_id, code):
+                raise AssertionError("snapshot should answer permission checks")
+
+        monkeypatch.setattr(permission_provider_registry, "_provider", Provider())
+        headers = _auth(receptionist)
+
+        client.get("/auth/me", headers=headers)
+        response = client.get("/benchmark/runs", headers=headers)
+
+        assert response.status_code == 200
+        assert Provider.calls == 1
+
+    def test_disabled(self, client, receptionist, employee_selects, monkeypatch):
+        from app.config import settings
+        monkeypatch.setattr(settings, "AUTH_PRINCIPAL_CACHE_ENABLED", False)
+        headers = _auth(receptionist)
+        employee_selects.clear()
+
+        client.get("/auth/me", headers=headers)
+        client.get("/auth/me", headers=headers)
+
+        assert get_principal_cache() is None
+        assert len(employee_selects) == 2
@@ -3,6 +3,7 @@ OAG Benchmark 专用 fixtures
 
 提供独立的内存数据库，seed 完整的 init_data 数据，
 以及真实的 AIService 实例（需要 OPENAI_API_KEY 环境变量）。
+operational_db 提供由 generate_operational_data.py 生成函数填充的运营数据库（报表/房态 benchmark）。
 """
 import pytest
 from sqlalchemy import create_engine
@@ -87,3 +88,84 @@ def receptionist_user(benchmark_db):
     user = benchmark_db.query(Employee).filter(Employee.username == "front1").first()
     assert user is not None, "front1 user not found in seed data"
     return user
+
+
+def _seed_operational_data(session, start_date, end_date):
+    """
+    按 generate_operational_data.main() 的方式生成运营数据（房型/房间/员工相同，
+    预订与入住记录覆盖 [start_date, end_date]；跳过逐日全表扫描的散客生成）
+
+    Returns:
+        (预订数, 入住记录数)
+    """
+    import random
+    from datetime import timedelta
+    from decimal import Decimal
+    import generate_operational_data as gen
+    from app.models.ontology import Room, RoomStatus, RoomType
+
+    random.seed(7)
+    room_types, base_prices = {}, {}
+    for name, price, occupancy in (("标间", "288.00", 2), ("大床房", "368.00", 2), ("豪华间", "588.00", 3)):
+        rt = RoomType(name=name, base_price=Decimal(price), max_occupancy=occupancy)
+        session.add(rt)
+        session.flush()
+        room_types[rt.id] = rt
+        base_prices[rt.id] = Decimal(price)
+
+    type_ids = list(room_types)
+    rooms = []
+    for floor, numbers in {1: range(101, 115), 2: range(201, 215), 3: range(301, 312)}.items():
+        for number in numbers:
+            rt_id = type_ids[0] if floor == 1 else random.choices(
+                type_ids, weights=[60, 35, 5] if floor == 2 else [20, 50, 30])[0]
+            rooms.append(Room(room_number=str(number), floor=floor, room_type_id=rt_id,
+                              status=RoomStatus.VACANT_CLEAN))
+    session.add_all(rooms)
+
+    employees = [
+        Employee(username=username, password_hash="x", name=username, role=role, is_active=True)
+        for username, role in (("manager", "manager"), ("front1", "receptionist"))
+    ]
+    session.add_all(employees)
+    session.commit()
+
+    guests = gen.generate_guests(session, 300)
+    reservations = gen.generate_reservations(
+        session, guests, rooms, room_types, base_prices, employees, start_date, end_date
+    )
+    stays, _, _ = gen.generate_stay_records(session, reservations, rooms, employees, room_types, base_prices)
+    tasks = gen.generate_tasks(session, stays, rooms, employees, start_date, end_date)
+    gen.update_room_status(session, stays, tasks)
+    return len(reservations), len(stays)
+
+
+@pytest.fixture(scope="module")
+def operational_db(request):
+    """
+    运营数据内存库（模块级，生成一次）
+
+    数据区间由测试模块的 OPERATIONAL_DATA_RANGE = (start_date, end_date) 指定，
+    默认为 generate_operational_data.py 的最近半年。
+
+    Yields:
+        (session, (预订数, 入住记录数))
+    """
+    from datetime import date, timedelta
+
+    start_date, end_date = getattr(
+        request.module, "OPERATIONAL_DATA_RANGE", (date.today() - timedelta(days=180), date.today())
+    )
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    counts = _seed_operational_data(session, start_date, end_date)
+
+    yield session, counts
+
+    session.close()
+    Base.metadata.drop_all(bind=engine)
@@ -0,0 +1,84 @@
+"""
+审计引擎 benchmark — 稳态下每次 log() 的耗时
+
+原实现在超过 max_logs 后每次调用都 list.pop(0) 并重建全部索引（O(n)）；
+环形缓冲 + 按序号增量淘汰的索引保持 O(1)。按窗口统计每次调用的平均耗时，
+环形缓冲在缓冲填满前后应保持平稳。
+
+运行：
+  uv run pytest tests/benchmark/test_audit_engine_benchmark.py -v -s --no-cov
+
+环境变量：
+  AUDIT_BENCH_CALLS          环形缓冲的 log() 调用次数（默认 1000000）
+  AUDIT_BENCH_LEGACY_CALLS   原实现的调用次数（默认 20000）
+  AUDIT_BENCH_MAX_LOGS       缓冲容量（默认 10000）
+"""
+import os
+import time
+import uuid
+from datetime import datetime
+
+import pytest
+
+from core.engine.audit import AuditEngine, AuditLog, AuditSeverity
+
+CALLS = int(os.getenv("AUDIT_BENCH_CALLS", "1000000"))
+LEGACY_CALLS = int(os.getenv("AUDIT_BENCH_LEGACY_CALLS", "20000"))
+MAX_LOGS = int(os.getenv("AUDIT_BENCH_MAX_LOGS", "10000"))
+WINDOWS = 10
+
+
+class _ListAuditEngine:
+    """原实现：list 存储，超出容量后 pop(0) 并重建索引"""
+
+    def __init__(self, max_logs):
+        self._max_logs = max_logs
+        self._logs, self._operator_logs, self._entity_logs = [], {}, {}
+
+    def log(self, operator_id=None, action="", entity_type=None, entity_id=None, new_value=None):
+        log = AuditLog(log_id=str(uuid.uuid4()), timestamp=datetime.utcnow(), operator_id=operator_id,
+                       action=action, entity_type=entity_type, entity_id=entity_id, old_value=None,
+                       new_value=new_value, severity=AuditSeverity.INFO)
+        index = len(self._logs)
+        self._logs.append(log)
+        self._operator_logs.setdefault(operator_id, []).append(index)
+        self._entity_logs.setdefault(f"{entity_type}:{entity_id}", []).append(index)
+        if len(self._logs) > self._max_logs:
+            self._logs.pop(0)
+            self._operator_logs.clear()
+            self._entity_logs.clear()
+            for i, entry in enumerate(self._logs):
+                self._operator_logs.setdefault(entry.operator_id, []).append(i)
+                self._entity_logs.setdefault(f"{entry.entity_type}:{entry.entity_id}", []).append(i)
+        return log
+
+
+def _per_call_us(engine, calls):
+    """每个窗口的平均单次耗时（微秒）"""
+    window = max(1, calls // WINDOWS)
+    results = []
+    for w in range(WINDOWS):
+        start = time.perf_counter()
+        for i in range(w * window, (w + 1) * window):
+            engine.log(operator_id=i % 50, action="room.update_status",
+                       entity_type="Room", entity_id=i % 500, new_value='{"status": "occupied"}')
+        results.append((time.perf_counter() - start) / window * 1e6)
+    return results
+
+
+@pytest.mark.slow
+def test_log_latency_at_steady_state():
+    engine = AuditEngine(max_logs=MAX_LOGS)
+    ring_us = _per_call_us(engine, CALLS)
+    legacy_us = _per_call_us(_ListAuditEngine(max_logs=MAX_LOGS), LEGACY_CALLS)
+
+    stats = engine.get_statistics()
+    assert stats["total_logs"] == MAX_LOGS
+    assert len(engine.get_by_entity("Room", 1)) == MAX_LOGS // 500
+    # 稳态窗口与首个窗口同一量级（原实现填满后增长两个数量级）
+    assert max(ring_us[1:]) < ring_us[0] * 3
+
+    fmt = lambda values: " ".join(f"{v:7.1f}" for v in values)
+    print(f"\n[audit engine] max_logs={MAX_LOGS}, us/call per {WINDOWS} windows\n"
+          f"  ring buffer  ({CALLS:>8} calls)  {fmt(ring_us)}\n"
+          f"  list+rebuild ({LEGACY_CALLS:>8} calls)  {fmt(legacy_us)}")
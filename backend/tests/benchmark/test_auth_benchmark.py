@@ -0,0 +1,126 @@
+"""
+认证快速路径 benchmark — 最简已认证接口的 p50/p99 延迟
+
+最简接口只依赖 get_current_user 并返回用户 ID，分别在关闭/开启主体缓存时
+逐个请求，统计延迟分位数与 employees 查询次数。
+数据库为文件 SQLite（WAL），员工带一个 RBAC 角色（get_current_user 未命中时
+还会 selectin 加载 user_roles）。
+
+运行：
+  uv run pytest tests/benchmark/test_auth_benchmark.py -v -s --no-cov
+
+环境变量：
+  AUTH_BENCH_REQUESTS   每种模式的请求数（默认 2000）
+"""
+import os
+import time
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event as sa_event
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, get_db
+from app.models.ontology import Employee, EmployeeRole
+from app.security.auth import create_access_token, get_current_user
+from app.security.principal_cache import get_principal_cache, reset_principal_cache
+from app.system.models.rbac import SysRole, SysUserRole
+
+REQUESTS = int(os.getenv("AUTH_BENCH_REQUESTS", "2000"))
+
+
+@pytest.fixture
+def auth_app(tmp_path):
+    """最简已认证接口 + 文件数据库，返回 (client, token, employee 查询计数)"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'auth_bench.db'}",
+                           connect_args={"check_same_thread": False})
+
+    @sa_event.listens_for(engine, "connect")
+    def _pragmas(dbapi_conn, _):
+        dbapi_conn.execute("PRAGMA journal_mode=WAL")
+
+    employee_selects = [0]
+
+    @sa_event.listens_for(engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        if "FROM employees" in statement:
+            employee_selects[0] += 1
+
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = factory()
+    employee = Employee(username="bench", password_hash="x", name="前台", role=EmployeeRole.RECEPTIONIST)
+    role = SysRole(code="receptionist", name="前台", data_scope="DEPT")
+    db.add_all([employee, role])
+    db.flush()
+    db.add(SysUserRole(user_id=employee.id, role_id=role.id))
+    db.commit()
+    token = create_access_token(employee.id, employee.role)
+    db.close()
+
+    app = FastAPI()
+
+    @app.get("/whoami")
+    def whoami(current_user: Employee = Depends(get_current_user)):
+        return {"id": current_user.id}
+
+    def override_get_db():
+        session = factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as client:
+        yield client, token, employee_selects
+    engine.dispose()
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct), len(ordered) - 1)]
+
+
+def _measure(client, token):
+    headers = {"Authorization": f"Bearer {token}"}
+    client.get("/whoami", headers=headers)  # 预热
+    latencies_ms = []
+    for _ in range(REQUESTS):
+        start = time.perf_counter()
+        response = client.get("/whoami", headers=headers)
+        latencies_ms.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200
+    return latencies_ms
+
+
+@pytest.mark.slow
+def test_authenticated_endpoint_latency(auth_app, monkeypatch):
+    from app.config import settings
+    client, token, employee_selects = auth_app
+
+    monkeypatch.setattr(settings, "AUTH_PRINCIPAL_CACHE_ENABLED", False)
+    reset_principal_cache()
+    employee_selects[0] = 0
+    uncached = _measure(client, token)
+    uncached_selects = employee_selects[0]
+
+    monkeypatch.setattr(settings, "AUTH_PRINCIPAL_CACHE_ENABLED", True)
+    reset_principal_cache()
+    employee_selects[0] = 0
+    cached = _measure(client, token)
+    cached_selects = employee_selects[0]
+    stats = get_principal_cache().get_stats()
+    reset_principal_cache()
+
+    assert uncached_selects == REQUESTS + 1
+    assert cached_selects == 1
+    assert stats["hits"] == REQUESTS
+
+    print(f"\n[auth] {REQUESTS} requests to GET /whoami per mode\n"
+          f"  uncached  p50={_percentile(uncached, 0.50):6.3f} ms  p99={_percentile(uncached, 0.99):6.3f} ms  "
+          f"employee queries={uncached_selects}\n"
+          f"  cached    p50={_percentile(cached, 0.50):6.3f} ms  p99={_percentile(cached, 0.99):6.3f} ms  "
+          f"employee queries={cached_selects}")
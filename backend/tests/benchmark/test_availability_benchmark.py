@@ -0,0 +1,110 @@
+"""
+房态可用性查询 benchmark — 旧版逐房型查询 vs. 单次查询临时索引 vs. 事件维护的常驻索引
+
+数据由 generate_operational_data.py 的生成函数产生（operational_db fixture）：
+前后各约半年（共一年）的预订与入住记录。旧版路径复现原
+``get_availability_by_room_type``：每个房型一次 count 加一次完整房间查询（N+1），
+且不计入已确认预订。
+
+运行：
+  uv run pytest tests/benchmark/test_availability_benchmark.py -v -s --no-cov
+
+环境变量：
+  AVAILABILITY_BENCH_DAYS   查询的入住日期数（默认 365，每个日期查询 1-3 晚）
+"""
+import logging
+import os
+import random
+import time
+from datetime import date, timedelta
+
+import pytest
+
+from app.models.ontology import Room, RoomStatus, RoomType, StayRecord, StayRecordStatus
+from app.services.availability_index import RoomAvailabilityIndex
+from app.services.event_bus import event_bus
+from app.services.room_service import RoomService
+
+logger = logging.getLogger(__name__)
+
+DAYS = int(os.getenv("AVAILABILITY_BENCH_DAYS", "365"))
+# operational_db 数据区间：过去半年 + 未来半年
+OPERATIONAL_DATA_RANGE = (date.today() - timedelta(days=180), date.today() + timedelta(days=185))
+
+
+def _legacy_availability(db, check_in_date, check_out_date):
+    """原实现：每个房型 count + 全量可用房间查询，不计预订"""
+    result = {}
+    for rt in db.query(RoomType).all():
+        total = db.query(Room).filter(
+            Room.room_type_id == rt.id, Room.is_active == True,
+            Room.status != RoomStatus.OUT_OF_ORDER
+        ).count()
+        occupied = db.query(StayRecord.room_id).filter(
+            StayRecord.status == StayRecordStatus.ACTIVE,
+            StayRecord.expected_check_out > check_in_date
+        ).subquery()
+        available = db.query(Room).filter(
+            Room.is_active == True,
+            Room.status.in_([RoomStatus.VACANT_CLEAN, RoomStatus.VACANT_DIRTY]),
+            ~Room.id.in_(occupied.select()),
+            Room.room_type_id == rt.id
+        ).all()
+        result[rt.id] = {'total': total, 'available': len(available)}
+    return result
+
+
+def _windows():
+    rng = random.Random(11)
+    today = date.today()
+    return [(today + timedelta(days=i), today + timedelta(days=i + rng.randint(1, 3))) for i in range(DAYS)]
+
+
+def _timed(fn, windows):
+    start = time.perf_counter()
+    results = [fn(ci, co) for ci, co in windows]
+    return (time.perf_counter() - start) * 1000 / len(windows), results
+
+
+@pytest.mark.slow
+def test_availability_index_vs_legacy(operational_db):
+    db, (reservation_count, stay_count) = operational_db
+    windows = _windows()
+
+    legacy_ms, _ = _timed(lambda ci, co: _legacy_availability(db, ci, co), windows)
+
+    per_query = RoomService(db)  # 未注册索引：每次查询构建区间临时索引
+    adhoc_ms, adhoc = _timed(per_query.get_availability_by_room_type, windows)
+
+    index = RoomAvailabilityIndex(max_age_seconds=0)
+    index.register(event_bus)
+    try:
+        build_start = time.perf_counter()
+        index.rebuild(db)
+        build_ms = (time.perf_counter() - build_start) * 1000
+
+        indexed = RoomService(db, availability_index=index)
+        index_ms, results = _timed(
+            lambda ci, co: index.get_availability(db, ci, co), windows
+        )
+        rooms_ms, _ = _timed(indexed.get_available_rooms, windows)
+    finally:
+        index.unregister()
+
+    for expected, actual in zip(adhoc, results):
+        assert {k: v['available'] for k, v in expected.items()} == \
+               {k: v['available'] for k, v in actual.items()}
+
+    logger.info(
+        f"Availability over {len(windows)} windows ({reservation_count} reservations, "
+        f"{stay_count} stays): legacy {legacy_ms:.2f} ms, ad-hoc {adhoc_ms:.2f} ms, "
+        f"index {index_ms:.3f} ms (build {build_ms:.1f} ms)"
+    )
+    print(
+        f"\n[availability] windows={len(windows)} reservations={reservation_count} stays={stay_count}"
+        f"\n  legacy by-type (N+1, no reservations) {legacy_ms:8.2f} ms/query"
+        f"\n  ad-hoc window index                    {adhoc_ms:8.2f} ms/query"
+        f"\n  resident index by-type                 {index_ms:8.3f} ms/query (build {build_ms:.1f} ms)"
+        f"\n  resident index available rooms         {rooms_ms:8.3f} ms/query"
+    )
+    assert index_ms < legacy_ms
@@ -0,0 +1,118 @@
+"""
+批量约束验证 benchmark — 逐条验证 vs validate_batch
+
+批量改手机号：逐条 validate_property_update 每个值一次唯一性查询，
+validate_property_update_batch 合并为 IN 查询。批量入住：逐条先按 id 取房间
+状态再 validate_action，validate_batch 按实体类型一次预取。
+统计 SQL 语句数与耗时，数据库为内存 SQLite。
+
+运行：
+  uv run pytest tests/benchmark/test_constraint_batch_benchmark.py -v -s --no-cov
+
+环境变量：
+  CONSTRAINT_BATCH_SIZE   批次条目数（默认 1000）
+"""
+import os
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event, inspect as sa_inspect
+
+from app.models.ontology import Guest, Room, RoomStatus, RoomType
+from core.ontology.metadata import (
+    ConstraintMetadata, ConstraintSeverity, ConstraintType, EntityMetadata, PropertyMetadata,
+)
+from core.ontology.registry import OntologyRegistry
+from core.reasoning.constraint_engine import ConstraintEngine, FieldUniquenessValidator
+
+BATCH = int(os.getenv("CONSTRAINT_BATCH_SIZE", "1000"))
+
+
+@contextmanager
+def _count_statements(engine):
+    counter = {"n": 0}
+
+    def _record(*args):
+        counter["n"] += 1
+
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+
+
+def _seed(db):
+    room_type = RoomType(name="标准间", base_price=Decimal("288.00"), max_occupancy=2)
+    db.add(room_type)
+    db.flush()
+    rooms = [Room(room_number=f"R{i}", floor=i % 20 + 1, room_type_id=room_type.id,
+                  status=RoomStatus.VACANT_CLEAN) for i in range(BATCH)]
+    guests = [Guest(name=f"客人{i}", phone=f"138{i:08d}") for i in range(BATCH)]
+    db.add_all(rooms + guests)
+    db.commit()
+    return [r.id for r in rooms], [(g.id, g.phone) for g in guests]
+
+
+@pytest.mark.slow
+def test_bulk_validation(db_session, db_engine):
+    registry = OntologyRegistry()
+    registry.clear()
+    try:
+        registry.register_model("Room", Room)
+        registry.register_model("Guest", Guest)
+        registry.register_constraint(ConstraintMetadata(
+            id="room_vacant", name="Room vacant", description="", constraint_type=ConstraintType.STATE,
+            severity=ConstraintSeverity.ERROR, entity="Room", action="checkin", condition_text="",
+            condition_code="state.status == 'vacant_clean'",
+        ))
+        guest = EntityMetadata(name="Guest", description="客人", table_name="guests")
+        guest.add_property(PropertyMetadata(name="phone", type="string", python_type="str",
+                                            update_validation_rules=[FieldUniquenessValidator("Guest", "phone")]))
+        registry.register_entity(guest)
+        engine = ConstraintEngine(registry)
+        room_ids, guest_phones = _seed(db_session)
+        updates = [(gid, phone, f"139{i:08d}") for i, (gid, phone) in enumerate(guest_phones)]
+        columns = [attr.key for attr in sa_inspect(Room).column_attrs]
+
+        def single_checkin():
+            results = []
+            for room_id in room_ids:
+                room = db_session.query(Room).filter(Room.id == room_id).first()
+                state = {name: getattr(room, name) for name in columns}
+                results.append(engine.validate_action("Room", "checkin", {}, state, {}))
+            return results
+
+        def single_phone():
+            return [engine.validate_property_update("Guest", "phone", old, new, {}, db_session, gid)
+                    for gid, old, new in updates]
+
+        timings = {}
+        for label, run in [
+            ("checkin  per item", single_checkin),
+            ("checkin  batch   ", lambda: engine.validate_batch(
+                [("Room", "checkin", {}, None, rid) for rid in room_ids], db=db_session)),
+            ("phone    per item", single_phone),
+            ("phone    batch   ", lambda: engine.validate_property_update_batch(
+                "Guest", "phone", updates, {}, db_session)),
+        ]:
+            db_session.expire_all()
+            with _count_statements(db_engine) as statements:
+                start = time.perf_counter()
+                results = run()
+                timings[label] = (time.perf_counter() - start, statements["n"], results)
+    finally:
+        registry.clear()
+
+    checkin_single, checkin_batch = timings["checkin  per item"], timings["checkin  batch   "]
+    phone_single, phone_batch = timings["phone    per item"], timings["phone    batch   "]
+    assert [r.is_valid for r in checkin_batch[2]] == [r.is_valid for r in checkin_single[2]]
+    assert [d.allowed for d in phone_batch[2]] == [d.allowed for d in phone_single[2]]
+    assert checkin_batch[1] <= (BATCH + 499) // 500
+    assert phone_batch[1] <= (BATCH + 499) // 500
+
+    lines = "\n".join(f"  {label}  {elapsed * 1000:8.1f} ms  {statements:5d} statements"
+                      for label, (elapsed, statements, _) in timings.items())
+    print(f"\n[constraint batch] {BATCH} items\n{lines}")
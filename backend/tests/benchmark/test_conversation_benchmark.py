@@ -0,0 +1,96 @@
+"""
+会话历史 benchmark — 逐请求扫描 JSONL vs. 增量索引
+
+旧版路径复现原 ConversationService：列出用户全部日志文件并从头解析，
+再在内存中过滤话题/关键词；新版只 stat 最新日志并读取索引中的 k 行。
+
+运行：
+  uv run pytest tests/benchmark/test_conversation_benchmark.py -v -s --no-cov
+
+环境变量：
+  CONVERSATION_BENCH_DAYS       历史天数（默认 180）
+  CONVERSATION_BENCH_PER_DAY    每天消息对数（默认 40）
+"""
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.conversation_service import ConversationMessage, ConversationService, MessageContext
+
+DAYS = int(os.getenv("CONVERSATION_BENCH_DAYS", "180"))
+PER_DAY = int(os.getenv("CONVERSATION_BENCH_PER_DAY", "40"))
+
+
+def _legacy_context(service, user_id, topic_id, max_rounds=3):
+    messages = []
+    limit = max_rounds * 2 + 10
+    for file_path in sorted(service._get_user_dir(user_id).glob('*.jsonl'), reverse=True):
+        for msg in reversed(service._read_file(file_path)):
+            messages.append(msg)
+            if len(messages) >= limit:
+                break
+        if len(messages) >= limit:
+            break
+    messages.reverse()
+    topic_messages = [m for m in messages if m.context and m.context.topic_id == topic_id]
+    return (topic_messages or messages)[-max_rounds * 2:]
+
+
+def _legacy_search(service, user_id, keyword):
+    results = []
+    for file_path in sorted(service._get_user_dir(user_id).glob('*.jsonl'), reverse=True):
+        results.extend(m for m in service._read_file(file_path) if keyword in m.content.lower())
+    results.sort(key=lambda m: m.timestamp, reverse=True)
+    return results[:50]
+
+
+def _timed(fn, *args, rounds=5):
+    result = None
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = fn(*args)
+    return (time.perf_counter() - start) * 1000 / rounds, result
+
+
+@pytest.fixture(scope="module")
+def history(tmp_path_factory):
+    base_dir = tmp_path_factory.mktemp("conversations")
+    user_dir = base_dir / "1"
+    user_dir.mkdir()
+    start = datetime.now() - timedelta(days=DAYS)
+    for day in range(DAYS):
+        current = start + timedelta(days=day)
+        with open(user_dir / f"{current:%Y-%m-%d}.jsonl", "w", encoding="utf-8") as f:
+            for i in range(PER_DAY):
+                ts = current.replace(hour=8) + timedelta(minutes=i)
+                topic = f"t{day}-{i // 5}"
+                for role, content in (("user", f"查询 {day}-{i} 号房间 checkout"), ("assistant", "已处理")):
+                    msg = ConversationMessage(id=f"{day}-{i}-{role}", timestamp=ts.isoformat(), role=role,
+                                              content=content, context=MessageContext(topic_id=topic))
+                    f.write(json.dumps(msg.to_dict(), ensure_ascii=False) + "\n")
+    service = ConversationService(base_dir=str(base_dir))
+    service.rebuild_index()
+    return service
+
+
+@pytest.mark.slow
+def test_context_and_search_vs_scan(history):
+    today_topic = f"t{DAYS - 1}-{(PER_DAY - 1) // 5}"
+
+    legacy_ms, expected = _timed(_legacy_context, history, 1, today_topic)
+    index_ms, actual = _timed(history.get_context_messages, 1, today_topic)
+    assert [m.id for m in actual] == [m.id for m in expected]
+
+    legacy_search_ms, expected = _timed(_legacy_search, history, 1, f"{DAYS // 2}-1 号")
+    search_ms, actual = _timed(history.search_messages, 1, f"{DAYS // 2}-1 号")
+    assert [m.id for m in actual] == [m.id for m in expected]
+
+    print(f"\n[conversations] days={DAYS} messages={DAYS * PER_DAY * 2}\n"
+          f"  context  scan={legacy_ms:8.2f} ms  index={index_ms:6.2f} ms  speedup={legacy_ms / index_ms:6.1f}x\n"
+          f"  search   scan={legacy_search_ms:8.2f} ms  index={search_ms:6.2f} ms  "
+          f"speedup={legacy_search_ms / search_ms:6.1f}x")
+    assert index_ms < legacy_ms
+    assert search_ms < legacy_search_ms
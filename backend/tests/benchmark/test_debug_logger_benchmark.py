@@ -0,0 +1,64 @@
+"""
+调试日志 benchmark — 逐条同步提交 vs. 写队列批量提交
+
+同步路径每次 create/update/log 调用各提交一次事务；写队列路径调用方只入队，
+后台线程把一批写入合并为一个事务。分别统计调用方耗时与 flush 后的总耗时。
+
+运行：
+  uv run pytest tests/benchmark/test_debug_logger_benchmark.py -v -s --no-cov
+
+环境变量：
+  DEBUG_LOGGER_BENCH_SESSIONS   会话数（默认 500）
+"""
+import os
+import time
+
+import pytest
+
+from core.ai.debug_logger import DebugLogger
+
+SESSIONS = int(os.getenv("DEBUG_LOGGER_BENCH_SESSIONS", "500"))
+
+
+def _run_sessions(logger):
+    """每个会话：创建、检索、LLM、两次尝试、完成，共 6 次写入"""
+    for i in range(SESSIONS):
+        session_id = logger.create_session(f"查询 {i} 号房间")
+        logger.update_session_retrieval(session_id, {"entities": ["Room"]}, [{"name": "ontology_query"}])
+        logger.update_session_llm(session_id, "prompt " * 50, "response " * 20, 500, "deepseek-chat")
+        logger.log_attempt(session_id, "ontology_query", {"room": i}, False, error={"code": "retry"})
+        logger.log_attempt(session_id, "ontology_query", {"room": i}, True, result={"rows": [i]})
+        logger.complete_session(session_id, result={"rows": [i]}, status="success")
+
+
+def _timed(logger):
+    start = time.perf_counter()
+    _run_sessions(logger)
+    call_ms = (time.perf_counter() - start) * 1000
+    logger.flush()
+    total_ms = (time.perf_counter() - start) * 1000
+    return call_ms, total_ms
+
+
+@pytest.mark.slow
+def test_queued_vs_synchronous_writes(tmp_path):
+    sync_logger = DebugLogger(str(tmp_path / "sync.db"), async_writes=False)
+    queued_logger = DebugLogger(str(tmp_path / "queued.db"))
+
+    sync_call_ms, sync_total_ms = _timed(sync_logger)
+    queued_call_ms, queued_total_ms = _timed(queued_logger)
+
+    for logger in (sync_logger, queued_logger):
+        stats = logger.get_statistics()
+        assert stats["total_sessions"] == SESSIONS
+        assert stats["total_attempts"] == SESSIONS * 2
+    write_stats = queued_logger.get_write_stats()
+    assert write_stats["dropped"] == 0 and write_stats["errors"] == 0
+
+    print(f"\n[debug_logger] sessions={SESSIONS} writes={SESSIONS * 6} "
+          f"batches={write_stats['batches']}\n"
+          f"  caller  sync={sync_call_ms:8.2f} ms  queued={queued_call_ms:8.2f} ms  "
+          f"speedup={sync_call_ms / queued_call_ms:6.1f}x\n"
+          f"  total   sync={sync_total_ms:8.2f} ms  queued={queued_total_ms:8.2f} ms  "
+          f"speedup={sync_total_ms / queued_total_ms:6.1f}x")
+    assert queued_total_ms < sync_total_ms
@@ -0,0 +1,115 @@
+"""
+约束表达式 benchmark — 编译缓存 vs 每次 ast.parse + 递归解释
+
+ConstraintEngine.validate_action 对一个动作的每条约束求值 condition_code
+（及 trigger_conditions）。原实现每次求值都 ast.parse 再递归遍历 AST；
+编译器按表达式字符串缓存闭包树，求值只剩闭包调用。
+
+运行：
+  uv run pytest tests/benchmark/test_expression_benchmark.py -v -s --no-cov
+
+环境变量：
+  EXPR_BENCH_CONSTRAINTS   单个动作上的约束数（默认 300）
+  EXPR_BENCH_DISPATCHES    validate_action 调用次数（默认 200）
+"""
+import ast
+import os
+import time
+
+import pytest
+
+from core.ontology.expression import _COMPARE_OPS
+from core.ontology.metadata import ConstraintMetadata, ConstraintSeverity, ConstraintType
+from core.ontology.registry import OntologyRegistry
+from core.reasoning import constraint_engine
+from core.reasoning.constraint_engine import ConstraintEngine
+
+CONSTRAINTS = int(os.getenv("EXPR_BENCH_CONSTRAINTS", "300"))
+DISPATCHES = int(os.getenv("EXPR_BENCH_DISPATCHES", "200"))
+
+EXPRESSIONS = [
+    "state.status == 'VACANT_CLEAN'",
+    "state.status != 'OCCUPIED' and state.floor > 0",
+    "param.amount <= state.outstanding_amount",
+    "user.role in ('manager', 'sysadmin', 'receptionist')",
+    "not state.is_blacklisted or user.role == 'manager'",
+]
+
+
+def _legacy_eval_node(node, ns):
+    """原解释器（节选本 benchmark 用到的节点）"""
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.Name):
+        if node.id in ns:
+            return ns[node.id]
+        raise ValueError(f"Undefined name: {node.id}")
+    if isinstance(node, ast.Attribute):
+        obj = _legacy_eval_node(node.value, ns)
+        return None if obj is None else getattr(obj, node.attr, None)
+    if isinstance(node, ast.Tuple):
+        return tuple(_legacy_eval_node(el, ns) for el in node.elts)
+    if isinstance(node, ast.Compare):
+        left = _legacy_eval_node(node.left, ns)
+        for op_node, comparator in zip(node.ops, node.comparators):
+            right = _legacy_eval_node(comparator, ns)
+            if not _COMPARE_OPS[type(op_node)](left, right):
+                return False
+            left = right
+        return True
+    if isinstance(node, ast.BoolOp):
+        values = (_legacy_eval_node(v, ns) for v in node.values)
+        return all(values) if isinstance(node.op, ast.And) else any(values)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        return not _legacy_eval_node(node.operand, ns)
+    raise ValueError(f"Unsupported expression node: {type(node).__name__}")
+
+
+def _legacy_safe_eval(expression, namespace):
+    return bool(_legacy_eval_node(ast.parse(expression, mode="eval").body, namespace))
+
+
+def _register(registry):
+    for i in range(CONSTRAINTS):
+        expression = EXPRESSIONS[i % len(EXPRESSIONS)]
+        registry.register_constraint(ConstraintMetadata(
+            id=f"bench_{i}", name=f"bench {i}", description=expression,
+            constraint_type=ConstraintType.STATE, severity=ConstraintSeverity.ERROR,
+            entity="Room", action="checkin", condition_text=expression, condition_code=expression,
+            trigger_conditions=["param.amount > 0"] if i % 3 == 0 else [],
+        ))
+
+
+def _run(engine):
+    start = time.perf_counter()
+    for i in range(DISPATCHES):
+        result = engine.validate_action(
+            "Room", "checkin", {"amount": 100 + i % 7},
+            {"status": "VACANT_CLEAN", "floor": 2, "outstanding_amount": 500, "is_blacklisted": False},
+            {"role": "receptionist"},
+        )
+        assert result.is_valid
+    return time.perf_counter() - start
+
+
+@pytest.mark.slow
+def test_validate_action_many_constraints(monkeypatch):
+    registry = OntologyRegistry()
+    registry.clear()
+    try:
+        _register(registry)
+        engine = ConstraintEngine(registry)
+
+        _run(engine)  # 预热
+        compiled_s = _run(engine)
+        monkeypatch.setattr(constraint_engine, "_safe_eval", _legacy_safe_eval)
+        legacy_s = _run(engine)
+    finally:
+        registry.clear()
+
+    assert compiled_s < legacy_s
+
+    evaluations = CONSTRAINTS + (CONSTRAINTS + 2) // 3
+    print(f"\n[expressions] {CONSTRAINTS} constraints/dispatch ({evaluations} evaluations), {DISPATCHES} dispatches\n"
+          f"  parse + interpret  {legacy_s / DISPATCHES * 1e6:9.1f} us/dispatch\n"
+          f"  compiled cache     {compiled_s / DISPATCHES * 1e6:9.1f} us/dispatch  ({legacy_s / compiled_s:.1f}x)")
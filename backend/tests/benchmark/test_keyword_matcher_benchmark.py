@@ -0,0 +1,77 @@
+"""
+关键字自动机 micro-benchmark — 数千个 searchable 关键字下的消息解析
+
+对比：
+- 逐关键字子串测试（原 find_entities_by_keywords + find_properties_by_keywords，
+  每次调用复制映射并遍历全部关键字，resolve_keyword_matches 做两遍）
+- KeywordMatcher 单遍扫描（编译一次）
+
+运行：
+  uv run pytest tests/benchmark/test_keyword_matcher_benchmark.py -v -s --no-cov
+
+环境变量：
+  KEYWORD_BENCH_KEYWORDS   关键字数（默认 3000）
+  KEYWORD_BENCH_MESSAGES   消息数（默认 2000）
+"""
+import os
+import random
+import time
+
+import pytest
+
+from core.ontology.keyword_matcher import KeywordMatcher
+
+KEYWORDS = int(os.getenv("KEYWORD_BENCH_KEYWORDS", "3000"))
+MESSAGES = int(os.getenv("KEYWORD_BENCH_MESSAGES", "2000"))
+
+_CHARS = "房间客人入住退房任务清洁账单预订空闲维修今天明天楼层价格会员早餐标准大床"
+
+
+def _scan_resolve(mapping, message):
+    """原实现：实体、属性各扫描一遍全部关键字"""
+    entities, properties = set(), set()
+    for keyword, targets in dict(mapping).items():
+        if keyword in message:
+            entities.update(name for kind, name in targets if kind == 'entity')
+    for keyword, targets in dict(mapping).items():
+        if keyword in message:
+            properties.update(name for kind, name in targets if kind == 'property')
+    return sorted(entities), sorted(properties)
+
+
+def _matcher_resolve(matcher, mapping, message):
+    entities, properties = set(), set()
+    for keyword in matcher.find_all(message):
+        for kind, name in mapping[keyword]:
+            (entities if kind == 'entity' else properties).add(name)
+    return sorted(entities), sorted(properties)
+
+
+@pytest.mark.slow
+def test_keyword_resolution_throughput():
+    rng = random.Random(42)
+    mapping = {}
+    while len(mapping) < KEYWORDS:
+        keyword = "".join(rng.choice(_CHARS) for _ in range(rng.randint(2, 4)))
+        kind = rng.choice(['entity', 'property'])
+        mapping[keyword] = [(kind, f"E{rng.randint(0, 50)}" + (".p" if kind == 'property' else ""))]
+    messages = ["".join(rng.choice(_CHARS + "的了吗请帮我查看一下") for _ in range(rng.randint(8, 40)))
+                for _ in range(MESSAGES)]
+
+    start = time.perf_counter()
+    matcher = KeywordMatcher(mapping.keys())
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    expected = [_scan_resolve(mapping, m) for m in messages]
+    scan_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = [_matcher_resolve(matcher, mapping, m) for m in messages]
+    matcher_s = time.perf_counter() - start
+
+    assert actual == expected
+
+    print(f"\n[keywords] {KEYWORDS} keywords, {MESSAGES} messages (compile {compile_ms:.1f} ms)\n"
+          f"  substring scan  {scan_s / MESSAGES * 1e6:9.1f} us/message\n"
+          f"  automaton       {matcher_s / MESSAGES * 1e6:9.1f} us/message  ({scan_s / matcher_s:.1f}x)")
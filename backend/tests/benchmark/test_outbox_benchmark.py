@@ -0,0 +1,137 @@
+"""
+事件发件箱 benchmark — 退房写入发件箱、中继批量发布的吞吐与端到端延迟
+
+启用 OUTBOX_ENABLED 后逐笔退房（业务变更与 event_outbox 同事务提交），
+后台中继线程同时批量发布到事件总线。统计：
+- 退房吞吐（笔/秒）
+- 中继发布吞吐（事件/秒，从第一笔退房到最后一个事件发布）
+- 端到端延迟（事件产生到发布的耗时 avg/p95/max）
+- 积压排空吞吐（停止中继时写入的积压，由 relay_pending 单独排空）
+
+运行：
+  uv run pytest tests/benchmark/test_outbox_benchmark.py -v -s --no-cov
+
+环境变量：
+  OUTBOX_BENCH_CHECKOUTS   退房笔数（默认 10000）
+"""
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, event as sa_event
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.ontology import (
+    Bill, Employee, EmployeeRole, Guest, Room, RoomStatus, RoomType, StayRecord, StayRecordStatus
+)
+from app.models.schemas import CheckOutRequest
+from app.services.checkout_service import CheckOutService
+from app.services.event_bus import Event
+from app.services.outbox_service import OutboxRelay, stage_event
+
+CHECKOUTS = int(os.getenv("OUTBOX_BENCH_CHECKOUTS", "10000"))
+
+
+@pytest.fixture
+def hotel_db(tmp_path):
+    """文件 SQLite（WAL），CHECKOUTS 间在住房及其账单"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'outbox_bench.db'}",
+                           connect_args={"check_same_thread": False, "timeout": 30})
+
+    @sa_event.listens_for(engine, "connect")
+    def _pragmas(dbapi_conn, _):
+        dbapi_conn.execute("PRAGMA journal_mode=WAL")
+        dbapi_conn.execute("PRAGMA synchronous=NORMAL")
+
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = factory()
+    room_type = RoomType(name="标准间", base_price=Decimal("288"), max_occupancy=2)
+    employee = Employee(username="bench", password_hash="x", name="前台", role=EmployeeRole.RECEPTIONIST)
+    db.add_all([room_type, employee])
+    db.flush()
+    db.bulk_insert_mappings(Room, [
+        {"id": i + 1, "room_number": f"{i + 1:05d}", "floor": 1, "room_type_id": room_type.id,
+         "status": RoomStatus.OCCUPIED} for i in range(CHECKOUTS)
+    ])
+    db.bulk_insert_mappings(Guest, [
+        {"id": i + 1, "name": f"客人{i}", "phone": f"138{i:08d}"} for i in range(CHECKOUTS)
+    ])
+    check_in = datetime.now() - timedelta(days=1)
+    db.bulk_insert_mappings(StayRecord, [
+        {"id": i + 1, "guest_id": i + 1, "room_id": i + 1, "check_in_time": check_in,
+         "expected_check_out": date.today(), "status": StayRecordStatus.ACTIVE} for i in range(CHECKOUTS)
+    ])
+    db.bulk_insert_mappings(Bill, [
+        {"stay_record_id": i + 1, "total_amount": Decimal("288"), "paid_amount": Decimal("288")}
+        for i in range(CHECKOUTS)
+    ])
+    db.commit()
+    employee_id = employee.id
+    db.close()
+
+    yield factory, employee_id
+    engine.dispose()
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct), len(ordered) - 1)]
+
+
+@pytest.mark.slow
+def test_checkout_outbox_throughput_and_lag(hotel_db, monkeypatch):
+    from app.config import settings
+    monkeypatch.setattr(settings, "OUTBOX_ENABLED", True)
+    factory, employee_id = hotel_db
+
+    lags_ms = []
+    done = threading.Event()
+
+    def publish(event):
+        lags_ms.append((datetime.now() - event.timestamp).total_seconds() * 1000)
+        if len(lags_ms) == CHECKOUTS:
+            done.set()
+
+    relay = OutboxRelay(factory, publish=publish, batch_size=500, poll_interval=0.05)
+    relay.start()
+    db = factory()
+    start = time.perf_counter()
+    try:
+        service = CheckOutService(db)
+        for stay_id in range(1, CHECKOUTS + 1):
+            service.check_out(CheckOutRequest(stay_record_id=stay_id), employee_id)
+            relay.notify()
+        checkout_s = time.perf_counter() - start
+        assert done.wait(60)
+        total_s = time.perf_counter() - start
+    finally:
+        relay.stop()
+        db.close()
+
+    assert relay.pending_count() == 0
+    stats = relay.get_stats()
+    assert (stats["published"], stats["errors"]) == (CHECKOUTS, 0)
+
+    # 积压排空：中继停止期间写入的事件
+    db = factory()
+    for i in range(CHECKOUTS):
+        stage_event(db, Event(event_type="bench.backlog", timestamp=datetime.now(), data={"n": i}, source="bench"))
+    db.commit()
+    db.close()
+    drain = OutboxRelay(factory, publish=lambda e: None, batch_size=500)
+    drain_start = time.perf_counter()
+    assert drain.relay_pending() == CHECKOUTS
+    drain_s = time.perf_counter() - drain_start
+
+    print(f"\n[outbox] checkouts={CHECKOUTS} batches={stats['batches']}\n"
+          f"  checkout  {CHECKOUTS / checkout_s:8.0f} checkouts/s\n"
+          f"  relay     {CHECKOUTS / total_s:8.0f} events/s end-to-end\n"
+          f"  lag       avg={sum(lags_ms) / len(lags_ms):7.1f} ms  p95={_percentile(lags_ms, 0.95):7.1f} ms  "
+          f"max={max(lags_ms):7.1f} ms\n"
+          f"  backlog   {CHECKOUTS / drain_s:8.0f} events/s drain")
@@ -0,0 +1,55 @@
+"""
+系统提示词构建 benchmark — 片段缓存 vs 每轮重建
+
+每轮对话都会调用 LLMService.build_system_prompt_with_schema。对比每次清空
+片段缓存后重建（原行为）与命中缓存只拼装片段，角色在前台/经理间轮换。
+本体与操作来自酒店领域注册。
+
+运行：
+  uv run pytest tests/benchmark/test_prompt_builder_benchmark.py -v -s --no-cov
+
+环境变量：
+  PROMPT_BENCH_TURNS   构建次数（默认 300）
+"""
+import os
+import time
+
+import pytest
+
+TURNS = int(os.getenv("PROMPT_BENCH_TURNS", "300"))
+ROLES = ["receptionist", "manager"]
+
+
+def _run(service, cached):
+    start = time.perf_counter()
+    prompts = []
+    for i in range(TURNS):
+        if not cached:
+            service._prompt_builder.invalidate_cache()
+        prompts.append(service.build_system_prompt_with_schema(
+            language="zh", user_role=ROLES[i % len(ROLES)], message_hint="查看房态"))
+    return time.perf_counter() - start, prompts
+
+
+@pytest.mark.slow
+def test_prompt_build_per_turn():
+    from app.hotel.hotel_domain_adapter import HotelDomainAdapter
+    from app.services.llm_service import LLMService
+    from core.ontology.registry import OntologyRegistry
+
+    HotelDomainAdapter().register_ontology(OntologyRegistry())
+    service = LLMService()
+    assert service._prompt_builder is not None
+
+    _run(service, cached=True)  # 预热
+    uncached_s, expected = _run(service, cached=False)
+    cached_s, actual = _run(service, cached=True)
+    stats = service.get_prompt_build_stats()
+
+    assert actual == expected
+    assert stats["cache_hit_rate"] == 1.0
+
+    print(f"\n[prompt builder] {TURNS} system prompts, ~{stats['estimated_tokens']} tokens each\n"
+          f"  rebuild every turn  {uncached_s / TURNS * 1000:8.3f} ms/prompt\n"
+          f"  section cache       {cached_s / TURNS * 1000:8.3f} ms/prompt  ({uncached_s / cached_s:.1f}x)\n"
+          f"  last build          {stats['build_ms']:.3f} ms in PromptBuilder")
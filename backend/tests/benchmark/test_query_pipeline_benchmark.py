@@ -11,17 +11,24 @@ Query Pipeline Benchmark — 验证统一查询管道 (ontology_query) 的端到
   - 组内用例按序执行，共享对话历史（模拟 Chat UI 多轮对话）
   - is_setup 标记的 cases 执行 mutation 构造查询前提条件
 
+另含离线部分 TestQueryEngineStatements（无需 LLM）：典型查询形状下
+QueryEngine 每次查询发出的 SQL 语句数，对比整实体加载 + 逐行懒加载的旧实现。
+
 运行：
   OPENAI_API_KEY=sk-xxx uv run pytest tests/benchmark/test_query_pipeline_benchmark.py -v -s --no-cov
+  uv run pytest tests/benchmark/test_query_pipeline_benchmark.py -k Statements -v -s --no-cov
 """
 import importlib.util
 import logging
 import os
-from datetime import date, timedelta
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from decimal import Decimal
 from pathlib import Path
 
 import pytest
 import yaml
+from sqlalchemy import event as sa_event
 
 from app.services.benchmark_assertions import (
     evaluate_l2_action,
@@ -46,7 +53,8 @@ QUERY_ACTIONS = {
 def _load_query_benchmark_data():
     with open(QUERY_BENCHMARK_DATA_PATH, "r", encoding="utf-8") as f:
         data = yaml.safe_load(f)
-    return data["suites"]
+    # 数据文件缺少 suites 时不阻断本模块收集（离线部分不依赖它）
+    return data.get("suites") or []
 
 
 def _resolve_date(value):
@@ -94,6 +102,21 @@ def _run_init_script(script_name: str, db) -> None:
         logger.warning(f"Init script '{script_name}' has no run(db) function")
 
 
+@contextmanager
+def _count_statements(engine):
+    """统计代码块内发出的 SQL 语句数"""
+    counter = [0]
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        counter[0] += 1
+
+    sa_event.listen(engine, "before_cursor_execute", _count)
+    try:
+        yield counter
+    finally:
+        sa_event.remove(engine, "before_cursor_execute", _count)
+
+
 _suites = _load_query_benchmark_data()
 
 
@@ -232,14 +255,15 @@ class TestQueryPipelineBenchmark:
         user_input = _resolve_date(case["input"])
         assertions = _resolve_in_dict(case.get("assertions", {}))
 
-        result = ai_service.process_message(
-            message=user_input,
-            user=user,
-            conversation_history=history,
-            topic_id=None,
-            follow_up_context=None,
-            language="zh",
-        )
+        with _count_statements(ai_service.db.get_bind()) as sql_statements:
+            result = ai_service.process_message(
+                message=user_input,
+                user=user,
+                conversation_history=history,
+                topic_id=None,
+                follow_up_context=None,
+                language="zh",
+            )
 
         history.append({"role": "user", "content": user_input})
         history.append({"role": "assistant", "content": result.get("message", "")})
@@ -257,7 +281,9 @@ class TestQueryPipelineBenchmark:
             and query_result is None
         ):
             logger.info(f"  [AUTO-EXECUTE] {action_type} (requires_confirmation)")
-            exec_result = ai_service.execute_action(actions[0], user)
+            with _count_statements(ai_service.db.get_bind()) as exec_statements:
+                exec_result = ai_service.execute_action(actions[0], user)
+            sql_statements[0] += exec_statements[0]
             if exec_result:
                 if exec_result.get("message"):
                     message = exec_result["message"]
@@ -271,7 +297,7 @@ class TestQueryPipelineBenchmark:
                 })
 
         label = f"[{suite_name}/{case_name}]"
-        logger.info(f"  action_type={action_type!r}")
+        logger.info(f"  action_type={action_type!r} sql_statements={sql_statements[0]}")
         logger.info(f"  message={message[:120]}")
         if query_result:
             rows = query_result.get("rows", [])
@@ -345,3 +371,80 @@ class TestQueryPipelineBenchmark:
                 logger.warning(f"  [UNRESOLVED] {fname}")
                 return None
         return resolved
+
+
+# ----------------------------------------------------------------------
+# 离线：QueryEngine 每次查询的 SQL 语句数
+# ----------------------------------------------------------------------
+
+STATEMENT_ROOMS = int(os.getenv("QUERY_BENCH_ROOMS", "200"))
+
+
+def _seed_stays(db):
+    from app.models.ontology import Guest, Room, RoomStatus, RoomType, StayRecord
+
+    room_types = [RoomType(name=f"房型{i}", base_price=Decimal("288.00"), max_occupancy=2) for i in range(4)]
+    db.add_all(room_types)
+    db.flush()
+    for i in range(STATEMENT_ROOMS):
+        room = Room(room_number=f"{i // 50 + 1}{i % 50:02d}", floor=i // 50 + 1,
+                    room_type_id=room_types[i % 4].id, status=RoomStatus.OCCUPIED)
+        guest = Guest(name=f"客人{i}", phone=f"138{i:08d}")
+        db.add_all([room, guest])
+        db.flush()
+        db.add(StayRecord(guest_id=guest.id, room_id=room.id, check_in_time=datetime.now(),
+                          expected_check_out=date.today() + timedelta(days=1)))
+    db.commit()
+
+
+def _legacy_execute(db, engine, query):
+    """重构前的执行方式：加载整个实体，按属性路径逐行取值（关联字段逐行懒加载）"""
+    from core.ontology.query_engine import get_model_class
+
+    model_class = get_model_class(query.entity)
+    objects = db.query(model_class).limit(query.limit).offset(query.offset).all()
+    return engine._map_results(objects, query)
+
+
+@pytest.mark.slow
+class TestQueryEngineStatements:
+    """典型查询形状的 SQL 语句数（无需 LLM）"""
+
+    def test_statements_per_query(self, db_session):
+        from app.hotel.hotel_domain_adapter import HotelDomainAdapter
+        from core.ontology.query import StructuredQuery
+        from core.ontology.query_engine import QueryEngine
+        from core.ontology.registry import OntologyRegistry
+
+        registry = OntologyRegistry()
+        HotelDomainAdapter().register_ontology(registry)
+        _seed_stays(db_session)
+        engine = QueryEngine(db_session, registry)
+        bind = db_session.get_bind()
+
+        shapes = {
+            "在住客人及房号": StructuredQuery(
+                entity="StayRecord", fields=["guest.name", "room.room_number", "check_in_time"],
+                limit=500),
+            "房间及房型": StructuredQuery(
+                entity="Room", fields=["room_number", "status", "room_type.name"], limit=500),
+            # 整页结果需额外一条 COUNT(*) 求真实总数（旧实现不返回 total）
+            "客人分页": StructuredQuery(entity="Guest", fields=["name", "phone"], limit=50),
+        }
+
+        lines = []
+        for name, query in shapes.items():
+            db_session.expire_all()
+            with _count_statements(bind) as legacy:
+                expected = _legacy_execute(db_session, engine, query)
+            db_session.expire_all()
+            with _count_statements(bind) as projected:
+                result = engine.execute(query)
+
+            assert result["rows"] == expected
+            if any("." in field for field in query.fields):
+                assert projected[0] < legacy[0]
+            lines.append(f"  {name:<10} entity+lazy load {legacy[0]:5d}   projected {projected[0]:3d}"
+                         f"   (total={result['total']})")
+
+        print(f"\n[query statements] SQL statements per query ({STATEMENT_ROOMS} rooms/stays)\n" + "\n".join(lines))
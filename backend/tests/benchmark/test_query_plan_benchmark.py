@@ -0,0 +1,89 @@
+"""
+查询计划缓存 benchmark — 同形状查询的编译开销
+
+OODA 管道反复发出同样形状、不同过滤值的查询。对比每次从头编译
+（SemanticPathResolver.compile + QueryEngine 构建语句）与命中计划缓存后只绑定新值。
+数据库为内存 SQLite，4 个房型、200 间房。
+
+运行：
+  uv run pytest tests/benchmark/test_query_plan_benchmark.py -v -s --no-cov
+
+环境变量：
+  PLAN_BENCH_QUERIES   查询次数（默认 2000）
+"""
+import os
+import time
+from decimal import Decimal
+
+import pytest
+
+from app.models.ontology import Room, RoomStatus, RoomType
+from core.ontology.query_engine import QueryEngine
+from core.ontology.query_plan import clear_plan_caches, structured_plan_cache
+from core.ontology.registry import OntologyRegistry
+from core.ontology.semantic_path_resolver import SemanticPathResolver
+from core.ontology.semantic_query import SemanticFilter, SemanticQuery
+
+QUERIES = int(os.getenv("PLAN_BENCH_QUERIES", "2000"))
+
+
+def _semantic(i):
+    """"某楼层某房型的房间"，每次过滤值不同"""
+    return SemanticQuery(
+        root_object="Room",
+        fields=["room_number", "status", "room_type.name"],
+        filters=[
+            SemanticFilter(path="floor", operator="eq", value=i % 4 + 1),
+            SemanticFilter(path="room_type.name", operator="ne", value=f"房型{i}"),
+        ],
+        order_by=["room_number"],
+    )
+
+
+def _seed(db):
+    room_types = [RoomType(name=f"房型{i}", base_price=Decimal("288.00"), max_occupancy=2) for i in range(4)]
+    db.add_all(room_types)
+    db.flush()
+    for i in range(200):
+        db.add(Room(room_number=f"{i // 50 + 1}{i % 50:02d}", floor=i // 50 + 1,
+                    room_type_id=room_types[i % 4].id, status=RoomStatus.VACANT_CLEAN))
+    db.commit()
+
+
+def _run(resolver, engine, cached, execute=True):
+    start = time.perf_counter()
+    for i in range(QUERIES):
+        if not cached:
+            clear_plan_caches()
+        structured = resolver.compile(_semantic(i))
+        if execute:
+            assert engine.execute(structured)["display_type"] == "table"
+        else:
+            engine.get_plan(structured)
+    return time.perf_counter() - start
+
+
+@pytest.mark.slow
+def test_repeated_query_shape(db_session):
+    from app.hotel.hotel_domain_adapter import HotelDomainAdapter
+    registry = OntologyRegistry()
+    HotelDomainAdapter().register_ontology(registry)
+    _seed(db_session)
+    resolver = SemanticPathResolver(registry)
+    engine = QueryEngine(db_session, registry)
+
+    _run(resolver, engine, cached=True)  # 预热
+    compile_uncached_s = _run(resolver, engine, cached=False, execute=False)
+    compile_cached_s = _run(resolver, engine, cached=True, execute=False)
+    uncached_s = _run(resolver, engine, cached=False)
+    clear_plan_caches()
+    cached_s = _run(resolver, engine, cached=True)
+    stats = structured_plan_cache.get_stats()
+
+    assert stats["misses"] == 1 and stats["hits"] == QUERIES - 1
+
+    print(f"\n[query plan] {QUERIES} queries of one shape, different filter values\n"
+          f"  compile only     uncached {compile_uncached_s / QUERIES * 1e6:8.1f} us  "
+          f"cached {compile_cached_s / QUERIES * 1e6:8.1f} us  ({compile_uncached_s / compile_cached_s:.1f}x)\n"
+          f"  compile+execute  uncached {uncached_s / QUERIES * 1e6:8.1f} us  "
+          f"cached {cached_s / QUERIES * 1e6:8.1f} us  ({uncached_s / cached_s:.2f}x)")
@@ -0,0 +1,138 @@
+"""
+房价计算 benchmark — 旧版逐晚查询 vs. RateEngine 一次加载
+
+房型由 operational_db 提供，每个房型补充周末价、旺季价和节日价三条价格策略。
+旧版路径复现原 PriceService：每晚查询一次房型和适用的价格策略后累加；
+新版一次加载全部房型在报价窗口内的价格策略，逐晚价格为数组切片。
+定价规则对比逐条 calculate_room_price 与批量 calculate_room_prices。
+
+运行：
+  uv run pytest tests/benchmark/test_rate_engine_benchmark.py -v -s --no-cov
+
+环境变量：
+  RATE_BENCH_QUOTES   报价数量（默认 200）
+"""
+import logging
+import os
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.hotel.domain.rules.pricing_rules import calculate_room_price, calculate_room_prices
+from app.models.ontology import RatePlan, RoomType
+from app.services.rate_engine import RateEngine
+
+logger = logging.getLogger(__name__)
+
+QUOTES = int(os.getenv("RATE_BENCH_QUOTES", "200"))
+
+
+def _legacy_price_for_date(db, room_type_id, target_date):
+    room_type = db.query(RoomType).filter(RoomType.id == room_type_id).first()
+    is_weekend = target_date.weekday() >= 4
+    if is_weekend:
+        plan = db.query(RatePlan).filter(
+            RatePlan.room_type_id == room_type_id,
+            RatePlan.is_active == True,
+            RatePlan.is_weekend == True,
+            RatePlan.start_date <= target_date,
+            RatePlan.end_date >= target_date
+        ).order_by(RatePlan.priority.desc()).first()
+        if plan:
+            return plan.price
+    plan = db.query(RatePlan).filter(
+        RatePlan.room_type_id == room_type_id,
+        RatePlan.is_active == True,
+        RatePlan.is_weekend == False,
+        RatePlan.start_date <= target_date,
+        RatePlan.end_date >= target_date
+    ).order_by(RatePlan.priority.desc()).first()
+    return plan.price if plan else room_type.base_price
+
+
+def _legacy_quote(db, requests):
+    totals = []
+    for room_type_id, check_in, check_out, room_count in requests:
+        total = Decimal('0')
+        current = check_in
+        while current < check_out:
+            total += _legacy_price_for_date(db, room_type_id, current)
+            current += timedelta(days=1)
+        totals.append(total * room_count)
+    return totals
+
+
+def _timed(fn, *args, rounds=3):
+    result = None
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = fn(*args)
+    return (time.perf_counter() - start) * 1000 / rounds, result
+
+
+def _requests(room_type_ids):
+    start = date.today()
+    return [
+        (room_type_ids[i % len(room_type_ids)], start + timedelta(days=i % 120),
+         start + timedelta(days=i % 120 + 1 + i % 30), 1 + i % 3)
+        for i in range(QUOTES)
+    ]
+
+
+@pytest.fixture(scope="module")
+def priced_db(operational_db):
+    db, _ = operational_db
+    today = date.today()
+    for room_type in db.query(RoomType).all():
+        db.add_all([
+            RatePlan(name=f"{room_type.name}周末价", room_type_id=room_type.id, start_date=today,
+                     end_date=today + timedelta(days=150), price=room_type.base_price + 70,
+                     priority=2, is_weekend=True, is_active=True),
+            RatePlan(name=f"{room_type.name}旺季价", room_type_id=room_type.id,
+                     start_date=today + timedelta(days=30), end_date=today + timedelta(days=90),
+                     price=room_type.base_price + 40, priority=1, is_weekend=False, is_active=True),
+            RatePlan(name=f"{room_type.name}节日价", room_type_id=room_type.id,
+                     start_date=today + timedelta(days=60), end_date=today + timedelta(days=66),
+                     price=room_type.base_price * 2, priority=5, is_weekend=False, is_active=True),
+        ])
+    db.commit()
+    return db
+
+
+@pytest.mark.slow
+def test_rate_engine_vs_per_night_queries(priced_db):
+    db = priced_db
+    requests = _requests([rt_id for (rt_id,) in db.query(RoomType.id).all()])
+    nights = sum((r[2] - r[1]).days for r in requests)
+
+    legacy_ms, expected = _timed(_legacy_quote, db, requests, rounds=1)
+    engine_ms, actual = _timed(RateEngine(db).quote, requests)
+
+    assert actual == expected
+    logger.info(f"Rate quote {QUOTES} stays / {nights} nights: legacy {legacy_ms:.2f} ms, engine {engine_ms:.2f} ms")
+    print(f"\n[rate quote] stays={QUOTES} nights={nights} legacy={legacy_ms:.2f} ms  "
+          f"engine={engine_ms:.2f} ms  speedup={legacy_ms / engine_ms:.1f}x")
+    assert engine_ms < legacy_ms
+
+
+@pytest.mark.slow
+def test_pricing_rules_batch_vs_loop():
+    count = QUOTES * 50
+    start = date(2025, 1, 1)
+    tiers = ["basic", "vip", "gold", "silver"]
+    base_prices = [288 + i % 5 * 100 for i in range(count)]
+    check_ins = [start + timedelta(days=i % 365) for i in range(count)]
+    check_outs = [d + timedelta(days=1 + i % 20) for i, d in enumerate(check_ins)]
+    guest_tiers = [tiers[i % 4] for i in range(count)]
+
+    def loop():
+        return [calculate_room_price(*args)[0] for args in zip(base_prices, check_ins, check_outs, guest_tiers)]
+
+    loop_ms, expected = _timed(loop)
+    batch_ms, actual = _timed(calculate_room_prices, base_prices, check_ins, check_outs, guest_tiers)
+
+    assert actual == expected
+    print(f"\n[pricing rules] quotes={count} loop={loop_ms:.2f} ms  batch={batch_ms:.2f} ms  "
+          f"speedup={loop_ms / batch_ms:.1f}x")
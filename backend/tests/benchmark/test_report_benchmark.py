@@ -0,0 +1,148 @@
+"""
+报表查询 benchmark — 旧版逐日/逐房型查询 vs. 日期序列分组聚合
+
+数据由 generate_operational_data.py 的生成函数产生（operational_db fixture，最近半年）。
+旧版路径复现原 ReportService：入住率每天两次 count，营收每天加载全部 Payment，
+房型统计每个房型一次 join 并在 Python 中累加；新版每个报表一次查询。
+仪表盘对比每次扫描明细表与读取事件维护的 daily_kpi 当天行。
+
+运行：
+  uv run pytest tests/benchmark/test_report_benchmark.py -v -s --no-cov
+
+环境变量：
+  REPORT_BENCH_DAYS   报表区间天数（默认 180）
+"""
+import logging
+import os
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func
+from sqlalchemy.orm import sessionmaker
+
+from app.models.ontology import Payment, Room, RoomStatus, RoomType, StayRecord, StayRecordStatus
+from app.services.kpi_rollup_service import DailyKPIRollup, KPIRollupService
+from app.services.report_service import ReportService
+
+logger = logging.getLogger(__name__)
+
+DAYS = int(os.getenv("REPORT_BENCH_DAYS", "180"))
+
+
+def _legacy_occupancy(db, start_date, end_date):
+    result = []
+    current = start_date
+    total_rooms = db.query(Room).filter(
+        Room.is_active == True, Room.status != RoomStatus.OUT_OF_ORDER
+    ).count()
+    while current <= end_date:
+        occupied = db.query(StayRecord).filter(
+            StayRecord.status == StayRecordStatus.ACTIVE,
+            func.date(StayRecord.check_in_time) <= current,
+            StayRecord.expected_check_out > current
+        ).count()
+        checked_out = db.query(StayRecord).filter(
+            StayRecord.status == StayRecordStatus.CHECKED_OUT,
+            func.date(StayRecord.check_in_time) <= current,
+            func.date(StayRecord.check_out_time) == current
+        ).count()
+        total_occupied = occupied + checked_out
+        rate = (total_occupied / total_rooms * 100) if total_rooms > 0 else 0
+        result.append({'date': current, 'total_rooms': total_rooms,
+                       'occupied_rooms': total_occupied, 'occupancy_rate': round(rate, 1)})
+        current += timedelta(days=1)
+    return result
+
+
+def _legacy_revenue(db, start_date, end_date):
+    result = []
+    current = start_date
+    while current <= end_date:
+        day_start = datetime.combine(current, datetime.min.time())
+        payments = db.query(Payment).filter(
+            Payment.payment_time >= day_start,
+            Payment.payment_time < day_start + timedelta(days=1)
+        ).all()
+        result.append({'date': current, 'revenue': sum(p.amount for p in payments),
+                       'payment_count': len(payments)})
+        current += timedelta(days=1)
+    return result
+
+
+def _legacy_room_types(db, start_date, end_date):
+    result = []
+    for rt in db.query(RoomType).all():
+        stays = db.query(StayRecord).join(Room).filter(
+            Room.room_type_id == rt.id,
+            StayRecord.check_in_time >= datetime.combine(start_date, datetime.min.time()),
+            StayRecord.check_in_time < datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+        ).all()
+        room_nights, revenue = 0, Decimal('0')
+        for stay in stays:
+            check_out = stay.check_out_time.date() if stay.check_out_time else stay.expected_check_out
+            room_nights += (check_out - stay.check_in_time.date()).days
+            if stay.bill:
+                revenue += stay.bill.paid_amount
+        result.append({'room_type_id': rt.id, 'room_type_name': rt.name,
+                       'room_nights': room_nights, 'revenue': revenue})
+    return result
+
+
+def _timed(fn, *args, rounds=3):
+    fn(*args)  # 预热
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = fn(*args)
+    return (time.perf_counter() - start) * 1000 / rounds, result
+
+
+@pytest.mark.slow
+def test_set_based_reports_vs_legacy(operational_db):
+    db, (reservation_count, stay_count) = operational_db
+    db.expire_all()
+    end_date = date.today()
+    start_date = end_date - timedelta(days=DAYS - 1)
+    service = ReportService(db)
+
+    lines = []
+    for name, legacy, current in (
+        ("occupancy", _legacy_occupancy, service.get_occupancy_report),
+        ("revenue", _legacy_revenue, service.get_revenue_report),
+        ("room_types", _legacy_room_types, service.get_room_type_report),
+    ):
+        legacy_ms, expected = _timed(legacy, db, start_date, end_date)
+        current_ms, actual = _timed(current, start_date, end_date)
+
+        assert actual == expected
+        lines.append(
+            f"  {name:<11} legacy={legacy_ms:9.2f} ms  set-based={current_ms:8.2f} ms  "
+            f"speedup={legacy_ms / current_ms:6.1f}x"
+        )
+        logger.info(f"Report {name} over {DAYS} days: legacy {legacy_ms:.2f} ms, set-based {current_ms:.2f} ms")
+        assert current_ms < legacy_ms
+
+    print(f"\n[reports] days={DAYS} reservations={reservation_count} stays={stay_count}\n" + "\n".join(lines))
+
+
+@pytest.mark.slow
+def test_dashboard_rollup_vs_scan(operational_db, monkeypatch):
+    import app.services.kpi_rollup_service as kpi_module
+
+    db, _ = operational_db
+    db.expire_all()
+    rollup = DailyKPIRollup(sessionmaker(bind=db.get_bind()))
+    rollup.register()
+    monkeypatch.setattr(kpi_module, "_kpi_rollup", rollup)
+    try:
+        scan_ms, expected = _timed(ReportService(db).get_dashboard_stats, rounds=20)
+        rollup_ms, actual = _timed(KPIRollupService(db).get_dashboard_stats, rounds=20)
+    finally:
+        rollup.unregister()
+
+    assert actual == expected
+    logger.info(f"Dashboard: scan {scan_ms:.2f} ms, daily_kpi row {rollup_ms:.2f} ms")
+    print(f"\n[dashboard] scan={scan_ms:.2f} ms  daily_kpi={rollup_ms:.2f} ms  "
+          f"speedup={scan_ms / rollup_ms:.1f}x")
+    assert rollup_ms < scan_ms
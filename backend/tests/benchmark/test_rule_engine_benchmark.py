@@ -0,0 +1,85 @@
+"""
+规则引擎 benchmark — 预排序 (实体, 事件) 分派 vs 每次过滤重排
+
+原实现每次 evaluate 都按实体取出规则、过滤 enabled 再按优先级排序，
+且对每条规则都求值条件。现在按 (实体, 动作) 预排序，仅在注册变化时重建；
+声明了 events 的规则不再进入无关动作的候选列表。决策表模式下共享同一条件的
+规则每次 evaluate 只求值一次。
+
+运行：
+  uv run pytest tests/benchmark/test_rule_engine_benchmark.py -v -s --no-cov
+
+环境变量：
+  RULE_BENCH_RULES     每个实体的规则数（默认 60）
+  RULE_BENCH_EVALS     evaluate 调用次数（默认 20000）
+"""
+import os
+import time
+
+import pytest
+
+from core.engine.rule_engine import FunctionCondition, Rule, RuleContext, RuleEngine
+
+RULES = int(os.getenv("RULE_BENCH_RULES", "60"))
+EVALS = int(os.getenv("RULE_BENCH_EVALS", "20000"))
+ACTIONS = ["checkin", "checkout", "change_room", "extend_stay", "complete_task"]
+
+
+class _LegacyRuleEngine(RuleEngine):
+    """原实现：每次按实体过滤、重排，不区分动作"""
+
+    def evaluate(self, context):
+        triggered = []
+        for rule in self.get_rules_for_entity(context.entity_type):
+            if rule.condition.evaluate(context):
+                rule.action(context)
+                triggered.append(rule)
+        return triggered
+
+
+def _register(engine):
+    # 同一实体下的规则共用少量条件（如"是否退房"），动作各不相同
+    shared = {action: FunctionCondition(lambda ctx, a=action: ctx.action == a) for action in ACTIONS}
+    for entity in ("room", "guest", "pricing", "task"):
+        for i in range(RULES):
+            action = ACTIONS[i % len(ACTIONS)]
+            engine.register_rule(Rule(
+                rule_id=f"{entity}_{i}", name=f"{entity} {i}", description="",
+                condition=shared[action], action=lambda ctx: None,
+                priority=i % 7, entity_type=entity, events=[action],
+            ))
+
+
+def _run(engine):
+    start = time.perf_counter()
+    triggered = 0
+    for i in range(EVALS):
+        triggered += len(engine.evaluate(RuleContext(None, "room", ACTIONS[i % len(ACTIONS)], {})))
+    return time.perf_counter() - start, triggered
+
+
+@pytest.mark.slow
+def test_evaluate_dispatch():
+    engines = {
+        "filter + sort each call": _LegacyRuleEngine(),
+        "indexed dispatch": RuleEngine(),
+        "indexed + decision table": RuleEngine(decision_table=True),
+    }
+    results = {}
+    for label, engine in engines.items():
+        _register(engine)
+        _run(engine)  # 预热
+        results[label] = _run(engine)
+
+    baseline_s, expected = results["filter + sort each call"]
+    assert all(triggered == expected for _, triggered in results.values())
+    assert results["indexed dispatch"][0] < baseline_s
+
+    stats = engines["indexed + decision table"].get_rule_stats("room_0")
+    assert stats["memoized"] > 0
+
+    lines = "\n".join(
+        f"  {label:<26} {elapsed / EVALS * 1e6:8.2f} us/evaluate  ({baseline_s / elapsed:.1f}x)"
+        for label, (elapsed, _) in results.items()
+    )
+    print(f"\n[rule engine] 4 entities x {RULES} rules, {EVALS} evaluations\n{lines}")
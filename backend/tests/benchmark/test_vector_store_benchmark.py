@@ -0,0 +1,177 @@
+"""
+VectorStore search benchmark — legacy per-row loop vs. NumPy matrix vs. sqlite-vec
+
+The legacy path reproduces the original ``VectorStore.search``: scan every
+candidate row from SQLite and call pure-Python ``cosine_similarity`` on it.
+The matrix path is the in-memory brute-force backend; the sqlite-vec path runs
+KNN inside SQLite and is compared against it for recall and latency.
+
+运行：
+  uv run pytest tests/benchmark/test_vector_store_benchmark.py -v -s --no-cov
+
+环境变量：
+  VECTOR_BENCH_SIZES   逗号分隔的规模（默认 1000,10000,100000）
+  VECTOR_BENCH_DIM     向量维度（默认 1536）
+"""
+import json
+import logging
+import os
+import time
+
+import numpy as np
+import pytest
+
+from core.ai.embedding import EmbeddingService
+from core.ai.vector_store import SchemaItem, VectorStore, cosine_similarity, load_sqlite_vec
+
+logger = logging.getLogger(__name__)
+
+SIZES = [int(s) for s in os.getenv("VECTOR_BENCH_SIZES", "1000,10000,100000").split(",") if s]
+DIM = int(os.getenv("VECTOR_BENCH_DIM", "1536"))
+TYPES = ["entity", "property", "action", "relationship"]
+TOP_K = 5
+
+
+class _ArrayEmbeddingService(EmbeddingService):
+    """Serves pre-generated vectors keyed by searchable text"""
+
+    def __init__(self, vectors: dict):
+        super().__init__(enabled=False)
+        self._vectors = vectors
+
+    def embed(self, text):
+        return self._vectors[text]
+
+    def batch_embed(self, texts):
+        return [self._vectors[text] for text in texts]
+
+
+def _legacy_search(store: VectorStore, query_vector, item_type=None, top_k=TOP_K):
+    """The pre-matrix search loop (one Python cosine per row)."""
+    where, params = "", []
+    if item_type:
+        where, params = " WHERE type = ?", [item_type]
+    rows = store.conn.execute(
+        f"SELECT id, type, entity, name, description, synonyms, metadata, embedding "
+        f"FROM schema_items{where}",
+        params,
+    ).fetchall()
+
+    scored = []
+    query = list(query_vector)
+    for row in rows:
+        embedding = VectorStore._bytes_to_float_array(row["embedding"])
+        item = SchemaItem(
+            id=row["id"], type=row["type"], entity=row["entity"], name=row["name"],
+            description=row["description"],
+            synonyms=json.loads(row["synonyms"]) if row["synonyms"] else [],
+            metadata=json.loads(row["metadata"]) if row["metadata"] else {},
+        )
+        scored.append((cosine_similarity(query, embedding), item))
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return [item for _, item in scored[:top_k]]
+
+
+def _sqlite_vec_available() -> bool:
+    import sqlite3
+
+    conn = sqlite3.connect(":memory:")
+    try:
+        return load_sqlite_vec(conn)
+    finally:
+        conn.close()
+
+
+def _build_store(size: int, rng, search_backend: str = "matrix"):
+    vectors = rng.standard_normal((size, DIM)).astype(np.float32)
+    items = [
+        SchemaItem(
+            id=f"Entity{i % 50}.field{i}",
+            type=TYPES[i % len(TYPES)],
+            entity=f"Entity{i % 50}",
+            name=f"field{i}",
+            description=f"field {i}",
+        )
+        for i in range(size)
+    ]
+    lookup = {item.to_searchable_text(): vectors[i] for i, item in enumerate(items)}
+
+    queries = rng.standard_normal((3, DIM)).astype(np.float32)
+    for i, q in enumerate(queries):
+        lookup[f"query {i}"] = q
+
+    store = VectorStore(
+        ":memory:",
+        embedding_service=_ArrayEmbeddingService(lookup),
+        embedding_dim=DIM,
+        search_backend=search_backend,
+    )
+    store.index_items(items)
+    return store, queries
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("size", SIZES)
+def test_matrix_search_vs_legacy_loop(size):
+    rng = np.random.default_rng(42)
+    store, queries = _build_store(size, rng)
+
+    try:
+        # Legacy: one query is enough to show the O(n * dim) Python cost
+        start = time.perf_counter()
+        legacy = _legacy_search(store, queries[0], item_type="property")
+        legacy_ms = (time.perf_counter() - start) * 1000
+
+        rounds = 20
+        start = time.perf_counter()
+        for i in range(rounds):
+            matrix = store.search(f"query {i % len(queries)}", top_k=TOP_K, item_type="property")
+        matrix_ms = (time.perf_counter() - start) * 1000 / rounds
+
+        matrix = store.search("query 0", top_k=TOP_K, item_type="property")
+        assert [item.id for item in matrix] == [item.id for item in legacy]
+
+        logger.info(
+            f"VectorStore search n={size} dim={DIM}: legacy {legacy_ms:.1f} ms, "
+            f"matrix {matrix_ms:.2f} ms, speedup {legacy_ms / matrix_ms:.0f}x"
+        )
+        print(
+            f"\n[vector_store] n={size:>7} dim={DIM} legacy={legacy_ms:10.1f} ms "
+            f"matrix={matrix_ms:8.2f} ms speedup={legacy_ms / matrix_ms:8.0f}x"
+        )
+        assert matrix_ms < legacy_ms
+    finally:
+        store.close()
+
+
+@pytest.mark.slow
+@pytest.mark.skipif(not _sqlite_vec_available(), reason="sqlite-vec extension cannot be loaded")
+@pytest.mark.parametrize("size", SIZES)
+def test_sqlite_vec_recall_and_latency(size):
+    matrix_store, queries = _build_store(size, np.random.default_rng(42), "matrix")
+    vec_store, _ = _build_store(size, np.random.default_rng(42), "sqlite_vec")
+
+    try:
+        timings = {}
+        hits = total = 0
+        for name, store in (("matrix", matrix_store), ("sqlite_vec", vec_store)):
+            start = time.perf_counter()
+            for i in range(len(queries)):
+                store.search(f"query {i}", top_k=TOP_K * 2, item_type="property")
+            timings[name] = (time.perf_counter() - start) * 1000 / len(queries)
+
+        for i in range(len(queries)):
+            expected = {item.id for item in matrix_store.search(f"query {i}", top_k=TOP_K * 2, item_type="property")}
+            actual = {item.id for item in vec_store.search(f"query {i}", top_k=TOP_K * 2, item_type="property")}
+            hits += len(expected & actual)
+            total += len(expected)
+        recall = hits / total
+
+        print(
+            f"\n[vector_store] n={size:>7} dim={DIM} matrix={timings['matrix']:8.2f} ms "
+            f"sqlite_vec={timings['sqlite_vec']:8.2f} ms recall@{TOP_K * 2}={recall:.3f}"
+        )
+        assert recall >= 0.99
+    finally:
+        matrix_store.close()
+        vec_store.close()
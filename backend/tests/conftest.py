@@ -10,12 +10,64 @@ from fastapi.testclient import TestClient
 from decimal import Decimal
 
 from app.database import Base, get_db
-from app.models import ontology, snapshots
+from app.models import ontology, snapshots, kpi, outbox
 from app.models.ontology import Employee, EmployeeRole, RoomType, Room, RoomStatus, Guest
 from app.security.auth import get_password_hash, create_access_token
 from app.main import app
 
 
+@pytest.fixture(autouse=True)
+def _reset_llm_response_cache():
+    """LLM 响应缓存是进程级单例，每个测试重新创建，避免跨测试命中"""
+    from app.services.llm_service import reset_response_cache
+    reset_response_cache()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def _reset_availability_index():
+    """房态可售库存索引是进程级单例（应用启动时注册到事件总线），每个测试重置"""
+    from app.services.availability_index import reset_availability_index
+    reset_availability_index()
+    yield
+    reset_availability_index()
+
+
+@pytest.fixture(autouse=True)
+def _reset_principal_cache():
+    """认证主体缓存是进程级单例，每个测试使用新的数据库，员工 ID 会重复"""
+    from app.security.principal_cache import reset_principal_cache
+    reset_principal_cache()
+    yield
+    reset_principal_cache()
+
+
+@pytest.fixture(autouse=True)
+def _reset_query_plan_caches():
+    """查询计划缓存是进程级的，测试可能替换模型或注册表内容，每个测试清空"""
+    from core.ontology.query_plan import clear_plan_caches
+    clear_plan_caches()
+    yield
+    clear_plan_caches()
+
+
+@pytest.fixture(autouse=True)
+def _disable_scheduler(monkeypatch):
+    """应用启动时不启动 APScheduler 后台调度（测试自行注册调度后端）"""
+    from app.config import settings
+    monkeypatch.setattr(settings, "SCHEDULER_ENABLED", False)
+    yield
+
+
+@pytest.fixture(autouse=True)
+def _reset_kpi_rollup():
+    """日经营指标汇总处理器是进程级单例（应用启动时注册到事件总线），每个测试重置"""
+    from app.services.kpi_rollup_service import reset_kpi_rollup
+    reset_kpi_rollup()
+    yield
+    reset_kpi_rollup()
+
+
 @pytest.fixture(scope="function")
 def db_engine():
     """创建内存数据库引擎"""
@@ -0,0 +1,162 @@
+"""
+测试 ConstraintEngine 批量验证：状态预取、唯一性 IN 查询、逐条结果
+"""
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+
+from app.models.ontology import Guest, Room, RoomStatus, RoomType
+from core.ontology.metadata import (
+    ConstraintMetadata, ConstraintSeverity, ConstraintType, EntityMetadata, PropertyMetadata,
+)
+from core.ontology.registry import OntologyRegistry
+from core.reasoning.constraint_engine import (
+    BatchValidationItem, ConstraintEngine, FieldUniquenessValidator, PhoneFormatValidator,
+)
+
+
+@pytest.fixture
+def registry():
+    reg = OntologyRegistry()
+    reg.clear()
+    reg.register_model("Room", Room)
+    reg.register_model("Guest", Guest)
+    reg.register_constraint(ConstraintMetadata(
+        id="room_vacant_for_checkin", name="Room must be vacant clean", description="",
+        constraint_type=ConstraintType.STATE, severity=ConstraintSeverity.ERROR,
+        entity="Room", action="checkin", condition_text="", condition_code="state.status == 'vacant_clean'",
+        error_message="Room is not vacant clean",
+    ))
+    guest = EntityMetadata(name="Guest", description="客人", table_name="guests")
+    guest.add_property(PropertyMetadata(
+        name="phone", type="string", python_type="str", format_regex=r'^1[3-9]\d{9}$',
+        update_validation_rules=[PhoneFormatValidator(), FieldUniquenessValidator("Guest", "phone")],
+    ))
+    reg.register_entity(guest)
+    yield reg
+    reg.clear()
+
+
+@pytest.fixture
+def selects(db_engine):
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(db_engine, "before_cursor_execute", _record)
+    yield statements
+    event.remove(db_engine, "before_cursor_execute", _record)
+
+
+@pytest.fixture
+def rooms(db_session):
+    room_type = RoomType(name="标准间", base_price=Decimal("288.00"), max_occupancy=2)
+    db_session.add(room_type)
+    db_session.flush()
+    rooms = [
+        Room(room_number=str(100 + i), floor=1, room_type_id=room_type.id,
+             status=RoomStatus.OCCUPIED if i % 3 == 0 else RoomStatus.VACANT_CLEAN)
+        for i in range(12)
+    ]
+    db_session.add_all(rooms)
+    db_session.commit()
+    return rooms
+
+
+class TestValidateBatch:
+
+    def test_prefetches_state_in_one_query(self, registry, db_session, rooms, selects):
+        engine = ConstraintEngine(registry)
+        items = [("Room", "checkin", {}, None, room.id) for room in rooms]
+        expected = [room.status == RoomStatus.VACANT_CLEAN for room in rooms]
+        selects.clear()  # 忽略 commit 后刷新属性的查询
+
+        results = engine.validate_batch(items, {"role": "receptionist"}, db=db_session)
+
+        assert [r.is_valid for r in results] == expected
+        assert len(selects) == 1
+        assert results[0].violated_constraints[0]["message"] == "Room is not vacant clean"
+
+    def test_matches_validate_action(self, registry):
+        engine = ConstraintEngine(registry)
+        states = [{"status": "vacant_clean"}, {"status": "occupied"}, {}]
+
+        batch = engine.validate_batch(
+            [BatchValidationItem("Room", "checkin", current_state=state) for state in states]
+            + [BatchValidationItem("Room", "checkout", current_state={"status": "occupied"})],
+            user_context={},
+        )
+        single = [engine.validate_action("Room", "checkin", {}, state, {}) for state in states]
+
+        assert [r.violated_constraints for r in batch[:3]] == [r.violated_constraints for r in single]
+        assert batch[3].is_valid
+
+    def test_no_constraints_no_query(self, registry, db_session, rooms, selects):
+        engine = ConstraintEngine(registry)
+        items = [("Room", "clean", {}, None, rooms[0].id)]
+        selects.clear()
+
+        results = engine.validate_batch(items, db=db_session)
+
+        assert results[0].is_valid
+        assert selects == []
+
+
+class TestPropertyUpdateBatch:
+
+    @pytest.fixture
+    def guests(self, db_session):
+        guests = [Guest(name="张三", phone="13800000001"), Guest(name="李四", phone="13800000002")]
+        db_session.add_all(guests)
+        db_session.commit()
+        return guests
+
+    def test_uniqueness_single_in_query(self, registry, db_session, guests, selects):
+        engine = ConstraintEngine(registry)
+        zhang, li = guests
+        updates = [
+            (zhang.id, zhang.phone, "13800000002"),   # 已被李四使用
+            (li.id, li.phone, "13800000002"),         # 未变更
+            (None, None, "13900000009"),
+            (None, None, "13900000009"),              # 批次内重复
+            (None, None, "12345"),                    # 格式错误
+            (zhang.id, zhang.phone, "13800000001"),   # 自身原值
+        ]
+        selects.clear()
+
+        decisions = engine.validate_property_update_batch("Guest", "phone", updates, {"role": "manager"}, db_session)
+
+        assert [d.allowed for d in decisions] == [False, True, True, False, False, True]
+        assert decisions[0].violations[0].message == "「13800000002」已被「李四」使用"
+        assert decisions[3].violations[0].message == "「13900000009」在本批次中重复"
+        assert [v.type for v in decisions[4].violations] == ["FormatValidation", "CustomValidation"]
+        assert sum("guests" in s for s in selects) == 1
+
+    def test_single_update_delegates(self, registry, db_session, guests):
+        engine = ConstraintEngine(registry)
+
+        decision = engine.validate_property_update(
+            "Guest", "phone", guests[0].phone, guests[1].phone, {"role": "manager"}, db_session, guests[0].id
+        )
+
+        assert not decision.allowed
+        assert decision.correction_prompt
+
+    def test_rule_error_reported_per_item(self, registry):
+        def broken(old_value, new_value, entity_id, db):
+            if new_value.endswith("9"):
+                raise RuntimeError("boom")
+            return True, ""
+
+        registry.get_entity("Guest").get_property("phone").update_validation_rules = [broken]
+        engine = ConstraintEngine(registry)
+
+        decisions = engine.validate_property_update_batch(
+            "Guest", "phone", [(1, None, "13900000009"), (2, None, "13900000001")], {}
+        )
+
+        assert decisions[0].violations[0].type == "ValidationError"
+        assert decisions[1].allowed
@@ -358,3 +358,108 @@ class TestDAGExecutorSnapshot:
 
         assert result.success  # Step still executed
         dispatcher.assert_called_once()
+
+
+class TestDAGExecutorParallel:
+    """Test parallel execution of independent steps on a bounded pool."""
+
+    @staticmethod
+    def _sleepy_dispatcher(delay=0.05, fail=(), record=None):
+        import threading
+        import time
+        active = [0]
+        lock = threading.Lock()
+
+        def dispatcher(action, params, ctx):
+            with lock:
+                active[0] += 1
+                if record is not None:
+                    record.append((action, active[0]))
+            time.sleep(delay)
+            with lock:
+                active[0] -= 1
+            if action in fail:
+                return {"success": False, "message": f"{action} failed"}
+            return {"success": True}
+
+        return dispatcher
+
+    def _fan_out_plan(self, rooms=4):
+        steps = [_make_step(f"clean_{i}", f"create_task_{i}") for i in range(rooms)]
+        steps.append(_make_step("notify", "notify", deps=[s.step_id for s in steps]))
+        return _make_plan(steps)
+
+    def test_independent_steps_run_concurrently(self):
+        record = []
+        executor = DAGExecutor(action_dispatcher=self._sleepy_dispatcher(record=record),
+                               parallel=True, max_workers=4)
+
+        result = executor.execute(self._fan_out_plan(4), {})
+
+        assert result.success and result.mode == "parallel"
+        assert max(active for _, active in record) == 4
+        assert [a for a, _ in record][-1] == "notify"
+        assert result.critical_path_ms < result.serial_ms / 2
+        assert result.wall_ms < result.serial_ms
+        assert result.to_dict()["timing"]["critical_path_ms"] == result.critical_path_ms
+
+    def test_pool_is_bounded(self):
+        record = []
+        executor = DAGExecutor(action_dispatcher=self._sleepy_dispatcher(delay=0.02, record=record),
+                               parallel=True, max_workers=2)
+
+        assert executor.execute(self._fan_out_plan(6), {}).success
+        assert max(active for _, active in record) == 2
+
+    def test_failure_rolls_back_completed_steps(self):
+        snapshots = Mock()
+        snapshots.create_snapshot.side_effect = lambda **kw: Mock(snapshot_id=f"snap-{kw['entity_id']}")
+        snapshots.undo.return_value = True
+        executor = DAGExecutor(action_dispatcher=self._sleepy_dispatcher(delay=0.01, fail={"create_task_1"}),
+                               snapshot_engine=snapshots, parallel=True, max_workers=4)
+        plan = self._fan_out_plan(3)
+
+        result = executor.execute(plan, {})
+
+        assert not result.success
+        assert result.failed_step == "clean_1"
+        assert result.rollback_status == "success"
+        undone = {c.args[0] for c in snapshots.undo.call_args_list}
+        assert undone == {"snap-clean_0", "snap-clean_2"}
+        assert plan.steps[-1].status == StepStatus.SKIPPED
+        assert plan.status == "failed"
+
+    def test_per_step_sessions(self):
+        sessions = []
+
+        def session_factory():
+            session = Mock()
+            sessions.append(session)
+            return session
+
+        seen = []
+
+        def dispatcher(action, params, ctx):
+            seen.append(ctx["db"])
+            return {"success": action != "fail"}
+
+        executor = DAGExecutor(action_dispatcher=dispatcher, parallel=True, session_factory=session_factory)
+        plan = _make_plan([_make_step("s1", "ok"), _make_step("s2", "fail")])
+
+        result = executor.execute(plan, {"db": "shared", "user": "u"})
+
+        assert not result.success
+        assert set(seen) == set(sessions) and len(sessions) == 2
+        ok, failed = sorted(sessions, key=lambda s: s.commit.called, reverse=True)
+        ok.commit.assert_called_once()
+        failed.rollback.assert_called_once()
+        assert all(s.close.called for s in sessions)
+
+    def test_shared_db_without_factory_runs_serially(self):
+        dispatcher = Mock(return_value={"success": True})
+        executor = DAGExecutor(action_dispatcher=dispatcher, parallel=True)
+
+        result = executor.execute(self._fan_out_plan(2), {"db": "shared"})
+
+        assert result.success and result.mode == "serial"
+        assert result.critical_path_ms <= result.serial_ms
@@ -878,3 +878,136 @@ class TestEdgeCases:
 
         assert len(session_ids) == 10
         assert len(set(session_ids)) == 10  # All unique
+
+
+# ==================== Test Buffered Write Path ====================
+
+class TestBufferedWrites:
+    """Test the queued writer, flushing, read-your-writes and backpressure."""
+
+    def _pause_writer(self, logger):
+        """Block the writer thread so later writes stay queued until gate is set."""
+        import threading
+        gate = threading.Event()
+        logger._submit(None, lambda conn: gate.wait(10))
+        return gate
+
+    def test_writes_batched_into_transactions(self, logger):
+        """Test that queued writes are committed in batches."""
+        gate = self._pause_writer(logger)
+        session_ids = [logger.create_session(f"Message {i}") for i in range(50)]
+        for session_id in session_ids:
+            logger.complete_session(session_id, status="success")
+        gate.set()
+
+        assert logger.flush(timeout=10)
+        stats = logger.get_write_stats()
+        assert stats["written"] == 101
+        assert stats["batches"] < 101
+        assert stats["pending"] == 0
+        assert all(s.status == "success" for s in logger.list_sessions(limit=100))
+
+    def test_read_your_writes(self, logger):
+        """Test that reads see writes still queued at call time."""
+        gate = self._pause_writer(logger)
+        session_id = logger.create_session("Test")
+        assert logger.update_session_llm(session_id, "p", "r", 10, "m") is True
+        first = logger.log_attempt(session_id, "a", {}, False)
+        second = logger.log_attempt(session_id, "a", {}, True)
+        assert logger.get_write_stats()["pending"] > 0
+        gate.set()
+
+        assert logger.get_session(session_id).llm_response == "r"
+        assert [a.attempt_number for a in logger.get_attempts(session_id)] == [0, 1]
+        assert logger.get_attempt(second).success is True
+        assert logger.get_attempt(first).success is False
+
+    def test_raw_connection_sees_queued_writes(self, logger):
+        """Test that _get_conn flushes before handing out a connection."""
+        session_id = logger.create_session("Test")
+        conn = logger._get_conn()
+        row = conn.execute("SELECT id FROM debug_sessions WHERE id = ?", (session_id,)).fetchone()
+        conn.close()
+        assert row is not None
+
+    def test_unknown_session_updates_are_synchronous(self, logger, temp_db):
+        """Test that sessions created elsewhere keep found/not-found results."""
+        other = DebugLogger(temp_db)
+        session_id = other.create_session("Other process")
+        other.flush()
+
+        assert logger.update_metadata(session_id, {"k": 1}) is True
+        assert logger.update_metadata("missing", {"k": 1}) is False
+        assert logger.log_attempt("missing", "a", {}, True) is None
+        assert logger.log_attempt(session_id, "a", {}, True) is not None
+
+    def test_drop_when_queue_full(self, temp_db):
+        """Test that writes are dropped when the queue is full."""
+        logger = DebugLogger(temp_db, queue_size=3)
+        gate = self._pause_writer(logger)
+        import time
+        while logger.get_write_stats()["queue_depth"]:  # writer holds the gate write
+            time.sleep(0.01)
+        session_ids = [logger.create_session(f"Message {i}") for i in range(5)]
+        gate.set()
+
+        stats = logger.get_write_stats()
+        assert stats["dropped"] == 2
+        assert len(logger.list_sessions()) == 3
+        # Updates to dropped sessions are skipped without touching the database
+        assert logger.update_metadata(session_ids[-1], {"k": 1}) is False
+        assert logger.log_attempt(session_ids[-1], "a", {}, True) is None
+
+    def test_sample_sessions_above_watermark(self, temp_db):
+        """Test that sampling keeps every Nth new session complete."""
+        logger = DebugLogger(temp_db, queue_size=100, overflow_policy="sample",
+                             high_watermark=0.1, sample_every=5)
+        gate = self._pause_writer(logger)
+        import time
+        while logger.get_write_stats()["queue_depth"]:
+            time.sleep(0.01)
+        session_ids = []
+        for i in range(30):
+            session_id = logger.create_session(f"Message {i}")
+            logger.complete_session(session_id, status="success")
+            session_ids.append(session_id)
+        gate.set()
+
+        sessions = logger.list_sessions(limit=100)
+        assert 5 < len(sessions) < 30
+        assert all(s.status == "success" for s in sessions)
+        assert logger.get_write_stats()["sampled_out"] == 30 - len(sessions)
+
+    def test_invalid_overflow_policy(self, temp_db):
+        """Test that unknown overflow policies are rejected."""
+        with pytest.raises(ValueError):
+            DebugLogger(temp_db, overflow_policy="block")
+
+    def test_close_flushes_and_switches_to_sync(self, temp_db):
+        """Test that close commits queued writes and later writes still land."""
+        logger = DebugLogger(temp_db)
+        session_id = logger.create_session("Test")
+        logger.close(timeout=10)
+
+        assert logger.async_writes is False
+        assert logger.complete_session(session_id, status="success") is True
+        assert DebugLogger(temp_db).get_session(session_id).status == "success"
+
+    def test_failed_write_does_not_lose_batch(self, logger):
+        """Test that a failing write is retried alone and the rest commit."""
+        gate = self._pause_writer(logger)
+        session_id = logger.create_session("Test")
+        logger._submit(None, lambda conn: conn.execute("INSERT INTO missing_table VALUES (1)"))
+        logger.complete_session(session_id, status="success")
+        gate.set()
+
+        assert logger.get_session(session_id).status == "success"
+        assert logger.get_write_stats()["errors"] == 1
+
+    def test_sync_mode(self, temp_db):
+        """Test that async_writes=False commits on the calling thread."""
+        logger = DebugLogger(temp_db, async_writes=False)
+        session_id = logger.create_session("Test")
+
+        assert logger._writer is None
+        assert DebugLogger(temp_db).get_session(session_id) is not None
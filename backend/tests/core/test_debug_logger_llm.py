@@ -131,6 +131,26 @@ class TestLogLLMInteraction:
         assert interactions[0].success is False
         assert interactions[0].error == "Connection timeout"
 
+    def test_cache_status_and_statistics(self, debug_logger, session_id):
+        common = dict(
+            session_id=session_id, ooda_phase="orient", call_type="topic_relevance",
+            started_at="2025-01-01T00:00:00", ended_at="2025-01-01T00:00:01",
+        )
+        debug_logger.log_llm_interaction(
+            sequence_number=0, latency_ms=800, tokens_total=120, cache_status="miss", **common
+        )
+        debug_logger.log_llm_interaction(
+            sequence_number=1, latency_ms=1, tokens_total=120,
+            cache_status="exact", saved_latency_ms=800, **common
+        )
+
+        interactions = debug_logger.get_llm_interactions(session_id)
+        assert [i.cache_status for i in interactions] == ["miss", "exact"]
+        assert interactions[1].to_dict()["saved_latency_ms"] == 800
+
+        stats = debug_logger.get_statistics()["llm_cache"]
+        assert stats == {"hits": 1, "misses": 1, "saved_latency_ms": 800, "saved_tokens": 120}
+
 
 class TestCascadeDelete:
     def test_delete_session_deletes_interactions(self, debug_logger, session_id):
@@ -192,5 +192,123 @@ class TestCreateEmbeddingService:
             create_embedding_service(provider="unknown")
 
 
+class TestBatchEmbedPipeline:
+    """Deduplicating, chunked, concurrent batch embedding"""
+
+    def _service(self, create, **kwargs):
+        service = EmbeddingService(enabled=False, retry_backoff=0.0, **kwargs)
+        service.enabled = True
+        service._client = MagicMock()
+        service._client.embeddings.create.side_effect = create
+        return service
+
+    @staticmethod
+    def _response(texts):
+        texts = [texts] if isinstance(texts, str) else texts
+        response = MagicMock()
+        response.data = [MagicMock(embedding=[float(len(t)), 1.0]) for t in texts]
+        return response
+
+    def test_deduplicates_and_chunks(self):
+        requests = []
+
+        def create(model, input):
+            requests.append(list(input))
+            return self._response(input)
+
+        service = self._service(create, batch_size=2)
+        texts = ["a", "bb", "a", "ccc", "dddd", "bb"]
+
+        results = service.batch_embed(texts)
+
+        assert results == [[float(len(t)), 1.0] for t in texts]
+        assert sorted(t for chunk in requests for t in chunk) == ["a", "bb", "ccc", "dddd"]
+        assert all(len(chunk) <= 2 for chunk in requests)
+
+    def test_retries_failed_chunk(self):
+        calls = {"n": 0}
+
+        def create(model, input):
+            calls["n"] += 1
+            if calls["n"] == 1:
+                raise RuntimeError("rate limited")
+            return self._response(input)
+
+        service = self._service(create, max_retries=2)
+
+        assert service.batch_embed(["x"]) == [[1.0, 1.0]]
+        assert calls["n"] == 2
+
+    def test_single_embed_retries(self):
+        calls = {"n": 0}
+
+        def create(model, input):
+            calls["n"] += 1
+            if calls["n"] == 1:
+                raise RuntimeError("connection reset")
+            return self._response(input)
+
+        service = self._service(create, max_retries=2)
+
+        assert service.embed("xy") == [2.0, 1.0]
+        assert calls["n"] == 2
+
+    def test_chunk_failing_all_retries_yields_none(self):
+        def create(model, input):
+            if "bad" in input:
+                raise RuntimeError("boom")
+            return self._response(input)
+
+        service = self._service(create, batch_size=1, max_retries=1)
+
+        assert service.batch_embed(["ok", "bad"]) == [[2.0, 1.0], None]
+        assert "bad" not in service._cache
+
+    def test_concurrency_is_bounded(self):
+        import threading
+        import time
+
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+
+        def create(model, input):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.01)
+            with lock:
+                state["active"] -= 1
+            return self._response(input)
+
+        service = self._service(create, batch_size=1, max_concurrency=3)
+        service.batch_embed([f"text{i}" for i in range(12)])
+
+        assert 1 < state["peak"] <= 3
+
+    def test_iter_batch_embed_streams_cache_hits_first(self):
+        service = self._service(lambda model, input: self._response(input))
+        service.embed("cached")
+
+        chunks = list(service.iter_batch_embed(["new", "cached"]))
+
+        assert chunks[0] == ([1], [[6.0, 1.0]])
+        assert chunks[1] == ([0], [[3.0, 1.0]])
+
+    def test_vector_store_indexes_streamed_chunks(self):
+        from core.ai.vector_store import SchemaItem, VectorStore
+
+        service = self._service(lambda model, input: self._response(input), batch_size=1)
+        items = [
+            SchemaItem(id=f"item{i}", type="property", entity="Guest", name=f"f{i}", description="d" * i)
+            for i in range(5)
+        ]
+
+        with VectorStore(":memory:", embedding_service=service, search_backend="matrix") as store:
+            store.index_items(items)
+
+            assert store.get_stats()["cache_size"] == 5
+            assert [item.id for item in store.list_items()] == [f"item{i}" for i in range(5)]
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
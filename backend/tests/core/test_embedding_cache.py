@@ -0,0 +1,146 @@
+"""
+tests/core/test_embedding_cache.py
+
+Unit tests for the persistent EmbeddingCache and EmbeddingService read-through
+"""
+import pytest
+from unittest.mock import MagicMock
+
+from core.ai.embedding import EmbeddingService
+from core.ai.embedding_cache import EmbeddingCache, text_digest
+
+
+def _mock_client(dim: int = 4):
+    """OpenAI-style client whose embeddings depend on the input text length"""
+    client = MagicMock()
+
+    def create(model, input):
+        texts = [input] if isinstance(input, str) else input
+        response = MagicMock()
+        response.data = [MagicMock(embedding=[float(len(t))] * dim) for t in texts]
+        return response
+
+    client.embeddings.create.side_effect = create
+    return client
+
+
+def _service(cache: EmbeddingCache, client=None) -> EmbeddingService:
+    service = EmbeddingService(model="nomic-embed-text", enabled=False, persistent_cache=cache)
+    service.enabled = True
+    service._client = client or _mock_client()
+    return service
+
+
+class TestEmbeddingCache:
+    """Test suite for EmbeddingCache"""
+
+    def test_put_and_get(self):
+        cache = EmbeddingCache()
+        cache.put("m", "客人姓名", [0.5, 0.25])
+
+        assert cache.get("m", "客人姓名") == [0.5, 0.25]
+        assert cache.get("other-model", "客人姓名") is None
+
+    def test_get_many_preserves_order_and_counts(self):
+        cache = EmbeddingCache()
+        cache.put_many("m", ["a", "b"], [[1.0], [2.0]])
+
+        assert cache.get_many("m", ["b", "x", "a", "b"]) == [[2.0], None, [1.0], [2.0]]
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 3
+        assert stats["misses"] == 1
+        assert stats["entries"] == 2
+        assert stats["bytes"] == 8
+
+    def test_none_embeddings_not_stored(self):
+        cache = EmbeddingCache()
+        cache.put_many("m", ["a", "b"], [None, [1.0]])
+
+        assert cache.get_stats()["entries"] == 1
+
+    def test_evicts_least_recently_used(self):
+        cache = EmbeddingCache(max_bytes=3 * 16, evict_ratio=1.0)
+        for text in ["a", "b", "c"]:
+            cache.put("m", text, [0.0] * 4)
+
+        cache.get("m", "a")  # refresh "a" so "b" becomes the oldest
+        cache.put("m", "d", [0.0] * 4)
+
+        assert cache.get("m", "b") is None
+        assert cache.get("m", "a") is not None
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_shared_across_instances(self, tmp_path):
+        db_path = str(tmp_path / "cache.db")
+        first = EmbeddingCache(db_path)
+        first.put("m", "hello", [1.0, 2.0])
+        first.close()
+
+        second = EmbeddingCache(db_path)
+        assert second.get("m", "hello") == [1.0, 2.0]
+        second.close()
+
+    def test_clear_by_model(self):
+        cache = EmbeddingCache()
+        cache.put("m1", "a", [1.0])
+        cache.put("m2", "a", [1.0])
+
+        cache.clear("m1")
+
+        assert cache.get("m1", "a") is None
+        assert cache.get("m2", "a") == [1.0]
+
+    def test_text_digest_is_content_address(self):
+        assert text_digest("abc") == text_digest("abc")
+        assert text_digest("abc") != text_digest("abd")
+
+
+class TestEmbeddingServiceReadThrough:
+    """EmbeddingService consults the persistent cache before the API"""
+
+    def test_embed_reuses_persisted_vector_after_restart(self):
+        cache = EmbeddingCache()
+        first = _service(cache)
+        first.embed("客人")
+
+        client = _mock_client()
+        second = _service(cache, client)
+        assert second.embed("客人") == [2.0] * 4
+        client.embeddings.create.assert_not_called()
+
+    def test_batch_embed_only_requests_misses(self):
+        cache = EmbeddingCache()
+        cache.put("nomic-embed-text", "cached", [9.0] * 4)
+
+        client = _mock_client()
+        service = _service(cache, client)
+        results = service.batch_embed(["cached", "new"])
+
+        assert results == [[9.0] * 4, [3.0] * 4]
+        client.embeddings.create.assert_called_once_with(model="nomic-embed-text", input=["new"])
+        assert cache.get("nomic-embed-text", "new") == [3.0] * 4
+
+    def test_disabled_service_does_not_persist_zero_vectors(self):
+        cache = EmbeddingCache()
+        service = EmbeddingService(enabled=False, persistent_cache=cache)
+
+        service.embed("text")
+        service.batch_embed(["a", "b"])
+
+        assert cache.get_stats()["entries"] == 0
+
+    def test_cache_stats_include_persistent(self):
+        cache = EmbeddingCache()
+        service = _service(cache)
+        service.embed("a")
+        service.embed("a")
+
+        stats = service.get_cache_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["persistent"]["entries"] == 1
+        assert stats["persistent"]["bytes"] == 16
+
+    def test_cache_stats_without_persistent(self):
+        assert EmbeddingService(enabled=False).get_cache_stats()["persistent"] is None
@@ -0,0 +1,89 @@
+"""
+测试共享表达式编译器：白名单、与原解释器一致的语义、缓存命中
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from core.ontology.expression import (
+    clear_expression_cache,
+    compile_expression,
+    evaluate_expression,
+    get_expression_cache_stats,
+)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    clear_expression_cache()
+    yield
+    clear_expression_cache()
+
+
+def _ns(**state):
+    return {
+        "state": SimpleNamespace(**state),
+        "param": SimpleNamespace(amount=50, tags=["vip"]),
+        "user": SimpleNamespace(role="manager"),
+    }
+
+
+class TestSemantics:
+
+    @pytest.mark.parametrize("expression, expected", [
+        ("state.status == 'VACANT_CLEAN'", True),
+        ("state.status != 'OCCUPIED'", True),
+        ("state.status in ['OCCUPIED', 'VACANT_DIRTY']", False),
+        ("user.role in ('manager', 'sysadmin')", True),
+        ("param.amount <= state.outstanding", True),
+        ("0 < param.amount <= 100", True),
+        ("0 < param.amount < 10", False),
+        ("not state.blacklisted and param.amount > 0", True),
+        ("state.blacklisted or -param.amount > 0", False),
+        ("param.amount + 50 <= state.outstanding", True),
+        ("'vip' in param.tags", True),
+        ("param.tags[0] == 'vip'", True),
+        ("(1 if state.blacklisted else 2) == 2", True),
+        ("state.missing is None", True),
+        ("state.missing.deeper is None", True),
+        ("True", True),
+    ])
+    def test_evaluates(self, expression, expected):
+        ns = _ns(status="VACANT_CLEAN", outstanding=100, blacklisted=False, missing=None)
+        assert evaluate_expression(expression, ns) is expected
+
+    def test_undefined_name(self):
+        with pytest.raises(ValueError, match="Undefined name"):
+            evaluate_expression("room.status == 'x'", _ns())
+
+    @pytest.mark.parametrize("expression", [
+        "__import__('os')",
+        "state.items()",
+        "[x for x in param.tags]",
+        "lambda: 1",
+        "param.amount ** 2",
+        "state.status ==",
+    ])
+    def test_rejected_at_compile_time(self, expression):
+        with pytest.raises(ValueError):
+            compile_expression(expression)
+
+
+class TestCache:
+
+    def test_compiled_once_per_expression(self):
+        first = compile_expression("state.floor > 0")
+        for _ in range(10):
+            assert compile_expression("state.floor > 0") is first
+
+        stats = get_expression_cache_stats()
+        assert stats["misses"] == 1
+        assert stats["hits"] == 10
+        assert stats["size"] == 1
+
+    def test_failures_not_cached(self):
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                compile_expression("state.items()")
+
+        assert get_expression_cache_stats()["size"] == 0
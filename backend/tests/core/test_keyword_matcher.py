@@ -0,0 +1,164 @@
+"""
+tests/core/test_keyword_matcher.py
+
+KeywordMatcher (Aho–Corasick) 与其使用方测试：
+自动机匹配、OntologyRegistry 关键字解析与失效、通用查询关键词、IntentRouter 关键字阶段
+"""
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from core.ai.intent_router import IntentRouter
+from core.ai.query_keywords import HELP_MATCHER, QUERY_KEYWORDS, QUERY_MATCHER, get_action_matcher
+from core.ontology import metadata as ontology_metadata
+from core.ontology.keyword_matcher import KeywordMatcher
+from core.ontology.registry import OntologyRegistry
+
+
+class TestKeywordMatcher:
+
+    def test_overlapping_and_nested(self):
+        matcher = KeywordMatcher(["房间", "空闲", "空闲房间", "he", "she", "his", "hers"])
+
+        assert matcher.find_all("查看空闲房间") == {"房间", "空闲", "空闲房间"}
+        assert matcher.find_all("ushers") == {"she", "he", "hers"}
+        assert list(matcher.iter_matches("ushers")) == [(1, "she"), (2, "he"), (2, "hers")]
+
+    def test_contains_any_and_longest(self):
+        matcher = KeywordMatcher(["入住", "办理入住", "退房"])
+
+        assert matcher.contains_any("帮我办理入住")
+        assert not matcher.contains_any("你好")
+        assert matcher.longest("帮我办理入住") == "办理入住"
+        assert matcher.longest("你好") is None
+
+    def test_empty_keyword_always_matches(self):
+        matcher = KeywordMatcher(["", "abc"])
+
+        assert matcher.contains_any("xyz")
+        assert matcher.find_all("xyz") == {""}
+        assert len(matcher) == 2
+
+    def test_matches_substring_semantics(self):
+        rng = random.Random(7)
+        alphabet = "abc房间空"
+        keywords = {"".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(200)}
+        matcher = KeywordMatcher(keywords)
+
+        for _ in range(200):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+            assert matcher.find_all(text) == {kw for kw in keywords if kw in text}
+
+
+class TestRegistryKeywordResolution:
+
+    @pytest.fixture(autouse=True)
+    def _isolated_keywords(self, monkeypatch):
+        monkeypatch.setattr(ontology_metadata, "_SEARCHABLE_KEYWORDS", {})
+        OntologyRegistry()._keyword_index = None
+        yield
+        OntologyRegistry()._keyword_index = None
+
+    def test_single_pass_entities_and_properties(self):
+        ontology_metadata.register_searchable_keyword("房间", "entity", "Room")
+        ontology_metadata.register_searchable_keyword("空闲", "property", "Room.status")
+        ontology_metadata.register_searchable_keyword("任务", "entity", "Task")
+        registry = OntologyRegistry()
+
+        assert registry.resolve_keyword_matches("查看空闲房间") == {
+            "entities": ["Room"], "properties": ["Room.status"]
+        }
+        assert registry.find_entities_by_keywords("房间和任务") == ["Room", "Task"]
+        assert registry.find_properties_by_keywords("任务") == []
+
+    def test_recompiled_after_registration(self):
+        registry = OntologyRegistry()
+        ontology_metadata.register_searchable_keyword("房间", "entity", "Room")
+        assert registry.find_entities_by_keywords("客人在哪") == []
+        matcher = registry._keyword_index[1]
+
+        ontology_metadata.register_searchable_keyword("客人", "entity", "Guest")
+
+        assert registry.find_entities_by_keywords("客人在哪") == ["Guest"]
+        assert registry._keyword_index[1] is not matcher
+
+    def test_matcher_reused_between_calls(self):
+        ontology_metadata.register_searchable_keyword("房间", "entity", "Room")
+        registry = OntologyRegistry()
+        registry.find_entities_by_keywords("房间")
+        matcher = registry._keyword_index[1]
+
+        registry.find_properties_by_keywords("房间")
+
+        assert registry._keyword_index[1] is matcher
+
+
+class TestQueryKeywordMatchers:
+
+    def test_query_matcher_equivalent_to_any(self):
+        for message in ["查看房间", "show rooms", "你好", "帮我退房"]:
+            assert QUERY_MATCHER.contains_any(message) == any(kw in message for kw in QUERY_KEYWORDS)
+
+    def test_help_matcher(self):
+        assert HELP_MATCHER.contains_any("how to check in")
+
+    def test_action_matcher_with_domain_keywords(self):
+        assert not get_action_matcher().contains_any("退房")
+        assert get_action_matcher(("退房", "入住")).contains_any("帮我退房")
+        assert get_action_matcher(("退房", "入住")) is get_action_matcher(("退房", "入住"))
+
+
+def _reference_match(action_hints, actions):
+    """重构前的逐 hint × 逐动作实现，用于对照"""
+    candidates = {}
+    for hint in action_hints:
+        hint_lower = hint.lower()
+        for action in actions:
+            name = action.name.lower()
+            if hint_lower == name:
+                if action.name not in candidates or candidates[action.name]["score"] < 1.0:
+                    candidates[action.name] = {"name": action.name, "score": 1.0}
+                continue
+            if hint_lower in name or name in hint_lower:
+                if action.name not in candidates or candidates[action.name]["score"] < 0.8:
+                    candidates[action.name] = {"name": action.name, "score": 0.8}
+                continue
+            if hint_lower in [kw.lower() for kw in action.search_keywords]:
+                if action.name not in candidates or candidates[action.name]["score"] < 0.9:
+                    candidates[action.name] = {"name": action.name, "score": 0.9}
+    return [(c["name"], c["score"]) for c in candidates.values()]
+
+
+class TestIntentRouterKeywordIndex:
+
+    def test_equivalent_to_nested_loop(self):
+        rng = random.Random(11)
+        words = ["checkin", "checkout", "walkin", "task", "room", "create", "query", "bill", "in"]
+        actions = [
+            SimpleNamespace(
+                name="_".join(rng.sample(words, rng.randint(1, 3))) + f"_{i}" * (i % 3 == 0),
+                search_keywords=[rng.choice(["入住", "退房", "Room", "任务", "账单"]) for _ in range(2)],
+            )
+            for i in range(40)
+        ]
+        router = IntentRouter()
+
+        for _ in range(100):
+            hints = [rng.choice(words + ["入住", "room", "CHECKIN", "", "checkin_walkin", "x"])
+                     for _ in range(rng.randint(1, 4))]
+            result = [(c["name"], c["score"]) for c in router._match_by_keywords(hints, actions)]
+            assert result == _reference_match(hints, actions)
+
+    def test_index_rebuilt_when_actions_change(self):
+        router = IntentRouter()
+        actions = [SimpleNamespace(name="checkin", search_keywords=[])]
+        router._match_by_keywords(["checkin"], actions)
+        index = router._keyword_index
+
+        router._match_by_keywords(["checkin"], list(actions))
+        assert router._keyword_index is index
+
+        actions.append(SimpleNamespace(name="checkout", search_keywords=["退房"]))
+        assert [c["name"] for c in router._match_by_keywords(["退房"], actions)] == ["checkout"]
+        assert router._keyword_index is not index
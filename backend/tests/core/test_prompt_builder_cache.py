@@ -0,0 +1,151 @@
+"""
+测试 PromptBuilder 片段缓存：注册表版本失效、角色/过滤条件变体、
+ActionRegistry 版本、token 预估与构建统计
+"""
+from datetime import date
+from unittest.mock import Mock
+
+import pytest
+
+from core.ai.prompt_builder import PromptBuilder, PromptContext, estimate_tokens
+from core.ontology.metadata import EntityMetadata, StateMachine, StateTransition
+from core.ontology.registry import OntologyRegistry
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    reg = OntologyRegistry()
+    reg.clear()
+    reg.register_entity(EntityMetadata(name="Room", description="酒店房间", table_name="rooms"))
+    reg.register_entity(EntityMetadata(name="Guest", description="客人", table_name="guests"))
+    reg.register_state_machine(StateMachine(
+        entity="Room", states=["vacant", "occupied"], initial_state="vacant",
+        transitions=[StateTransition(from_state="vacant", to_state="occupied", trigger="check_in")],
+    ))
+    yield reg
+    reg.clear()
+
+
+def _context(**kwargs):
+    kwargs.setdefault("current_date", date(2026, 3, 1))
+    return PromptContext(**kwargs)
+
+
+class TestSectionCache:
+
+    def test_repeat_build_is_fully_cached_and_identical(self):
+        builder = PromptBuilder()
+
+        first = builder.build_system_prompt(_context(user_role="receptionist"))
+        assert builder.last_build_stats["cached_sections"] == []
+
+        second = builder.build_system_prompt(_context(user_role="receptionist", user_id=7))
+
+        assert second.replace("\n**用户ID:** 7", "") == first
+        assert builder.last_build_stats["cache_hit_rate"] == 1.0
+
+    def test_matches_uncached_builder(self):
+        cached = PromptBuilder()
+        cached.build_system_prompt(_context())
+
+        assert cached.build_system_prompt(_context()) == PromptBuilder().build_system_prompt(_context())
+
+    def test_registry_change_rebuilds(self, clean_registry):
+        builder = PromptBuilder()
+        builder.build_system_prompt(_context())
+
+        clean_registry.register_entity(EntityMetadata(name="Task", description="任务", table_name="tasks"))
+        prompt = builder.build_system_prompt(_context())
+
+        assert "### Task" in prompt
+        assert "entity_descriptions" not in builder.last_build_stats["cached_sections"]
+
+    def test_allowed_entities_keyed_separately(self):
+        builder = PromptBuilder()
+
+        full = builder.build_system_prompt(_context())
+        guests_only = builder.build_system_prompt(_context(allowed_entities=["Guest"]))
+
+        assert "### Room" in full and "### Room" not in guests_only
+        assert "Room 状态机" not in guests_only
+        assert builder.build_system_prompt(_context()) == full
+
+    def test_permissions_keyed_by_role(self, clean_registry):
+        clean_registry.register_permission("check_in", {"manager"})
+        builder = PromptBuilder(admin_roles=["manager", "sysadmin"])
+
+        manager = builder.build_system_prompt(_context(user_role="manager", include_permissions=True))
+        sysadmin = builder.build_system_prompt(_context(user_role="sysadmin", include_permissions=True))
+
+        assert "- check_in: manager" in manager
+        assert "当前角色无特殊权限" in sysadmin
+
+    def test_discovery_reuses_sections(self):
+        builder = PromptBuilder()
+        builder.build_system_prompt(_context(include_actions=False))
+
+        prompt = builder.build_discovery_prompt(_context())
+
+        assert prompt.endswith(PromptBuilder.DISCOVERY_TOOL_PROTOCOL)
+        assert builder.last_build_stats["cache_hit_rate"] == 1.0
+
+    def test_invalidate_cache(self):
+        builder = PromptBuilder()
+        builder.build_system_prompt(_context())
+
+        builder.invalidate_cache()
+        builder.build_system_prompt(_context())
+
+        assert builder.last_build_stats["cached_sections"] == []
+
+
+class TestActionRegistryVersion:
+
+    def test_glossary_rebuilt_after_action_registration(self):
+        action_registry = Mock(version=1)
+        action_registry.get_domain_glossary.return_value = {"a": {"keywords": ["kw_a"], "meaning": "A"}}
+        builder = PromptBuilder(action_registry=action_registry)
+
+        assert "kw_a" in builder.build_domain_glossary()
+        action_registry.get_domain_glossary.return_value = {"b": {"keywords": ["kw_b"], "meaning": "B"}}
+        assert "kw_a" in builder.build_domain_glossary()
+
+        action_registry.version = 2
+        assert "kw_b" in builder.build_domain_glossary()
+        assert action_registry.get_domain_glossary.call_count == 2
+
+    def test_register_bumps_version(self):
+        from pydantic import BaseModel
+        from core.ai.actions import ActionRegistry
+
+        class Params(BaseModel):
+            room_id: int
+
+        registry = ActionRegistry(vector_store=False)
+        before = registry.version
+
+        @registry.register(name="noop", entity="Room", description="noop")
+        def _noop(params: Params, db, user):
+            return {}
+
+        assert registry.version == before + 1
+
+
+class TestTokenEstimates:
+
+    def test_estimate_tokens(self):
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("房间") == 2
+        assert estimate_tokens("room") == 1
+
+    def test_build_stats_report_section_tokens(self):
+        builder = PromptBuilder()
+
+        builder.build_system_prompt(_context(user_role="manager"))
+        stats = builder.last_build_stats
+
+        assert stats["section_tokens"]["role_context"] == estimate_tokens("**当前用户角色:** manager")
+        assert stats["section_tokens"]["action_descriptions"] > 0
+        assert stats["estimated_tokens"] > sum(stats["section_tokens"].values())
+        assert stats["registry_version"] == OntologyRegistry().version
+        assert stats["build_ms"] >= 0
@@ -0,0 +1,150 @@
+"""
+tests/core/test_query_engine_projection.py
+
+QueryEngine 列投影、关系预加载、流式导出与真实总数测试
+"""
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+
+from app.models.ontology import Room, RoomStatus, RoomType
+from core.ontology.query import FilterClause, FilterOperator, StructuredQuery
+from core.ontology.query_engine import QueryEngine
+from core.ontology.registry import OntologyRegistry
+
+
+@pytest.fixture(autouse=True, scope="module")
+def _bootstrap_adapter():
+    from app.hotel.hotel_domain_adapter import HotelDomainAdapter
+    HotelDomainAdapter().register_ontology(OntologyRegistry())
+
+
+@pytest.fixture
+def rooms(db_session):
+    standard = RoomType(name="标准间", base_price=Decimal("288.00"), max_occupancy=2)
+    suite = RoomType(name="套房", base_price=Decimal("888.50"), max_occupancy=3)
+    db_session.add_all([standard, suite])
+    db_session.flush()
+    for number, floor, room_type, status in [
+        ("101", 1, standard, RoomStatus.VACANT_CLEAN), ("102", 1, suite, RoomStatus.OCCUPIED),
+        ("201", 2, standard, RoomStatus.VACANT_DIRTY), ("301", 3, suite, RoomStatus.VACANT_CLEAN),
+    ]:
+        db_session.add(Room(room_number=number, floor=floor, room_type_id=room_type.id, status=status))
+    db_session.commit()
+    db_session.expire_all()
+    # 持有房型实例：以关系结尾的字段取 str(obj)，需保证两次查询得到同一对象
+    return standard, suite
+
+
+@pytest.fixture
+def selects(db_engine):
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(db_engine, "before_cursor_execute", _record)
+    yield statements
+    event.remove(db_engine, "before_cursor_execute", _record)
+
+
+def _legacy_rows(engine, db_session, query):
+    """重构前的实现：加载整个实体，按属性路径逐行取值"""
+    objects = db_session.query(Room).order_by(Room.room_number).all()
+    return engine._map_results(objects, query)
+
+
+def _query(fields, **kwargs):
+    return StructuredQuery(entity="Room", fields=fields, order_by=["room_number"], **kwargs)
+
+
+class TestProjection:
+
+    @pytest.mark.parametrize("fields", [
+        ["room_number", "status", "floor"],
+        ["room_number", "room_type.name", "room_type.base_price"],
+        ["room_number", "stay_records.status", "no_such_field"],
+        ["room_number", "room_type"],
+    ])
+    def test_rows_match_entity_mapping(self, db_session, rooms, fields):
+        engine = QueryEngine(db_session)
+        query = _query(fields)
+
+        assert engine.execute(query)["rows"] == _legacy_rows(engine, db_session, query)
+
+    def test_projected_plan_selects_only_requested_columns(self, db_session, rooms, selects):
+        engine = QueryEngine(db_session)
+        query = _query(["room_number", "room_type.name"])
+
+        result = engine.execute(query)
+
+        assert engine.get_plan(query).projected
+        assert len(selects) == 1
+        assert "rooms.features" not in selects[0]
+        assert result["rows"][1] == {"room_number": "102", "room_type.name": "套房"}
+
+    def test_relationship_field_uses_selectinload(self, db_session, rooms, selects):
+        engine = QueryEngine(db_session)
+        query = _query(["room_number", "room_type"])
+
+        engine.execute(query)
+
+        assert not engine.get_plan(query).projected
+        assert len(selects) == 2
+
+
+class TestTotals:
+
+    def test_total_counts_beyond_page(self, db_session, rooms, selects):
+        engine = QueryEngine(db_session)
+
+        result = engine.execute(_query(["room_number"], limit=2))
+
+        assert len(result["rows"]) == 2
+        assert result["total"] == 4
+        assert result["summary"] == "共 4 条记录"
+        assert sum("count(" in s.lower() for s in selects) == 1
+
+    def test_partial_page_skips_count(self, db_session, rooms, selects):
+        engine = QueryEngine(db_session)
+
+        result = engine.execute(_query(["room_number"], limit=10, offset=1))
+
+        assert result["total"] == 4
+        assert len(selects) == 1
+
+    def test_count_respects_filters(self, db_session, rooms):
+        engine = QueryEngine(db_session)
+        query = _query(["room_number"], limit=1,
+                       filters=[FilterClause(field="floor", operator=FilterOperator.EQ, value=1)])
+
+        assert engine.count(query) == 2
+        assert engine.execute(query)["total"] == 2
+
+
+class TestStream:
+
+    def test_batches_cover_all_rows(self, db_session, rooms):
+        engine = QueryEngine(db_session)
+        query = _query(["room_number", "room_type.name"], limit=1)
+
+        batches = list(engine.stream(query, batch_size=3))
+
+        assert [len(batch) for batch in batches] == [3, 1]
+        assert [row["room_number"] for batch in batches for row in batch] == ["101", "102", "201", "301"]
+
+    def test_entity_mode_stream(self, db_session, rooms):
+        engine = QueryEngine(db_session)
+        query = _query(["room_number", "room_type"])
+
+        rows = [row for batch in engine.stream(query, batch_size=2) for row in batch]
+
+        assert rows == _legacy_rows(engine, db_session, query)
+
+    def test_aggregate_not_streamable(self, db_session):
+        engine = QueryEngine(db_session)
+
+        with pytest.raises(ValueError):
+            next(engine.stream(StructuredQuery(entity="Room", fields=["floor"], group_by=["floor"])))
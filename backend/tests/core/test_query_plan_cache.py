@@ -0,0 +1,181 @@
+"""
+tests/core/test_query_plan_cache.py
+
+查询计划缓存测试：形状键、同形状复用并绑定新值、各操作符参数化、
+注册表版本失效、SemanticPathResolver 编译复用
+"""
+from decimal import Decimal
+
+import pytest
+
+from app.models.ontology import Room, RoomStatus, RoomType
+from core.ontology.query import FilterClause, FilterOperator, JoinClause, StructuredQuery
+from core.ontology.query_engine import QueryEngine
+from core.ontology.query_plan import (
+    PlanCache,
+    semantic_plan_cache,
+    structured_plan_cache,
+    structured_query_shape,
+)
+from core.ontology.registry import OntologyRegistry
+from core.ontology.semantic_path_resolver import SemanticPathResolver
+from core.ontology.semantic_query import SemanticFilter, SemanticQuery
+
+
+@pytest.fixture(autouse=True, scope="module")
+def _bootstrap_adapter():
+    from app.hotel.hotel_domain_adapter import HotelDomainAdapter
+    HotelDomainAdapter().register_ontology(OntologyRegistry())
+
+
+@pytest.fixture
+def rooms(db_session):
+    standard = RoomType(name="标准间", base_price=Decimal("288.00"), max_occupancy=2)
+    suite = RoomType(name="套房", base_price=Decimal("888.00"), max_occupancy=3)
+    db_session.add_all([standard, suite])
+    db_session.flush()
+    for number, floor, room_type in [("101", 1, standard), ("102", 1, suite),
+                                     ("201", 2, standard), ("301", 3, suite)]:
+        db_session.add(Room(room_number=number, floor=floor, room_type_id=room_type.id,
+                            status=RoomStatus.VACANT_CLEAN))
+    db_session.commit()
+
+
+def _room_numbers(result):
+    return sorted(row["room_number"] for row in result["rows"])
+
+
+def _rooms_query(operator, value, field="floor"):
+    return StructuredQuery(entity="Room", fields=["room_number"],
+                           filters=[FilterClause(field=field, operator=operator, value=value)])
+
+
+class TestShape:
+
+    def test_values_and_paging_excluded(self):
+        q1 = _rooms_query(FilterOperator.EQ, 1)
+        q2 = _rooms_query(FilterOperator.EQ, 3)
+        q2.limit, q2.offset = 5, 10
+
+        assert structured_query_shape(q1) == structured_query_shape(q2)
+        assert structured_query_shape(q1) != structured_query_shape(_rooms_query(FilterOperator.GTE, 1))
+        assert structured_query_shape(q1) != structured_query_shape(_rooms_query(FilterOperator.EQ, None))
+
+
+class TestQueryEnginePlanCache:
+
+    def test_same_shape_reuses_plan_with_new_values(self, db_session, rooms):
+        engine = QueryEngine(db_session)
+
+        assert _room_numbers(engine.execute(_rooms_query(FilterOperator.EQ, 1))) == ["101", "102"]
+        assert _room_numbers(engine.execute(_rooms_query(FilterOperator.EQ, 2))) == ["201"]
+
+        stats = structured_plan_cache.get_stats()
+        assert (stats["misses"], stats["hits"]) == (1, 1)
+
+    @pytest.mark.parametrize("operator,value,expected", [
+        (FilterOperator.IN, [1, 3], ["101", "102", "301"]),
+        (FilterOperator.IN, 2, ["201"]),
+        (FilterOperator.NOT_IN, [1], ["201", "301"]),
+        (FilterOperator.BETWEEN, [2, 3], ["201", "301"]),
+        (FilterOperator.NE, 1, ["201", "301"]),
+        (FilterOperator.LT, 2, ["101", "102"]),
+    ])
+    def test_operators_bound_per_execution(self, db_session, rooms, operator, value, expected):
+        engine = QueryEngine(db_session)
+        engine.execute(_rooms_query(operator, [9, 9] if operator == FilterOperator.BETWEEN else 9))
+
+        assert _room_numbers(engine.execute(_rooms_query(operator, value))) == expected
+
+    def test_like_and_relationship_filters(self, db_session, rooms):
+        engine = QueryEngine(db_session)
+
+        assert _room_numbers(engine.execute(_rooms_query(FilterOperator.LIKE, "0", "room_number"))) \
+            == ["101", "102", "201", "301"]
+        assert _room_numbers(engine.execute(_rooms_query(FilterOperator.LIKE, "2", "room_number"))) \
+            == ["102", "201"]
+        assert _room_numbers(engine.execute(_rooms_query(FilterOperator.EQ, "套房", "room_type.name"))) \
+            == ["102", "301"]
+        assert _room_numbers(engine.execute(_rooms_query(FilterOperator.NE, "套房", "room_type.name"))) \
+            == ["101", "201"]
+
+    def test_eq_ne_none_compile_to_null_checks(self, db_session, rooms):
+        """EQ/NE None 编译为 IS NULL / IS NOT NULL，与非 None 值不共用计划"""
+        room_101 = db_session.query(Room).filter(Room.room_number == "101").one()
+        room_101.features = "海景"
+        room_101.room_type.description = "含早"
+        db_session.commit()
+        engine = QueryEngine(db_session)
+
+        assert _room_numbers(engine.execute(_rooms_query(FilterOperator.EQ, "海景", "features"))) == ["101"]
+        assert _room_numbers(engine.execute(_rooms_query(FilterOperator.EQ, None, "features"))) \
+            == ["102", "201", "301"]
+        assert _room_numbers(engine.execute(_rooms_query(FilterOperator.NE, None, "features"))) == ["101"]
+        assert _room_numbers(engine.execute(_rooms_query(FilterOperator.EQ, None, "room_type.description"))) \
+            == ["102", "301"]
+        assert _room_numbers(engine.execute(_rooms_query(FilterOperator.NE, None, "room_type.description"))) \
+            == ["101", "201"]
+        assert _room_numbers(engine.execute(StructuredQuery(
+            entity="Room", fields=["room_number"],
+            joins=[JoinClause(entity="RoomType", filters={"description": None})],
+        ))) == ["102", "301"]
+        assert structured_plan_cache.get_stats()["hits"] == 0
+
+    def test_join_filter_values_bound(self, db_session, rooms):
+        engine = QueryEngine(db_session)
+
+        def query(name):
+            return StructuredQuery(entity="Room", fields=["room_number"],
+                                   joins=[JoinClause(entity="RoomType", filters={"name": name})])
+
+        assert _room_numbers(engine.execute(query("标准间"))) == ["101", "201"]
+        assert _room_numbers(engine.execute(query("套房"))) == ["102", "301"]
+        assert structured_plan_cache.get_stats()["hits"] == 1
+
+    def test_registry_change_invalidates(self, db_session, rooms):
+        engine = QueryEngine(db_session)
+        engine.execute(_rooms_query(FilterOperator.EQ, 1))
+        plan = engine.get_plan(_rooms_query(FilterOperator.EQ, 1))
+
+        OntologyRegistry().invalidate()
+
+        assert engine.get_plan(_rooms_query(FilterOperator.EQ, 1)) is not plan
+
+
+class TestSemanticPlanCache:
+
+    def test_compile_reuses_paths_and_binds_values(self):
+        resolver = SemanticPathResolver()
+
+        def semantic(floor):
+            return SemanticQuery(root_object="Room", fields=["room_number", "room_type.name"],
+                                 filters=[SemanticFilter(path="floor", operator="eq", value=floor)],
+                                 limit=7)
+
+        first = resolver.compile(semantic(1))
+        second = resolver.compile(semantic(2))
+
+        assert [f.value for f in first.filters] == [1]
+        assert [f.value for f in second.filters] == [2]
+        assert second.fields == first.fields and second.limit == 7
+        assert second.joins == first.joins and second.joins[0] is not first.joins[0]
+        assert semantic_plan_cache.get_stats()["hits"] == 1
+
+    def test_unknown_root_not_cached(self):
+        resolver = SemanticPathResolver()
+
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                resolver.compile(SemanticQuery(root_object="NoSuchEntity", fields=["id"]))
+        assert len(semantic_plan_cache) == 0
+
+
+class TestPlanCache:
+
+    def test_lru_bound(self):
+        cache = PlanCache(max_entries=2)
+        for key in ("a", "b", "a", "c"):
+            cache.get_or_build(key, object)
+
+        assert len(cache) == 2
+        assert cache.get_stats()["hits"] == 1
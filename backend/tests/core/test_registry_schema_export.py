@@ -260,3 +260,61 @@ class TestInterfaceRegistration:
 
         assert clean_registry.get_interface("TestIface") is None
         assert clean_registry.get_implementations("TestIface") == []
+
+
+class TestRegistryVersionMemoization:
+    """注册表版本号与派生视图记忆"""
+
+    def test_version_bumped_by_register_and_clear(self, clean_registry):
+        version = clean_registry.version
+        clean_registry.register_entity(EntityMetadata(name="Room", description="", table_name="rooms"))
+        clean_registry.register_permission("checkin", {"manager"})
+        assert clean_registry.version == version + 2
+
+        clean_registry.clear()
+        assert clean_registry.version == version + 3
+
+    def test_derived_views_memoized_within_version(self, clean_registry):
+        clean_registry.register_entity(EntityMetadata(name="Room", description="房间", table_name="rooms"))
+
+        assert clean_registry.export_schema() is clean_registry.export_schema()
+        assert clean_registry.describe_type("Room") is clean_registry.describe_type("Room")
+        assert clean_registry.to_llm_knowledge_base() is clean_registry.to_llm_knowledge_base()
+        assert clean_registry.get_relationship_map() is clean_registry.get_relationship_map()
+
+    def test_derived_views_rebuilt_after_register(self, clean_registry):
+        clean_registry.register_entity(EntityMetadata(name="Room", description="", table_name="rooms"))
+        schema = clean_registry.export_schema()
+
+        clean_registry.register_entity(EntityMetadata(name="Guest", description="", table_name="guests"))
+
+        assert clean_registry.export_schema() is not schema
+        assert set(clean_registry.export_schema()["entity_types"]) == {"Room", "Guest"}
+
+    def test_invalidate_after_direct_metadata_change(self, clean_registry):
+        entity = EntityMetadata(name="Room", description="", table_name="rooms")
+        clean_registry.register_entity(entity)
+        assert clean_registry.get_display_name_index() == {}
+
+        entity.add_property(PropertyMetadata(name="room_number", type="string", python_type="str",
+                                             display_name="房号"))
+        clean_registry.invalidate()
+
+        assert clean_registry.get_display_name_index() == {"room_number": "房号"}
+
+    def test_display_name_index_first_entity_wins(self, clean_registry):
+        for name, display in [("Room", "房间状态"), ("Task", "任务状态")]:
+            entity = EntityMetadata(name=name, description="", table_name=name.lower())
+            entity.add_property(PropertyMetadata(name="status", type="string", python_type="str",
+                                                 display_name=display))
+            entity.add_property(PropertyMetadata(name=f"{name.lower()}_id", type="integer", python_type="int"))
+            clean_registry.register_entity(entity)
+
+        assert clean_registry.get_display_name_index() == {"status": "房间状态"}
+
+    def test_not_cached_when_registry_changes_during_build(self, clean_registry):
+        def build():
+            clean_registry.register_entity(EntityMetadata(name="Room", description="", table_name="rooms"))
+            return object()
+
+        assert clean_registry.memoize("probe", build) is not clean_registry.memoize("probe", object)
@@ -0,0 +1,177 @@
+"""
+tests/core/test_response_cache.py
+
+Unit tests for LLMResponseCache
+"""
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.ai.response_cache import CachedResponse, LLMResponseCache, usage_to_dict
+
+
+def _messages(user, system="You are a hotel assistant."):
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": user},
+    ]
+
+
+class _FakeEmbeddings:
+    """Embeds text as a fixed vector per known phrase"""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+        self.calls = []
+
+    def embed(self, text):
+        self.calls.append(text)
+        return self.vectors.get(text)
+
+
+class TestExactMatch:
+    """Exact-key caching"""
+
+    def test_miss_then_hit(self):
+        cache = LLMResponseCache()
+
+        assert cache.get("m", 0.7, _messages("hi")) is None
+        cache.put("m", 0.7, _messages("hi"), "hello", usage={"total_tokens": 42}, latency_ms=900)
+        entry = cache.get("m", 0.7, _messages("hi"))
+
+        assert entry.content == "hello"
+        assert entry.match == "exact"
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+        assert stats["saved_latency_ms"] == 900
+        assert stats["saved_tokens"] == 42
+
+    def test_key_normalizes_whitespace(self):
+        cache = LLMResponseCache()
+        cache.put("m", 0.0, _messages("查看  房态\n"), "ok")
+
+        assert cache.get("m", 0.0, _messages(" 查看 房态")) is not None
+
+    @pytest.mark.parametrize("model,temperature,params", [
+        ("other", 0.0, None),
+        ("m", 0.7, None),
+        ("m", 0.0, {"max_tokens": 10}),
+    ])
+    def test_key_includes_model_temperature_and_params(self, model, temperature, params):
+        cache = LLMResponseCache()
+        cache.put("m", 0.0, _messages("hi"), "ok")
+
+        assert cache.get(model, temperature, _messages("hi"), params) is None
+
+    def test_empty_content_not_cached(self):
+        cache = LLMResponseCache()
+        cache.put("m", 0.0, _messages("hi"), "")
+
+        assert cache.get_stats()["entries"] == 0
+
+
+class TestEviction:
+    """TTL, size and explicit invalidation"""
+
+    def test_ttl_expiry(self):
+        cache = LLMResponseCache(ttl_seconds=10)
+        with patch("core.ai.response_cache.time.monotonic", return_value=100.0):
+            cache.put("m", 0.0, _messages("hi"), "ok")
+        with patch("core.ai.response_cache.time.monotonic", return_value=105.0):
+            assert cache.get("m", 0.0, _messages("hi")) is not None
+        with patch("core.ai.response_cache.time.monotonic", return_value=111.0):
+            assert cache.get("m", 0.0, _messages("hi")) is None
+
+        assert cache.get_stats()["expirations"] == 1
+        assert cache.get_stats()["entries"] == 0
+
+    def test_lru_eviction(self):
+        cache = LLMResponseCache(max_entries=2)
+        cache.put("m", 0.0, _messages("a"), "A")
+        cache.put("m", 0.0, _messages("b"), "B")
+        cache.get("m", 0.0, _messages("a"))  # touch "a"
+        cache.put("m", 0.0, _messages("c"), "C")
+
+        assert cache.get("m", 0.0, _messages("b")) is None
+        assert cache.get("m", 0.0, _messages("a")).content == "A"
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_invalidate(self):
+        cache = LLMResponseCache()
+        cache.put("m", 0.0, _messages("a"), "A")
+        cache.invalidate()
+
+        assert cache.get("m", 0.0, _messages("a")) is None
+        assert cache.get_stats()["invalidations"] == 1
+
+
+class TestSemanticMatch:
+    """Embedding-similarity lookup for deterministic calls"""
+
+    def _cache(self):
+        embeddings = _FakeEmbeddings({
+            "今天有多少空房": [1.0, 0.0, 0.0],
+            "今天有多少空房？": [0.99, 0.05, 0.0],
+            "帮我退房": [0.0, 1.0, 0.0],
+        })
+        return LLMResponseCache(embedding_service=embeddings, similarity_threshold=0.95), embeddings
+
+    def test_similar_prompt_hits(self):
+        cache, _ = self._cache()
+        cache.put("m", 0.0, _messages("今天有多少空房"), "12")
+
+        entry = cache.get("m", 0.0, _messages("今天有多少空房？"))
+
+        assert entry.content == "12"
+        assert entry.match == "semantic"
+        assert cache.get_stats()["semantic_hits"] == 1
+
+    def test_dissimilar_prompt_misses(self):
+        cache, _ = self._cache()
+        cache.put("m", 0.0, _messages("今天有多少空房"), "12")
+
+        assert cache.get("m", 0.0, _messages("帮我退房")) is None
+
+    def test_requires_same_preceding_messages(self):
+        cache, _ = self._cache()
+        cache.put("m", 0.0, _messages("今天有多少空房"), "12")
+
+        assert cache.get("m", 0.0, _messages("今天有多少空房？", system="other")) is None
+
+    def test_only_for_temperature_zero(self):
+        cache, embeddings = self._cache()
+        cache.put("m", 0.7, _messages("今天有多少空房"), "12")
+
+        assert cache.get("m", 0.7, _messages("今天有多少空房？")) is None
+        assert embeddings.calls == []
+
+    def test_zero_vectors_are_ignored(self):
+        cache = LLMResponseCache(embedding_service=_FakeEmbeddings({"a": [0.0, 0.0], "b": [0.0, 0.0]}))
+        cache.put("m", 0.0, _messages("a"), "A")
+
+        assert cache.get("m", 0.0, _messages("b")) is None
+
+    def test_eviction_removes_semantic_candidates(self):
+        cache, _ = self._cache()
+        cache.max_entries = 1
+        cache.put("m", 0.0, _messages("今天有多少空房"), "12")
+        cache.put("m", 0.0, _messages("帮我退房"), "ok")
+
+        assert cache.get("m", 0.0, _messages("今天有多少空房？")) is None
+
+
+class TestCachedResponse:
+    """Completion-shaped cache entries"""
+
+    def test_to_completion(self):
+        entry = CachedResponse(content="hi", usage={"prompt_tokens": 1, "completion_tokens": 2, "total_tokens": 3})
+        completion = entry.to_completion()
+
+        assert completion.choices[0].message.content == "hi"
+        assert completion.usage.total_tokens == 3
+
+    def test_usage_to_dict(self):
+        usage = MagicMock(prompt_tokens=5, completion_tokens=7, total_tokens=12)
+
+        assert usage_to_dict(usage) == {"prompt_tokens": 5, "completion_tokens": 7, "total_tokens": 12}
+        assert usage_to_dict(None) is None
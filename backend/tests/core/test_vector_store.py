@@ -6,7 +6,29 @@ Unit tests for VectorStore and SchemaItem
 import pytest
 import sqlite3
 
-from core.ai.vector_store import SchemaItem, VectorStore
+from core.ai.vector_store import (
+    SchemaItem,
+    SqliteVecIndex,
+    VectorMatrix,
+    VectorStore,
+    cosine_similarity,
+    load_sqlite_vec,
+)
+import core.ai.vector_store as vector_store_module
+
+
+def _sqlite_vec_available() -> bool:
+    conn = sqlite3.connect(":memory:")
+    try:
+        return load_sqlite_vec(conn)
+    finally:
+        conn.close()
+
+
+requires_sqlite_vec = pytest.mark.skipif(
+    not _sqlite_vec_available(),
+    reason="sqlite-vec extension cannot be loaded by this Python's sqlite3",
+)
 from core.ai.embedding import EmbeddingService
 
 
@@ -460,3 +482,240 @@ class TestVectorStoreIntegration:
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
+
+
+class TestVectorMatrix:
+    """Tests for the in-memory NumPy similarity index"""
+
+    @pytest.fixture
+    def matrix(self):
+        matrix = VectorMatrix()
+        matrix.upsert("Guest.name", [1.0, 0.0, 0.0], "property", "Guest")
+        matrix.upsert("Guest", [0.9, 0.1, 0.0], "entity", "Guest")
+        matrix.upsert("Room.status", [0.0, 1.0, 0.0], "property", "Room")
+        matrix.upsert("checkin", [0.0, 0.0, 2.0], "action", "Guest")
+        return matrix
+
+    def test_search_ranks_by_cosine(self, matrix):
+        results = matrix.search([1.0, 0.0, 0.0], top_k=2)
+
+        assert [item_id for item_id, _ in results] == ["Guest.name", "Guest"]
+        assert results[0][1] == pytest.approx(1.0)
+
+    def test_scores_match_cosine_similarity(self, matrix):
+        query = [0.3, 0.5, 0.2]
+        scores = dict(matrix.search(query, top_k=10))
+
+        assert scores["checkin"] == pytest.approx(cosine_similarity(query, [0.0, 0.0, 2.0]), abs=1e-6)
+        assert scores["Guest"] == pytest.approx(cosine_similarity(query, [0.9, 0.1, 0.0]), abs=1e-6)
+
+    def test_type_and_entity_masks(self, matrix):
+        results = matrix.search([1.0, 1.0, 1.0], top_k=10, item_type="property", entity_filter="Guest")
+        assert [item_id for item_id, _ in results] == ["Guest.name"]
+
+        assert matrix.search([1.0, 1.0, 1.0], item_type="relationship") == []
+
+    def test_remove_swaps_last_row(self, matrix):
+        assert matrix.remove("Guest.name") is True
+        assert matrix.remove("Guest.name") is False
+        assert len(matrix) == 3
+        assert "checkin" in matrix
+
+        results = matrix.search([0.0, 0.0, 1.0], top_k=1)
+        assert results[0][0] == "checkin"
+
+    def test_ties_keep_insertion_order(self):
+        matrix = VectorMatrix()
+        for item_id in ["a", "b", "c", "d"]:
+            matrix.upsert(item_id, [0.0, 0.0], "property", "X")
+
+        assert [item_id for item_id, _ in matrix.search([1.0, 0.0], top_k=3)] == ["a", "b", "c"]
+
+        # Re-indexing moves the item to the end, like INSERT OR REPLACE
+        matrix.upsert("a", [0.0, 0.0], "property", "X")
+        assert [item_id for item_id, _ in matrix.search([1.0, 0.0], top_k=4)] == ["b", "c", "d", "a"]
+
+    def test_grows_past_initial_capacity(self):
+        matrix = VectorMatrix(dim=4)
+        for i in range(200):
+            matrix.upsert(f"item{i}", [float(i), 1.0, 0.0, 0.0], "property", "X")
+
+        assert len(matrix) == 200
+        assert matrix.search([1.0, 0.0, 0.0, 0.0], top_k=1)[0][0] == "item199"
+
+    def test_clear_resets_codes_and_arrays(self, matrix):
+        matrix.clear()
+
+        assert len(matrix) == 0
+        assert matrix._codes == {}
+        assert matrix.nbytes == 0
+        assert matrix.search([1.0, 0.0, 0.0]) == []
+
+        matrix.upsert("Room", [0.0, 1.0, 0.0], "entity", "Room")
+        assert matrix.search([0.0, 1.0, 0.0], item_type="entity", entity_filter="Room")[0][0] == "Room"
+        assert matrix._codes == {"entity": 0, "Room": 1}
+
+    def test_dimension_mismatch_raises(self, matrix):
+        with pytest.raises(ValueError):
+            matrix.search([1.0, 0.0], top_k=1)
+
+
+class TestVectorStoreIndexSync:
+    """The search index must follow index_items / delete_item / reload"""
+
+    @pytest.fixture
+    def embedding_service(self):
+        service = EmbeddingService(enabled=False)
+        vectors = {
+            "guest": [1.0, 0.0, 0.0],
+            "room": [0.0, 1.0, 0.0],
+            "task": [0.0, 0.0, 1.0],
+        }
+
+        def mock_embed(text):
+            for key, vector in vectors.items():
+                if key in text.lower():
+                    return vector
+            return [0.0, 0.0, 0.0]
+
+        service.embed = mock_embed
+        service.batch_embed = lambda texts: [mock_embed(text) for text in texts]
+        return service
+
+    def _items(self):
+        return [
+            SchemaItem(id="Guest", type="entity", entity="Guest", name="Guest", description="guest"),
+            SchemaItem(id="Room", type="entity", entity="Room", name="Room", description="room"),
+            SchemaItem(id="Task", type="entity", entity="Task", name="Task", description="task"),
+        ]
+
+    def test_search_uses_matrix_ranking(self, embedding_service):
+        with VectorStore(":memory:", embedding_service=embedding_service, embedding_dim=3) as store:
+            store.index_items(self._items())
+
+            results = store.search("room", top_k=1)
+            assert [r.id for r in results] == ["Room"]
+
+    def test_delete_removes_from_search(self, embedding_service):
+        with VectorStore(":memory:", embedding_service=embedding_service, embedding_dim=3) as store:
+            store.index_items(self._items())
+            store.delete_item("Room")
+
+            assert "Room" not in [r.id for r in store.search("room", top_k=3)]
+            assert store.get_stats()["cache_size"] == 2
+
+    def test_failed_embedding_is_not_searchable(self, embedding_service):
+        embedding_service.batch_embed = lambda texts: [None for _ in texts]
+        with VectorStore(":memory:", embedding_service=embedding_service, embedding_dim=3) as store:
+            store.index_items(self._items())
+
+            assert store.get_item("Guest") is not None
+            assert store.search("guest") == []
+
+    def test_matrix_rebuilt_from_disk(self, embedding_service, tmp_path):
+        db_path = str(tmp_path / "vectors.db")
+        with VectorStore(db_path, embedding_service=embedding_service, embedding_dim=3) as store:
+            store.index_items(self._items())
+
+        with VectorStore(db_path, embedding_service=embedding_service, embedding_dim=3) as reopened:
+            assert reopened.get_stats()["cache_size"] == 3
+            assert [r.id for r in reopened.search("task", top_k=1)] == ["Task"]
+
+
+class TestSearchBackendSelection:
+    """search_backend chooses sqlite-vec or the matrix, with fallback"""
+
+    def test_matrix_backend(self):
+        with VectorStore(":memory:", search_backend="matrix") as store:
+            assert store.search_backend == "matrix"
+            assert store.get_stats()["search_backend"] == "matrix"
+
+    def test_unknown_backend_rejected(self):
+        with pytest.raises(ValueError):
+            VectorStore(":memory:", search_backend="faiss")
+
+    def test_auto_falls_back_when_extension_missing(self, monkeypatch):
+        monkeypatch.setattr(vector_store_module, "load_sqlite_vec", lambda conn: False)
+        with VectorStore(":memory:") as store:
+            assert store.search_backend == "matrix"
+
+    def test_explicit_sqlite_vec_requires_extension(self, monkeypatch):
+        monkeypatch.setattr(vector_store_module, "load_sqlite_vec", lambda conn: False)
+        with pytest.raises(RuntimeError):
+            VectorStore(":memory:", search_backend="sqlite_vec")
+
+    def test_load_sqlite_vec_handles_missing_support(self):
+        class NoExtensions:
+            def enable_load_extension(self, enabled):
+                raise AttributeError("enable_load_extension")
+
+        assert load_sqlite_vec(NoExtensions()) is False
+
+
+@requires_sqlite_vec
+class TestSqliteVecIndex:
+    """vec0-backed index must rank like the in-memory matrix"""
+
+    @pytest.fixture
+    def conn(self):
+        conn = sqlite3.connect(":memory:")
+        load_sqlite_vec(conn)
+        yield conn
+        conn.close()
+
+    def test_matches_matrix_ranking(self, conn):
+        import numpy as np
+
+        rng = np.random.default_rng(7)
+        vectors = rng.standard_normal((300, 16)).astype(np.float32)
+        vec_index, matrix = SqliteVecIndex(conn), VectorMatrix()
+        for i, vector in enumerate(vectors):
+            item_type = "property" if i % 3 else "entity"
+            vec_index.upsert(f"item{i}", vector, item_type, f"E{i % 5}")
+            matrix.upsert(f"item{i}", vector, item_type, f"E{i % 5}")
+
+        for query in rng.standard_normal((10, 16)):
+            for kwargs in ({}, {"item_type": "property"}, {"entity_filter": "E2"}):
+                expected = matrix.search(query, top_k=10, **kwargs)
+                actual = vec_index.search(query, top_k=10, **kwargs)
+                assert [i for i, _ in actual] == [i for i, _ in expected]
+                assert [s for _, s in actual] == pytest.approx([s for _, s in expected], abs=1e-4)
+
+    def test_ties_keep_insertion_order(self, conn):
+        index = SqliteVecIndex(conn)
+        for item_id in ["a", "b", "c", "d"]:
+            index.upsert(item_id, [0.0, 0.0], "property", "X")
+
+        assert [i for i, _ in index.search([1.0, 0.0], top_k=3)] == ["a", "b", "c"]
+
+        index.upsert("a", [0.0, 0.0], "property", "X")
+        assert [i for i, _ in index.search([1.0, 0.0], top_k=4)] == ["b", "c", "d", "a"]
+
+    def test_remove_and_clear(self, conn):
+        index = SqliteVecIndex(conn)
+        index.upsert("a", [1.0, 0.0], "property", "X")
+        index.upsert("b", [0.0, 1.0], "property", "X")
+
+        assert index.remove("a") is True
+        assert index.remove("a") is False
+        assert len(index) == 1
+
+        index.clear()
+        assert len(index) == 0
+        assert index.search([1.0, 0.0]) == []
+
+    def test_store_persists_vectors(self, tmp_path):
+        db_path = str(tmp_path / "vectors.db")
+        service = EmbeddingService(enabled=False)
+        service.batch_embed = lambda texts: [[1.0, float(i), 0.0] for i, _ in enumerate(texts)]
+        items = [
+            SchemaItem(id=f"item{i}", type="property", entity="Guest", name=f"f{i}", description="d")
+            for i in range(3)
+        ]
+
+        with VectorStore(db_path, embedding_service=service, search_backend="sqlite_vec") as store:
+            store.index_items(items)
+
+        with VectorStore(db_path, embedding_service=service, search_backend="sqlite_vec") as store:
+            assert store.search_backend == "sqlite_vec"
+            assert store.get_stats()["cache_size"] == 3
@@ -9,6 +9,7 @@ from datetime import date, timedelta
 from app.hotel.domain.rules.pricing_rules import (
     register_pricing_rules,
     calculate_room_price,
+    calculate_room_prices,
     is_weekend,
     is_holiday,
 )
@@ -342,5 +343,63 @@ class TestCalculateRoomPrice:
         assert any(a["name"] == "长住折扣（7+天）" for a in details["adjustments"])
 
 
+class TestCalculateRoomPrices:
+    """批量计算房间价格测试"""
+
+    def test_matches_calculate_room_price(self):
+        """批量结果与逐条计算一致"""
+        base_prices, check_ins, check_outs, tiers = [], [], [], []
+        tier_cycle = ["basic", "vip", "gold", "silver", "unknown"]
+        start = date(2024, 12, 25)
+        for i in range(400):
+            check_in = start + timedelta(days=i)
+            base_prices.append([288, 288.5, 199.99, 1000][i % 4])
+            check_ins.append(check_in)
+            check_outs.append(check_in + timedelta(days=i % 17))
+            tiers.append(tier_cycle[i % 5])
+
+        prices = calculate_room_prices(base_prices, check_ins, check_outs, tiers)
+
+        assert prices == [
+            calculate_room_price(*args)[0]
+            for args in zip(base_prices, check_ins, check_outs, tiers)
+        ]
+
+    def test_default_tier_and_empty(self):
+        """缺省等级为 basic，空输入返回空列表"""
+        check_in = date(2025, 10, 1)  # 国庆
+        assert calculate_room_prices([288], [check_in], [check_in + timedelta(days=1)]) == [
+            calculate_room_price(288, check_in, check_in + timedelta(days=1))[0]
+        ]
+        assert calculate_room_prices([], [], []) == []
+
+    def test_length_mismatch(self):
+        """参数长度不一致时报错"""
+        with pytest.raises(ValueError):
+            calculate_room_prices([288, 388], [date(2025, 1, 7)], [date(2025, 1, 8)])
+
+
+class TestSharedFacts:
+    """定价规则共用上下文事实"""
+
+    def test_dates_parsed_once_per_context(self):
+        """测试字符串日期在同一上下文中只解析一次，周末/节假日/长住规则共用"""
+        engine = RuleEngine(decision_table=True)
+        register_pricing_rules(engine)
+        context = RuleContext(
+            entity=None,
+            entity_type="pricing",
+            action="calculate",
+            parameters={"check_in_date": "2025-10-03", "check_out_date": "2025-10-17", "base_price": 288},
+        )
+
+        rule_ids = [r.rule_id for r in engine.evaluate(context)]
+
+        assert rule_ids == ["pricing_holiday_surcharge", "pricing_weekend_surcharge",
+                            "pricing_long_stay_discount"]
+        assert context.facts == {"check_in_date": date(2025, 10, 3), "stay_nights": 14}
+        assert context.metadata["discount_rate"] == 0.15
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
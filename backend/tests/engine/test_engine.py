@@ -229,6 +229,86 @@ class TestRuleEngine:
         engine.enable_rule("test")
         assert engine.get_rule("test").enabled
 
+    def test_dispatch_by_entity_and_event(self):
+        """测试按 (实体, 事件) 预排序分派，注册后重建"""
+        engine = RuleEngine()
+        noop = lambda ctx: None
+        engine.register_rule(Rule("a", "A", "", FunctionCondition(lambda ctx: True), noop,
+                                  priority=1, entity_type="room"))
+        engine.register_rule(Rule("b", "B", "", FunctionCondition(lambda ctx: True), noop,
+                                  priority=5, entity_type="room", events=["checkout"]))
+
+        assert [r.rule_id for r in engine.get_rules_for_entity("room", "checkin")] == ["a"]
+        assert [r.rule_id for r in engine.get_rules_for_entity("room", "checkout")] == ["b", "a"]
+
+        engine.register_rule(Rule("c", "C", "", FunctionCondition(lambda ctx: True), noop,
+                                  priority=9, entity_type="room"))
+        engine.disable_rule("a")
+        triggered = engine.evaluate(RuleContext(None, "room", "checkout", {}))
+        assert [r.rule_id for r in triggered] == ["c", "b"]
+
+        engine.unregister_rule("c")
+        assert [r.rule_id for r in engine.get_rules_for_entity("room", "checkout")] == ["b"]
+
+    def test_entity_type_defaults_to_rule_id_prefix(self):
+        """测试未指定 entity_type 时沿用 rule_id 前缀"""
+        rule = Rule("room_x", "X", "", FunctionCondition(lambda ctx: True), lambda ctx: None)
+        assert rule.entity_type == "room"
+
+    def test_decision_table_memoizes_shared_conditions(self):
+        """测试决策表模式下共享条件每次 evaluate 只求值一次"""
+        calls = []
+
+        def is_weekend(ctx):
+            calls.append(ctx.action)
+            return True
+
+        for decision_table, expected_calls in [(False, 2), (True, 1)]:
+            calls.clear()
+            engine = RuleEngine(decision_table=decision_table)
+            for rule_id in ("pricing_a", "pricing_b"):
+                engine.register_rule(Rule(rule_id, rule_id, "", FunctionCondition(is_weekend), lambda ctx: None))
+
+            assert len(engine.evaluate(RuleContext(None, "pricing", "quote", {}))) == 2
+            assert len(calls) == expected_calls
+            assert engine.get_rule_stats("pricing_b")["memoized"] == (1 if decision_table else 0)
+
+    def test_context_fact_computed_once(self):
+        """测试 RuleContext.fact 在同一上下文内只计算一次"""
+        context = RuleContext(None, "pricing", "quote", {"day": "2025-01-03"})
+        computed = []
+
+        def parse(ctx):
+            computed.append(1)
+            return ctx.parameters["day"]
+
+        assert context.fact("day", parse) == context.fact("day", parse) == "2025-01-03"
+        assert len(computed) == 1
+
+    def test_rule_stats(self):
+        """测试规则命中计数与耗时统计"""
+        engine = RuleEngine()
+
+        def boom(ctx):
+            raise RuntimeError("boom")
+
+        engine.register_rule(Rule("room_hit", "", "", FunctionCondition(lambda ctx: ctx.action == "checkout"),
+                                  lambda ctx: None))
+        engine.register_rule(Rule("room_err", "", "", FunctionCondition(boom), lambda ctx: None))
+
+        for action in ("checkout", "checkin", "checkout"):
+            engine.evaluate(RuleContext(None, "room", action, {}))
+
+        stats = engine.get_rule_stats()
+        assert stats["room_hit"]["evaluations"] == 3
+        assert stats["room_hit"]["hits"] == 2
+        assert stats["room_hit"]["hit_rate"] == pytest.approx(2 / 3)
+        assert stats["room_hit"]["condition_ms"] >= 0
+        assert stats["room_err"]["errors"] == 3
+
+        engine.reset_stats()
+        assert engine.get_rule_stats("room_hit")["evaluations"] == 0
+
 
 # ============== StateMachine Tests ==============
 class TestStateMachineConfig:
@@ -656,3 +736,70 @@ class TestAuditEngine:
 
         engine.clear()
         assert engine.get_statistics()["total_logs"] == 0
+
+    def test_ring_buffer_evicts_oldest(self):
+        """测试环形缓冲：超过容量覆盖最旧条目，索引与统计同步淘汰"""
+        engine = AuditEngine(max_logs=3)
+        logs = [
+            engine.log(operator_id=i % 2, action=f"a{i % 2}", entity_type="E", entity_id=i,
+                       severity=AuditSeverity.WARNING if i == 0 else AuditSeverity.INFO)
+            for i in range(5)
+        ]
+
+        assert engine.get_all() == logs[2:]
+        assert engine.get_all(limit=1, offset=1) == [logs[3]]
+        assert engine.get_by_id(logs[1].log_id) is None
+        assert engine.get_by_id(logs[4].log_id) is logs[4]
+        assert engine.get_by_operator(0) == [logs[2], logs[4]]
+        assert engine.get_by_operator(0, limit=1) == [logs[2]]
+        assert engine.get_by_entity("E", 0) == []
+        assert engine.get_by_action("a1") == [logs[3]]
+
+        stats = engine.get_statistics()
+        assert stats["total_logs"] == 3
+        assert stats["by_severity"] == {"info": 3, "warning": 0, "error": 0, "critical": 0}
+        assert stats["by_action"] == {"a0": 2, "a1": 1}
+        assert "E:0" not in engine._entity_logs
+
+    def test_spill_in_batches(self):
+        """测试转存：按批交给 sink，失败的批次保留重试"""
+        batches = []
+        engine = AuditEngine(max_logs=2, spill=batches.append, spill_batch_size=2, max_pending_spill=10)
+        logs = [engine.log(action=f"a{i}") for i in range(5)]
+
+        assert engine.flush_spill() == 5
+        assert batches == [logs[0:2], logs[2:4], logs[4:]]
+
+        def failing(batch):
+            raise RuntimeError("db down")
+
+        engine.set_spill(failing)
+        engine.log(action="later")
+        assert engine.flush_spill() == 0
+        stats = engine.get_spill_stats()
+        assert (stats["pending"], stats["errors"], stats["spilled"]) == (1, 1, 5)
+
+    def test_spill_queue_bounded(self):
+        """测试转存队列有界：超出时丢弃最旧条目并计数"""
+        batches = []
+        engine = AuditEngine(max_logs=10, spill=batches.append, spill_batch_size=10, max_pending_spill=3)
+        logs = [engine.log(action=f"a{i}") for i in range(5)]
+
+        engine.flush_spill()
+
+        assert batches == [logs[2:]]
+        assert engine.get_spill_stats()["dropped"] == 2
+
+    def test_background_spill(self):
+        """测试后台线程转存，停止时转存剩余条目"""
+        spilled = []
+        engine = AuditEngine(spill=spilled.extend, spill_batch_size=2, spill_interval=10)
+        engine.start_spill()
+        try:
+            for i in range(3):
+                engine.log(action=f"a{i}")
+        finally:
+            engine.stop_spill()
+
+        assert [log.action for log in spilled] == ["a0", "a1", "a2"]
+        assert not engine.get_spill_stats()["running"]
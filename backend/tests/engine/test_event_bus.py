@@ -441,3 +441,215 @@ def test_multiple_event_buses_independent():
 
     # 由于是单例，event_bus 和 bus 是同一个实例
     assert len(received_global) == 1
+
+
+# ==================== 异步分发 ====================
+
+import threading
+import time
+
+from core.engine.event_bus import DispatchMode
+
+
+def _event(event_type="test", **data):
+    return Event(event_type=event_type, timestamp=datetime.now(), data=data)
+
+
+def test_async_handler_runs_off_publish_thread():
+    """测试异步处理器在工作线程执行，publish 不等待"""
+    bus = EventBus()
+    bus.clear()
+    gate = threading.Event()
+    threads = []
+
+    def handler(event):
+        gate.wait(5)
+        threads.append(threading.current_thread())
+
+    bus.subscribe("test", handler, mode="async")
+    result = bus.publish(_event())
+
+    assert (result.queued_count, result.success_count) == (1, 0)
+    stats = bus.get_statistics()
+    assert stats.queue_depth == {"test": 1}
+    assert stats.queue_lag_ms["test"] >= 0
+
+    gate.set()
+    assert bus.drain(timeout=5)
+    assert threads and threads[0] is not threading.current_thread()
+    stats = bus.get_statistics()
+    assert stats.total_processed == 1
+    assert stats.queue_depth == {}
+    assert stats.handler_latency_ms["handler"]["count"] == 1
+
+
+def test_invalid_dispatch_mode():
+    """测试未知分发模式"""
+    bus = EventBus()
+    bus.clear()
+    with pytest.raises(ValueError):
+        bus.subscribe("test", lambda e: None, mode="deferred")
+
+
+def test_async_ordering_per_aggregate():
+    """测试同一聚合的事件按发布顺序处理，不同聚合可并行"""
+    bus = EventBus()
+    bus.clear()
+    seen = {}
+    lock = threading.Lock()
+
+    def handler(event):
+        time.sleep(0.001)
+        with lock:
+            seen.setdefault(event.data["room_id"], []).append(event.data["seq"])
+
+    bus.subscribe("room.changed", handler, mode=DispatchMode.ASYNC, aggregate_key="room_id")
+    for seq in range(20):
+        for room_id in (1, 2, 3):
+            bus.publish(_event("room.changed", room_id=room_id, seq=seq))
+
+    assert bus.drain(timeout=10)
+    assert seen == {room_id: list(range(20)) for room_id in (1, 2, 3)}
+
+
+def test_async_priority_order():
+    """测试就绪队列按订阅优先级取出"""
+    bus = EventBus()
+    bus.clear()
+    bus.shutdown(timeout=5)
+    bus.max_workers = 1
+    try:
+        gate = threading.Event()
+        order = []
+
+        bus.subscribe("block", lambda e: gate.wait(5), mode="async")
+        bus.publish(_event("block"))
+        bus.subscribe("low", lambda e: order.append("low"), mode="async", priority=0)
+        bus.subscribe("high", lambda e: order.append("high"), mode="async", priority=10)
+        bus.publish(_event("low"))
+        bus.publish(_event("high"))
+        gate.set()
+
+        assert bus.drain(timeout=5)
+        assert order == ["high", "low"]
+    finally:
+        bus.shutdown(timeout=5)
+        bus.max_workers = 4
+
+
+def test_sync_handlers_run_by_priority():
+    """测试同步处理器按优先级执行"""
+    bus = EventBus()
+    bus.clear()
+    order = []
+
+    bus.subscribe("test", lambda e: order.append("low"), priority=-1)
+    bus.subscribe("test", lambda e: order.append("high"), priority=5)
+    bus.publish(_event())
+
+    assert order == ["high", "low"]
+
+
+def test_async_retry_then_dead_letter():
+    """测试异步处理器失败重试，最终进入死信列表并可重放"""
+    bus = EventBus()
+    bus.clear()
+    calls = []
+    healthy = threading.Event()
+
+    def flaky(event):
+        calls.append(event.event_id)
+        if not healthy.is_set():
+            raise RuntimeError("downstream unavailable")
+
+    bus.subscribe("test", flaky, mode="async", max_retries=2, retry_backoff=0)
+    event = _event()
+    bus.publish(event)
+
+    assert bus.drain(timeout=5)
+    assert len(calls) == 3
+    stats = bus.get_statistics()
+    assert (stats.total_retried, stats.total_dead_lettered, stats.total_failed) == (2, 1, 1)
+    letter = bus.get_dead_letters()[0]
+    assert (letter.events, letter.attempts, letter.error) == ([event], 3, "downstream unavailable")
+
+    healthy.set()
+    assert bus.replay_dead_letters() == 1
+    assert bus.drain(timeout=5)
+    assert bus.get_dead_letters() == []
+    assert bus.get_statistics().total_processed == 1
+
+
+def test_publish_many_coalesces_batch_handlers():
+    """测试 publish_many 将事件合并后交给批处理器"""
+    bus = EventBus()
+    bus.clear()
+    sync_batches = []
+    async_batches = []
+
+    bus.subscribe("test", lambda events: sync_batches.append(len(events)), batch=True)
+    bus.subscribe("test", lambda events: async_batches.append(len(events)),
+                  mode="async", batch=True, max_batch_size=4)
+    bus.subscribe("other", lambda events: sync_batches.append(-len(events)), batch=True)
+
+    results = bus.publish_many([_event() for _ in range(10)] + [_event("other")])
+
+    assert sync_batches == [10, -1]
+    assert all(r.success_count == 1 for r in results)
+    assert bus.drain(timeout=5)
+    assert sum(async_batches) == 10
+    assert max(async_batches) <= 4
+
+
+def test_sync_batch_handler_priority_order():
+    """测试批处理器的执行顺序：publish 按优先级，publish_many 在非批处理器之后"""
+    bus = EventBus()
+    bus.clear()
+    calls = []
+
+    bus.subscribe("test", lambda event: calls.append("low"), priority=1)
+    bus.subscribe("test", lambda events: calls.append(("batch", len(events))), batch=True, priority=5)
+    bus.subscribe("test", lambda event: calls.append("high"), priority=10)
+
+    bus.publish(_event())
+    assert calls == ["high", ("batch", 1), "low"]
+
+    calls.clear()
+    bus.publish_many([_event(), _event()])
+    assert calls == ["high", "low", "high", "low", ("batch", 2)]
+
+
+def test_sync_batch_handler_failure_marks_each_event():
+    """测试同步批处理器失败时每个事件都记为失败"""
+    bus = EventBus()
+    bus.clear()
+
+    def handler(events):
+        raise ValueError("bad batch")
+
+    bus.subscribe("test", handler, batch=True)
+    results = bus.publish_many([_event(), _event()])
+
+    assert [r.failure_count for r in results] == [1, 1]
+    assert bus.get_statistics().total_failed == 2
+
+
+def test_clear_discards_pending_async_events():
+    """测试 clear 丢弃尚未处理的异步事件"""
+    bus = EventBus()
+    bus.clear()
+    gate = threading.Event()
+    handled = []
+
+    def handler(event):
+        gate.wait(5)
+        handled.append(event)
+
+    bus.subscribe("test", handler, mode="async")
+    for _ in range(5):
+        bus.publish(_event())
+    bus.clear()
+    gate.set()
+
+    assert bus.drain(timeout=5)
+    assert len(handled) <= 1
@@ -339,3 +339,40 @@ class TestGetActionSummary:
         summary = audit_service.get_action_summary(days=7)
         counts = [s["count"] for s in summary]
         assert counts == sorted(counts, reverse=True)
+
+
+class TestSystemLogSpill:
+    """Tests for make_system_log_spill() with core AuditEngine."""
+
+    def test_spills_engine_entries_to_system_logs(self, db_engine, db_session, operator):
+        from sqlalchemy.orm import sessionmaker
+        from app.services.audit_service import make_system_log_spill
+        from core.engine.audit import AuditEngine
+
+        engine = AuditEngine(
+            spill=make_system_log_spill(sessionmaker(bind=db_engine)), spill_batch_size=2
+        )
+        entries = [
+            engine.log(operator_id=operator.id, action="room.update_status", entity_type="Room",
+                       entity_id=i, new_value='{"status": "occupied"}', ip_address="10.0.0.1")
+            for i in range(3)
+        ]
+        engine.log(action="permission.denied")
+
+        assert engine.flush_spill() == 4
+
+        rows = db_session.query(SystemLog).order_by(SystemLog.id).all()
+        assert [(r.operator_id, r.action, r.entity_id) for r in rows] == [
+            (operator.id, "room.update_status", 0),
+            (operator.id, "room.update_status", 1),
+            (operator.id, "room.update_status", 2),
+            (None, "permission.denied", None),
+        ]
+        assert rows[0].created_at == entries[0].timestamp
+        assert rows[0].ip_address == "10.0.0.1"
+
+    def test_create_log_without_commit(self, audit_service, db_session, operator):
+        audit_service.create_log(operator_id=operator.id, action="deferred", commit=False)
+        db_session.rollback()
+
+        assert db_session.query(SystemLog).filter_by(action="deferred").count() == 0
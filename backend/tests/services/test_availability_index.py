@@ -0,0 +1,310 @@
+"""
+房态可售库存索引测试
+覆盖：预订占用库存、离店日期区间、事件驱动的增量维护、重复投递跳过、与全量构建结果一致
+"""
+import pytest
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from app.models.ontology import (
+    Room, RoomType, RoomStatus, Reservation, ReservationStatus, StayRecord, StayRecordStatus
+)
+from app.models.schemas import (
+    ReservationCreate, ReservationCancel, ExtendStay, ChangeRoom, CheckInFromReservation,
+    CheckOutRequest
+)
+from app.services.availability_index import RoomAvailabilityIndex
+from app.services.checkin_service import CheckInService
+from app.services.checkout_service import CheckOutService
+from app.services.reservation_service import ReservationService
+from app.services.room_service import RoomService
+
+TODAY = date.today()
+
+
+def _d(days: int) -> date:
+    return TODAY + timedelta(days=days)
+
+
+class _Bus:
+    """最小事件总线：同步分发"""
+
+    def __init__(self):
+        self.handlers = {}
+
+    def subscribe(self, event_type, handler):
+        self.handlers.setdefault(event_type, []).append(handler)
+
+    def unsubscribe(self, event_type, handler):
+        self.handlers.get(event_type, []).remove(handler)
+
+    def publish(self, event):
+        for handler in self.handlers.get(event.event_type, []):
+            handler(event)
+
+
+@pytest.fixture
+def hotel(db_session):
+    """两个房型：标准间 3 间、豪华间 1 间"""
+    standard = RoomType(name="标准间", base_price=Decimal("288"), max_occupancy=2)
+    deluxe = RoomType(name="豪华间", base_price=Decimal("588"), max_occupancy=2)
+    db_session.add_all([standard, deluxe])
+    db_session.flush()
+    rooms = [
+        Room(room_number=str(n), floor=1, room_type_id=standard.id, status=RoomStatus.VACANT_CLEAN)
+        for n in (101, 102, 103)
+    ]
+    rooms.append(Room(room_number="201", floor=2, room_type_id=deluxe.id, status=RoomStatus.VACANT_CLEAN))
+    db_session.add_all(rooms)
+    db_session.commit()
+    return standard, deluxe, rooms
+
+
+def _reserve(db, guest, room_type, check_in, check_out, room_count=1,
+             status=ReservationStatus.CONFIRMED, no="R"):
+    reservation = Reservation(
+        reservation_no=f"{no}{check_in:%m%d}{room_type.id}{room_count}",
+        guest_id=guest.id, room_type_id=room_type.id,
+        check_in_date=check_in, check_out_date=check_out,
+        room_count=room_count, status=status
+    )
+    db.add(reservation)
+    db.commit()
+    return reservation
+
+
+def _stay(db, guest, room, check_out, employee):
+    stay = StayRecord(
+        guest_id=guest.id, room_id=room.id, check_in_time=datetime.now(),
+        expected_check_out=check_out, status=StayRecordStatus.ACTIVE, created_by=employee.id
+    )
+    room.status = RoomStatus.OCCUPIED
+    db.add(stay)
+    db.commit()
+    return stay
+
+
+class TestReservationAwareAvailability:
+    """未注册索引时按查询区间临时构建"""
+
+    def test_confirmed_reservations_consume_inventory(self, db_session, hotel, sample_guest):
+        standard, _, _ = hotel
+        _reserve(db_session, sample_guest, standard, _d(1), _d(3), room_count=2)
+
+        svc = RoomService(db_session)
+        rooms = svc.get_available_rooms(_d(2), _d(4), room_type_id=standard.id)
+
+        assert len(rooms) == 1
+        availability = svc.get_availability_by_room_type(_d(2), _d(4))[standard.id]
+        assert (availability['total'], availability['booked'], availability['available']) == (3, 2, 1)
+        assert [n['booked'] for n in availability['nights']] == [2, 0]
+
+    def test_check_out_date_is_exclusive(self, db_session, hotel, sample_guest):
+        _, deluxe, _ = hotel
+        _reserve(db_session, sample_guest, deluxe, _d(1), _d(3))
+
+        svc = RoomService(db_session)
+
+        assert svc.get_available_rooms(_d(3), _d(5), room_type_id=deluxe.id) != []
+        assert svc.get_available_rooms(_d(0), _d(1), room_type_id=deluxe.id) != []
+        assert svc.get_available_rooms(_d(0), _d(2), room_type_id=deluxe.id) == []
+
+    def test_cancelled_reservations_ignored(self, db_session, hotel, sample_guest):
+        _, deluxe, _ = hotel
+        _reserve(db_session, sample_guest, deluxe, _d(1), _d(3), status=ReservationStatus.CANCELLED)
+
+        assert len(RoomService(db_session).get_available_rooms(_d(1), _d(2), deluxe.id)) == 1
+
+    def test_exclude_reservation_id(self, db_session, hotel, sample_guest):
+        _, deluxe, _ = hotel
+        reservation = _reserve(db_session, sample_guest, deluxe, _d(0), _d(2))
+
+        svc = RoomService(db_session)
+
+        assert svc.get_available_rooms(_d(0), _d(2), deluxe.id) == []
+        assert len(svc.get_available_rooms(_d(0), _d(2), deluxe.id,
+                                           exclude_reservation_id=reservation.id)) == 1
+
+    def test_availability_by_type_excludes_reservation(self, db_session, hotel, sample_guest):
+        standard, _, _ = hotel
+        reservation = _reserve(db_session, sample_guest, standard, _d(1), _d(3), room_count=2)
+
+        svc = RoomService(db_session)
+        others = svc.get_availability_by_room_type(_d(1), _d(3))[standard.id]
+        own = svc.get_availability_by_room_type(_d(1), _d(3), exclude_reservation_id=reservation.id)[standard.id]
+
+        assert (others['booked'], others['available']) == (2, 1)
+        assert (own['booked'], own['available']) == (0, 3)
+
+    def test_checkin_action_assigns_reserved_room(self, db_session, hotel, sample_guest, sample_employee):
+        from app.services.actions.base import CheckinParams
+        from app.services.actions.stay_actions import register_stay_actions
+        from core.ai.actions import ActionRegistry
+        _, deluxe, _ = hotel
+        reservation = _reserve(db_session, sample_guest, deluxe, _d(0), _d(2))
+        registry = ActionRegistry()
+        register_stay_actions(registry)
+
+        result = registry.get_action("checkin").handler(
+            CheckinParams(reservation_id=reservation.id), db=db_session, user=sample_employee
+        )
+
+        assert result["success"], result
+        assert result["room_number"] == "201"
+
+    def test_room_free_after_stay_ends(self, db_session, hotel, sample_guest, sample_employee):
+        _, deluxe, rooms = hotel
+        _stay(db_session, sample_guest, rooms[3], _d(2), sample_employee)
+
+        svc = RoomService(db_session)
+
+        assert svc.get_available_rooms(_d(0), _d(1), deluxe.id) == []
+        assert svc.get_available_rooms(_d(1), _d(3), deluxe.id) == []
+        assert [r.room_number for r in svc.get_available_rooms(_d(2), _d(3), deluxe.id)] == ["201"]
+
+    def test_overdue_stay_still_occupies_tonight(self, db_session, hotel, sample_guest, sample_employee):
+        _, deluxe, rooms = hotel
+        _stay(db_session, sample_guest, rooms[3], _d(-1), sample_employee)
+
+        availability = RoomService(db_session).get_availability_by_room_type(_d(0), _d(1))
+
+        assert availability[deluxe.id]['available'] == 0
+
+    def test_out_of_order_rooms_blocked(self, db_session, hotel):
+        standard, _, rooms = hotel
+        rooms[0].status = RoomStatus.OUT_OF_ORDER
+        db_session.commit()
+
+        availability = RoomService(db_session).get_availability_by_room_type(_d(0), _d(1))[standard.id]
+
+        assert (availability['total'], availability['blocked'], availability['available']) == (2, 1, 2)
+
+
+class TestEventDrivenIndex:
+    """注册到事件总线后由业务事件增量维护"""
+
+    @pytest.fixture
+    def bus(self):
+        return _Bus()
+
+    @pytest.fixture
+    def index(self, bus):
+        index = RoomAvailabilityIndex(max_age_seconds=0)
+        index.register(bus)
+        yield index
+        index.unregister()
+
+    def _assert_matches_rebuild(self, db, index, start, end):
+        fresh = RoomAvailabilityIndex(max_age_seconds=0)
+        fresh.rebuild(db)
+        assert index.get_availability(db, start, end) == fresh.get_availability(db, start, end)
+        assert index.get_free_room_ids(db, start, end) == fresh.get_free_room_ids(db, start, end)
+
+    def test_reservation_lifecycle(self, db_session, hotel, bus, index, sample_employee):
+        standard, _, _ = hotel
+        room_svc = RoomService(db_session, bus.publish, availability_index=index)
+        res_svc = ReservationService(db_session, event_publisher=bus.publish)
+        room_svc.get_availability_by_room_type(_d(1), _d(2))  # 首次查询构建索引
+
+        reservation = res_svc.create_reservation(ReservationCreate(
+            guest_name="王五", guest_phone="13700000000", room_type_id=standard.id,
+            check_in_date=_d(1), check_out_date=_d(4), room_count=2
+        ), created_by=sample_employee.id)
+
+        assert len(room_svc.get_available_rooms(_d(2), _d(3), standard.id)) == 1
+        self._assert_matches_rebuild(db_session, index, _d(0), _d(5))
+
+        from app.models.schemas import ReservationUpdate
+        res_svc.update_reservation(reservation.id, ReservationUpdate(check_out_date=_d(2)))
+        assert len(room_svc.get_available_rooms(_d(2), _d(3), standard.id)) == 3
+
+        res_svc.cancel_reservation(reservation.id, ReservationCancel(cancel_reason="行程变更"))
+        assert len(room_svc.get_available_rooms(_d(1), _d(2), standard.id)) == 3
+        assert index.get_stats()['rebuilds'] == 1
+        self._assert_matches_rebuild(db_session, index, _d(0), _d(5))
+
+    def test_check_in_extend_change_and_check_out(self, db_session, hotel, bus, index,
+                                                  sample_guest, sample_employee):
+        standard, deluxe, rooms = hotel
+        room_svc = RoomService(db_session, bus.publish, availability_index=index)
+        checkin_svc = CheckInService(db_session, event_publisher=bus.publish)
+        reservation = _reserve(db_session, sample_guest, standard, _d(0), _d(2))
+        room_svc.get_availability_by_room_type(_d(0), _d(1))
+
+        stay = checkin_svc.check_in_from_reservation(
+            CheckInFromReservation(reservation_id=reservation.id, room_id=rooms[0].id),
+            operator_id=sample_employee.id
+        )
+        free = index.get_free_room_ids(db_session, _d(0), _d(1))
+        assert rooms[0].id not in free[standard.id]
+        self._assert_matches_rebuild(db_session, index, _d(0), _d(4))
+
+        checkin_svc.extend_stay(stay.id, ExtendStay(new_check_out_date=_d(3)), sample_employee.id)
+        assert index.get_availability(db_session, _d(2), _d(3))[standard.id]['booked'] == 1
+
+        checkin_svc.change_room(stay.id, ChangeRoom(new_room_id=rooms[3].id), sample_employee.id)
+        availability = index.get_availability(db_session, _d(0), _d(1))
+        assert availability[standard.id]['booked'] == 0
+        assert availability[deluxe.id]['available'] == 0
+        self._assert_matches_rebuild(db_session, index, _d(0), _d(4))
+
+        CheckOutService(db_session, event_publisher=bus.publish).check_out(
+            CheckOutRequest(stay_record_id=stay.id, allow_unsettled=True, unsettled_reason="测试"),
+            operator_id=sample_employee.id
+        )
+        assert index.get_availability(db_session, _d(0), _d(1))[deluxe.id]['available'] == 1
+        assert index.get_stats()['rebuilds'] == 1
+        self._assert_matches_rebuild(db_session, index, _d(0), _d(4))
+
+    def test_database_occupancy_authoritative_today(self, db_session, hotel, bus, index):
+        standard, _, rooms = hotel
+        room_svc = RoomService(db_session, bus.publish, availability_index=index)
+        room_svc.get_availability_by_room_type(_d(0), _d(1))
+        rooms[0].status = RoomStatus.OCCUPIED  # 绕过服务层，索引不知情
+        db_session.commit()
+
+        assert rooms[0] not in room_svc.get_available_rooms(_d(0), _d(1), standard.id)
+        assert rooms[0] in room_svc.get_available_rooms(_d(1), _d(2), standard.id)
+
+    def test_redelivered_event_skipped(self, db_session, hotel, bus, index, sample_guest, sample_employee):
+        standard, _, rooms = hotel
+        room_svc = RoomService(db_session, bus.publish, availability_index=index)
+        room_svc.get_availability_by_room_type(_d(0), _d(1))
+        events = []
+        stay = CheckInService(db_session, event_publisher=events.append).check_in_from_reservation(
+            CheckInFromReservation(
+                reservation_id=_reserve(db_session, sample_guest, standard, _d(0), _d(2)).id,
+                room_id=rooms[0].id,
+            ),
+            operator_id=sample_employee.id
+        )
+        bus.publish(events[0])
+        CheckOutService(db_session, event_publisher=bus.publish).check_out(
+            CheckOutRequest(stay_record_id=stay.id, allow_unsettled=True, unsettled_reason="测试"),
+            operator_id=sample_employee.id
+        )
+
+        bus.publish(events[0])  # 发件箱重复投递入住事件
+
+        assert rooms[0].id in index.get_free_room_ids(db_session, _d(0), _d(1))[standard.id]
+        assert index.get_stats()['events_applied'] == 2
+        self._assert_matches_rebuild(db_session, index, _d(0), _d(4))
+
+    def test_room_status_and_inventory_events(self, db_session, hotel, bus, index):
+        standard, _, rooms = hotel
+        room_svc = RoomService(db_session, bus.publish, availability_index=index)
+        room_svc.get_availability_by_room_type(_d(0), _d(1))
+
+        room_svc.update_room_status(rooms[0].id, RoomStatus.OUT_OF_ORDER)
+        availability = index.get_availability(db_session, _d(0), _d(1))[standard.id]
+        assert (availability['total'], availability['blocked']) == (2, 1)
+        assert index.get_stats()['rebuilds'] == 1
+
+        from app.models.schemas import RoomCreate
+        room_svc.create_room(RoomCreate(room_number="104", floor=1, room_type_id=standard.id))
+        assert index.get_availability(db_session, _d(0), _d(1))[standard.id]['total'] == 3
+        assert index.get_stats()['rebuilds'] == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -735,3 +735,110 @@ class TestCrossDayPagination:
         # Should be time-sorted oldest first
         assert messages[0].content == "yesterday-0"
         assert messages[-1].content == "today-a"
+
+
+# ========== Index ==========
+
+
+def _append_lines(path, *messages):
+    with open(path, "a", encoding="utf-8") as f:
+        for msg in messages:
+            f.write(json.dumps(msg.to_dict(), ensure_ascii=False) + "\n")
+
+
+class TestConversationIndex:
+    """Tests for the SQLite index behind the JSONL logs."""
+
+    def test_external_appends_are_picked_up(self, service):
+        service.save_message_pair(user_id=1, user_content="q1", assistant_content="a1")
+        assert len(service.get_messages(user_id=1)[0]) == 2
+
+        today_file = service._get_file_path(1, date.today().isoformat())
+        _append_lines(today_file, ConversationMessage(
+            id="ext-1", timestamp=datetime.now().isoformat(), role="user", content="external"
+        ))
+        with open(today_file, "a", encoding="utf-8") as f:
+            f.write('{"id": "partial"')  # 未写完的行
+
+        messages, _ = service.get_messages(user_id=1)
+        assert [m.content for m in messages] == ["q1", "a1", "external"]
+
+        with open(today_file, "a", encoding="utf-8") as f:
+            f.write(', "timestamp": "2026-01-01T00:00:00", "role": "user", "content": "done"}\n')
+        assert service.get_messages_by_date(1, date.today().isoformat())[-1].id == "partial"
+
+    def test_appends_to_older_day_are_picked_up(self, service, tmp_path):
+        old_day = (date.today() - timedelta(days=1)).isoformat()
+        user_dir = tmp_path / "1"
+        user_dir.mkdir()
+        _append_lines(user_dir / f"{old_day}.jsonl", ConversationMessage(
+            id="old-1", timestamp=f"{old_day}T10:00:00", role="user", content="昨天的问题"
+        ))
+        service.save_message_pair(user_id=1, user_content="q1", assistant_content="a1")
+        assert len(service.search_messages(1, "昨天")) == 1
+
+        # 追加已有文件不会改变目录 mtime，仍需识别出变化
+        dir_mtime = user_dir.stat().st_mtime_ns
+        _append_lines(user_dir / f"{old_day}.jsonl", ConversationMessage(
+            id="old-2", timestamp=f"{old_day}T11:00:00", role="user", content="昨天的补充"
+        ))
+        assert user_dir.stat().st_mtime_ns == dir_mtime
+
+        assert [m.id for m in service.search_messages(1, "昨天")] == ["old-2", "old-1"]
+        assert [m.id for m in service.get_messages_by_date(1, old_day)] == ["old-1", "old-2"]
+
+    def test_rewritten_and_deleted_files_are_reindexed(self, service):
+        service.save_message_pair(user_id=1, user_content="before", assistant_content="rewrite")
+        today_file = service._get_file_path(1, date.today().isoformat())
+        assert service.get_last_message(1).content == "rewrite"
+
+        today_file.write_text(json.dumps(ConversationMessage(
+            id="r", timestamp=datetime.now().isoformat(), role="user", content="x"
+        ).to_dict()) + "\n", encoding="utf-8")
+        assert [m.id for m in service.get_messages(1)[0]] == ["r"]
+
+        today_file.unlink()
+        assert service.get_messages(1) == ([], False)
+        assert service.get_statistics()["total_messages"] == 0
+
+    def test_topic_context_beyond_recent_window(self, service):
+        service.save_message_pair(user_id=1, user_content="topic q", assistant_content="topic a", topic_id="old")
+        for i in range(20):
+            service.save_message_pair(user_id=1, user_content=f"q{i}", assistant_content=f"a{i}", topic_id="new")
+
+        ctx = service.get_context_messages(user_id=1, topic_id="old", max_rounds=3)
+
+        assert [m.content for m in ctx] == ["topic q", "topic a"]
+
+    def test_search_chinese_and_short_keywords(self, service):
+        service.save_message_pair(user_id=1, user_content="帮我查一下 201 房间的退房时间", assistant_content="明天中午")
+        service.save_message_pair(user_id=2, user_content="退房时间", assistant_content="ok")
+
+        assert [m.content for m in service.search_messages(1, "退房时间")] == ["帮我查一下 201 房间的退房时间"]
+        assert [m.content for m in service.search_messages(1, "中午")] == ["明天中午"]
+        assert service.search_messages(1, "OK") == []
+        assert [m.content for m in service.search_messages(2, "OK")] == ["ok"]
+
+    def test_new_service_reuses_index(self, service, tmp_path):
+        service.save_message_pair(user_id=1, user_content="q", assistant_content="a")
+
+        reopened = ConversationService(base_dir=str(tmp_path))
+
+        assert reopened.index.counts() == {"users": 1, "files": 1, "messages": 2}
+        assert [m.content for m in reopened.get_messages(1)[0]] == ["q", "a"]
+
+    def test_rebuild_index_migrates_existing_tree(self, tmp_path):
+        user_dir = tmp_path / "7"
+        user_dir.mkdir()
+        _append_lines(user_dir / "2025-12-31.jsonl", *[
+            ConversationMessage(id=f"m{i}", timestamp=f"2025-12-31T10:00:0{i}", role="user", content=f"c{i}")
+            for i in range(3)
+        ])
+        with open(user_dir / "2025-12-31.jsonl", "a", encoding="utf-8") as f:
+            f.write("not json\n")
+
+        svc = ConversationService(base_dir=str(tmp_path), index_path=str(tmp_path / "idx" / "conv.db"))
+
+        assert svc.rebuild_index() == {"users": 1, "files": 1, "messages": 3}
+        assert svc.get_available_dates(7) == ["2025-12-31"]
+        assert svc.get_users_with_conversations() == [7]
@@ -0,0 +1,275 @@
+"""
+日经营指标汇总测试
+覆盖：与明细报表口径一致、事件驱动的增量维护、重复投递只计一次、
+对账保留历史房态快照、未来日期不落库、夜间对账内置任务
+"""
+import pytest
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from sqlalchemy.orm import sessionmaker
+
+from app.models.kpi import DailyKPI
+from app.models.ontology import (
+    Bill, Payment, PaymentMethod, Room, RoomStatus, RoomType, StayRecord, StayRecordStatus
+)
+from app.models.schemas import ChangeRoom, CheckOutRequest, ExtendStay, PaymentCreate, WalkInCheckIn
+from app.services.billing_service import BillingService
+from app.services.checkin_service import CheckInService
+from app.services.checkout_service import CheckOutService
+from app.services.kpi_rollup_service import DailyKPIRollup, KPIRollupService
+from app.services.report_service import ReportService
+from app.services.room_service import RoomService
+
+TODAY = date.today()
+
+
+class _Bus:
+    """最小事件总线：同步分发"""
+
+    def __init__(self):
+        self.handlers = {}
+
+    def subscribe(self, event_type, handler):
+        self.handlers.setdefault(event_type, []).append(handler)
+
+    def unsubscribe(self, event_type, handler):
+        self.handlers.get(event_type, []).remove(handler)
+
+    def publish(self, event):
+        for handler in self.handlers.get(event.event_type, []):
+            handler(event)
+
+
+@pytest.fixture
+def hotel(db_session):
+    """标准间 3 间（其中 1 间维修）、豪华间 1 间"""
+    standard = RoomType(name="标准间", base_price=Decimal("288"), max_occupancy=2)
+    deluxe = RoomType(name="豪华间", base_price=Decimal("588"), max_occupancy=2)
+    db_session.add_all([standard, deluxe])
+    db_session.flush()
+    rooms = [
+        Room(room_number="101", floor=1, room_type_id=standard.id, status=RoomStatus.VACANT_CLEAN),
+        Room(room_number="102", floor=1, room_type_id=standard.id, status=RoomStatus.VACANT_DIRTY),
+        Room(room_number="103", floor=1, room_type_id=standard.id, status=RoomStatus.OUT_OF_ORDER),
+        Room(room_number="201", floor=2, room_type_id=deluxe.id, status=RoomStatus.VACANT_CLEAN),
+    ]
+    db_session.add_all(rooms)
+    db_session.commit()
+    return standard, deluxe, rooms
+
+
+def _history(db, guest, employee, rooms):
+    """前天入住、昨天退房的一条住宿，以及昨天和今天的收款"""
+    stay = StayRecord(
+        guest_id=guest.id, room_id=rooms[0].id,
+        check_in_time=datetime.combine(TODAY - timedelta(days=2), datetime.min.time()) + timedelta(hours=14),
+        check_out_time=datetime.combine(TODAY - timedelta(days=1), datetime.min.time()) + timedelta(hours=11),
+        expected_check_out=TODAY - timedelta(days=1), status=StayRecordStatus.CHECKED_OUT,
+        created_by=employee.id
+    )
+    db.add(stay)
+    db.flush()
+    bill = Bill(stay_record_id=stay.id, total_amount=Decimal("288"), paid_amount=Decimal("388"))
+    db.add(bill)
+    db.flush()
+    db.add_all([
+        Payment(bill_id=bill.id, amount=Decimal("288"), method=PaymentMethod.CARD,
+                payment_time=stay.check_out_time, created_by=employee.id),
+        Payment(bill_id=bill.id, amount=Decimal("100"), method=PaymentMethod.CASH,
+                payment_time=datetime.now(), created_by=employee.id),
+    ])
+    db.commit()
+
+
+def _strip(values):
+    return {k: v for k, v in values.items() if k != 'business_date'}
+
+
+class TestRollupMatchesReports:
+    """汇总行与明细报表口径一致"""
+
+    def test_reports_match_report_service(self, db_session, hotel, sample_guest, sample_employee):
+        _history(db_session, sample_guest, sample_employee, hotel[2])
+        start, end = TODAY - timedelta(days=3), TODAY
+
+        svc = KPIRollupService(db_session)
+        report = ReportService(db_session)
+
+        assert svc.get_occupancy_report(start, end) == report.get_occupancy_report(start, end)
+        assert svc.get_revenue_report(start, end) == report.get_revenue_report(start, end)
+        assert svc.get_dashboard_stats() == report.get_dashboard_stats()
+        assert db_session.query(DailyKPI).count() == 4
+
+    def test_breakdown_adr_and_revpar(self, db_session, hotel, sample_guest, sample_employee):
+        standard, deluxe, rooms = hotel
+        _history(db_session, sample_guest, sample_employee, rooms)
+
+        yesterday = KPIRollupService(db_session).get_days(TODAY - timedelta(days=1), TODAY - timedelta(days=1))[0]
+
+        assert (yesterday['occupied_rooms'], yesterday['sellable_rooms']) == (1, 3)
+        assert yesterday['revenue_by_method'] == {'card': Decimal('288')}
+        assert (yesterday['adr'], yesterday['revpar']) == (Decimal('288.00'), Decimal('96.00'))
+        assert yesterday['room_type_breakdown'][standard.id] == {
+            'room_type_name': '标准间', 'total_rooms': 2, 'occupied_rooms': 1,
+            'arrivals': 0, 'departures': 1, 'revenue': Decimal('288'),
+        }
+        assert yesterday['room_type_breakdown'][deluxe.id]['total_rooms'] == 1
+
+    def test_future_days_not_persisted(self, db_session, hotel):
+        days = KPIRollupService(db_session).get_days(TODAY, TODAY + timedelta(days=2))
+
+        assert [d['business_date'] for d in days] == [TODAY + timedelta(days=i) for i in range(3)]
+        assert [row.business_date for row in db_session.query(DailyKPI).all()] == [TODAY]
+
+    def test_reconcile_keeps_historical_room_snapshot(self, db_session, hotel):
+        svc = KPIRollupService(db_session)
+        yesterday = TODAY - timedelta(days=1)
+        svc.reconcile(yesterday, TODAY)
+
+        hotel[2][1].status = RoomStatus.OUT_OF_ORDER
+        db_session.commit()
+        svc.reconcile(yesterday, TODAY)
+
+        rows = {row.business_date: row for row in db_session.query(DailyKPI).all()}
+        assert (rows[yesterday].out_of_order, rows[yesterday].sellable_rooms) == (1, 3)
+        assert (rows[TODAY].out_of_order, rows[TODAY].sellable_rooms) == (2, 2)
+
+
+class TestEventDrivenRollup:
+    """注册到事件总线后由业务事件修改当天的行"""
+
+    @pytest.fixture
+    def bus(self):
+        return _Bus()
+
+    @pytest.fixture
+    def rollup(self, db_engine, bus, monkeypatch):
+        import app.services.kpi_rollup_service as module
+        rollup = DailyKPIRollup(sessionmaker(autocommit=False, autoflush=False, bind=db_engine))
+        rollup.register(bus)
+        monkeypatch.setattr(module, "_kpi_rollup", rollup)
+        yield rollup
+        rollup.unregister()
+
+    def _today(self, db):
+        db.expire_all()
+        return KPIRollupService.load(db.query(DailyKPI).filter(DailyKPI.business_date == TODAY).one())
+
+    def _assert_matches_reconcile(self, db):
+        incremental = _strip(self._today(db))
+        KPIRollupService(db).reconcile(TODAY, TODAY)
+        assert incremental == _strip(self._today(db))
+
+    def test_stay_lifecycle(self, db_session, hotel, bus, rollup, sample_employee):
+        standard, deluxe, rooms = hotel
+        svc = KPIRollupService(db_session)
+        svc.get_dashboard_stats()  # 首次读取生成当天的行
+
+        checkin = CheckInService(db_session, event_publisher=bus.publish)
+        stay = checkin.walk_in_check_in(WalkInCheckIn(
+            guest_name="王五", guest_phone="13700000000", room_id=rooms[0].id,
+            expected_check_out=TODAY + timedelta(days=2)
+        ), operator_id=sample_employee.id)
+        stats = svc.get_dashboard_stats()
+        assert (stats['today_checkins'], stats['occupied'], stats['vacant_clean']) == (1, 1, 1)
+        self._assert_matches_reconcile(db_session)
+
+        bill = db_session.query(Bill).filter(Bill.stay_record_id == stay.id).one()
+        BillingService(db_session, event_publisher=bus.publish).add_payment(
+            PaymentCreate(bill_id=bill.id, amount=Decimal("300"), method=PaymentMethod.CASH),
+            operator_id=sample_employee.id
+        )
+        today = self._today(db_session)
+        assert (today['revenue'], today['revenue_by_method']) == (Decimal('300'), {'cash': Decimal('300')})
+        assert today['room_type_breakdown'][standard.id]['revenue'] == Decimal('300')
+        self._assert_matches_reconcile(db_session)
+
+        checkin.change_room(stay.id, ChangeRoom(new_room_id=rooms[3].id), sample_employee.id)
+        today = self._today(db_session)
+        assert today['room_type_breakdown'][deluxe.id]['occupied_rooms'] == 1
+        assert today['room_type_breakdown'][standard.id]['occupied_rooms'] == 0
+        self._assert_matches_reconcile(db_session)
+
+        CheckOutService(db_session, event_publisher=bus.publish).check_out(
+            CheckOutRequest(stay_record_id=stay.id, allow_unsettled=True, unsettled_reason="测试"),
+            operator_id=sample_employee.id
+        )
+        stats = svc.get_dashboard_stats()
+        assert (stats['today_checkouts'], stats['occupied']) == (1, 0)
+        self._assert_matches_reconcile(db_session)
+        assert rollup.get_stats()['errors'] == 0
+
+    def test_overdue_stay_extended(self, db_session, hotel, bus, rollup, sample_guest, sample_employee):
+        rooms = hotel[2]
+        stay = StayRecord(
+            guest_id=sample_guest.id, room_id=rooms[3].id,
+            check_in_time=datetime.now() - timedelta(days=2), expected_check_out=TODAY,
+            status=StayRecordStatus.ACTIVE, created_by=sample_employee.id
+        )
+        rooms[3].status = RoomStatus.OCCUPIED
+        db_session.add(stay)
+        db_session.flush()
+        db_session.add(Bill(stay_record_id=stay.id, total_amount=Decimal("1176")))
+        db_session.commit()
+        svc = KPIRollupService(db_session)
+        assert svc.get_days(TODAY, TODAY)[0]['occupied_rooms'] == 0
+
+        CheckInService(db_session, event_publisher=bus.publish).extend_stay(
+            stay.id, ExtendStay(new_check_out_date=TODAY + timedelta(days=1)), sample_employee.id
+        )
+
+        assert self._today(db_session)['occupied_rooms'] == 1
+        self._assert_matches_reconcile(db_session)
+
+    def test_room_status_refresh(self, db_session, hotel, bus, rollup):
+        rooms = hotel[2]
+        svc = KPIRollupService(db_session)
+        svc.get_dashboard_stats()
+
+        RoomService(db_session, bus.publish).update_room_status(rooms[1].id, RoomStatus.VACANT_CLEAN)
+
+        stats = svc.get_dashboard_stats()
+        assert (stats['vacant_clean'], stats['vacant_dirty']) == (3, 0)
+        assert rollup.get_stats()['events_applied'] == 1
+
+    def test_redelivered_events_applied_once(self, db_session, hotel, bus, rollup, sample_employee,
+                                             monkeypatch):
+        """发件箱重复投递同一事件 ID 时只修改一次"""
+        from app.config import settings
+        monkeypatch.setattr(settings, "OUTBOX_ENABLED", True)
+        rooms = hotel[2]
+        KPIRollupService(db_session).get_dashboard_stats()
+
+        events = []
+        stay = CheckInService(db_session, event_publisher=events.append).walk_in_check_in(WalkInCheckIn(
+            guest_name="王五", guest_phone="13700000000", room_id=rooms[0].id,
+            expected_check_out=TODAY + timedelta(days=2)
+        ), operator_id=sample_employee.id)
+        bill = db_session.query(Bill).filter(Bill.stay_record_id == stay.id).one()
+        BillingService(db_session, event_publisher=events.append).add_payment(
+            PaymentCreate(bill_id=bill.id, amount=Decimal("300"), method=PaymentMethod.CASH),
+            operator_id=sample_employee.id
+        )
+        for event in events + events:
+            bus.publish(event)
+
+        today = self._today(db_session)
+        assert (today['arrivals'], today['occupied_rooms']) == (1, 1)
+        assert (today['revenue'], today['payment_count']) == (Decimal('300'), 1)
+        assert rollup.get_stats()['events_applied'] == 2
+        self._assert_matches_reconcile(db_session)
+
+
+class TestReconcileJob:
+    """夜间对账任务"""
+
+    def test_builtin_job_seeded_once(self, db_session):
+        from app.system.services.scheduler_service import SchedulerService
+
+        service = SchedulerService(db_session)
+
+        assert service.seed_builtin_jobs() == 1
+        assert service.seed_builtin_jobs() == 0
+        job = service.get_job_by_code("daily_kpi_reconcile")
+        target = SchedulerService._resolve_target(job.invoke_target)
+        assert target.__name__ == "reconcile_daily_kpi"
@@ -9,7 +9,9 @@ Covers:
 - LLMService class: init, chat, _build_context_info, _validate_and_clean_result,
   extract_entities, check_topic_relevance, extract_intent, extract_params,
   parse_followup_input, _instrumented_completion, build_system_prompt_with_schema,
-  get_query_schema, on_ontology_changed, _build_action_params_hints
+  get_query_schema, on_ontology_changed, _build_action_params_hints,
+  get_prompt_build_stats
+- LLM response cache integration
 """
 import json
 import pytest
@@ -1182,7 +1184,7 @@ class TestBuildSystemPromptWithSchema:
         svc = self._make_service()
         svc._prompt_builder = MagicMock()
         svc._prompt_builder.build_system_prompt.return_value = "dynamic prompt"
-        svc._prompt_builder._build_domain_glossary.return_value = "glossary"
+        svc._prompt_builder.build_domain_glossary.return_value = "glossary"
 
         result = svc.build_system_prompt_with_schema(include_glossary=True, user_role="manager", message_hint="test")
         assert "dynamic prompt" in result
@@ -1192,7 +1194,7 @@ class TestBuildSystemPromptWithSchema:
         svc = self._make_service()
         svc._prompt_builder = MagicMock()
         svc._prompt_builder.build_system_prompt.return_value = "dynamic prompt"
-        svc._prompt_builder._build_domain_glossary.side_effect = Exception("fail")
+        svc._prompt_builder.build_domain_glossary.side_effect = Exception("fail")
 
         result = svc.build_system_prompt_with_schema(include_glossary=True)
         assert "dynamic prompt" in result
@@ -1211,6 +1213,34 @@ class TestBuildSystemPromptWithSchema:
                 assert isinstance(result, str)
 
 
+class TestGetPromptBuildStats:
+    def _make_service(self):
+        from app.services.llm_service import LLMService
+        with patch.object(LLMService, '__init__', lambda self: None):
+            svc = LLMService()
+        svc._query_schema_cache = None
+        svc.SYSTEM_PROMPT = "Test prompt"
+        return svc
+
+    def test_no_prompt_builder(self):
+        svc = self._make_service()
+        svc._prompt_builder = None
+        assert svc.get_prompt_build_stats() == {}
+
+    def test_reports_section_cache_hits(self):
+        from core.ai.prompt_builder import PromptBuilder
+        svc = self._make_service()
+        svc._prompt_builder = PromptBuilder()
+
+        svc.build_system_prompt_with_schema(user_role="manager")
+        assert svc.get_prompt_build_stats()["cached_sections"] == []
+
+        svc.build_system_prompt_with_schema(user_role="manager")
+        stats = svc.get_prompt_build_stats()
+        assert stats["cache_hit_rate"] == 1.0
+        assert stats["estimated_tokens"] > 0
+
+
 class TestBuildActionParamsHints:
     def _make_service(self):
         from app.services.llm_service import LLMService
@@ -1488,3 +1518,82 @@ class TestExtractParams:
         }
         result = svc.extract_params("no useful info", schema)
         assert result["confidence"] == 0.0
+
+
+class TestLLMServiceResponseCache:
+    """Repeated prompts are served from the shared LLMResponseCache"""
+
+    def _make_service(self, cache):
+        from app.services.llm_service import LLMService
+        with patch.object(LLMService, '__init__', lambda self: None):
+            svc = LLMService()
+        svc.enabled = True
+        svc.client = MagicMock()
+        svc._prompt_builder = None
+        svc._query_schema_cache = None
+        svc._response_cache = cache
+
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = "cached text"
+        mock_response.usage = MagicMock(prompt_tokens=5, completion_tokens=10, total_tokens=15)
+        svc.client.chat.completions.create.return_value = mock_response
+        return svc
+
+    @patch("core.ai.llm_call_context.LLMCallContext")
+    def test_second_identical_call_skips_provider(self, mock_ctx_cls):
+        from core.ai.response_cache import LLMResponseCache
+
+        debug_logger = MagicMock()
+        mock_ctx_cls.get_current.return_value = {
+            "session_id": "sess-1",
+            "ooda_phase": "orient",
+            "call_type": "topic_relevance",
+            "debug_logger": debug_logger,
+            "sequence": 0,
+        }
+        mock_ctx_cls.next_sequence.return_value = 0
+        svc = self._make_service(LLMResponseCache())
+        messages = [{"role": "user", "content": "hi"}]
+
+        first = svc._instrumented_completion(messages, model="m", temperature=0)
+        second = svc._instrumented_completion(messages, model="m", temperature=0)
+
+        assert svc.client.chat.completions.create.call_count == 1
+        assert second.choices[0].message.content == first.choices[0].message.content
+        logged = [c.kwargs for c in debug_logger.log_llm_interaction.call_args_list]
+        assert [k["cache_status"] for k in logged] == ["miss", "exact"]
+        assert logged[1]["tokens_total"] == 15
+        assert logged[1]["saved_latency_ms"] is not None
+
+    @patch("core.ai.llm_call_context.LLMCallContext")
+    def test_raw_chat_uses_cache(self, mock_ctx_cls):
+        from core.ai.response_cache import LLMResponseCache
+
+        mock_ctx_cls.get_current.return_value = None
+        svc = self._make_service(LLMResponseCache())
+
+        assert svc.raw_chat([{"role": "user", "content": "discover"}]) == "cached text"
+        assert svc.raw_chat([{"role": "user", "content": "discover"}]) == "cached text"
+        assert svc.client.chat.completions.create.call_count == 1
+
+    @patch("core.ai.llm_call_context.LLMCallContext")
+    def test_on_ontology_changed_invalidates_shared_cache(self, mock_ctx_cls):
+        import app.services.llm_service as llm_module
+
+        mock_ctx_cls.get_current.return_value = None
+        with patch.object(llm_module.settings, "LLM_CACHE_ENABLED", True):
+            llm_module.reset_response_cache()
+            try:
+                cache = llm_module.get_response_cache()
+                svc = self._make_service(cache)
+                messages = [{"role": "user", "content": "hi"}]
+
+                svc._instrumented_completion(messages, model="m", temperature=0)
+                svc.on_ontology_changed()
+                svc._instrumented_completion(messages, model="m", temperature=0)
+
+                assert svc.client.chat.completions.create.call_count == 2
+                assert cache.get_stats()["invalidations"] == 1
+            finally:
+                llm_module.reset_response_cache()
@@ -0,0 +1,277 @@
+"""
+事件发件箱测试
+覆盖：与业务变更同事务提交、中继按序批量发布并标记、发布失败保序重试、
+至少一次投递下消费者幂等、退房等业务服务事件走发件箱、后台中继线程
+"""
+import json
+import threading
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.models.events import EventType
+from app.models.ontology import Bill, RoomStatus, StayRecord, StayRecordStatus, Task, TaskType
+from app.models.outbox import OutboxEvent, ProcessedEvent
+from app.models.schemas import CheckOutRequest
+from app.services.checkout_service import CheckOutService
+from app.services.event_bus import Event
+from app.services.event_handlers import EventHandlers
+from app.services.outbox_service import OutboxRelay, claim_event, stage_event
+
+
+def _event(event_type="test.event", **data):
+    return Event(event_type=event_type, timestamp=datetime.now(), data=data, source="test")
+
+
+@pytest.fixture
+def session_factory(db_engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=db_engine)
+
+
+class TestStageEvent:
+    """发件箱写入随业务事务提交或回滚"""
+
+    def test_commit_and_rollback(self, db_session):
+        stage_event(db_session, _event(n=1))
+        db_session.commit()
+        stage_event(db_session, _event(n=2))
+        db_session.rollback()
+
+        rows = db_session.query(OutboxEvent).all()
+        assert [r.payload for r in rows] == ['{"n": 1}']
+        assert rows[0].published_at is None
+
+    def test_payload_serializes_dates_and_decimals(self, db_session):
+        stage_event(db_session, _event(day=date(2026, 10, 1), amount=Decimal("288.00")))
+        db_session.commit()
+
+        assert db_session.query(OutboxEvent).one().payload == '{"day": "2026-10-01", "amount": "288.00"}'
+
+    def test_event_ids_unique(self):
+        assert len({_event().event_id for _ in range(1000)}) == 1000
+
+
+class TestOutboxRelay:
+    """中继批量发布"""
+
+    def test_publishes_in_order_and_marks(self, db_session, session_factory):
+        events = [_event(n=i) for i in range(5)]
+        for event in events:
+            stage_event(db_session, event)
+        db_session.commit()
+
+        received = []
+        relay = OutboxRelay(session_factory, publish=received.append, batch_size=2)
+
+        assert relay.relay_pending() == 5
+        assert [e.event_id for e in received] == [e.event_id for e in events]
+        assert [e.data["n"] for e in received] == list(range(5))
+        assert received[0].timestamp == events[0].timestamp
+        assert relay.pending_count() == 0
+        assert relay.relay_once() == 0
+        assert relay.get_stats()["published"] == 5
+
+    def test_failure_keeps_order_and_retries(self, db_session, session_factory):
+        for i in range(3):
+            stage_event(db_session, _event(n=i))
+        db_session.commit()
+
+        received = []
+
+        def publish(event):
+            if event.data["n"] == 1 and not received[1:]:
+                received.append(None)
+                raise RuntimeError("bus unavailable")
+            received.append(event.data["n"])
+
+        relay = OutboxRelay(session_factory, publish=publish)
+
+        assert relay.relay_once() == 1
+        db_session.expire_all()
+        row = db_session.query(OutboxEvent).filter(OutboxEvent.published_at.is_(None)).first()
+        assert (row.attempts, row.last_error) == (1, "bus unavailable")
+
+        assert relay.relay_once() == 2
+        assert received == [0, None, 1, 2]
+        assert relay.get_stats()["errors"] == 1
+
+    def test_poison_event_skipped_after_max_attempts(self, db_session, session_factory):
+        stage_event(db_session, _event(n=0))
+        stage_event(db_session, _event(n=1))
+        db_session.commit()
+
+        received = []
+
+        def publish(event):
+            if event.data["n"] == 0:
+                raise ValueError("bad event")
+            received.append(event.data["n"])
+
+        relay = OutboxRelay(session_factory, publish=publish, max_attempts=2)
+        relay.relay_once()
+        relay.relay_once()
+
+        assert relay.relay_once() == 1
+        assert received == [1]
+        assert relay.pending_count() == 0
+
+    def test_purge_published(self, db_session, session_factory):
+        stage_event(db_session, _event())
+        db_session.commit()
+        relay = OutboxRelay(session_factory, publish=lambda e: None)
+        relay.relay_once()
+        db_session.query(OutboxEvent).update({"published_at": datetime.now() - timedelta(days=8)})
+        db_session.commit()
+
+        assert relay.purge_published(days=7) == 1
+
+    def test_background_thread(self, tmp_path):
+        from sqlalchemy import create_engine
+        from app.database import Base
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'outbox.db'}", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        done = threading.Event()
+        received = []
+
+        def publish(event):
+            received.append(event)
+            if len(received) == 3:
+                done.set()
+
+        relay = OutboxRelay(factory, publish=publish, poll_interval=10)
+        relay.start()
+        try:
+            db = factory()
+            for i in range(3):
+                stage_event(db, _event(n=i))
+            db.commit()
+            db.close()
+            relay.notify()
+
+            assert done.wait(5)
+        finally:
+            relay.stop()
+        assert relay.get_stats()["running"] is False
+        engine.dispose()
+
+
+class TestIdempotentConsumer:
+    """重复投递时消费者只处理一次"""
+
+    def test_claim_event(self, db_session):
+        assert claim_event(db_session, "consumer", "e1") is True
+        db_session.commit()
+
+        assert claim_event(db_session, "consumer", "e1") is False
+        assert claim_event(db_session, "other", "e1") is True
+
+    def test_redelivered_checkout_creates_one_cleaning_task(self, db_session, session_factory, sample_room,
+                                                            monkeypatch):
+        from app.config import settings
+        monkeypatch.setattr(settings, "OUTBOX_ENABLED", True)
+        handlers = EventHandlers(db_session_factory=session_factory)
+        event = _event(EventType.GUEST_CHECKED_OUT, room_id=sample_room.id, guest_name="张三")
+
+        handlers.handle_guest_checked_out(event)
+        handlers.handle_guest_checked_out(event)
+
+        assert db_session.query(Task).filter(Task.room_id == sample_room.id).count() == 1
+        assert db_session.query(ProcessedEvent).count() == 1
+
+    def test_redelivered_room_change_and_task_completed(self, db_session, session_factory, sample_room,
+                                                        monkeypatch):
+        from app.config import settings
+        monkeypatch.setattr(settings, "OUTBOX_ENABLED", True)
+        handlers = EventHandlers(db_session_factory=session_factory)
+        changed = _event(EventType.ROOM_CHANGED, old_room_id=sample_room.id, guest_name="张三")
+        completed = _event(EventType.TASK_COMPLETED, task_type="cleaning", room_id=sample_room.id)
+
+        handlers.handle_room_changed(changed)
+        handlers.handle_room_changed(changed)
+        handlers.handle_task_completed(completed)
+        sample_room.status = RoomStatus.VACANT_DIRTY  # 之后再次变脏
+        db_session.commit()
+        handlers.handle_task_completed(completed)
+
+        assert db_session.query(Task).filter(Task.room_id == sample_room.id).count() == 1
+        db_session.refresh(sample_room)
+        assert sample_room.status == RoomStatus.VACANT_DIRTY
+
+
+class TestCheckoutThroughOutbox:
+    """启用发件箱后退房事件同事务写入，由中继发布"""
+
+    def test_checkout_stages_event(self, db_session, session_factory, sample_room, sample_guest,
+                                   sample_employee, monkeypatch):
+        from app.config import settings
+        monkeypatch.setattr(settings, "OUTBOX_ENABLED", True)
+
+        sample_room.status = RoomStatus.OCCUPIED
+        stay = StayRecord(
+            guest_id=sample_guest.id, room_id=sample_room.id,
+            check_in_time=datetime.now() - timedelta(days=1),
+            expected_check_out=date.today(), status=StayRecordStatus.ACTIVE
+        )
+        db_session.add(stay)
+        db_session.flush()
+        db_session.add(Bill(stay_record_id=stay.id, total_amount=Decimal("288"), paid_amount=Decimal("288")))
+        db_session.commit()
+
+        CheckOutService(db_session).check_out(CheckOutRequest(stay_record_id=stay.id), sample_employee.id)
+
+        row = db_session.query(OutboxEvent).one()
+        assert row.event_type == EventType.GUEST_CHECKED_OUT.value
+        assert db_session.query(Task).count() == 0
+
+        handlers = EventHandlers(db_session_factory=session_factory)
+        relay = OutboxRelay(session_factory, publish=handlers.handle_guest_checked_out)
+        assert relay.relay_once() == 1
+        task = db_session.query(Task).one()
+        assert (task.room_id, task.task_type) == (sample_room.id, TaskType.CLEANING)
+
+    def test_injected_publisher_bypasses_outbox(self, db_session, sample_room, sample_guest,
+                                                sample_employee, monkeypatch):
+        from app.config import settings
+        monkeypatch.setattr(settings, "OUTBOX_ENABLED", True)
+
+        stay = StayRecord(
+            guest_id=sample_guest.id, room_id=sample_room.id,
+            check_in_time=datetime.now() - timedelta(days=1),
+            expected_check_out=date.today(), status=StayRecordStatus.ACTIVE
+        )
+        db_session.add(stay)
+        db_session.commit()
+
+        published = []
+        CheckOutService(db_session, event_publisher=published.append).check_out(
+            CheckOutRequest(stay_record_id=stay.id), sample_employee.id
+        )
+
+        assert [e.event_type for e in published] == [EventType.GUEST_CHECKED_OUT]
+        assert db_session.query(OutboxEvent).count() == 0
+
+
+class TestServicesStageEvents:
+    """启用发件箱后其他服务的领域事件同样随业务事务写入"""
+
+    def test_task_and_room_events_staged(self, db_session, sample_room, sample_employee, monkeypatch):
+        from app.config import settings
+        from app.models.schemas import TaskCreate
+        from app.services.room_service import RoomService
+        from app.services.task_service import TaskService
+        monkeypatch.setattr(settings, "OUTBOX_ENABLED", True)
+
+        task = TaskService(db_session).create_task(
+            TaskCreate(room_id=sample_room.id, task_type=TaskType.CLEANING), sample_employee.id
+        )
+        RoomService(db_session).update_room_status(sample_room.id, RoomStatus.VACANT_DIRTY)
+
+        rows = db_session.query(OutboxEvent).order_by(OutboxEvent.id).all()
+        assert [row.event_type for row in rows] == [
+            EventType.TASK_CREATED.value, EventType.ROOM_STATUS_CHANGED.value
+        ]
+        assert json.loads(rows[0].payload)["task_id"] == task.id
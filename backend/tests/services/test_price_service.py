@@ -1,7 +1,8 @@
 """
 Tests for app/hotel/services/price_service.py
 Covers: get_rate_plans, get_rate_plan, create_rate_plan, update_rate_plan,
-        delete_rate_plan, get_price_for_date, calculate_total_price, get_price_calendar
+        delete_rate_plan, get_price_for_date, calculate_total_price, get_price_calendar,
+        calculate_total_prices
 """
 import pytest
 from datetime import date, timedelta
@@ -381,6 +382,51 @@ class TestCalculateTotalPrice:
         assert total == Decimal("0")
 
 
+class TestCalculateTotalPrices:
+
+    def _reference_total(self, service, rt_id, check_in, check_out, room_count):
+        """逐晚调用 get_price_for_date 累加"""
+        total = Decimal("0")
+        current = check_in
+        while current < check_out:
+            total += service.get_price_for_date(rt_id, current)
+            current += timedelta(days=1)
+        return total * room_count
+
+    def test_batch_matches_per_night_sum(self, db_session):
+        standard = _make_room_type(db_session, base_price=Decimal("288.50"))
+        deluxe = _make_room_type(db_session, name="豪华间", base_price=Decimal("588"))
+        today = date.today()
+        _make_rate_plan(db_session, standard, "旺季", start_date=today + timedelta(days=5),
+                        end_date=today + timedelta(days=40), price=Decimal("388"), priority=1)
+        _make_rate_plan(db_session, standard, "国庆", start_date=today + timedelta(days=20),
+                        end_date=today + timedelta(days=26), price=Decimal("688.88"), priority=5)
+        _make_rate_plan(db_session, standard, "周末", start_date=today,
+                        end_date=today + timedelta(days=60), price=Decimal("428"),
+                        priority=2, is_weekend=True)
+        _make_rate_plan(db_session, deluxe, "停用", start_date=today,
+                        end_date=today + timedelta(days=60), price=Decimal("1"), is_active=False)
+        db_session.commit()
+
+        service = PriceService(db_session)
+        requests = [
+            (standard.id, today, today + timedelta(days=45), 2),
+            (deluxe.id, today + timedelta(days=3), today + timedelta(days=64), 1),
+            (standard.id, today + timedelta(days=21), today + timedelta(days=23), 3),
+            (deluxe.id, today, today, 1),
+        ]
+
+        totals = service.calculate_total_prices(requests)
+
+        assert totals == [self._reference_total(service, *r) for r in requests]
+        assert totals[3] == Decimal("0")
+
+    def test_invalid_room_type(self, db_session):
+        today = date.today()
+        with pytest.raises(ValueError, match="房型不存在"):
+            PriceService(db_session).calculate_total_prices([(99999, today, today + timedelta(days=1), 1)])
+
+
 class TestGetPriceCalendar:
 
     def test_calendar_structure(self, db_session):
@@ -416,3 +462,10 @@ class TestGetPriceCalendar:
         # Both Friday (weekday 4) and Saturday (weekday 5) are >= 4 → is_weekend True
         assert calendar[0]["is_weekend"] is True
         assert calendar[1]["is_weekend"] is True
+
+    def test_reversed_range_is_empty(self, db_session):
+        rt = _make_room_type(db_session)
+        db_session.commit()
+
+        today = date.today()
+        assert PriceService(db_session).get_price_calendar(rt.id, today, today - timedelta(days=1)) == []
@@ -259,6 +259,30 @@ class TestGetOccupancyReport:
         report = ReportService(db_session).get_occupancy_report(today, today)
         assert report[0]["occupied_rooms"] >= 1
 
+    def test_per_day_counts_follow_stay_dates(self, db_session):
+        rt = _make_room_type(db_session)
+        room = _make_room(db_session, rt, "101")
+        guest = _make_guest(db_session)
+        emp = _make_employee(db_session)
+
+        today = date.today()
+        _make_stay(
+            db_session, guest, room,
+            datetime.combine(today, datetime.min.time()),
+            today + timedelta(days=2),
+            created_by=emp.id,
+        )
+        db_session.commit()
+
+        report = ReportService(db_session).get_occupancy_report(
+            today - timedelta(days=1), today + timedelta(days=2))
+        assert [r["date"] for r in report] == [today + timedelta(days=i) for i in range(-1, 3)]
+        assert [r["occupied_rooms"] for r in report] == [0, 1, 1, 0]
+
+    def test_reversed_range_is_empty(self, db_session):
+        today = date.today()
+        assert ReportService(db_session).get_occupancy_report(today, today - timedelta(days=1)) == []
+
 
 class TestGetRevenueReport:
     """Tests for ReportService.get_revenue_report()"""
@@ -310,6 +334,24 @@ class TestGetRevenueReport:
         assert report[0]["revenue"] == Decimal("100")
         assert report[1]["revenue"] == Decimal("200")
 
+    def test_days_without_payments_are_zero(self, db_session):
+        rt = _make_room_type(db_session)
+        room = _make_room(db_session, rt, "101")
+        guest = _make_guest(db_session)
+        emp = _make_employee(db_session)
+        stay = _make_stay(db_session, guest, room, datetime.now(),
+                          date.today() + timedelta(days=1), created_by=emp.id)
+        bill = _make_bill(db_session, stay)
+
+        today = date.today()
+        _make_payment(db_session, bill, Decimal("150"),
+                      payment_time=datetime.combine(today, datetime.min.time()) + timedelta(hours=9))
+        db_session.commit()
+
+        report = ReportService(db_session).get_revenue_report(today - timedelta(days=2), today)
+        assert [r["revenue"] for r in report] == [0, 0, Decimal("150")]
+        assert [r["payment_count"] for r in report] == [0, 0, 1]
+
 
 class TestGetRoomTypeReport:
     """Tests for ReportService.get_room_type_report()"""
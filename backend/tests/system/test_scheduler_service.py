@@ -17,7 +17,7 @@ from sqlalchemy.orm import Session
 
 from app.system.models.scheduler import SysJob, SysJobLog
 from app.system.services.scheduler_service import SchedulerService
-from app.system.services.scheduler_backend import APSchedulerBackend
+from app.system.services.scheduler_backend import APSchedulerBackend, acquire_scheduler_lock
 from core.scheduler import SchedulerRegistry
 
 
@@ -334,6 +334,17 @@ class TestSchedulerServiceLoadActive:
         assert count == 0
 
 
+    def test_load_builtin_jobs_skips_user_jobs(self, service_with_backend, mock_backend, sample_job):
+        """Startup registers only the builtin jobs, not every active SysJob."""
+        svc = service_with_backend
+        svc.seed_builtin_jobs()
+
+        count = svc.load_builtin_jobs()
+
+        assert count == 1
+        assert mock_backend.add_job.call_args.kwargs["job_id"] == "daily_kpi_reconcile"
+
+
 # ── SchedulerService Internal Helpers ─────────────────────
 
 
@@ -539,3 +550,19 @@ class TestAPSchedulerBackend:
         backend = APSchedulerBackend()
         from apscheduler.schedulers.background import BackgroundScheduler
         assert isinstance(backend.scheduler, BackgroundScheduler)
+
+
+class TestSchedulerLock:
+    """Only one worker process runs the scheduler."""
+
+    def test_second_acquire_fails_until_released(self, tmp_path):
+        path = str(tmp_path / "locks" / "scheduler.lock")
+
+        first = acquire_scheduler_lock(path)
+        assert first is not None
+        assert acquire_scheduler_lock(path) is None
+
+        first.close()
+        second = acquire_scheduler_lock(path)
+        assert second is not None
+        second.close()